@@ -6,16 +6,20 @@ Provides intelligent commentary and tips for CS:GO gesture control
 import google.generativeai as genai
 import json
 import time
+from collections import deque
 from typing import Dict, List, Optional, Any
 from config import config
 
+# Commentary entries kept for get_commentary_history (a session generates one every few seconds for hours)
+HISTORY_LIMIT = 50
+
 class GeminiCommentary:
     """Gemini AI-powered commentary system"""
     
     def __init__(self):
         self.model = None
         self.last_commentary_time = 0
-        self.commentary_history = []
+        self.commentary_history = deque(maxlen=HISTORY_LIMIT)
         
         # Initialize Gemini
         if config.gemini_api_key:
@@ -88,7 +92,7 @@ class GeminiCommentary:
                 'type': 'backseat_commentary',
                 'content': commentary,
                 'timestamp': time.time(),
-                'game_state': game_state
+                'context': context  # The formatted summary, not the live game_state dict
             })
             
             return commentary
@@ -121,7 +125,7 @@ class GeminiCommentary:
                 'type': 'strategy_advice',
                 'content': advice,
                 'timestamp': time.time(),
-                'game_state': game_state
+                'context': context
             })
             
             return advice
@@ -239,11 +243,11 @@ class GeminiCommentary:
     
     def get_commentary_history(self, limit: int = 10) -> List[Dict]:
         """Get recent commentary history"""
-        return self.commentary_history[-limit:]
+        return list(self.commentary_history)[-limit:]
     
     def clear_history(self):
         """Clear commentary history"""
-        self.commentary_history = []
+        self.commentary_history.clear()
     
     def is_available(self) -> bool:
         """Check if AI commentary is available"""
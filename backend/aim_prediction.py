@@ -0,0 +1,134 @@
+"""
+Aim Prediction
+Extrapolates the index finger tip to the expected mouse injection time.
+
+By the time a landmark turns into a mouse move the hand has already moved on by
+the capture + inference + injection latency. The predictor fits velocity and
+acceleration to the last few timestamped samples and leads the aim point by the
+measured pipeline latency, with a clamp for sudden direction changes: on a
+reversal the lead already applied decays over a few frames instead of vanishing
+at once, since the mouse controller moves by deltas from the last output and
+would otherwise jump back by the whole lead.
+"""
+
+import time
+from collections import deque
+
+import numpy as np
+
+
+class LatencyEstimator:
+    """Smoothed capture-to-injection latency (seconds)"""
+
+    def __init__(self, initial=0.05, smoothing=0.1, max_latency=0.25):
+        self.value = initial
+        self.smoothing = smoothing
+        self.max_latency = max_latency
+        self.samples = 0
+
+    def observe(self, latency):
+        """Fold a new latency measurement into the estimate"""
+        if latency is None or latency < 0:
+            return self.value
+        latency = min(latency, self.max_latency)  # A stall still raises the horizon, within bounds
+        if self.samples == 0:
+            self.value = latency
+        else:
+            self.value += self.smoothing * (latency - self.value)
+        self.samples += 1
+        return self.value
+
+
+class AimPredictor:
+    """Velocity/acceleration extrapolation of the aim point with a direction-change clamp"""
+
+    def __init__(self, history_size=5, max_horizon=0.1, horizon_scale=1.0,
+                 max_lead=0.05, max_sample_gap=0.2, initial_latency=0.05, reversal_decay=0.5):
+        self.history = deque(maxlen=max(2, history_size))
+        self.max_horizon = max_horizon  # Never lead further than this (seconds)
+        self.horizon_scale = horizon_scale  # Fraction of measured latency to compensate
+        self.max_lead = max_lead  # Max extrapolation distance (normalized units)
+        self.max_sample_gap = max_sample_gap  # Older gaps mean tracking was lost
+        self.latency = LatencyEstimator(initial=initial_latency)
+        self.reversal_decay = reversal_decay  # Fraction of the lead kept per frame while reversing
+        self.lead = np.zeros(2)  # Offset added to the last returned position
+        self.last_velocity = None
+        self.clamped = False
+
+    @property
+    def horizon(self):
+        """Current prediction horizon, tuned from the measured pipeline latency"""
+        return min(self.max_horizon, max(0.0, self.latency.value * self.horizon_scale))
+
+    def observe_latency(self, latency):
+        """Report the measured capture-to-injection latency for the last frame"""
+        return self.latency.observe(latency)
+
+    def reset(self):
+        """Forget motion history (e.g. gun released or hand lost)"""
+        self.history.clear()
+        self.lead = np.zeros(2)
+        self.last_velocity = None
+        self.clamped = False
+
+    def update(self, x, y, timestamp=None):
+        """
+        Add a sample and return the position extrapolated to injection time.
+        Coordinates are normalized landmark units; timestamp is the capture time.
+        """
+        if timestamp is None:
+            timestamp = time.perf_counter()
+
+        if self.history and timestamp - self.history[-1][0] > self.max_sample_gap:
+            self.reset()
+        if self.history and timestamp <= self.history[-1][0]:
+            # Duplicate or out-of-order frame - keep the newest sample only
+            self.history.pop()
+        self.history.append((timestamp, x, y))
+
+        self.clamped = False
+        if len(self.history) < 2:
+            self.last_velocity = None
+            self.lead = np.zeros(2)
+            return x, y
+
+        samples = np.asarray(self.history, dtype=np.float64)
+        t = samples[:, 0] - timestamp
+        xy = samples[:, 1:3]
+
+        if len(samples) >= 3:
+            # Quadratic fit per axis: p(t) = a t^2 + b t + c, evaluated at t = 0
+            coeffs = np.polyfit(t, xy, 2)
+            acceleration = 2.0 * coeffs[0]
+            velocity = coeffs[1]
+        else:
+            velocity = (xy[1] - xy[0]) / (t[1] - t[0])
+            acceleration = np.zeros(2)
+
+        # Safety clamp: a reversal between the latest segment and the fitted
+        # velocity means the hand just changed direction - don't overshoot
+        latest_velocity = (xy[-1] - xy[-2]) / (t[-1] - t[-2])
+        reversed_direction = float(np.dot(latest_velocity, velocity)) < 0.0
+        if self.last_velocity is not None and float(np.dot(self.last_velocity, velocity)) < 0.0:
+            reversed_direction = True
+        self.last_velocity = velocity
+
+        if reversed_direction:
+            # Ease the lead out rather than snapping back to the raw position
+            self.clamped = True
+            self.lead = self.lead * self.reversal_decay
+            return x + float(self.lead[0]), y + float(self.lead[1])
+
+        h = self.horizon
+        lead = velocity * h + 0.5 * acceleration * h * h
+        if float(np.dot(lead, velocity)) < 0.0:
+            # Deceleration would carry the prediction backwards - use velocity only
+            lead = velocity * h
+
+        lead_norm = float(np.hypot(lead[0], lead[1]))
+        if lead_norm > self.max_lead:
+            lead *= self.max_lead / lead_norm
+            self.clamped = True
+
+        self.lead = lead
+        return x + float(lead[0]), y + float(lead[1])
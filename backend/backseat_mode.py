@@ -10,8 +10,15 @@ from typing import Dict, List, Optional, Tuple
 from config import config
 from ai_commentary import gemini_commentary
 from voice_synthesis import voice_synthesis
+from gesture_frame import GestureFrame
+from ring_buffer import EventWindow, RingBuffer, RollingMean
 from character_overlay import character_overlay
 
+# Non-idle actions tracked in the performance history (index = event code)
+ACTIONS = ('shooting', 'aiming', 'moving', 'spraying', 'crouching', 'jumping')
+ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+ACTION_HORIZON = 30.0  # Seconds of actions kept for variety/transition scoring
+
 class BackseatGamerMode:
     """Backseat gamer mode with AI-powered commentary"""
     
@@ -21,11 +28,11 @@ class BackseatGamerMode:
         self.last_commentary_time = 0
         self.encouragement_threshold = config.backseat_encouragement_threshold
         
-        # Performance tracking
-        self.performance_history = []
-        self.gesture_accuracy_history = []
-        self.recent_actions = []
-        self.action_timestamps = []
+        # Performance tracking (fixed-size rings, statistics kept up to date incrementally)
+        self.performance_history = RingBuffer(50)
+        self.gesture_accuracy_history = RingBuffer(100)
+        self.recent_accuracy = RollingMean(10)
+        self.recent_actions = EventWindow(capacity=4096, horizon=ACTION_HORIZON, codes=len(ACTIONS))
         
         # Commentary types and their frequencies
         self.commentary_types = {
@@ -45,10 +52,10 @@ class BackseatGamerMode:
         """Start backseat gamer mode"""
         self.is_active = True
         self.last_commentary_time = time.time()
-        self.performance_history = []
-        self.gesture_accuracy_history = []
-        self.recent_actions = []
-        self.action_timestamps = []
+        self.performance_history.clear()
+        self.gesture_accuracy_history.clear()
+        self.recent_accuracy.clear()
+        self.recent_actions.clear()
         self.character_mood = 'excited'
         
         # Welcome message
@@ -80,7 +87,7 @@ class BackseatGamerMode:
         
         print("Backseat Gamer Mode deactivated.")
     
-    def update_backseat_mode(self, gesture_data: Dict, frame: np.ndarray) -> str:
+    def update_backseat_mode(self, gesture_data: GestureFrame, frame: np.ndarray) -> str:
         """
         Update backseat gamer mode based on current game state
         Returns: status message
@@ -118,43 +125,24 @@ class BackseatGamerMode:
         
         return f"Backseat Active | {mood_text} | {performance_text}"
     
-    def _update_performance_tracking(self, gesture_data: Dict, current_time: float):
+    def _update_performance_tracking(self, gesture_data: GestureFrame, current_time: float):
         """Update performance tracking metrics"""
-        # Track recent actions
+        # Track recent actions (last 30 seconds)
         current_action = self._determine_current_action(gesture_data)
         if current_action and current_action != 'idle':
-            self.recent_actions.append(current_action)
-            self.action_timestamps.append(current_time)
-        
-        # Keep only recent actions (last 30 seconds)
-        cutoff_time = current_time - 30
-        filtered_actions = []
-        filtered_timestamps = []
-        
-        for action, timestamp in zip(self.recent_actions, self.action_timestamps):
-            if timestamp > cutoff_time:
-                filtered_actions.append(action)
-                filtered_timestamps.append(timestamp)
-        
-        self.recent_actions = filtered_actions
-        self.action_timestamps = filtered_timestamps
+            self.recent_actions.append(current_time, ACTION_CODES[current_action])
+        self.recent_actions.expire(current_time)
         
-        # Calculate gesture accuracy
+        # Calculate gesture accuracy (last 100 measurements kept)
         gesture_accuracy = self._calculate_gesture_accuracy(gesture_data)
         self.gesture_accuracy_history.append(gesture_accuracy)
+        self.recent_accuracy.append(gesture_accuracy)
         
-        # Keep only last 100 measurements
-        if len(self.gesture_accuracy_history) > 100:
-            self.gesture_accuracy_history = self.gesture_accuracy_history[-100:]
-        
-        # Calculate overall performance score
+        # Calculate overall performance score (last 50 kept)
         performance_score = self._calculate_performance_score(gesture_data)
         self.performance_history.append(performance_score)
-        
-        if len(self.performance_history) > 50:
-            self.performance_history = self.performance_history[-50:]
     
-    def _determine_current_action(self, gesture_data: Dict) -> str:
+    def _determine_current_action(self, gesture_data: GestureFrame) -> str:
         """Determine current player action based on gesture data"""
         wasd_states = gesture_data.get('wasd_states', {})
         gun_active = gesture_data.get('gun_active', False)
@@ -177,7 +165,7 @@ class BackseatGamerMode:
         else:
             return 'idle'
     
-    def _calculate_gesture_accuracy(self, gesture_data: Dict) -> float:
+    def _calculate_gesture_accuracy(self, gesture_data: GestureFrame) -> float:
         """Calculate current gesture accuracy"""
         accuracy_components = []
         
@@ -205,26 +193,22 @@ class BackseatGamerMode:
         
         return sum(accuracy_components) / len(accuracy_components)
     
-    def _calculate_performance_score(self, gesture_data: Dict) -> float:
+    def _calculate_performance_score(self, gesture_data: GestureFrame) -> float:
         """Calculate overall performance score (0-10)"""
         score = 5.0  # Base score
         
         # Gesture accuracy component
-        avg_accuracy = sum(self.gesture_accuracy_history[-10:]) / min(10, len(self.gesture_accuracy_history))
-        score += avg_accuracy * 2.0
+        score += self.recent_accuracy.value * 2.0
         
-        # Action variety component
-        unique_actions = len(set(self.recent_actions[-10:]))
-        score += min(unique_actions * 0.5, 2.0)
+        # Action variety component (distinct actions among the last 10)
+        score += min(self.recent_actions.distinct_recent * 0.5, 2.0)
         
-        # Smoothness component (based on action transitions)
-        if len(self.recent_actions) > 1:
-            transitions = len(set(zip(self.recent_actions[:-1], self.recent_actions[1:])))
-            score += min(transitions * 0.2, 1.0)
+        # Smoothness component (distinct action transitions in the window)
+        score += min(self.recent_actions.transitions * 0.2, 1.0)
         
         return min(max(score, 0.0), 10.0)
     
-    def _generate_game_state(self, gesture_data: Dict) -> Dict:
+    def _generate_game_state(self, gesture_data: GestureFrame) -> Dict:
         """Generate game state for AI commentary"""
         current_action = self._determine_current_action(gesture_data)
         performance_score = self._calculate_performance_score(gesture_data)
@@ -234,7 +218,7 @@ class BackseatGamerMode:
             'current_action': current_action,
             'performance_score': performance_score,
             'gesture_accuracy': gesture_accuracy,
-            'recent_actions': self.recent_actions[-5:],  # Last 5 actions
+            'recent_actions': [ACTIONS[code] for code in self.recent_actions.last(5)],  # Last 5 actions
             'wasd_states': gesture_data.get('wasd_states', {}),
             'gun_active': gesture_data.get('gun_active', False),
             'is_shooting': gesture_data.get('is_shooting', False),
@@ -373,17 +357,14 @@ class BackseatGamerMode:
     
     def get_performance_stats(self) -> Dict:
         """Get performance statistics"""
-        if not self.performance_history:
+        if not len(self.performance_history):
             return {}
         
-        avg_performance = sum(self.performance_history) / len(self.performance_history)
-        avg_accuracy = sum(self.gesture_accuracy_history) / len(self.gesture_accuracy_history)
-        
         return {
-            'average_performance': avg_performance,
-            'average_accuracy': avg_accuracy,
+            'average_performance': self.performance_history.mean(),
+            'average_accuracy': self.gesture_accuracy_history.mean(),
             'total_actions': len(self.recent_actions),
-            'unique_actions': len(set(self.recent_actions)),
+            'unique_actions': self.recent_actions.distinct,
             'character_mood': self.character_mood,
             'session_duration': time.time() - self.last_commentary_time + self.commentary_frequency
         }
@@ -0,0 +1,19 @@
+"""
+Gesture Pipeline Benchmarks
+Headless throughput/latency benchmarks for the control pipeline (CPU-only, no camera,
+no display, no key/mouse injection).
+
+Suites:
+    geometry     - per-call cost of the landmark geometry functions
+    controllers  - per-call cost of every controller's update()
+    pipeline     - full frame (capture -> color -> models -> controllers) per profile:
+                   leaning, integrated, complete, krunker
+    overlay      - landmark drawing, status panels and latency HUD at 1280x720
+    memory       - traced/RSS memory growth over a long landmark replay
+
+Usage (from backend/):
+    python -m benchmarks                              # all suites, results/<stamp>_<commit>.json
+    python -m benchmarks --quick --only geometry,controllers
+    python -m benchmarks --footage session.avi        # pipeline on recorded footage
+    python -m benchmarks.compare old.json new.json    # compare two runs
+"""
@@ -0,0 +1,93 @@
+"""
+Run the benchmark suites and write a JSON results file.
+
+    python -m benchmarks [--only geometry,controllers,pipeline,overlay,memory] [--quick]
+                         [--footage session.avi] [--landmarks session.lmk] [--output results.json]
+"""
+
+import argparse
+import os
+import time
+
+# Headless: no Qt/GTK window backend, no X display needed
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from .common import BenchmarkResults  # noqa: E402  (also puts backend/ on sys.path)
+from . import bench_controllers, bench_geometry, bench_memory, bench_overlay, bench_pipeline  # noqa: E402
+
+SUITES = ('geometry', 'controllers', 'pipeline', 'overlay', 'memory')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description="Gesture pipeline benchmarks")
+    parser.add_argument('--only', help=f"Comma-separated suites to run ({', '.join(SUITES)})")
+    parser.add_argument('--quick', action='store_true', help='Fewer frames/repeats for a smoke run')
+    parser.add_argument('--footage', help='Recorded video for the pipeline suite (frame_recording.py)')
+    parser.add_argument('--landmarks', help='Landmark log for the memory suite (landmark_log.py)')
+    parser.add_argument('--profiles', help=f"Comma-separated pipeline profiles ({', '.join(bench_pipeline.PROFILES)})")
+    parser.add_argument('--pipeline-frames', type=int, help='Frames per pipeline profile (default 300)')
+    parser.add_argument('--memory-frames', type=int, help='Frames replayed by the memory suite (default 36000)')
+    parser.add_argument('--output', help='Results file (default benchmarks/results/<stamp>_<commit>.json)')
+    args = parser.parse_args(argv)
+
+    suites = [s.strip() for s in args.only.split(',')] if args.only else list(SUITES)
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suite(s): {', '.join(sorted(unknown))}")
+    profiles = [p.strip() for p in args.profiles.split(',')] if args.profiles else None
+    if profiles and set(profiles) - set(bench_pipeline.PROFILES):
+        parser.error(f"unknown profile(s): {', '.join(sorted(set(profiles) - set(bench_pipeline.PROFILES)))}")
+
+    config = {
+        'suites': suites,
+        'quick': args.quick,
+        'micro_frames': 120 if args.quick else 600,
+        'repeat': 2 if args.quick else 5,
+        'pipeline_frames': args.pipeline_frames or (30 if args.quick else 300),
+        'memory_frames': args.memory_frames or (3000 if args.quick else 36000),
+        'footage': args.footage,
+        'landmarks': args.landmarks,
+        'profiles': profiles or list(bench_pipeline.PROFILES),
+    }
+    results = BenchmarkResults(config)
+
+    runners = {
+        'geometry': lambda: bench_geometry.run(results, config['micro_frames'], config['repeat']),
+        'controllers': lambda: bench_controllers.run(results, config['micro_frames'], config['repeat']),
+        'pipeline': lambda: bench_pipeline.run(results, config['pipeline_frames'], footage=args.footage,
+                                               profiles=profiles),
+        'overlay': lambda: bench_overlay.run(results, min(config['micro_frames'], 120), config['repeat']),
+        'memory': lambda: bench_memory.run(results, config['memory_frames'], landmarks=args.landmarks),
+    }
+    for suite in suites:
+        start = time.perf_counter()
+        print(f"▶ {suite} ...", flush=True)
+        runners[suite]()
+        print(f"  done in {time.perf_counter() - start:.1f}s", flush=True)
+        _print_suite(suite, results.suites.get(suite, {}))
+
+    path = results.save(args.output)
+    print(f"📊 Results written to {path}")
+    return results
+
+
+def _print_suite(suite, cases):
+    for case, metrics in cases.items():
+        if 'skipped' in metrics:
+            print(f"    {case:<52} skipped ({metrics['skipped']})")
+        elif 'us_per_call_median' in metrics:
+            print(f"    {case:<52} {metrics['us_per_call_median']:>10.2f} µs/call")
+        elif 'p50_ms' in metrics:
+            aim = metrics.get('aim_latency')
+            aim = f" | aim p50 {aim['p50_ms']:.0f} / p95 {aim['p95_ms']:.0f} ms" if aim else ""
+            print(f"    {case:<52} p50 {metrics['p50_ms']:.1f} ms | p95 {metrics['p95_ms']:.1f} ms | "
+                  f"{metrics['fps']:.1f} FPS{aim}")
+        elif 'accuracy' in metrics:
+            print(f"    {case:<52} " + " | ".join(f"{label} {value:.1%}" for label, value in metrics['accuracy'].items()))
+        elif 'traced_growth_bytes' in metrics:
+            print(f"    {case:<52} traced {metrics['traced_growth_bytes'] / 1024:+.1f} KiB | "
+                  f"RSS {metrics['rss_growth_bytes'] / 1024:+.1f} KiB | objects {metrics['objects_growth']:+d}")
+
+
+if __name__ == '__main__':
+    main()
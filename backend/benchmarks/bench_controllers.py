@@ -0,0 +1,125 @@
+"""
+Per-call cost of every controller's update() on a scripted landmark stream,
+driving a non-recording NullInputBackend.
+"""
+
+import os
+import tempfile
+
+import numpy as np
+
+from .common import BenchmarkResults, quiet, time_calls
+from .synthetic import labeled_hands, landmark_frames, write_landmark_log
+
+
+def run(results: BenchmarkResults, frames: int = 600, repeat: int = 5):
+    import leaning_control_system as lcs
+    from input_backends import NullInputBackend
+    from landmark_log import LandmarkFrame
+
+    stream = landmark_frames(frames)
+    right_hands = [f.multi_hand_landmarks[-1] for f in stream]
+    left_hands = [f.multi_hand_landmarks[0] for f in stream]
+    backend = NullInputBackend(record=False)
+
+    with quiet():
+        gun = lcs.StickyGunDetector()
+        results.add('controllers', 'StickyGunDetector.update', time_calls(gun.update, right_hands, repeat))
+
+        shooting = lcs.ThumbShootingController(input_backend=backend)
+        results.add('controllers', 'ThumbShootingController.update',
+                    time_calls(lambda h: shooting.update(h, True), right_hands, repeat))
+
+        for prediction in (True, False):
+            mouse = lcs.SmoothMouseController(prediction=prediction, input_backend=backend)
+            timed = [(h, f.timestamp) for h, f in zip(right_hands, stream)]
+            results.add('controllers', f"SmoothMouseController.update[prediction={prediction}]",
+                        time_calls(lambda item: mouse.update(item[0], True, item[1]), timed, repeat))
+
+        left = lcs.LeftHandGestureController(input_backend=backend)
+        results.add('controllers', 'LeftHandGestureController.update',
+                    time_calls(lambda h: left.update(h, True), left_hands, repeat))
+
+        # Every gesture lookup of one frame (both hands): rule predicates vs the learned classifier
+        classifier = _gesture_classifier(results)
+        pairs = list(zip(left_hands, right_hands))
+        for name, gestures in (('rules', lcs.RULE_GESTURES), ('classifier', classifier)):
+            results.add('controllers', f"gestures.frame[{name}]",
+                        time_calls(lambda pair: _all_gestures(gestures, *pair), pairs, repeat))
+
+        wasd = lcs.WASDController(input_backend=backend)
+        features = [(lcs.calculate_lean_pose(f.pose_landmarks, 1280, 720),
+                     lcs.calculate_head_pose(f.face_landmarks, 1280, 720)[1]) for f in stream]
+        results.add('controllers', 'WASDController.update',
+                    time_calls(lambda item: wasd.update(item[0], item[1], True), features, repeat))
+
+        tongue = lcs.TongueController(input_backend=backend)
+        results.add('controllers', 'TongueController.update',
+                    time_calls(lambda f: tongue.update(f.face_landmarks, True), stream, repeat))
+
+        # Everything together, on live MediaPipe objects and on replayed landmark_log views
+        system = lcs.LeaningControlSystem(input_backend=backend, load_models=False)
+        system.control_enabled = True
+        results.add('controllers', 'LeaningControlSystem.update_controls',
+                    time_calls(lambda f: system.update_controls(f.multi_hand_landmarks, f.pose_landmarks,
+                                                                f.face_landmarks, capture_time=f.timestamp,
+                                                                handedness_list=f.multi_handedness),
+                               stream, repeat))
+
+        learned = lcs.LeaningControlSystem(input_backend=backend, load_models=False, gestures=classifier)
+        learned.control_enabled = True
+        results.add('controllers', 'LeaningControlSystem.update_controls[classifier]',
+                    time_calls(lambda f: learned.update_controls(f.multi_hand_landmarks, f.pose_landmarks,
+                                                                 f.face_landmarks, capture_time=f.timestamp,
+                                                                 handedness_list=f.multi_handedness),
+                               stream, repeat))
+        learned.wasd_controller.release_all_keys()
+        learned.shooting_controller.force_release()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            log = write_landmark_log(os.path.join(tmp, 'stream.lmk'), stream)
+            replayed = [LandmarkFrame(record) for record in np.array(log.records)]
+        results.add('controllers', 'LeaningControlSystem.update_controls[replay]',
+                    time_calls(lambda f: system.update_controls(f.multi_hand_landmarks, f.pose_landmarks,
+                                                                f.face_landmarks, capture_time=f.timestamp,
+                                                                handedness_list=f.multi_handedness),
+                               replayed, repeat))
+        gestures = [system.update_controls(f.multi_hand_landmarks, f.pose_landmarks, f.face_landmarks,
+                                           capture_time=f.timestamp, handedness_list=f.multi_handedness)
+                     for f in stream]
+        system.wasd_controller.release_all_keys()
+        system.shooting_controller.force_release()
+
+    # Backseat coach performance history (imports the AI-mode dependencies)
+    case = 'BackseatGamerMode._update_performance_tracking'
+    try:
+        with quiet():
+            from backseat_mode import BackseatGamerMode
+            coach = BackseatGamerMode()
+    except Exception as e:
+        results.skip('controllers', case, f"import failed: {e!r}")
+        return
+    timed = [(g, i / 60.0) for i, g in enumerate(gestures * 6)]  # 60 FPS, well past the 30 s action horizon
+    results.add('controllers', case,
+                time_calls(lambda item: coach._update_performance_tracking(item[0], item[1]), timed, repeat))
+
+
+def _all_gestures(gestures, left_hand, right_hand):
+    gestures.classify(left_hand, right_hand)
+    return (gestures.gun(right_hand), gestures.curled(right_hand), gestures.thumb_down(right_hand),
+            gestures.left_gesture(left_hand))
+
+
+def _gesture_classifier(results: BenchmarkResults):
+    """Classifier trained on rotated, jittered synthetic hands; records rules vs model accuracy on held-out ones"""
+    import gesture_classifier
+
+    train_set, test_set = labeled_hands(4000, seed=1).split(0.25)
+    classifier = gesture_classifier.train(train_set.features(), train_set.targets, train_set.mask)
+    reports = gesture_classifier.compare(classifier, test_set)
+    for name, report in reports.items():
+        results.add('controllers', f"gestures.accuracy[{name}]",
+                    {'accuracy': {label: round(r['accuracy'], 4) for label, r in report.items()},
+                     'false_positive': {label: round(r['false_positive'], 4) for label, r in report.items()},
+                     'samples': len(test_set)})
+    return classifier
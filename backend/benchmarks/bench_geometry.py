@@ -0,0 +1,68 @@
+"""
+Per-call cost of the landmark geometry functions.
+
+The leaning system's implementations are always measured; the integrated and
+complete scripts' copies are measured too when their module imports (they pull
+in pyautogui at import time, which needs a display).
+"""
+
+import importlib
+
+from .common import BenchmarkResults, quiet, time_calls
+from .synthetic import landmark_frames
+
+OTHER_MODULES = ('integrated_control_system', 'complete_control_system')
+
+
+def _cases(module, frames):
+    hands = [f.multi_hand_landmarks[-1] for f in frames]
+    faces = [f.face_landmarks for f in frames]
+    poses = [f.pose_landmarks for f in frames]
+    points = [([h.landmark[8].x, h.landmark[8].y], [h.landmark[6].x, h.landmark[6].y],
+               [h.landmark[5].x, h.landmark[5].y]) for h in hands]
+
+    cases = {
+        'calculate_angle': (lambda p: module.calculate_angle(*p), points),
+        'is_finger_extended': (lambda h: module.is_finger_extended(h.landmark, 8, 6, 5), hands),
+        'is_gun_gesture': (module.is_gun_gesture, hands),
+        'is_thumb_down': (module.is_thumb_down, hands),
+        'are_bottom_fingers_curled': (module.are_bottom_fingers_curled, hands),
+        'detect_left_hand_gestures': (module.detect_left_hand_gestures, hands),
+        'calculate_head_pose': (lambda f: module.calculate_head_pose(f, 1280, 720), faces),
+    }
+    if hasattr(module, 'calculate_lean_pose'):
+        cases['calculate_lean_pose'] = (lambda p: module.calculate_lean_pose(p, 1280, 720), poses)
+    if hasattr(module, 'calculate_head_pose_from_pose'):
+        cases['calculate_head_pose_from_pose'] = (lambda p: module.calculate_head_pose_from_pose(p, 1280, 720), poses)
+    if hasattr(module, 'detect_mouth_open'):
+        cases['detect_mouth_open'] = (module.detect_mouth_open, faces)
+    if hasattr(module, 'detect_tongue_out'):
+        cases['detect_tongue_out'] = (module.detect_tongue_out, faces)
+    return cases
+
+
+def run(results: BenchmarkResults, frames: int = 600, repeat: int = 5):
+    stream = landmark_frames(frames)
+
+    import leaning_control_system
+    modules = [('leaning', leaning_control_system)]
+    for name in OTHER_MODULES:
+        try:
+            with quiet():
+                modules.append((name.split('_')[0], importlib.import_module(name)))
+        except Exception as e:  # ImportError, or pyautogui failing without a display
+            results.skip('geometry', name.split('_')[0], f"import failed: {e!r}")
+
+    for prefix, module in modules:
+        cases = _cases(module, stream)
+        with quiet():
+            for case, (fn, inputs) in cases.items():
+                results.add('geometry', f"{prefix}.{case}", time_calls(fn, inputs, repeat))
+
+    # identify_hands is a method (the hand tracker) but needs no models
+    from input_backends import NullInputBackend
+    with quiet():
+        system = leaning_control_system.LeaningControlSystem(NullInputBackend(), load_models=False)
+        results.add('geometry', 'leaning.identify_hands',
+                    time_calls(lambda f: system.identify_hands(f.multi_hand_landmarks, f.multi_handedness, f.timestamp),
+                               stream, repeat))
@@ -0,0 +1,87 @@
+"""
+Memory growth over a long landmark replay.
+
+Replays a landmark log (the scripted stream by default) through every
+controller plus the latency profiler for many minutes of frames, sampling
+tracemalloc, RSS and the gc object count with soak_test.MemoryTracker. A leak
+shows up as a positive slope and in the top growing allocation sites; for
+hours-long runs with limits use soak_test.py.
+"""
+
+import os
+import tempfile
+
+import numpy as np
+
+from .common import BenchmarkResults, quiet
+from .synthetic import landmark_frames, write_landmark_log
+
+
+def run(results: BenchmarkResults, frames: int = 36000, chunk: int = 1000, landmarks: str = None,
+        top: int = 5):
+    from input_backends import NullInputBackend
+    from landmark_log import LandmarkFrame, LandmarkLog
+    from latency_profiler import latency_profiler
+    from leaning_control_system import LeaningControlSystem
+    from soak_test import MemoryTracker, silenced
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if landmarks:
+            log = LandmarkLog(landmarks)
+        else:
+            with quiet():
+                log = write_landmark_log(os.path.join(tmp, 'memory.lmk'), landmark_frames(1200))
+        records = np.array(log.records)  # Detach from the memmap before the temp dir goes away
+    if len(records) == 0:
+        results.skip('memory', 'long_replay', 'empty landmark log')
+        return
+    period = float(records['t'][-1]) + 1.0 / 30.0
+
+    with quiet():
+        system = LeaningControlSystem(input_backend=NullInputBackend(record=False), load_models=False)
+    system.control_enabled = True
+    profiler = latency_profiler
+    saved_window = profiler.window
+    profiler.reset(window=300)
+
+    def replay(start, count):
+        for i in range(start, start + count):
+            frame = LandmarkFrame(records[i % len(records)])
+            frame.timestamp += (i // len(records)) * period  # Keep time monotonic across loops
+            profiler.begin_frame()
+            system.update_controls(frame.multi_hand_landmarks, frame.pose_landmarks, frame.face_landmarks,
+                                   capture_time=frame.timestamp, handedness_list=frame.multi_handedness)
+            profiler.end_frame()
+
+    tracker = MemoryTracker()
+    with silenced():  # Not quiet(): its StringIO would grow with every print
+        replay(0, chunk)  # Warm-up: let caches and the profiler window fill
+        tracker.start()
+        done = chunk
+        while done < frames:
+            count = min(chunk, frames - done)
+            replay(done, count)
+            done += count
+            tracker.sample(done, done / 30.0)
+        tracker.stop()
+        system.wasd_controller.release_all_keys()
+        system.shooting_controller.force_release()
+    profiler.reset(window=saved_window)
+
+    samples = tracker.samples
+    if len(samples) < 2:
+        results.skip('memory', 'long_replay', 'not enough frames for a trend (increase --memory-frames)')
+        return
+    growth = tracker.growth()
+    results.add('memory', 'long_replay', {
+        'frames': int(frames),
+        'replayed_seconds': round(frames / 30.0, 1),
+        'source': landmarks or 'synthetic',
+        'traced_start_bytes': samples[0].traced,
+        'traced_end_bytes': samples[-1].traced,
+        'traced_growth_bytes': growth['traced'],
+        'traced_bytes_per_1k_frames': round(tracker.slope('traced', per='frames', scale=1000.0), 1),
+        'rss_growth_bytes': growth['rss'],
+        'objects_growth': growth['objects'],
+        'top_growth': tracker.top_growth(top),
+    })
@@ -0,0 +1,86 @@
+"""
+Preview overlay rendering cost at 1280x720: landmark drawing (vectorized, with
+mp_drawing per model for reference), the status panels and the latency HUD. Each call draws onto a fresh copy of the
+frame; the copy itself is reported as 'frame_copy' for reference.
+"""
+
+import numpy as np
+
+from .common import BenchmarkResults, quiet, time_calls
+from .synthetic import as_results, landmark_frames
+
+
+def run(results: BenchmarkResults, frames: int = 120, repeat: int = 3, width: int = 1280, height: int = 720):
+    from input_backends import NullInputBackend
+    from landmark_drawing import FACE_CONTOUR_SKELETON, HAND_SKELETON, POSE_SKELETON, mp_drawing
+    from latency_profiler import LatencyProfiler
+    from leaning_control_system import LeaningControlSystem
+
+    stream = landmark_frames(frames)
+    base = np.random.default_rng(0).integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+    with quiet():
+        system = LeaningControlSystem(input_backend=NullInputBackend(record=False), load_models=False)
+    system.control_enabled = True
+    status = {
+        'wasd_states': {'w': True, 'a': False, 's': False, 'd': True},
+        'gun_active': True, 'shoot_status': 'FIRING!', 'left_status': 'Holding: one_down',
+        'tongue_status': 'Tongue ready', 'left_right_lean': 6.0, 'head_pitch': -9.0, 'tongue_out': False,
+    }
+
+    profiler = LatencyProfiler(window=300)
+    rng = np.random.default_rng(1)
+    for _ in range(300):
+        profiler.begin_frame()
+        for name in ('capture', 'color', 'hands', 'pose', 'face_mesh', 'controllers'):
+            profiler.record(name, float(rng.uniform(0.0005, 0.02)))
+        profiler.end_frame()
+    profiler.show_hud = True
+    profiler.summary_interval = 0.0  # Measure the uncached path
+
+    skeletons = {
+        'pose': (POSE_SKELETON, lambda f: f.pose_landmarks),
+        'face_contours': (FACE_CONTOUR_SKELETON, lambda f: f.face_landmarks),
+        'hand': (HAND_SKELETON, lambda f: f.multi_hand_landmarks[0]),
+    }
+
+    def mediapipe_draw(frame, skeleton, landmarks):
+        mp_drawing.draw_landmarks(frame, landmarks, list(zip(skeleton.starts.tolist(), skeleton.ends.tolist())),
+                                  skeleton.landmark_spec, skeleton.connection_spec)
+
+    def draw_with_mediapipe(frame, f):
+        for skeleton, landmarks in skeletons.values():
+            if skeleton is HAND_SKELETON:
+                for hand in f.multi_hand_landmarks:
+                    mediapipe_draw(frame, skeleton, hand)
+            else:
+                mediapipe_draw(frame, skeleton, landmarks(f))
+
+    def display_status(frame):
+        system.display_status(frame, status['wasd_states'], status['gun_active'], status['shoot_status'],
+                              status['left_status'], status['tongue_status'], status['left_right_lean'],
+                              status['head_pitch'], status['tongue_out'])
+
+    cases = {
+        'frame_copy': lambda f: base.copy(),
+        'draw_landmarks': lambda f: system.draw_landmarks(base.copy(), *as_results(f)),
+        'draw_landmarks[mediapipe]': lambda f: draw_with_mediapipe(base.copy(), f),
+        'display_status': lambda f: display_status(base.copy()),
+        'draw_panel': lambda f: system._draw_panel(base.copy(), 10, 10, 300, 120, "CONTROL STATUS", alpha=0.8),
+        'latency_hud': lambda f: profiler.draw_hud(base.copy()),
+    }
+
+    for name, (skeleton, landmarks) in skeletons.items():
+        cases[name] = lambda f, s=skeleton, lm=landmarks: s.draw(base.copy(), lm(f))
+        cases[f"{name}[mediapipe]"] = lambda f, s=skeleton, lm=landmarks: mediapipe_draw(base.copy(), s, lm(f))
+
+    def full_overlay(f):
+        frame = base.copy()
+        system.draw_landmarks(frame, *as_results(f))
+        display_status(frame)
+        profiler.draw_hud(frame)
+    cases['full_overlay'] = full_overlay
+
+    for case, fn in cases.items():
+        metrics = time_calls(fn, stream, repeat)
+        metrics['resolution'] = f"{width}x{height}"
+        results.add('overlay', case, metrics)
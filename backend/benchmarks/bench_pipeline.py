@@ -0,0 +1,300 @@
+"""
+Full-frame pipeline cost per control profile:
+capture -> mirror/color conversion -> MediaPipe models -> features + controllers.
+
+Model configurations mirror each script. The integrated, complete and krunker
+scripts inject through pyautogui/Quartz at import time and only run against a
+webcam, so their frames go through the leaning system's controllers with the
+inputs that profile has (no pose for integrated/complete, one hand for krunker);
+model inference dominates the frame either way.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+
+import cv2
+
+from .common import BenchmarkResults, frame_stats, quiet, time_calls
+
+HANDS_2 = dict(static_image_mode=False, max_num_hands=2, min_detection_confidence=0.7, min_tracking_confidence=0.5)
+HANDS_1 = dict(static_image_mode=False, max_num_hands=1, min_detection_confidence=0.7, min_tracking_confidence=0.5)
+POSE = dict(static_image_mode=False, model_complexity=1, enable_segmentation=False,
+            min_detection_confidence=0.5, min_tracking_confidence=0.5)
+FACE_MESH = dict(max_num_faces=1, refine_landmarks=True, min_detection_confidence=0.5, min_tracking_confidence=0.5)
+
+PROFILES = {
+    'leaning': {'hands': HANDS_2, 'pose': POSE, 'face_mesh': FACE_MESH},
+    'integrated': {'hands': HANDS_2, 'face_mesh': FACE_MESH},
+    'complete': {'hands': HANDS_2, 'face_mesh': FACE_MESH},
+    'krunker': {'hands': HANDS_1},
+}
+
+
+def _create_models(config, inference=None, warm: bool = False):
+    import mediapipe as mp
+    factories = {
+        'hands': mp.solutions.hands.Hands,
+        'pose': mp.solutions.pose.Pose,
+        'face_mesh': mp.solutions.face_mesh.FaceMesh,
+    }
+    if not warm:
+        return {name: factories[name](**params) for name, params in config.items()}
+    from model_warmup import warm_up_models, warmup_image
+    sizes = inference.sizes if inference is not None else {}
+    models, _ = warm_up_models(
+        {name: (lambda name=name: factories[name](**config[name])) for name in config},
+        {name: warmup_image(sizes.get(name)) for name in config}
+    )
+    return models
+
+
+def _burn(stop):
+    while not stop.is_set():
+        sum(range(10000))
+
+
+@contextmanager
+def cpu_contention(processes: int):
+    """Busy processes competing for the CPU (stand-in for the game) while the block runs"""
+    if not processes:
+        yield
+        return
+    import multiprocessing
+    context = multiprocessing.get_context('spawn')
+    stop = context.Event()
+    burners = [context.Process(target=_burn, args=(stop,), daemon=True) for _ in range(processes)]
+    for burner in burners:
+        burner.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        for burner in burners:
+            burner.join(timeout=2.0)
+
+
+def _open_capture(footage, frames, paced_fps=None):
+    if footage:
+        from frame_recording import ReplayCapture
+        cap = ReplayCapture(footage, realtime=False, loop=True)
+    else:
+        from .synthetic import SyntheticCapture
+        cap = SyntheticCapture(frames)
+    if paced_fps:
+        from .synthetic import PacedCapture
+        cap = PacedCapture(cap, paced_fps)
+    return cap
+
+
+def run_profile(profile: str, frames: int = 300, warmup: int = 10, footage: str = None, inference=None,
+                workers_depth: int = None, system_options=None, warm_models: bool = False,
+                governor=None, contention: int = 0, paced_fps: float = None):
+    """
+    Run one profile headless; returns the metrics dict.
+    workers_depth: run the models in worker processes
+    warm_models: warm the graphs up (model_warmup.py) before the first frame; counted in init_ms
+    governor: latency_governor.LatencyGovernor shedding face mesh rate, pose resolution and frames
+    contention: busy processes competing for the CPU during the measured frames
+    paced_fps: deliver frames at this camera rate through a bounded queue and report the
+               capture-to-controls (aim) latency, which includes the time frames wait in the queue
+    system_options: LeaningControlSystem keyword arguments (face mesh schedule, head pose source)
+    """
+    from frame_buffers import FrameBufferPool
+    from inference_resolution import InferenceResolution
+    from input_backends import NullInputBackend
+    from latency_profiler import latency_profiler
+    from leaning_control_system import LeaningControlSystem
+
+    config = dict(PROFILES[profile])
+    system_options = system_options or {}
+    if system_options.get('face_mesh_mode') == 'off':
+        config.pop('face_mesh', None)
+    max_hands = config['hands']['max_num_hands']
+    if inference is None:
+        inference = InferenceResolution(max_hands=max_hands)
+    workers = None
+    with quiet():
+        start = time.perf_counter()
+        if workers_depth:
+            from inference_workers import InferenceWorkerPool
+            models, workers = {}, InferenceWorkerPool(config, inference, depth=workers_depth,
+                                                             warmup=warm_models)
+        else:
+            models = _create_models(config, inference, warm_models)
+        init_ms = (time.perf_counter() - start) * 1000.0
+        system = LeaningControlSystem(input_backend=NullInputBackend(record=False), load_models=False,
+                                      **system_options)
+    system.control_enabled = True
+    if governor is not None:
+        own_sizes = workers is None and inference.auto is None
+        governor.configure(preview=False, face_mesh='face_mesh' in config,
+                           sizes=inference.sizes if own_sizes else None)
+
+    # Dropped frames don't count towards `frames` (at most every other one is dropped)
+    cap = _open_capture(footage, (2 * frames if governor is not None else frames) + warmup, paced_fps)
+    frame_pool = FrameBufferPool()
+    profiler = latency_profiler
+    saved_window = profiler.window
+    profiler.reset(window=frames)
+    first_frame_ms = None
+    processed = dropped = 0
+    aim_latency = []
+    try:
+        with quiet(), cpu_contention(contention):
+            while processed < frames + warmup:
+                if processed == warmup:
+                    profiler.reset(window=frames)
+                profiler.begin_frame()
+                with profiler.stage('capture'):
+                    ret, frame = frame_pool.read(cap)
+                if not ret:
+                    profiler.end_frame()
+                    break
+                if governor is not None and governor.drop_frame():
+                    profiler.cancel_frame()
+                    dropped += 1
+                    continue
+
+                with profiler.stage('color'):
+                    if workers is not None:
+                        frame, rgb_frame = frame_pool.prepare(frame, rgb_out=workers.input_buffer(frame.shape))
+                        workers.submit()
+                    else:
+                        frame, rgb_frame = frame_pool.prepare(frame)
+                        inference.begin_frame(rgb_frame)
+                    h, w, _ = frame.shape
+
+                if workers is not None:
+                    with profiler.stage('workers'):
+                        hand_results, pose_results, face_results = workers.collect() or (None, None, None)
+                else:
+                    results = {}
+                    for name, model in models.items():
+                        if name == 'face_mesh' and governor is not None and processed % governor.face_mesh_interval:
+                            continue
+                        with profiler.stage(name):
+                            if name == 'hands':
+                                results[name] = inference.process_hands(model)
+                            else:
+                                results[name] = model.process(inference.image_for(name))
+                    hand_results = results['hands']
+                    pose_results = results.get('pose')
+                    face_results = results.get('face_mesh')
+                hand_list = hand_results.multi_hand_landmarks if hand_results else None
+                handedness = hand_results.multi_handedness if hand_results else None
+                system.update_controls(
+                    hand_list[:max_hands] if hand_list else None,
+                    pose_results.pose_landmarks if pose_results else None,
+                    face_results.multi_face_landmarks[0] if face_results and face_results.multi_face_landmarks else None,
+                    w, h, time.perf_counter(), handedness[:max_hands] if handedness else None
+                )
+                if paced_fps and processed >= warmup:
+                    aim_latency.append((time.perf_counter() - cap.arrival) * 1000.0)
+                total = profiler.end_frame()
+                if workers is None:
+                    inference.end_frame(profiler.frames[-1])
+                if governor is not None:
+                    governor.update(profiler.frames[-1])
+                if first_frame_ms is None:
+                    first_frame_ms = total
+                processed += 1
+    finally:
+        cap.release()
+        system.wasd_controller.release_all_keys()
+        system.shooting_controller.force_release()
+        for model in models.values():
+            model.close()
+        if workers is not None:
+            workers.close()
+
+    totals = [row['total'] for row in profiler.frames]
+    metrics = frame_stats(totals)
+    metrics['models'] = list(config)
+    metrics['source'] = footage or 'synthetic'
+    metrics['inference'] = workers.describe() if workers is not None else inference.describe()
+    metrics['init_ms'] = round(init_ms, 3)
+    metrics['first_frame_ms'] = round(first_frame_ms or 0.0, 3)
+    if governor is not None:
+        metrics['governor'] = governor.summary()
+        metrics['dropped_frames'] = dropped
+    if contention:
+        metrics['contention_processes'] = contention
+    if paced_fps:
+        metrics['aim_latency'] = {k: v for k, v in frame_stats(aim_latency).items() if k.endswith('_ms')}
+        metrics['camera_discarded'] = cap.discarded
+    metrics['stages'] = {name: {k: round(v, 3) for k, v in stats.items()}
+                         for name, stats in profiler.summary().items() if name != 'total'}
+    profiler.reset(window=saved_window)
+    return metrics
+
+
+def frame_prepare(results: BenchmarkResults, repeat: int = 5, width: int = 1280, height: int = 720):
+    """Mirror + RGB conversion: fresh allocations per frame vs the reused FrameBufferPool buffers"""
+    import numpy as np
+    from frame_buffers import FrameBufferPool
+
+    frames = [np.random.default_rng(i).integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+              for i in range(4)] * 25
+    pool = FrameBufferPool()
+    results.add('pipeline', 'frame_prepare[alloc]',
+                time_calls(lambda f: cv2.cvtColor(cv2.flip(f, 1), cv2.COLOR_BGR2RGB), frames, repeat))
+    results.add('pipeline', 'frame_prepare[pooled]', time_calls(pool.prepare, frames, repeat))
+
+
+def run(results: BenchmarkResults, frames: int = 300, warmup: int = 10, footage: str = None,
+        profiles=None):
+    from inference_resolution import InferenceResolution
+
+    frame_prepare(results)
+    for profile in profiles or PROFILES:
+        try:
+            results.add('pipeline', profile, run_profile(profile, frames, warmup, footage))
+        except Exception as e:
+            results.skip('pipeline', profile, f"failed: {e!r}")
+
+    # Inference-resolution variants of the full leaning pipeline
+    if profiles is None or 'leaning' in profiles:
+        variants = {
+            'leaning[full-res]': InferenceResolution({'pose': None}),
+            'leaning[hands-roi]': InferenceResolution(hands_roi=True),
+            'leaning[auto-res]': InferenceResolution(auto=True, budget_ms=33.3),
+        }
+        for case, inference in variants.items():
+            try:
+                results.add('pipeline', case, run_profile('leaning', frames, warmup, footage, inference))
+            except Exception as e:
+                results.skip('pipeline', case, f"failed: {e!r}")
+
+        # Head pitch from the pose landmarks with face mesh dropped from the loop
+        try:
+            results.add('pipeline', 'leaning[no-face-mesh]',
+                        run_profile('leaning', frames, warmup, footage, system_options={'face_mesh_mode': 'off'}))
+        except Exception as e:
+            results.skip('pipeline', 'leaning[no-face-mesh]', f"failed: {e!r}")
+
+        # Graphs warmed up on synthetic frames before the loop: first_frame_ms drops to steady state
+        try:
+            results.add('pipeline', 'leaning[warmup]', run_profile('leaning', frames, warmup, footage, warm_models=True))
+        except Exception as e:
+            results.skip('pipeline', 'leaning[warmup]', f"failed: {e!r}")
+
+        # The game competing for every core, without and with the latency governor (deadline = unloaded p95);
+        # frames arrive at 30 FPS through a bounded queue so waiting for stale frames shows in the aim latency
+        try:
+            from latency_governor import LatencyGovernor
+            burners = os.cpu_count() or 1
+            base = results.suites['pipeline'].get('leaning', {}).get('p95_ms', 33.3)
+            for case, governor in (('leaning[contention]', None),
+                                   ('leaning[contention+governor]', LatencyGovernor(deadline_ms=base))):
+                results.add('pipeline', case, run_profile('leaning', frames, warmup, footage, governor=governor,
+                                                          contention=burners, paced_fps=30.0))
+        except Exception as e:
+            results.skip('pipeline', 'leaning[contention]', f"failed: {e!r}")
+
+        # One process per model (inference_workers.py), synchronous and with two frames in flight
+        for case, depth in (('leaning[workers]', 1), ('leaning[workers-depth2]', 2)):
+            try:
+                results.add('pipeline', case, run_profile('leaning', frames, warmup, footage, workers_depth=depth))
+            except Exception as e:
+                results.skip('pipeline', case, f"failed: {e!r}")
@@ -0,0 +1,133 @@
+"""
+Shared benchmark helpers: timing loops, environment metadata and the results file.
+"""
+
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+# The backend modules use flat imports (`from input_backends import ...`)
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+@contextlib.contextmanager
+def quiet():
+    """Swallow the controllers' console prints so they don't dominate the timings"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def time_calls(fn: Callable, inputs: Sequence, repeat: int = 5) -> Dict[str, float]:
+    """
+    Call fn(item) for every item in inputs, `repeat` times.
+    Returns per-call microseconds (best/median/mean over the repeats).
+    """
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        rounds = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for item in inputs:
+                fn(item)
+            rounds.append((time.perf_counter() - start) / len(inputs) * 1e6)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    rounds = np.asarray(rounds)
+    return {
+        'us_per_call_best': round(float(rounds.min()), 3),
+        'us_per_call_median': round(float(np.median(rounds)), 3),
+        'us_per_call_mean': round(float(rounds.mean()), 3),
+        'calls': len(inputs) * repeat,
+    }
+
+
+def frame_stats(frame_ms: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/mean frame time (ms) and the resulting throughput"""
+    values = np.asarray(frame_ms, dtype=np.float64)
+    if values.size == 0:
+        return {'frames': 0}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    mean = float(values.mean())
+    return {
+        'frames': int(values.size),
+        'p50_ms': round(float(p50), 3),
+        'p95_ms': round(float(p95), 3),
+        'p99_ms': round(float(p99), 3),
+        'mean_ms': round(mean, 3),
+        'fps': round(1000.0 / mean, 1) if mean > 0 else 0.0,
+    }
+
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                             capture_output=True, text=True, timeout=10)
+        commit = out.stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=BACKEND_DIR,
+                               capture_output=True, text=True, timeout=30).stdout.strip()
+        return f"{commit}-dirty" if commit and dirty else (commit or 'unknown')
+    except (OSError, subprocess.SubprocessError):
+        return 'unknown'
+
+
+def environment() -> Dict[str, str]:
+    """Versions and machine info recorded with every run"""
+    import cv2
+    try:
+        import mediapipe
+        mediapipe_version = mediapipe.__version__
+    except ImportError:
+        mediapipe_version = None
+    return {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'opencv': cv2.__version__,
+        'mediapipe': mediapipe_version,
+    }
+
+
+class BenchmarkResults:
+    """Machine-readable results: {suite: {case: {metric: value}}} plus run metadata"""
+
+    def __init__(self, config: Dict = None):
+        self.meta = environment()
+        self.config = config or {}
+        self.suites: Dict[str, Dict[str, Dict]] = {}
+
+    def add(self, suite: str, case: str, metrics: Dict):
+        self.suites.setdefault(suite, {})[case] = metrics
+
+    def skip(self, suite: str, case: str, reason: str):
+        self.add(suite, case, {'skipped': reason})
+
+    def to_dict(self) -> Dict:
+        return {'meta': self.meta, 'config': self.config, 'suites': self.suites}
+
+    def save(self, path: str = None) -> str:
+        if path is None:
+            os.makedirs(RESULTS_DIR, exist_ok=True)
+            stamp = time.strftime('%Y%m%d_%H%M%S')
+            path = os.path.join(RESULTS_DIR, f"{stamp}_{self.meta['commit']}.json")
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
@@ -0,0 +1,68 @@
+"""
+Compare two benchmark result files case by case.
+
+    python -m benchmarks.compare baseline.json candidate.json [--threshold 10]
+
+Lower is better for every compared metric; changes beyond the threshold (%)
+are flagged. Exits non-zero when any metric regressed past the threshold.
+"""
+
+import argparse
+import json
+import sys
+
+# Primary metric per suite (lower is better)
+METRICS = {
+    'geometry': 'us_per_call_median',
+    'controllers': 'us_per_call_median',
+    'overlay': 'us_per_call_median',
+    'pipeline': 'p95_ms',
+    'memory': 'traced_growth_bytes',
+}
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline, candidate, threshold=10.0):
+    """Yield (suite, case, metric, old, new, change_pct) for cases present in both runs"""
+    for suite, metric in METRICS.items():
+        old_cases = baseline['suites'].get(suite, {})
+        new_cases = candidate['suites'].get(suite, {})
+        for case in old_cases:
+            old, new = old_cases[case].get(metric), new_cases.get(case, {}).get(metric)
+            if old is None or new is None:
+                continue
+            change = (new - old) / abs(old) * 100.0 if old else (0.0 if new == old else float('inf'))
+            yield suite, case, metric, old, new, change
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.compare')
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--threshold', type=float, default=10.0, help='Flag changes beyond this percent')
+    args = parser.parse_args(argv)
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    print(f"baseline:  {baseline['meta']['commit']} ({baseline['meta']['timestamp']})")
+    print(f"candidate: {candidate['meta']['commit']} ({candidate['meta']['timestamp']})\n")
+
+    regressions = 0
+    for suite, case, metric, old, new, change in compare(baseline, candidate, args.threshold):
+        flag = ''
+        if change > args.threshold:
+            flag = '  ▲ slower' if suite != 'memory' else '  ▲ more growth'
+            regressions += 1
+        elif change < -args.threshold:
+            flag = '  ▼ faster' if suite != 'memory' else '  ▼ less growth'
+        print(f"{suite:<12} {case:<52} {metric:<20} {old:>12.3f} -> {new:>12.3f} ({change:+6.1f}%){flag}")
+
+    print(f"\n{regressions} regression(s) beyond {args.threshold:.0f}%")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,297 @@
+"""
+Synthetic inputs for the benchmarks: scripted MediaPipe-shaped landmark streams
+(real protobuf landmark lists, so the drawing utils accept them) and a
+synthetic camera for when no recorded footage is given.
+"""
+
+import math
+import time
+from types import SimpleNamespace
+from typing import List
+
+import numpy as np
+from mediapipe.framework.formats import classification_pb2, landmark_pb2
+
+FINGER_OFFSETS = (-0.3, -0.1, 0.1, 0.3)  # index, middle, ring, pinky (x, in hand-scale units)
+
+
+def _landmark_list(points) -> landmark_pb2.NormalizedLandmarkList:
+    landmarks = landmark_pb2.NormalizedLandmarkList()
+    for point in points:
+        x, y, z = point[:3]
+        visibility = point[3] if len(point) > 3 else None
+        lm = landmarks.landmark.add(x=x, y=y, z=z)
+        if visibility is not None:
+            lm.visibility = visibility
+    return landmarks
+
+
+def hand_points(cx, cy, extended=(True, False, False, False), thumb_extended=True,
+                thumb_down=False, scale=0.12) -> List[tuple]:
+    """21 hand landmarks, fingers pointing up; curled fingers fold back onto the palm"""
+    points = [None] * 21
+    points[0] = (cx, cy + 0.4 * scale, 0.0)  # wrist
+
+    # Thumb: CMC, MCP, IP, TIP
+    points[1] = (cx - 0.4 * scale, cy + 0.3 * scale, -0.01)
+    points[2] = (cx - 0.55 * scale, cy + 0.15 * scale, -0.02)
+    if thumb_down:
+        points[3] = (cx - 0.65 * scale, cy + 0.0 * scale, -0.03)
+        points[4] = (cx - 0.5 * scale, cy + 0.12 * scale, -0.03)
+    elif thumb_extended:
+        points[3] = (cx - 0.65 * scale, cy + 0.0 * scale, -0.03)
+        points[4] = (cx - 0.75 * scale, cy - 0.15 * scale, -0.04)
+    else:
+        points[3] = (cx - 0.5 * scale, cy + 0.05 * scale, -0.03)
+        points[4] = (cx - 0.35 * scale, cy + 0.2 * scale, -0.03)
+
+    for finger, (offset, is_extended) in enumerate(zip(FINGER_OFFSETS, extended)):
+        base = 5 + finger * 4
+        fx = cx + offset * scale
+        points[base] = (fx, cy, 0.0)  # MCP
+        if is_extended:
+            points[base + 1] = (fx, cy - 0.35 * scale, -0.01)
+            points[base + 2] = (fx, cy - 0.55 * scale, -0.02)
+            points[base + 3] = (fx, cy - 0.75 * scale, -0.03)
+        else:
+            points[base + 1] = (fx, cy - 0.3 * scale, -0.01)
+            points[base + 2] = (fx + 0.05 * scale, cy - 0.15 * scale, 0.0)
+            points[base + 3] = (fx + 0.03 * scale, cy - 0.05 * scale, 0.01)
+    return points
+
+
+def pose_points(lean=0.0, visibility=0.95, pitch=0.0) -> List[tuple]:
+    """
+    33 pose landmarks centred in frame; lean shifts the torso horizontally (normalized units).
+    The head points line up with face_points(pitch): eyes at 0.26, mouth corners at 0.36.
+    """
+    points = [(0.5 + lean, 0.3, 0.0, visibility)] * 33
+    points = list(points)
+    points[0] = (0.5, 0.19 + (0.5 + pitch / 100.0) * 0.22, -0.05, visibility)  # nose
+    points[2] = (0.46, 0.26, 0.0, visibility)  # left eye
+    points[5] = (0.54, 0.26, 0.0, visibility)  # right eye
+    points[9] = (0.48, 0.36, 0.0, visibility)  # mouth left
+    points[10] = (0.52, 0.36, 0.0, visibility)  # mouth right
+    points[11] = (0.58 + lean, 0.45, 0.0, visibility)  # left shoulder
+    points[12] = (0.42 + lean, 0.45, 0.0, visibility)  # right shoulder
+    points[23] = (0.55 + lean * 0.5, 0.8, 0.0, visibility)  # left hip
+    points[24] = (0.45 + lean * 0.5, 0.8, 0.0, visibility)  # right hip
+    for i in (13, 15, 17, 19, 21):
+        points[i] = (0.65 + lean, 0.45 + 0.04 * (i - 11), 0.0, visibility)
+    for i in (14, 16, 18, 20, 22):
+        points[i] = (0.35 + lean, 0.45 + 0.04 * (i - 12), 0.0, visibility)
+    for i in (25, 27, 29, 31):
+        points[i] = (0.55, 0.8 + 0.02 * (i - 23), 0.0, visibility)
+    for i in (26, 28, 30, 32):
+        points[i] = (0.45, 0.8 + 0.02 * (i - 24), 0.0, visibility)
+    return points
+
+
+def face_points(pitch=0.0, mouth_open=False, count=478) -> List[tuple]:
+    """Face mesh landmarks on an ellipse; pitch moves the nose between forehead and chin"""
+    angles = np.linspace(0, 2 * math.pi, count, endpoint=False)
+    points = [(0.5 + 0.08 * math.cos(a), 0.3 + 0.11 * math.sin(a), 0.0) for a in angles]
+    forehead_y, chin_y = 0.19, 0.41
+    points[10] = (0.5, forehead_y, 0.0)
+    points[152] = (0.5, chin_y, 0.0)
+    points[1] = (0.5, forehead_y + (0.5 + pitch / 100.0) * (chin_y - forehead_y), -0.05)
+    points[33] = (0.46, 0.26, 0.0)
+    points[263] = (0.54, 0.26, 0.0)
+    gap = 0.03 if mouth_open else 0.005
+    points[13] = (0.5, 0.36, 0.0)
+    points[14] = (0.5, 0.36 + gap, 0.0)
+    return points
+
+
+def _handedness(label: str, score: float = 0.95) -> classification_pb2.ClassificationList:
+    handedness = classification_pb2.ClassificationList()
+    handedness.classification.add(index=0 if label == 'Left' else 1, score=score, label=label)
+    return handedness
+
+
+# Left-hand gesture cycle: (thumb_extended, finger_extended x4)
+LEFT_GESTURES = (
+    (True, (True, True, True, True)),     # open palm - no action
+    (True, (True, False, True, True)),    # one finger down - crouch
+    (True, (False, False, False, False)),  # four down - jump
+)
+
+
+def landmark_frame(index: int, fps: float = 30.0) -> SimpleNamespace:
+    """
+    One scripted frame of MediaPipe-shaped results.
+    Over a ~4 s cycle the right hand makes a gun and aims in a circle while the
+    thumb fires every second, the left hand cycles crouch/jump, the body leans
+    left/right, the head pitches and the mouth opens periodically.
+    """
+    t = index / fps
+    phase = t % 4.0
+    gun = phase < 3.0
+    aim_x = 0.7 + 0.05 * math.cos(2 * math.pi * t / 2.0)
+    aim_y = 0.45 + 0.05 * math.sin(2 * math.pi * t / 2.0)
+    right = hand_points(aim_x, aim_y,
+                        extended=(True, False, False, False) if gun else (True, True, True, True),
+                        thumb_down=gun and (t % 1.0) > 0.6)
+    thumb, fingers = LEFT_GESTURES[int(t / 1.5) % len(LEFT_GESTURES)]
+    left = hand_points(0.25, 0.5, extended=fingers, thumb_extended=thumb)
+
+    hands = [_landmark_list(left), _landmark_list(right)]
+    handedness = [_handedness('Left'), _handedness('Right')]
+    if 3.5 <= phase < 3.8:
+        # Brief tracking loss exercises the sticky gun grace period
+        hands, handedness = [hands[0]], [handedness[0]]
+
+    lean = 0.1 * math.sin(2 * math.pi * t / 6.0)
+    pitch = 18.0 * math.sin(2 * math.pi * t / 5.0)
+    return SimpleNamespace(
+        timestamp=t,
+        multi_hand_landmarks=hands,
+        multi_handedness=handedness,
+        pose_landmarks=_landmark_list(pose_points(lean, pitch=pitch)),
+        face_landmarks=_landmark_list(face_points(pitch, mouth_open=(t % 7.0) > 6.0)),
+    )
+
+
+def landmark_frames(count: int, fps: float = 30.0) -> List[SimpleNamespace]:
+    """Pre-generate a scripted landmark stream (so generation isn't timed)"""
+    return [landmark_frame(i, fps) for i in range(count)]
+
+
+def as_results(frame: SimpleNamespace):
+    """Split a scripted frame into (hand_results, pose_results, face_results) like the models return"""
+    hand_results = SimpleNamespace(multi_hand_landmarks=frame.multi_hand_landmarks,
+                                   multi_handedness=frame.multi_handedness)
+    pose_results = SimpleNamespace(pose_landmarks=frame.pose_landmarks)
+    face_results = SimpleNamespace(multi_face_landmarks=[frame.face_landmarks])
+    return hand_results, pose_results, face_results
+
+
+def write_landmark_log(path: str, frames):
+    """Record a scripted stream with LandmarkLogWriter and open it for replay"""
+    from landmark_log import LandmarkLog, LandmarkLogWriter
+
+    writer = LandmarkLogWriter(path)
+    for frame in frames:
+        writer.write(frame.timestamp, *as_results(frame))
+    writer.close()
+    return LandmarkLog(path)
+
+
+def labeled_hands(count: int, seed: int = 0, max_rotation: float = 35.0, noise: float = 0.004):
+    """
+    gesture_classifier.GestureSamples of random hand poses with their true labels:
+    rotated up to +-max_rotation degrees in the image plane, at random scale and
+    position, with Gaussian landmark jitter. Half are left hands (mirrored).
+    """
+    from gesture_classifier import LABELS, GestureSamples
+
+    rng = np.random.default_rng(seed)
+    points = np.empty((count, 21, 3), np.float32)
+    left = rng.random(count) < 0.5
+    targets = np.zeros((count, len(LABELS)), np.float32)
+    mask = np.zeros((count, len(LABELS)), np.float32)
+    for i in range(count):
+        if not left[i] and rng.random() < 0.5:
+            extended = (True, False, False, False)  # Gun
+        else:
+            extended = tuple(bool(e) for e in rng.random(4) < 0.5)
+        thumb = rng.choice(('extended', 'down', 'tucked'))
+        scale = rng.uniform(0.08, 0.16)
+        cx, cy = rng.uniform(0.25, 0.75), rng.uniform(0.3, 0.7)
+        hand = np.array(hand_points(cx, cy, extended, thumb_extended=thumb == 'extended',
+                                    thumb_down=thumb == 'down', scale=scale), np.float32)
+        wrist = hand[0].copy()
+        angle = math.radians(rng.uniform(-max_rotation, max_rotation))
+        c, s = math.cos(angle), math.sin(angle)
+        xy = hand[:, :2] - wrist[:2]
+        hand[:, :2] = wrist[:2] + xy @ np.array([[c, s], [-s, c]], np.float32)
+        if left[i]:
+            hand[:, 0] = 2 * wrist[0] - hand[:, 0]  # Left hands are mirror images
+        hand[:, :2] += rng.normal(0.0, noise, (21, 2))
+        hand[:, 2] += rng.normal(0.0, noise, 21)
+        points[i] = hand
+
+        curled = 3 - sum(extended[1:])
+        down = (thumb != 'extended') + (4 - sum(extended))
+        truth = {'gun': extended[0] and curled == 3, 'curled': curled >= 2, 'thumb_down': thumb == 'down',
+                 'one_down': down == 1, 'four_down': down == 4}
+        for label in (('one_down', 'four_down') if left[i] else ('gun', 'curled', 'thumb_down')):
+            targets[i, LABELS.index(label)] = truth[label]
+            mask[i, LABELS.index(label)] = 1.0
+    return GestureSamples(points, left, targets, mask, rng.random(count))
+
+
+class SyntheticCapture:
+    """
+    cv2.VideoCapture stand-in producing moving-noise BGR frames.
+    Nothing is detected in them, so pipeline numbers are a lower bound; pass
+    --footage with a real recording for representative tracking cost.
+    """
+
+    def __init__(self, frames: int, width: int = 1280, height: int = 720, pool: int = 16, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        base = rng.integers(0, 256, size=(height // 8, width // 8, 3), dtype=np.uint8)
+        self._pool = []
+        for i in range(pool):
+            shifted = np.roll(base, i, axis=1)
+            self._pool.append(np.ascontiguousarray(
+                np.repeat(np.repeat(shifted, 8, axis=0), 8, axis=1)))
+        self.frames = frames
+        self.index = 0
+        self.width, self.height = width, height
+
+    def read(self, image=None):
+        if self.index >= self.frames:
+            return False, None
+        source = self._pool[self.index % len(self._pool)]
+        if image is not None and image.shape == source.shape:
+            np.copyto(image, source)
+            frame = image
+        else:
+            frame = source.copy()  # Capture hands out a fresh buffer
+        self.index += 1
+        return True, frame
+
+    def isOpened(self):
+        return self.index < self.frames
+
+    def release(self):
+        self.index = self.frames
+
+
+class PacedCapture:
+    """
+    Delivers a capture's frames at a camera's frame rate through a bounded driver
+    queue: a loop slower than the camera reads ever older frames until the queue
+    is full, then the driver discards the oldest. `arrival` is the perf_counter
+    time the last frame read was produced, for capture-to-output latency.
+    """
+
+    def __init__(self, capture, fps: float = 30.0, queue: int = 4):
+        self.capture = capture
+        self.interval = 1.0 / fps
+        self.queue = queue
+        self.start = None
+        self.next_index = 0
+        self.arrival = 0.0
+        self.discarded = 0  # Frames the driver dropped because the queue was full
+
+    def read(self, image=None):
+        now = time.perf_counter()
+        if self.start is None:
+            self.start = now
+        produced = int((now - self.start) / self.interval) + 1
+        if self.next_index >= produced:
+            time.sleep(self.start + self.next_index * self.interval - now)
+        elif produced - self.next_index > self.queue:
+            self.discarded += produced - self.queue - self.next_index
+            self.next_index = produced - self.queue
+        self.arrival = self.start + self.next_index * self.interval
+        self.next_index += 1
+        return self.capture.read(image)
+
+    def isOpened(self):
+        return self.capture.isOpened()
+
+    def release(self):
+        self.capture.release()
@@ -0,0 +1,255 @@
+"""
+Calibration
+Per-user neutral pose and range of motion, kept as named profiles on disk.
+
+calculate_lean_pose measures lean from the frame center (0.5) and the head
+pitch assumes the nose sits halfway down the face, so a user sitting off
+center, or with the camera above or below eye level, holds A/D or W/S for the
+whole session. A calibration records a few seconds of each of:
+
+    - neutral:  sitting normally, looking at the screen (the "no key" lean and pitch)
+    - pitch:    nodding forward and back through a comfortable range
+    - hand:     sweeping the gun hand over its comfortable aiming range
+
+LeaningControlSystem then measures lean and head pitch from the neutral pose
+in its features stage, rescales pitch so every user's range reaches the W/S
+thresholds alike, and scales mouse sensitivity so the hand range covers the
+same cursor travel.
+
+Profiles are JSON files in ~/.csgo_gesture_control/calibration/<name>.json,
+loaded at startup; 'c' in the preview window recalibrates and saves:
+
+    python leaning_control_system.py --calibration alice              # Load (calibrates first if missing)
+    python leaning_control_system.py --calibration alice --calibrate  # Calibrate again
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_DIRECTORY = os.path.join(os.path.expanduser('~'), '.csgo_gesture_control', 'calibration')
+
+# (phase, seconds, instruction shown on the preview)
+PHASES = (
+    ('neutral', 3.0, "Sit normally and look at the screen"),
+    ('pitch', 4.0, "Nod slowly: head forward, then back"),
+    ('hand', 4.0, "Gun hand: sweep your aim across the screen"),
+)
+SETTLE_SECONDS = 0.5  # Ignored at the start of each phase while the user follows the instruction
+
+# Pitch travel (head pose units) and index fingertip travel (normalized image units) the
+# WASD thresholds and mouse sensitivity were set for; a user's range is scaled onto them
+NOMINAL_PITCH_RANGE = 20.0
+NOMINAL_HAND_SPAN = 0.35
+SCALE_LIMITS = (0.5, 2.0)
+MIN_PITCH_RANGE = 2.0  # Less travel than this is treated as "not measured"
+MIN_SAMPLES = 10
+
+
+def _scale(nominal: float, measured: Optional[float]) -> float:
+    if not measured:
+        return 1.0
+    return float(min(max(nominal / measured, SCALE_LIMITS[0]), SCALE_LIMITS[1]))
+
+
+class Calibration:
+    """One user's neutral lean/pitch and ranges of motion"""
+
+    __slots__ = ('name', 'lean', 'pitch', 'pitch_range', 'hand_span', 'created')
+
+    def __init__(self, name: str, lean: float = 0.0, pitch: Optional[Dict[str, float]] = None,
+                 pitch_range: Optional[Dict[str, Tuple[float, float]]] = None,
+                 hand_span: Optional[Tuple[float, float]] = None, created: Optional[str] = None):
+        self.name = name
+        self.lean = lean  # Neutral calculate_lean_pose value
+        self.pitch = dict(pitch or {})  # Head pose source ('face'/'pose') -> neutral pitch
+        self.pitch_range = {source: tuple(travel) for source, travel in (pitch_range or {}).items()}  # (forward, back)
+        self.hand_span = tuple(hand_span) if hand_span else None  # Index fingertip (x, y) travel
+        self.created = created or time.strftime('%Y-%m-%d %H:%M:%S')
+
+    def pitch_scales(self, source: str) -> Tuple[float, float]:
+        """(forward, back) multipliers bringing the user's pitch travel onto NOMINAL_PITCH_RANGE"""
+        forward, back = self.pitch_range.get(source, (None, None))
+        return _scale(NOMINAL_PITCH_RANGE, forward), _scale(NOMINAL_PITCH_RANGE, back)
+
+    @property
+    def mouse_scale(self) -> float:
+        """Mouse sensitivity multiplier bringing the user's hand travel onto NOMINAL_HAND_SPAN"""
+        return _scale(NOMINAL_HAND_SPAN, max(self.hand_span) if self.hand_span else None)
+
+    def adjust_lean(self, lean: float) -> float:
+        return lean - self.lean
+
+    def adjust_pitch(self, pitch: float, source: str) -> float:
+        """Pitch from the neutral pose, scaled per direction (forward is negative, like WASDController)"""
+        if source not in self.pitch:
+            return pitch
+        pitch -= self.pitch[source]
+        forward, back = self.pitch_scales(source)
+        return pitch * (forward if pitch < 0 else back)
+
+    def describe(self) -> str:
+        pitch = ', '.join(f"{source} {value:+.1f}" for source, value in sorted(self.pitch.items())) or 'not measured'
+        return f"'{self.name}': lean {self.lean:+.1f} | pitch {pitch} | mouse x{self.mouse_scale:.2f}"
+
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'lean': self.lean,
+            'pitch': self.pitch,
+            'pitch_range': {source: list(travel) for source, travel in self.pitch_range.items()},
+            'hand_span': list(self.hand_span) if self.hand_span else None,
+            'created': self.created,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Calibration':
+        return cls(data['name'], data.get('lean', 0.0), data.get('pitch'), data.get('pitch_range'),
+                   data.get('hand_span'), data.get('created'))
+
+
+class Calibrator:
+    """
+    Collects a Calibration from live frames, one timed phase (PHASES) after another.
+    Feed every frame to update(); result() once it returns True. store: where the result is saved.
+    """
+
+    def __init__(self, name: str, store: Optional['CalibrationStore'] = None, phases=PHASES,
+                 settle: float = SETTLE_SECONDS):
+        self.name = name
+        self.store = store or CalibrationStore()
+        self.phases = phases
+        self.settle = settle
+        self.start = None
+        self.samples = {phase: {} for phase, _, _ in phases}  # Phase -> feature -> values
+        self.duration = sum(seconds for _, seconds, _ in phases)
+
+    def phase(self, now: float) -> Optional[Tuple[str, float, str]]:
+        """(phase, seconds left in it, instruction), or None once every phase is over"""
+        elapsed = now - self.start if self.start is not None else 0.0
+        for phase, seconds, instruction in self.phases:
+            if elapsed < seconds:
+                return phase, seconds - elapsed, instruction
+            elapsed -= seconds
+        return None
+
+    def update(self, now: float, lean: Optional[float] = None, pitch: Optional[Dict[str, float]] = None,
+               tip: Optional[Tuple[float, float]] = None) -> bool:
+        """
+        Record one frame's raw features: lean, {head pose source: pitch}, gun hand index fingertip (x, y).
+        Returns: True once calibration is complete
+        """
+        if self.start is None:
+            self.start = now
+        current = self.phase(now)
+        if current is None:
+            return True
+        phase, left, _ = current
+        seconds = next(s for p, s, _ in self.phases if p == phase)
+        if seconds - left < self.settle:
+            return False
+        samples = self.samples[phase]
+        if lean is not None:
+            samples.setdefault('lean', []).append(lean)
+        for source, value in (pitch or {}).items():
+            samples.setdefault(source, []).append(value)
+        if tip is not None:
+            samples.setdefault('tip', []).append(tip)
+        return False
+
+    def result(self) -> Calibration:
+        """The calibration from the collected samples; ValueError if the neutral pose was never seen"""
+        neutral = {feature: float(np.median(values)) for feature, values in self.samples['neutral'].items()
+                   if feature != 'tip' and len(values) >= MIN_SAMPLES}
+        if not neutral:
+            raise ValueError("no pose or face landmarks during the neutral phase - is the camera on you?")
+
+        pitch = {source: value for source, value in neutral.items() if source != 'lean'}
+        pitch_range = {}
+        for source, values in self.samples['pitch'].items():
+            if source in pitch and len(values) >= MIN_SAMPLES:
+                travel = np.asarray(values) - pitch[source]
+                forward, back = -np.percentile(travel, 5), np.percentile(travel, 95)
+                pitch_range[source] = (float(forward) if forward >= MIN_PITCH_RANGE else None,
+                                       float(back) if back >= MIN_PITCH_RANGE else None)
+
+        hand_span = None
+        tips = self.samples['hand'].get('tip', [])
+        if len(tips) >= MIN_SAMPLES:
+            low, high = np.percentile(np.asarray(tips), [5, 95], axis=0)
+            hand_span = tuple(float(span) for span in high - low)
+
+        return Calibration(self.name, neutral.get('lean', 0.0), pitch, pitch_range, hand_span)
+
+
+class CalibrationStore:
+    """Named calibrations as <directory>/<name>.json"""
+
+    def __init__(self, directory: str = DEFAULT_DIRECTORY):
+        self.directory = directory
+
+    def path(self, name: str) -> str:
+        if not name or os.sep in name or name.startswith('.'):
+            raise ValueError(f"invalid calibration name '{name}'")
+        return os.path.join(self.directory, f"{name}.json")
+
+    def names(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(f[:-5] for f in os.listdir(self.directory) if f.endswith('.json'))
+
+    def load(self, name: str) -> Optional[Calibration]:
+        """The saved calibration, or None if there is none under that name"""
+        try:
+            with open(self.path(name)) as f:
+                return Calibration.from_dict(json.load(f))
+        except FileNotFoundError:
+            return None
+
+    def save(self, calibration: Calibration) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(calibration.name)
+        with open(path, 'w') as f:
+            json.dump(calibration.to_dict(), f, indent=2)
+        return path
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Command-line options shared by the control scripts"""
+    group = parser.add_argument_group('calibration')
+    group.add_argument('--calibration', metavar='NAME',
+                       help="Load this user's calibration (calibrates at startup if it doesn't exist yet)")
+    group.add_argument('--calibrate', action='store_true', help='Calibrate again at startup and overwrite it')
+    group.add_argument('--calibration-dir', default=DEFAULT_DIRECTORY, help='Where calibrations are stored')
+
+
+def from_args(args):
+    """
+    LeaningControlSystem(calibration=...) from the options: the saved Calibration, or a Calibrator
+    when it still has to be captured
+    """
+    if not args.calibration:
+        return None
+    store = CalibrationStore(args.calibration_dir)
+    calibration = None if args.calibrate else store.load(args.calibration)
+    if calibration is not None:
+        print(f"📐 Calibration {calibration.describe()}")
+        return calibration
+    print(f"📐 Calibration '{args.calibration}' will be captured at startup ({store.path(args.calibration)})")
+    return Calibrator(args.calibration, store)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List or inspect saved calibrations")
+    parser.add_argument('names', nargs='*', help='Calibrations to show (default: all)')
+    parser.add_argument('--calibration-dir', default=DEFAULT_DIRECTORY)
+    args = parser.parse_args()
+
+    store = CalibrationStore(args.calibration_dir)
+    for name in args.names or store.names():
+        calibration = store.load(name)
+        print(f"{calibration.describe()} | saved {calibration.created}" if calibration else f"'{name}': not found")
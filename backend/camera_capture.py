@@ -0,0 +1,388 @@
+"""
+Camera Capture
+Opens the webcam with a negotiated, low-latency capture mode.
+
+cv2.VideoCapture(0) with a requested 1280x720@30 gives whatever the backend
+and driver settle on: often uncompressed YUYV at a resolution where USB
+bandwidth caps it at 10 FPS, behind a multi-frame driver queue. open_camera
+instead:
+
+    - opens the device with the platform's native API (V4L2, AVFoundation,
+      DirectShow/MSMF), falling back to OpenCV's default
+    - asks for a one-frame driver buffer, so every read is the newest frame
+    - tries each candidate mode (target resolution first, then smaller ones;
+      MJPG before YUYV at each) and measures what it actually delivers:
+      frame size and FPS over a few frames after the mode switch
+    - keeps the first mode that hits the target FPS, else the best measured
+      one; a source that ignores every setting (a replayed file) is measured
+      once and used as it is
+    - rewinds a video file afterwards, so the probed frames still reach the
+      pipeline
+
+Works with anything that has the cv2.VideoCapture interface, so negotiation
+can be checked without a webcam against a SyntheticCamera or a recording
+(frame_recording.ReplayCapture):
+
+    python camera_capture.py                      # Probe webcam 0
+    python camera_capture.py --camera synthetic   # Simulated device
+    python camera_capture.py --camera session.avi
+"""
+
+import argparse
+import sys
+import time
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+# Compressed first: MJPG reaches 720p30+ on USB 2 webcams where YUYV often tops out at 10 FPS
+FORMATS = ('MJPG', 'YUYV')
+FALLBACK_SIZES = ((960, 540), (848, 480), (640, 480), (640, 360))
+FPS_TOLERANCE = 0.9  # A mode "hits" the target at >= 90% of its FPS (frame timing jitter)
+
+
+def fourcc_code(fourcc: str) -> int:
+    return cv2.VideoWriter_fourcc(*fourcc)
+
+
+def fourcc_name(code: float) -> str:
+    code = int(code)
+    name = ''.join(chr((code >> (8 * i)) & 0xFF) for i in range(4))
+    return name if code and name.isprintable() else '?'
+
+
+def platform_apis() -> List[Tuple[str, int]]:
+    """(name, cv2.CAP_*) capture APIs to try, native first"""
+    if sys.platform.startswith('linux'):
+        apis = [('V4L2', cv2.CAP_V4L2)]
+    elif sys.platform == 'darwin':
+        apis = [('AVFoundation', cv2.CAP_AVFOUNDATION)]
+    elif sys.platform == 'win32':
+        apis = [('DirectShow', cv2.CAP_DSHOW), ('MSMF', cv2.CAP_MSMF)]
+    else:
+        apis = []
+    return apis + [('default', cv2.CAP_ANY)]
+
+
+class CaptureMode:
+    """Pixel format, frame size and frame rate of a capture"""
+    __slots__ = ('fourcc', 'width', 'height', 'fps')
+
+    def __init__(self, fourcc: str, width: int, height: int, fps: float):
+        self.fourcc = fourcc
+        self.width = width
+        self.height = height
+        self.fps = fps
+
+    def __repr__(self):
+        return f"{self.fourcc} {self.width}x{self.height}@{self.fps:.0f}"
+
+
+class CameraSettings:
+    """
+    What to negotiate.
+    formats: pixel formats to try in order (() keeps the device default)
+    probe_frames: frames timed per candidate mode, after warmup_frames are discarded
+    probe: False applies the target mode without measuring any candidate
+    """
+
+    def __init__(self, device=0, width: int = 1280, height: int = 720, fps: float = 30.0,
+                 formats: Sequence[str] = FORMATS, buffer_size: int = 1, probe: bool = True,
+                 probe_frames: int = 10, warmup_frames: int = 3, fallback_sizes=FALLBACK_SIZES):
+        self.device = device
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.formats = tuple(formats)
+        self.buffer_size = buffer_size
+        self.probe = probe
+        self.probe_frames = max(2, probe_frames)
+        self.warmup_frames = warmup_frames
+        self.fallback_sizes = fallback_sizes
+
+    def candidates(self) -> List[CaptureMode]:
+        """Target size first, then the smaller fallback sizes; each in every format"""
+        sizes = [(self.width, self.height)] + [(w, h) for w, h in self.fallback_sizes
+                                               if w * h < self.width * self.height]
+        formats = self.formats or ('',)
+        return [CaptureMode(fourcc, w, h, self.fps) for w, h in sizes for fourcc in formats]
+
+
+class CaptureReport:
+    """Outcome of open_camera/negotiate: the mode in use and what each probe measured"""
+
+    def __init__(self, api: str = '?'):
+        self.api = api
+        self.mode: Optional[CaptureMode] = None  # Delivered format/size and measured FPS
+        self.target: Optional[CaptureMode] = None
+        self.reported_fps = 0.0  # CAP_PROP_FPS after negotiation (what the driver claims)
+        self.buffer_size = None  # Driver queue length when the backend accepted the setting
+        self.configurable = True  # False: the source ignored every setting (file, some backends)
+        self.probes: List[Tuple[CaptureMode, Optional[CaptureMode]]] = []  # (requested, delivered)
+
+    @property
+    def ok(self) -> bool:
+        return self.mode is not None
+
+    @property
+    def hits_target(self) -> bool:
+        return (self.ok and self.target is not None and self.mode.fps >= self.target.fps * FPS_TOLERANCE
+                and (self.mode.width, self.mode.height) == (self.target.width, self.target.height))
+
+    def describe(self) -> str:
+        if not self.ok:
+            return f"{self.api}: no frames delivered"
+        buffer = f"buffer {self.buffer_size}" if self.buffer_size else "driver buffer"
+        fixed = "" if self.configurable else " (fixed format)"
+        return (f"{self.api}: {self.mode.fourcc} {self.mode.width}x{self.mode.height} @ {self.mode.fps:.1f} FPS "
+                f"measured ({self.reported_fps:.0f} reported), {buffer}{fixed}")
+
+
+def apply_mode(cap, mode: CaptureMode, buffer_size: Optional[int] = None) -> bool:
+    """Request a mode; True if the source accepted any of the settings"""
+    accepted = False
+    if mode.fourcc:
+        accepted |= bool(cap.set(cv2.CAP_PROP_FOURCC, fourcc_code(mode.fourcc)))
+    accepted |= bool(cap.set(cv2.CAP_PROP_FRAME_WIDTH, mode.width))
+    accepted |= bool(cap.set(cv2.CAP_PROP_FRAME_HEIGHT, mode.height))
+    accepted |= bool(cap.set(cv2.CAP_PROP_FPS, mode.fps))
+    if buffer_size:
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+    return accepted
+
+
+def measure(cap, frames: int = 10, warmup: int = 3,
+            clock: Callable[[], float] = time.perf_counter) -> Optional[CaptureMode]:
+    """Delivered mode (format from the source, size from the frames, FPS from read timing), None if no frames"""
+    image = None
+    for _ in range(warmup):  # Frames right after a mode switch come late or stale
+        ret, frame = cap.read()
+        if not ret:
+            return None
+    times = []
+    for _ in range(frames):
+        ret, frame = cap.read() if image is None else cap.read(image)
+        if not ret or frame is None:
+            break
+        image = frame
+        times.append(clock())
+    if len(times) < 2:
+        return None
+    fps = (len(times) - 1) / max(times[-1] - times[0], 1e-6)
+    h, w = image.shape[:2]
+    return CaptureMode(fourcc_name(cap.get(cv2.CAP_PROP_FOURCC)), w, h, fps)
+
+
+def negotiate(cap, settings: CameraSettings, api: str = '?',
+              clock: Callable[[], float] = time.perf_counter) -> CaptureReport:
+    """Pick the capture mode on an opened source (see the module docstring)"""
+    report = CaptureReport(api)
+    report.target = CaptureMode('', settings.width, settings.height, settings.fps)
+    candidates = settings.candidates()
+    if not settings.probe:
+        report.configurable = apply_mode(cap, candidates[0], settings.buffer_size)
+        report.mode = measure(cap, settings.probe_frames, 0, clock)
+        candidates = []
+
+    best = None
+    for requested in candidates:
+        accepted = apply_mode(cap, requested, settings.buffer_size)
+        delivered = measure(cap, settings.probe_frames, settings.warmup_frames, clock)
+        report.probes.append((requested, delivered))
+        if not accepted and len(report.probes) == 1:
+            # The source ignores capture settings: what it delivers is all there is
+            report.configurable = False
+            best = (requested, delivered)
+            break
+        if delivered is None:
+            continue
+        hit = delivered.fps >= settings.fps * FPS_TOLERANCE
+        # Below the target size, take the size the driver snapped to; at the target, insist on it
+        size_ok = ((delivered.width, delivered.height) == (requested.width, requested.height)
+                   or (requested.width, requested.height) != (settings.width, settings.height))
+        if hit and size_ok:
+            best = (requested, delivered)
+            break
+        # Otherwise keep the fastest mode seen, then the larger frame
+        key = (min(delivered.fps, settings.fps), delivered.width * delivered.height)
+        if best is None or best[1] is None or key > (min(best[1].fps, settings.fps),
+                                                     best[1].width * best[1].height):
+            best = (requested, delivered)
+
+    if best is not None and best[1] is not None:
+        requested, delivered = best
+        if report.configurable and requested is not candidates[len(report.probes) - 1]:
+            apply_mode(cap, requested, settings.buffer_size)  # Probing moved past it: switch back
+        report.mode = delivered
+    if settings.buffer_size and cap.get(cv2.CAP_PROP_BUFFERSIZE) > 0:
+        report.buffer_size = int(cap.get(cv2.CAP_PROP_BUFFERSIZE))
+    report.reported_fps = cap.get(cv2.CAP_PROP_FPS)
+    return report
+
+
+def open_camera(settings: Optional[CameraSettings] = None, factory=None, verbose: bool = True):
+    """
+    Open and negotiate a capture.
+    factory(device, api) creates the capture (default cv2.VideoCapture; use it for synthetic sources).
+    Returns: (capture, CaptureReport); the capture is returned even when negotiation found no
+    frames, so the caller's read loop decides what to do with a dead camera
+    """
+    settings = settings or CameraSettings()
+    if factory is not None:
+        apis = [('custom', cv2.CAP_ANY)]
+    elif isinstance(settings.device, str) and not settings.device.isdigit():
+        apis = [('file', cv2.CAP_ANY)]  # A video file or stream URL
+    else:
+        apis = platform_apis()
+    factory = factory or cv2.VideoCapture
+    device = int(settings.device) if isinstance(settings.device, str) and settings.device.isdigit() else settings.device
+
+    cap, api = None, apis[-1][0]
+    for api, preference in apis:
+        cap = factory(device, preference)
+        if cap.isOpened():
+            break
+        cap.release()
+    if not cap.isOpened():
+        report = CaptureReport(api)
+        if verbose:
+            print(f"❌ Camera {settings.device}: could not open")
+        return cap, report
+
+    report = negotiate(cap, settings, api)
+    if api == 'file':
+        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)  # Probing read the clip's first frames; start it over
+    if verbose:
+        if not report.ok:
+            print(f"⚠️ Camera {settings.device}: {report.describe()}")
+        elif report.hits_target or not report.configurable:
+            print(f"📷 Camera {settings.device}: {report.describe()}")
+        else:
+            print(f"⚠️ Camera {settings.device}: target {settings.width}x{settings.height}@{settings.fps:.0f} "
+                  f"not reached, using {report.describe()}")
+    return cap, report
+
+
+class SyntheticCamera:
+    """
+    cv2.VideoCapture stand-in for a webcam with a fixed list of supported modes (negotiation tests,
+    benchmarks without a camera). Requests snap to the supported mode of the requested format
+    closest to the requested size; frames are paced at the mode's rate.
+    """
+
+    DEFAULT_MODES = (
+        CaptureMode('MJPG', 1280, 720, 30), CaptureMode('MJPG', 640, 480, 60),
+        CaptureMode('YUYV', 1280, 720, 10), CaptureMode('YUYV', 640, 480, 30),
+    )
+
+    def __init__(self, device=0, api=None, modes: Sequence[CaptureMode] = DEFAULT_MODES):
+        self.modes = list(modes)
+        self.requested = {}
+        self.mode = self.modes[0]
+        self.buffer_size = 4
+        self._opened = True
+        self._next = None
+        self._frame = None
+        self._index = 0
+
+    def _negotiate(self):
+        fourcc = self.requested.get('fourcc', self.mode.fourcc)
+        width = self.requested.get('width', self.mode.width)
+        height = self.requested.get('height', self.mode.height)
+        modes = [m for m in self.modes if m.fourcc == fourcc] or self.modes
+        mode = min(modes, key=lambda m: (abs(m.width - width) + abs(m.height - height), -m.fps))
+        fps = min(self.requested.get('fps', mode.fps), mode.fps)
+        self.mode = CaptureMode(mode.fourcc, mode.width, mode.height, fps)
+        self._next = None
+
+    def set(self, prop, value):
+        names = {cv2.CAP_PROP_FRAME_WIDTH: 'width', cv2.CAP_PROP_FRAME_HEIGHT: 'height', cv2.CAP_PROP_FPS: 'fps'}
+        if prop == cv2.CAP_PROP_FOURCC:
+            self.requested['fourcc'] = fourcc_name(value)
+        elif prop in names:
+            self.requested[names[prop]] = value
+        elif prop == cv2.CAP_PROP_BUFFERSIZE:
+            self.buffer_size = int(value)
+            return True
+        else:
+            return False
+        self._negotiate()
+        return True
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FOURCC:
+            return float(fourcc_code(self.mode.fourcc))
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.mode.width)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.mode.height)
+        if prop == cv2.CAP_PROP_FPS:
+            return float(self.mode.fps)
+        if prop == cv2.CAP_PROP_BUFFERSIZE:
+            return float(self.buffer_size)
+        return 0.0
+
+    def isOpened(self):
+        return self._opened
+
+    def read(self, image=None):
+        if not self._opened:
+            return False, None
+        now = time.perf_counter()
+        if self._next is not None and self._next > now:
+            time.sleep(self._next - now)
+            now = self._next
+        self._next = now + 1.0 / self.mode.fps
+        shape = (self.mode.height, self.mode.width, 3)
+        if self._frame is None or self._frame.shape != shape:
+            self._frame = np.zeros(shape, dtype=np.uint8)
+            self._frame[:] = np.linspace(0, 255, self.mode.width, dtype=np.uint8)[None, :, None]
+        frame = image if image is not None and image.shape == shape else self._frame.copy()
+        if frame is image:
+            np.copyto(frame, self._frame)
+        x = (self._index * 8) % self.mode.width  # A moving bar, so consecutive frames differ
+        frame[:, x:x + 8] = 255
+        self._index += 1
+        return True, frame
+
+    def release(self):
+        self._opened = False
+
+
+def add_arguments(parser: argparse.ArgumentParser, fps: float = 30.0):
+    """Command-line options shared by the control scripts"""
+    group = parser.add_argument_group('camera')
+    group.add_argument('--camera', default='0', help="Camera index, a video file, or 'synthetic'")
+    group.add_argument('--camera-size', default='1280x720', help='Target frame size WxH')
+    group.add_argument('--camera-fps', type=float, default=fps, help='Target frame rate')
+    group.add_argument('--camera-format', default='auto', choices=('auto',) + FORMATS + ('default',),
+                       help='Pixel format (auto tries MJPG then YUYV; default keeps the driver choice)')
+    group.add_argument('--no-camera-probe', action='store_true',
+                       help='Request the target mode without measuring candidates (faster startup)')
+
+
+def from_args(args) -> CameraSettings:
+    width, height = (int(v) for v in args.camera_size.lower().split('x'))
+    formats = {'auto': FORMATS, 'default': ()}.get(args.camera_format, (args.camera_format,))
+    return CameraSettings(args.camera, width, height, args.camera_fps, formats, probe=not args.no_camera_probe)
+
+
+def open_from_args(args):
+    """Capture for the --camera options ('synthetic' -> SyntheticCamera)"""
+    settings = from_args(args)
+    factory = SyntheticCamera if settings.device == 'synthetic' else None
+    return open_camera(settings, factory)[0]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Probe camera capture modes")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    settings = from_args(args)
+    cap, report = open_camera(settings, SyntheticCamera if settings.device == 'synthetic' else None)
+    for requested, delivered in report.probes:
+        print(f"  requested {requested!r:<24} -> " + (f"{delivered!r} ({delivered.fps:.1f} FPS)" if delivered
+                                                      else "no frames"))
+    cap.release()
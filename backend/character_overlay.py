@@ -23,6 +23,7 @@ class CharacterOverlay:
         self.character_x = 50
         self.character_y = 200
         self.current_animation = 'idle'
+        self._overlay = None
         self.animation_frame = 0
         self.animation_start_time = time.time()
         
@@ -128,8 +129,12 @@ class CharacterOverlay:
         """Draw the character overlay on the frame"""
         h, w = frame.shape[:2]
         
-        # Create character overlay
-        overlay = np.zeros_like(frame)
+        # Character overlay (reused buffer, cleared in place instead of reallocated every frame)
+        overlay = self._overlay
+        if overlay is None or overlay.shape != frame.shape:
+            overlay = self._overlay = np.zeros_like(frame)
+        else:
+            overlay.fill(0)
         
         # Draw character based on style
         if self.character_style == 'anime':
@@ -15,6 +15,7 @@ import cv2
 import mediapipe as mp
 import numpy as np
 import pyautogui
+from hand_tracker import HandTracker
 import time
 
 # Safety
@@ -457,6 +458,7 @@ class CompleteControlSystem:
         self.mouse_controller = SmoothMouseController()
         self.left_hand_controller = LeftHandGestureController()
         self.tongue_controller = TongueController()
+        self.hand_tracker = HandTracker()
         
         # Control state
         self.control_enabled = False
@@ -467,27 +469,12 @@ class CompleteControlSystem:
         print("Left hand: Crouch/jump")
         print("Tongue: Spray emote")
     
-    def identify_hands(self, hand_landmarks_list):
-        """Identify which hand is left vs right based on position"""
-        if len(hand_landmarks_list) == 0:
-            return None, None
-        elif len(hand_landmarks_list) == 1:
-            # Only one hand detected, assume it's the right hand
-            return None, hand_landmarks_list[0]
-        else:
-            # Two hands detected, identify by x position
-            hand1 = hand_landmarks_list[0]
-            hand2 = hand_landmarks_list[1]
-            
-            # Get wrist positions
-            wrist1_x = hand1.landmark[0].x
-            wrist2_x = hand2.landmark[0].x
-            
-            # Left hand is on the left side of screen (lower x value)
-            if wrist1_x < wrist2_x:
-                return hand1, hand2  # hand1 is left, hand2 is right
-            else:
-                return hand2, hand1  # hand2 is left, hand1 is right
+    def identify_hands(self, hand_landmarks_list, handedness_list=None):
+        """
+        Identify which hand is left vs right, kept stable across frames by the hand tracker
+        Returns: (left_hand, right_hand)
+        """
+        return self.hand_tracker.update(hand_landmarks_list, handedness_list)
     
     def run(self):
         """Main control loop"""
@@ -589,7 +576,7 @@ class CompleteControlSystem:
                 if hand_results and hand_results.multi_hand_landmarks:
                     try:
                         # Identify left and right hands
-                        left_hand, right_hand = self.identify_hands(hand_results.multi_hand_landmarks)
+                        left_hand, right_hand = self.identify_hands(hand_results.multi_hand_landmarks, hand_results.multi_handedness)
                         
                         # Process right hand (gun control)
                         if right_hand:
@@ -15,6 +15,7 @@ import mediapipe as mp
 import numpy as np
 import time
 import pyautogui
+from hand_tracker import HandTracker
 
 # Safety
 pyautogui.PAUSE = 0.01
@@ -305,6 +306,7 @@ class DualHandTrackingController:
         self.shooting_controller = ThumbShootingController()
         self.mouse_controller = SmoothMouseController(smoothing_factor=0.5)
         self.left_hand_controller = LeftHandGestureController()
+        self.hand_tracker = HandTracker()
         
         # Control state
         self.control_enabled = False
@@ -313,50 +315,12 @@ class DualHandTrackingController:
         print("Right hand: Gun gesture + thumb shooting")
         print("Left hand: Palm-facing controls (crouch/jump)")
     
-    def identify_hands(self, hand_landmarks_list):
+    def identify_hands(self, hand_landmarks_list, handedness_list=None):
         """
-        Identify which hand is left vs right based on position
+        Identify which hand is left vs right, kept stable across frames by the hand tracker
         Returns: (left_hand, right_hand)
         """
-        try:
-            if len(hand_landmarks_list) < 2:
-                # Only one hand detected
-                if len(hand_landmarks_list) == 1:
-                    hand = hand_landmarks_list[0]
-                    # Assume it's right hand for gun control if no left hand
-                    return None, hand
-                else:
-                    return None, None
-            
-            # Two hands detected - identify by position
-            hand1 = hand_landmarks_list[0]
-            hand2 = hand_landmarks_list[1]
-            
-            # Get wrist positions safely
-            if not hasattr(hand1, 'landmark') or not hasattr(hand2, 'landmark'):
-                print("Warning: Hand landmarks not properly formatted")
-                return None, hand1  # Default to first hand as right
-            
-            if len(hand1.landmark) < 1 or len(hand2.landmark) < 1:
-                print("Warning: Insufficient hand landmarks")
-                return None, hand1  # Default to first hand as right
-            
-            wrist1_x = hand1.landmark[0].x
-            wrist2_x = hand2.landmark[0].x
-            
-            # Left hand is on the left side of screen (smaller x value)
-            if wrist1_x < wrist2_x:
-                return hand1, hand2
-            else:
-                return hand2, hand1
-                
-        except Exception as e:
-            print(f"Error in identify_hands: {e}")
-            # Return safe defaults
-            if len(hand_landmarks_list) >= 1:
-                return None, hand_landmarks_list[0]
-            else:
-                return None, None
+        return self.hand_tracker.update(hand_landmarks_list, handedness_list)
     
     def run(self):
         """Main dual hand tracking loop"""
@@ -420,7 +384,7 @@ class DualHandTrackingController:
                 if results and results.multi_hand_landmarks:
                     try:
                         # Identify left and right hands
-                        left_hand, right_hand = self.identify_hands(results.multi_hand_landmarks)
+                        left_hand, right_hand = self.identify_hands(results.multi_hand_landmarks, results.multi_handedness)
                         
                         # Process right hand (gun control)
                         if right_hand:
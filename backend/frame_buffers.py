@@ -0,0 +1,115 @@
+"""
+Frame Buffers
+Preallocated per-frame image buffers shared by capture, the models and the overlay.
+
+The original loop allocated a new 1280x720 image for the mirror flip and
+another for the RGB conversion every frame (and main.py converted again).
+FrameBufferPool keeps one capture buffer plus BGR/RGB buffers per slot and
+writes into them in place with OpenCV's dst= arguments. The RGB buffer is
+handed out read-only: it is shared by Hands/Pose/FaceMesh (MediaPipe passes
+non-writeable images by reference) and nothing may draw on it.
+"""
+
+import time
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+class _Slot:
+    __slots__ = ('bgr', 'rgb')
+
+    def __init__(self, shape):
+        self.bgr = np.empty(shape, dtype=np.uint8)
+        self.rgb = np.empty(shape, dtype=np.uint8)
+        self.rgb.flags.writeable = False
+
+
+class FrameBufferPool:
+    """
+    Reusable capture/BGR/RGB buffers.
+    slots > 1 rotates through several buffer pairs so a frame can still be in use
+    (e.g. by a background consumer) while the next one is prepared.
+    """
+
+    def __init__(self, slots: int = 1):
+        self.slots = max(1, slots)
+        self._slots = []
+        self._index = 0
+        self._shape = None
+        self._capture = None
+        self.read_time = None  # perf_counter when the last frame was read
+        self.capture_time = None  # Its capture timestamp (s), see read()
+        self.allocations = 0  # Buffer (re)allocations - stays at 1 for a fixed camera format
+
+    def _ensure(self, shape):
+        if shape != self._shape:
+            self._shape = shape
+            self._slots = [_Slot(shape) for _ in range(self.slots)]
+            self._index = 0
+            self.allocations += 1
+
+    def read(self, cap):
+        """
+        cap.read() into the pool's capture buffer (cv2.VideoCapture reuses it when the format matches).
+        Stamps the frame: capture_time is the source's recorded timestamp when it has one
+        (frame_recording.ReplayCapture.frame_timestamp), so controller timers replay deterministically
+        even with --fast; live cameras fall back to read_time, the perf_counter arrival time.
+        """
+        if self._capture is None:
+            ret, frame = cap.read()
+        else:
+            ret, frame = cap.read(self._capture)
+        if ret and frame is not None:
+            self._capture = frame
+            self.read_time = time.perf_counter()
+            timestamp = getattr(cap, 'frame_timestamp', None)
+            self.capture_time = self.read_time if timestamp is None else timestamp
+        return ret, frame
+
+    def prepare(self, frame: np.ndarray, mirror: bool = True, rgb_out: Optional[np.ndarray] = None,
+                convert: bool = True) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Mirror the camera frame into the next BGR buffer and convert it into the
+        matching read-only RGB buffer.
+        rgb_out: convert into this buffer instead (e.g. a shared-memory ring slot, see inference_workers.py)
+        convert: False skips the RGB conversion (no model runs on this frame); rgb is then None
+        Returns: (bgr, rgb) - bgr is for drawing/display, rgb is for the models
+        """
+        self._ensure(frame.shape)
+        slot = self._slots[self._index]
+        self._index = (self._index + 1) % self.slots
+
+        if mirror:
+            cv2.flip(frame, 1, dst=slot.bgr)
+        else:
+            np.copyto(slot.bgr, frame)
+        if not convert:
+            return slot.bgr, None
+        rgb = slot.rgb if rgb_out is None else rgb_out
+        rgb.flags.writeable = True
+        cv2.cvtColor(slot.bgr, cv2.COLOR_BGR2RGB, dst=rgb)
+        rgb.flags.writeable = False
+        return slot.bgr, rgb
+
+
+def blend_rect(frame: np.ndarray, x: int, y: int, width: int, height: int,
+               fill=(0, 0, 0), border=(255, 255, 255), border_thickness: int = 2, alpha: float = 0.7):
+    """
+    Semi-transparent filled rectangle blended in place over just its own region
+    (same result as drawing on frame.copy() and blending the whole frame).
+    """
+    h, w = frame.shape[:2]
+    pad = border_thickness // 2 + 1 if border is not None else 0
+    x0, y0 = max(0, x - pad), max(0, y - pad)
+    x1, y1 = min(w, x + width + pad + 1), min(h, y + height + pad + 1)
+    if x0 >= x1 or y0 >= y1:
+        return
+    roi = frame[y0:y1, x0:x1]
+    overlay = roi.copy()
+    p1, p2 = (x - x0, y - y0), (x + width - x0, y + height - y0)
+    cv2.rectangle(overlay, p1, p2, fill, -1)
+    if border is not None:
+        cv2.rectangle(overlay, p1, p2, border, border_thickness)
+    cv2.addWeighted(overlay, alpha, roi, 1 - alpha, 0, roi)
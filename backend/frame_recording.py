@@ -0,0 +1,274 @@
+"""
+Frame Recording and Replay
+Saves camera frames with per-frame capture timestamps and plays them back
+through the same interface as cv2.VideoCapture.
+
+A recording is a video (MJPG .avi, or raw uint8 frames) plus a JSON sidecar:
+    session.avi       - frames as captured (before the mirror flip)
+    session.avi.json  - {"format", "width", "height", "fps", "timestamps": [...]}
+
+Usage:
+    python frame_recording.py record session.avi --seconds 60
+    python leaning_control_system.py --replay session.avi --fast --no-preview
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import List, Optional
+
+import cv2
+import numpy as np
+
+
+def _sidecar_path(path: str) -> str:
+    return path + '.json'
+
+
+class FrameRecorder:
+    """Writes frames plus capture timestamps (compressed MJPG or raw)"""
+
+    def __init__(self, path: str, fps: float = 30.0, raw: bool = False):
+        self.path = path
+        self.fps = fps
+        self.raw = raw
+        self.timestamps: List[float] = []
+        self.shape = None
+        self._writer = None
+        self._raw_file = None
+        self._start = None
+
+    def write(self, frame: np.ndarray, timestamp: Optional[float] = None):
+        """Append a frame; timestamp defaults to now (perf_counter)"""
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        if self._start is None:
+            self._start = timestamp
+            self.shape = frame.shape
+            if self.raw:
+                self._raw_file = open(self.path, 'wb')
+            else:
+                h, w = frame.shape[:2]
+                fourcc = cv2.VideoWriter_fourcc(*'MJPG')
+                self._writer = cv2.VideoWriter(self.path, fourcc, self.fps, (w, h))
+                if not self._writer.isOpened():
+                    raise IOError(f"Could not open video writer for {self.path}")
+
+        if self.raw:
+            self._raw_file.write(np.ascontiguousarray(frame).tobytes())
+        else:
+            self._writer.write(frame)
+        self.timestamps.append(timestamp - self._start)
+
+    def close(self):
+        """Finish the video and write the timestamp sidecar"""
+        if self._writer is not None:
+            self._writer.release()
+            self._writer = None
+        if self._raw_file is not None:
+            self._raw_file.close()
+            self._raw_file = None
+        if self.shape is None:
+            return
+        meta = {
+            'format': 'raw' if self.raw else 'mjpg',
+            'width': int(self.shape[1]),
+            'height': int(self.shape[0]),
+            'channels': int(self.shape[2]) if len(self.shape) > 2 else 1,
+            'fps': self.fps,
+            'frames': len(self.timestamps),
+            'timestamps': [round(t, 6) for t in self.timestamps],
+        }
+        with open(_sidecar_path(self.path), 'w') as f:
+            json.dump(meta, f)
+        print(f"💾 Recorded {len(self.timestamps)} frames to {self.path}")
+
+
+class RecordingCapture:
+    """Wraps a live capture and records every frame it returns"""
+
+    def __init__(self, cap, recorder: FrameRecorder):
+        self.cap = cap
+        self.recorder = recorder
+
+    def read(self, image=None):
+        ret, frame = self.cap.read() if image is None else self.cap.read(image)
+        if ret:
+            self.recorder.write(frame)
+        return ret, frame
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def set(self, prop, value):
+        return self.cap.set(prop, value)
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def release(self):
+        self.recorder.close()
+        self.cap.release()
+
+
+class ReplayCapture:
+    """
+    Drop-in replacement for cv2.VideoCapture that replays a recording.
+    realtime=True paces frames by the recorded timestamps; False runs as fast as possible.
+    """
+
+    def __init__(self, path: str, realtime: bool = True, loop: bool = False):
+        self.path = path
+        self.realtime = realtime
+        self.loop = loop
+        self.index = 0
+        self.frame_timestamp = 0.0  # Recorded capture time of the last frame (s)
+        self._opened = True
+        self._video = None
+        self._raw = None
+        self._start_wall = None
+
+        meta = {}
+        sidecar = _sidecar_path(path)
+        if os.path.exists(sidecar):
+            with open(sidecar) as f:
+                meta = json.load(f)
+        self.meta = meta
+
+        if meta.get('format') == 'raw':
+            shape = (meta['height'], meta['width'], meta.get('channels', 3))
+            data = np.memmap(path, dtype=np.uint8, mode='r')
+            self._raw = data.reshape((-1,) + shape)
+            self.frame_count = self._raw.shape[0]
+            self.width, self.height = meta['width'], meta['height']
+            self.fps = meta.get('fps', 30.0)
+        else:
+            self._video = cv2.VideoCapture(path)
+            if not self._video.isOpened():
+                self._opened = False
+            self.frame_count = int(self._video.get(cv2.CAP_PROP_FRAME_COUNT))
+            self.width = int(self._video.get(cv2.CAP_PROP_FRAME_WIDTH))
+            self.height = int(self._video.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            self.fps = meta.get('fps') or self._video.get(cv2.CAP_PROP_FPS) or 30.0
+
+        timestamps = meta.get('timestamps')
+        if not timestamps:
+            timestamps = [i / self.fps for i in range(max(self.frame_count, 0))]
+        self.timestamps = timestamps
+
+    def _rewind(self):
+        self.index = 0
+        self._start_wall = None
+        if self._video is not None:
+            self._video.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def read(self, image=None):
+        if not self._opened:
+            return False, None
+        if 0 < self.frame_count <= self.index:
+            if not self.loop:
+                self._opened = False
+                return False, None
+            self._rewind()
+
+        if self._raw is not None:
+            source = self._raw[self.index]
+            if image is not None and image.shape == source.shape and image.flags.writeable:
+                np.copyto(image, source)  # Reuse the caller's buffer like cv2.VideoCapture.read(image)
+                frame = image
+            else:
+                frame = np.array(source)
+        else:
+            ret, frame = self._video.read() if image is None else self._video.read(image)
+            if not ret:
+                if self.loop and self.index > 0:
+                    self._rewind()
+                    return self.read(image)
+                self._opened = False
+                return False, None
+
+        if self.index < len(self.timestamps):
+            self.frame_timestamp = self.timestamps[self.index]
+        else:
+            self.frame_timestamp = self.index / self.fps
+
+        if self.realtime:
+            now = time.perf_counter()
+            if self._start_wall is None:
+                self._start_wall = now - self.frame_timestamp
+            wait = self._start_wall + self.frame_timestamp - now
+            if wait > 0:
+                time.sleep(wait)
+
+        self.index += 1
+        return True, frame
+
+    def isOpened(self):
+        return self._opened
+
+    def set(self, prop, value):
+        # Capture settings don't apply to a recording
+        return False
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height)
+        if prop == cv2.CAP_PROP_FPS:
+            return float(self.fps)
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return float(self.frame_count)
+        if prop == cv2.CAP_PROP_POS_MSEC:
+            return self.frame_timestamp * 1000.0
+        return 0.0
+
+    def release(self):
+        self._opened = False
+        if self._video is not None:
+            self._video.release()
+            self._video = None
+        self._raw = None
+
+
+def record_session(path: str, seconds: float, camera: int = 0, raw: bool = False,
+                   width: int = 1280, height: int = 720, fps: int = 30):
+    """Record a webcam session with a live preview"""
+    from camera_capture import CameraSettings, open_camera
+
+    cap, _ = open_camera(CameraSettings(camera, width, height, fps))
+    if not cap.isOpened():
+        print("Error: Could not open camera")
+        return
+
+    recorder = FrameRecorder(path, fps=fps, raw=raw)
+    capture = RecordingCapture(cap, recorder)
+    print(f"🎥 Recording {seconds:.0f}s to {path} ('q' to stop early)")
+    start = time.time()
+    try:
+        while time.time() - start < seconds:
+            ret, frame = capture.read()
+            if not ret:
+                time.sleep(0.01)
+                continue
+            cv2.imshow('Recording', cv2.flip(frame, 1))
+            if cv2.waitKey(1) & 0xFF in (ord('q'), 27):
+                break
+    finally:
+        capture.release()
+        cv2.destroyAllWindows()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record webcam frames for offline replay")
+    sub = parser.add_subparsers(dest='command', required=True)
+    rec = sub.add_parser('record', help='Record a webcam session')
+    rec.add_argument('path')
+    rec.add_argument('--seconds', type=float, default=60)
+    rec.add_argument('--camera', type=int, default=0)
+    rec.add_argument('--raw', action='store_true', help='Store uncompressed frames')
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        record_session(args.path, args.seconds, camera=args.camera, raw=args.raw)
@@ -0,0 +1,439 @@
+"""
+Gesture Classifier
+Learned replacement for the hand-tuned gesture predicates (is_gun_gesture,
+are_bottom_fingers_curled, is_thumb_down, detect_left_hand_gestures), trained
+from recorded landmark sessions.
+
+The predicates threshold a few joint angles and distances in image
+coordinates, one Python landmark access at a time: they misfire near their
+thresholds on jittery landmarks, and is_thumb_down (tip below the IP joint in
+image y) breaks as soon as the hand tilts. The classifier normalizes each hand
+instead - wrist at the origin, wrist->middle knuckle pointing up at unit
+length, left hands mirrored onto right ones - and runs a small MLP (or
+logistic regression with --hidden 0) over the 21 normalized joints. Per frame
+that is one serialization of both hands, one 3x3 transform per hand and a
+couple of matmuls for both hands together (the feature standardization is
+folded into the first layer).
+
+Training data is landmark_log recordings plus a labels file next to each log
+(<log>.labels.json, shared with threshold_tuner.py's "actions") saying which
+gestures were held when, in session seconds:
+
+    {"segments": [
+        {"start": 2.0, "end": 6.5, "right": ["gun"], "left": []},
+        {"start": 8.0, "end": 12.0, "right": ["gun", "curled", "thumb_down"]},
+        {"start": 14.0, "end": 18.0, "left": ["one_down"]}
+    ]}
+
+Within a segment a listed role gets all of its labels (listed: positive, the
+rest: negative); roles left out of a segment, and frames outside every
+segment, are not used. Hand roles come from replaying the log through
+hand_tracker.HandTracker, as in the live system. Right-hand labels are gun,
+curled (bottom fingers, keeps the gun locked) and thumb_down; left-hand labels
+are one_down (crouch) and four_down (jump).
+
+    python gesture_classifier.py train session1.lmk session2.lmk --output gestures.npz
+    python gesture_classifier.py evaluate gestures.npz session3.lmk
+    python leaning_control_system.py --gesture-model gestures.npz
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from landmark_drawing import landmark_points
+
+HAND_POINTS = 21
+MIDDLE_MCP = 9  # Wrist -> middle knuckle is the hand's "up" axis
+
+ROLE_LABELS = {
+    'right': ('gun', 'curled', 'thumb_down'),
+    'left': ('one_down', 'four_down'),
+}
+LABELS = ROLE_LABELS['right'] + ROLE_LABELS['left']
+
+
+def hand_features(points: np.ndarray, left: Sequence[bool]) -> np.ndarray:
+    """
+    (n, 63) float32 features for (n, 21, 3) hand landmarks: wrist at the origin,
+    wrist->middle MCP rotated to point up (-y) at unit length, left hands mirrored
+    """
+    p = points - points[:, :1]
+    # One 3x3 transform per hand; built from Python floats, which beats a dozen
+    # tiny array ops for a frame's two hands (and is still cheap for training sets)
+    transforms = []
+    for (dx, dy, _), mirrored in zip(p[:, MIDDLE_MCP].tolist(), left):
+        inverse = 1.0 / max(dx * dx + dy * dy, 1e-12)  # 1/length^2: unit direction and scale in one
+        ux, uy = dx * inverse, dy * inverse
+        sign = 1.0 if mirrored else -1.0  # x axis (-uy, ux), mirrored to (uy, -ux) for left hands
+        transforms.append(((sign * uy, -ux, 0.0), (-sign * ux, -uy, 0.0), (0.0, 0.0, math.sqrt(inverse))))
+    return np.matmul(p, np.array(transforms, np.float32)).reshape(len(p), -1)
+
+
+class GestureClassifier:
+    """
+    Gesture source backed by a trained model (see LeaningControlSystem(gestures=...)).
+    classify(left, right) scores both hands of a frame at once; gun/curled/thumb_down/
+    left_gesture then answer from those scores like the rule predicates.
+    """
+
+    def __init__(self, layers: Sequence, mean: np.ndarray, std: np.ndarray, labels: Sequence[str] = LABELS,
+                 threshold: float = 0.5):
+        missing = set(LABELS) - set(labels)
+        if missing:
+            raise ValueError(f"gesture model has no output for {', '.join(sorted(missing))}")
+        self.layers = [(np.asarray(w, np.float32), np.asarray(b, np.float32)) for w, b in layers]
+        self.mean = np.asarray(mean, np.float32)
+        self.std = np.asarray(std, np.float32)
+        self.labels = tuple(labels)
+        self.threshold = threshold
+        self.index = {label: i for i, label in enumerate(self.labels)}
+        self.left_index = np.array([self.index[label] for label in ROLE_LABELS['left']], dtype=np.intp)
+        self._logit_threshold = float(np.log(threshold / (1.0 - threshold)))
+        # Standardization folded into the first layer: ((x - mean) / std) @ W = x @ (W / std) - (mean / std) @ W
+        (w, b), rest = self.layers[0], self.layers[1:]
+        self._layers = [(w / self.std[:, None], b - (self.mean / self.std) @ w)] + rest
+        self._scores: Dict[str, tuple] = {}  # role -> (hand, logits row or None)
+
+    @classmethod
+    def load(cls, path: str, threshold: float = 0.5) -> 'GestureClassifier':
+        with np.load(path) as data:
+            count = sum(1 for key in data.files if key.startswith('W'))
+            layers = [(data[f'W{i}'], data[f'b{i}']) for i in range(count)]
+            return cls(layers, data['mean'], data['std'], [str(label) for label in data['labels']], threshold)
+
+    def save(self, path: str):
+        arrays = {'labels': np.array(self.labels), 'mean': self.mean, 'std': self.std}
+        for i, (w, b) in enumerate(self.layers):
+            arrays[f'W{i}'] = w
+            arrays[f'b{i}'] = b
+        np.savez(path, **arrays)
+
+    def describe(self) -> str:
+        sizes = [self.layers[0][0].shape[0]] + [w.shape[1] for w, _ in self.layers]
+        return f"{'MLP' if len(self.layers) > 1 else 'logistic'} {'-'.join(map(str, sizes))}"
+
+    def logits(self, features: np.ndarray) -> np.ndarray:
+        """(n, labels) logits for raw hand_features rows"""
+        x = features
+        for w, b in self._layers[:-1]:
+            x = x @ w
+            x += b
+            np.maximum(x, 0.0, out=x)
+        w, b = self._layers[-1]
+        return x @ w + b
+
+    def predict(self, points: np.ndarray, left: Sequence[bool]) -> np.ndarray:
+        """(n, labels) logits for (n, 21, 3) hands"""
+        return self.logits(hand_features(points, left))
+
+    def decide(self, logits: np.ndarray) -> np.ndarray:
+        """(n, labels) decisions; the left-hand gestures are exclusive (the most likely one, if any)"""
+        decisions = logits > self._logit_threshold
+        left = logits[:, self.left_index]
+        best = left.argmax(axis=1)
+        exclusive = np.zeros_like(left, dtype=bool)
+        exclusive[np.arange(len(left)), best] = left[np.arange(len(left)), best] > self._logit_threshold
+        decisions[:, self.left_index] = exclusive
+        return decisions
+
+    # --- Gesture source interface (see leaning_control_system.RuleGestures) ---
+
+    def classify(self, left_hand=None, right_hand=None):
+        """Score this frame's hands in one batch (None leaves that role's scores alone)"""
+        roles = [(role, hand) for role, hand in (('left', left_hand), ('right', right_hand)) if hand is not None]
+        valid = [(role, hand) for role, hand in roles if len(hand.landmark) == HAND_POINTS]
+        for role, hand in roles:
+            self._scores[role] = (hand, None)
+        if not valid:
+            return
+        points = landmark_points([hand for _, hand in valid])
+        for (role, hand), row in zip(valid, self.predict(points, [role == 'left' for role, _ in valid])):
+            self._scores[role] = (hand, row)
+
+    def _row(self, hand, role: str) -> Optional[np.ndarray]:
+        scores = self._scores.get(role)
+        if scores is None or scores[0] is not hand:
+            self.classify(**{f'{role}_hand': hand})
+            scores = self._scores[role]
+        return scores[1]
+
+    def _positive(self, hand, label: str) -> bool:
+        if hand is None:
+            return False
+        row = self._row(hand, 'right')
+        return row is not None and bool(row[self.index[label]] > self._logit_threshold)
+
+    def gun(self, hand) -> bool:
+        return self._positive(hand, 'gun')
+
+    def curled(self, hand) -> bool:
+        return self._positive(hand, 'curled')
+
+    def thumb_down(self, hand) -> bool:
+        return self._positive(hand, 'thumb_down')
+
+    def left_gesture(self, hand) -> str:
+        """'one_down', 'four_down', 'unknown', or 'invalid' (not a 21-landmark hand)"""
+        row = self._row(hand, 'left')
+        if row is None:
+            return "invalid"
+        left = row[self.left_index]
+        best = int(left.argmax())
+        return ROLE_LABELS['left'][best] if left[best] > self._logit_threshold else "unknown"
+
+
+def train(features: np.ndarray, targets: np.ndarray, mask: np.ndarray, hidden: int = 32, epochs: int = 60,
+          batch_size: int = 256, learning_rate: float = 0.01, l2: float = 1e-4, seed: int = 0,
+          labels: Sequence[str] = LABELS) -> GestureClassifier:
+    """
+    Fit an MLP with one ReLU hidden layer (hidden=0: logistic regression) by Adam on a
+    masked binary cross-entropy: each sample only trains the labels its mask marks known.
+    """
+    rng = np.random.default_rng(seed)
+    features = np.asarray(features, np.float32)
+    mean = features.mean(axis=0)
+    std = features.std(axis=0)
+    std[std < 1e-6] = 1.0
+    x_all = (features - mean) / std
+    y_all = np.asarray(targets, np.float32)
+    m_all = np.asarray(mask, np.float32)
+
+    sizes = [x_all.shape[1]] + ([hidden] if hidden else []) + [y_all.shape[1]]
+    params = []
+    for fan_in, fan_out in zip(sizes[:-1], sizes[1:]):
+        params.append(rng.normal(0.0, np.sqrt(2.0 / fan_in), (fan_in, fan_out)).astype(np.float32))
+        params.append(np.zeros(fan_out, np.float32))
+    moments = [np.zeros_like(p) for p in params]
+    velocities = [np.zeros_like(p) for p in params]
+    beta1, beta2, step = 0.9, 0.999, 0
+
+    for _ in range(epochs):
+        order = rng.permutation(len(x_all))
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            x, y, m = x_all[batch], y_all[batch], m_all[batch]
+            activations = [x]
+            for i in range(0, len(params) - 2, 2):
+                activations.append(np.maximum(activations[-1] @ params[i] + params[i + 1], 0.0))
+            logits = activations[-1] @ params[-2] + params[-1]
+            probabilities = 1.0 / (1.0 + np.exp(-np.clip(logits, -30.0, 30.0)))
+            delta = (probabilities - y) * m / max(float(m.sum()), 1.0)
+
+            grads = [None] * len(params)
+            for i in range(len(params) - 2, -1, -2):
+                grads[i] = activations[i // 2].T @ delta + l2 * params[i]
+                grads[i + 1] = delta.sum(axis=0)
+                if i:
+                    delta = (delta @ params[i].T) * (activations[i // 2] > 0)
+
+            step += 1
+            for p, g, mo, v in zip(params, grads, moments, velocities):
+                mo *= beta1
+                mo += (1 - beta1) * g
+                v *= beta2
+                v += (1 - beta2) * g * g
+                p -= learning_rate * (mo / (1 - beta1 ** step)) / (np.sqrt(v / (1 - beta2 ** step)) + 1e-8)
+
+    layers = [(params[i], params[i + 1]) for i in range(0, len(params), 2)]
+    return GestureClassifier(layers, mean, std, labels)
+
+
+class GestureSamples:
+    """
+    Labeled hands: points (n, 21, 3), left (n,) bool, targets/mask (n, labels) and
+    position (n,) - how far into its labeled segment each sample is (0-1)
+    """
+    __slots__ = ('points', 'left', 'targets', 'mask', 'position')
+
+    def __init__(self, points, left, targets, mask, position):
+        self.points = np.asarray(points, np.float32).reshape(-1, HAND_POINTS, 3)
+        self.left = np.asarray(left, bool)
+        self.targets = np.asarray(targets, np.float32).reshape(-1, len(LABELS))
+        self.mask = np.asarray(mask, np.float32).reshape(-1, len(LABELS))
+        self.position = np.asarray(position, np.float32)
+
+    def __len__(self):
+        return len(self.left)
+
+    def subset(self, index) -> 'GestureSamples':
+        return GestureSamples(self.points[index], self.left[index], self.targets[index], self.mask[index],
+                              self.position[index])
+
+    def split(self, holdout: float):
+        """(train, test): the last `holdout` of every labeled segment is held out"""
+        test = self.position >= 1.0 - holdout
+        return self.subset(~test), self.subset(test)
+
+    def features(self) -> np.ndarray:
+        return hand_features(self.points, self.left)
+
+    @staticmethod
+    def concatenate(samples: Sequence['GestureSamples']) -> 'GestureSamples':
+        return GestureSamples(*(np.concatenate([getattr(s, name) for s in samples])
+                                for name in GestureSamples.__slots__))
+
+
+def load_labels(path: str) -> List[Dict]:
+    """Segments of a labels file, sorted by start time (unknown gesture names are rejected)"""
+    with open(path) as f:
+        segments = json.load(f).get('segments', [])
+    for segment in segments:
+        for role, names in ROLE_LABELS.items():
+            unknown = set(segment.get(role) or ()) - set(names)
+            if unknown:
+                raise ValueError(f"{path}: unknown {role}-hand label(s) {', '.join(sorted(unknown))}")
+    return sorted(segments, key=lambda segment: segment['start'])
+
+
+def load_samples(log_path: str, labels_path: Optional[str] = None) -> GestureSamples:
+    """Labeled hands of one landmark log (labels default to <log>.labels.json)"""
+    from hand_tracker import HandTracker
+    from landmark_log import LandmarkLog
+
+    segments = load_labels(labels_path or f"{log_path}.labels.json")
+    tracker = HandTracker()
+    points, left, targets, mask, position = [], [], [], [], []
+    current = 0
+    for frame in LandmarkLog(log_path):
+        t = frame.timestamp
+        hands = dict(zip(('left', 'right'), tracker.update(frame.multi_hand_landmarks, frame.multi_handedness, t)))
+        while current < len(segments) and segments[current]['end'] < t:
+            current += 1
+        if current == len(segments) or t < segments[current]['start']:
+            continue
+        segment = segments[current]
+        for role, hand in hands.items():
+            names = segment.get(role)
+            if hand is None or names is None:
+                continue
+            row = np.zeros(len(LABELS), np.float32)
+            known = np.zeros(len(LABELS), np.float32)
+            for label in ROLE_LABELS[role]:
+                row[LABELS.index(label)] = label in names
+                known[LABELS.index(label)] = 1.0
+            points.append(hand.array[:, :3])
+            left.append(role == 'left')
+            targets.append(row)
+            mask.append(known)
+            position.append((t - segment['start']) / max(segment['end'] - segment['start'], 1e-6))
+    return GestureSamples(points, left, targets, mask, position)
+
+
+def rule_decisions(samples: GestureSamples, gestures=None) -> np.ndarray:
+    """(n, labels) decisions of a per-hand gesture source (the rule predicates by default)"""
+    from landmark_log import LandmarkListView
+
+    if gestures is None:
+        from leaning_control_system import RULE_GESTURES as gestures
+    decisions = np.zeros((len(samples), len(LABELS)), bool)
+    for i, (points, left) in enumerate(zip(samples.points, samples.left)):
+        hand = LandmarkListView(points)
+        if left:
+            name = gestures.left_gesture(hand)
+            for label in ROLE_LABELS['left']:
+                decisions[i, LABELS.index(label)] = name == label
+        else:
+            decisions[i, LABELS.index('gun')] = gestures.gun(hand)
+            decisions[i, LABELS.index('curled')] = gestures.curled(hand)
+            decisions[i, LABELS.index('thumb_down')] = gestures.thumb_down(hand)
+    return decisions
+
+
+def accuracy(decisions: np.ndarray, samples: GestureSamples) -> Dict[str, Dict[str, float]]:
+    """Per-label accuracy / false positive / false negative rates over the labeled entries"""
+    report = {}
+    for i, label in enumerate(LABELS):
+        known = samples.mask[:, i] > 0
+        if not known.any():
+            continue
+        truth = samples.targets[known, i] > 0.5
+        said = decisions[known, i]
+        negatives, positives = max(int((~truth).sum()), 1), max(int(truth.sum()), 1)
+        report[label] = {
+            'samples': int(known.sum()),
+            'accuracy': float((said == truth).mean()),
+            'false_positive': float((said & ~truth).sum() / negatives),
+            'false_negative': float((~said & truth).sum() / positives),
+        }
+    return report
+
+
+def compare(model: GestureClassifier, samples: GestureSamples) -> Dict[str, Dict]:
+    """Rule predicates vs the model on the same labeled hands"""
+    return {
+        'rules': accuracy(rule_decisions(samples), samples),
+        'model': accuracy(model.decide(model.predict(samples.points, samples.left)), samples),
+    }
+
+
+def print_comparison(reports: Dict[str, Dict]):
+    print(f"  {'label':<12} {'samples':>8}   {'rules acc  fp    fn':>22}   {'model acc  fp    fn':>22}")
+    for label in LABELS:
+        rules, model = reports['rules'].get(label), reports['model'].get(label)
+        if rules is None:
+            continue
+        cells = [f"{r['accuracy']:6.1%} {r['false_positive']:5.1%} {r['false_negative']:5.1%}" for r in (rules, model)]
+        print(f"  {label:<12} {rules['samples']:>8}   {cells[0]:>22}   {cells[1]:>22}")
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Command-line options shared by the control scripts"""
+    group = parser.add_argument_group('gesture classifier')
+    group.add_argument('--gesture-model', metavar='MODEL.npz',
+                       help='Trained gesture model (gesture_classifier.py train) instead of the rule predicates')
+
+
+def from_args(args) -> Optional[GestureClassifier]:
+    if not args.gesture_model:
+        return None
+    model = GestureClassifier.load(args.gesture_model)
+    print(f"🧠 Gesture model: {args.gesture_model} ({model.describe()})")
+    return model
+
+
+def _load_all(paths: Sequence[str]) -> GestureSamples:
+    samples = []
+    for path in paths:
+        loaded = load_samples(path)
+        print(f"  {path}: {len(loaded)} labeled hands")
+        samples.append(loaded)
+    return GestureSamples.concatenate(samples)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train or evaluate the learned gesture classifier")
+    sub = parser.add_subparsers(dest='command', required=True)
+    fit = sub.add_parser('train', help='Train on labeled landmark logs')
+    fit.add_argument('logs', nargs='+', help='Landmark logs, each with a <log>.labels.json next to it')
+    fit.add_argument('--output', default='gestures.npz')
+    fit.add_argument('--hidden', type=int, default=32, help='Hidden units (0 = logistic regression)')
+    fit.add_argument('--epochs', type=int, default=60)
+    fit.add_argument('--holdout', type=float, default=0.2,
+                     help='Tail fraction of every segment held out for the rules-vs-model report')
+    ev = sub.add_parser('evaluate', help='Compare a trained model against the rule predicates')
+    ev.add_argument('model')
+    ev.add_argument('logs', nargs='+')
+    args = parser.parse_args()
+
+    samples = _load_all(args.logs)
+    if not len(samples):
+        parser.error("no labeled hands - check the .labels.json segments")
+    if args.command == 'train':
+        train_set, test_set = samples.split(args.holdout) if args.holdout > 0 else (samples, samples)
+        start = time.perf_counter()
+        classifier = train(train_set.features(), train_set.targets, train_set.mask,
+                           hidden=args.hidden, epochs=args.epochs)
+        print(f"Trained {classifier.describe()} on {len(train_set)} hands in {time.perf_counter() - start:.1f}s")
+        classifier.save(args.output)
+        print(f"💾 Saved {os.path.abspath(args.output)}")
+        print(f"Held-out hands: {len(test_set)}")
+    else:
+        classifier = GestureClassifier.load(args.model)
+        test_set = samples
+    print_comparison(compare(classifier, test_set))
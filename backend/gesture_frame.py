@@ -0,0 +1,84 @@
+"""
+Gesture Frame
+Immutable per-frame gesture state produced once by the tracking pipeline
+(LeaningControlSystem.update_controls) and read by every consumer: the normal
+mode overlay, the tutorial and the backseat coach.
+
+GestureFrame uses __slots__ (no per-instance dict) and keeps the
+`gesture_data.get('gun_active', False)` access the AI modes were written
+against, so they consume real tracking without a second inference pass or a
+per-consumer dict.
+"""
+
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional
+
+# Shared read-only "nothing pressed" key states
+NO_KEYS = MappingProxyType({'w': False, 'a': False, 's': False, 'd': False})
+
+
+class GestureFrame:
+    """One frame of gesture state (read-only)"""
+    __slots__ = (
+        'timestamp', 'control_enabled',
+        'wasd_states', 'left_right_lean', 'head_pitch',
+        'gun_active', 'is_shooting', 'shoot_status',
+        'left_action', 'left_status',
+        'tongue_out', 'tongue_status',
+        'hands_detected', 'pose_detected', 'face_detected',
+    )
+
+    def __init__(self, timestamp: Optional[float] = None, control_enabled: bool = False,
+                 wasd_states: Mapping[str, bool] = NO_KEYS, left_right_lean: float = 0.0, head_pitch: float = 0.0,
+                 gun_active: bool = False, is_shooting: bool = False, shoot_status: str = "No right hand",
+                 left_action: Optional[str] = None, left_status: str = "No left hand",
+                 tongue_out: bool = False, tongue_status: str = "No face",
+                 hands_detected: int = 0, pose_detected: bool = False, face_detected: bool = False):
+        setter = object.__setattr__
+        setter(self, 'timestamp', timestamp)
+        setter(self, 'control_enabled', control_enabled)
+        setter(self, 'wasd_states', wasd_states)
+        setter(self, 'left_right_lean', left_right_lean)
+        setter(self, 'head_pitch', head_pitch)
+        setter(self, 'gun_active', gun_active)
+        setter(self, 'is_shooting', is_shooting)
+        setter(self, 'shoot_status', shoot_status)
+        setter(self, 'left_action', left_action)
+        setter(self, 'left_status', left_status)
+        setter(self, 'tongue_out', tongue_out)
+        setter(self, 'tongue_status', tongue_status)
+        setter(self, 'hands_detected', hands_detected)
+        setter(self, 'pose_detected', pose_detected)
+        setter(self, 'face_detected', face_detected)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("GestureFrame is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("GestureFrame is immutable")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Dict-style access for consumers written against the old gesture_data dicts"""
+        if key in _FIELDS:
+            return getattr(self, key)
+        return default
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in _FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        keys = ''.join(k.upper() for k, pressed in self.wasd_states.items() if pressed) or '-'
+        return (f"GestureFrame(keys={keys}, gun={self.gun_active}, shooting={self.is_shooting}, "
+                f"left={self.left_action}, tongue={self.tongue_out}, lean={self.left_right_lean:.1f}, "
+                f"pitch={self.head_pitch:.1f})")
+
+
+_FIELDS = frozenset(GestureFrame.__slots__)
+
+# Frame before any tracking result exists
+EMPTY_FRAME = GestureFrame()
@@ -0,0 +1,179 @@
+"""
+Gesture State Machine
+Declarative, time-based state machines for the discrete gesture controllers
+(gun lock, thumb shooting, left-hand crouch/jump, tongue spray).
+
+A gesture is a table of transitions between named states:
+
+    Transition(source, target, when=guards, unless=guards, after_ms=ms, event=name)
+
+A transition fires when every `when` guard is true and every `unless` guard is
+false; with `after_ms` set, that must have held continuously for `after_ms`
+milliseconds of frame time (capture timestamps) since entering the state, so
+holds, grace periods and debounces don't depend on the frame rate. The first matching
+transition out of the current state wins (one step per update). Firing a
+transition with an `event` notifies the subscribers - controllers inject
+their key/mouse edges there.
+
+Guards are named predicates over a few named features:
+
+    Guard(is_gun_gesture, 'hand')
+
+Only the guards used by the current state's transitions are evaluated, and a
+guard whose inputs are unchanged since its last evaluation (same object, or
+an equal bool/number/string) reuses its cached value.
+
+Controller timing settings are milliseconds. Older settings counted frames;
+frames_to_ms()/legacy_frames() convert those at the NOMINAL_FPS they were
+tuned for.
+"""
+
+import time
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+_SCALARS = (bool, int, float, str, type(None))
+
+# Frame rate the old frame-count settings (grace_period=30, debounce_frames=10) were tuned at
+NOMINAL_FPS = 30.0
+
+
+def frames_to_ms(frames: float, fps: float = NOMINAL_FPS) -> float:
+    """Duration of `frames` frames at `fps`, in milliseconds"""
+    return frames * 1000.0 / fps
+
+
+def legacy_frames(name: str, frames: float, fps: float = NOMINAL_FPS) -> float:
+    """Convert a deprecated frame-count setting to milliseconds (with a notice)"""
+    ms = frames_to_ms(frames, fps)
+    print(f"⚠️ {name}={frames} counts frames - using {ms:.0f} ms ({fps:g} FPS); pass milliseconds instead")
+    return ms
+
+
+class Guard:
+    """Predicate over the named features in `inputs` (passed positionally to fn)"""
+    __slots__ = ('fn', 'inputs')
+
+    def __init__(self, fn: Callable[..., bool], *inputs: str):
+        self.fn = fn
+        self.inputs = inputs
+
+
+class Transition:
+    """One row of a gesture table"""
+    __slots__ = ('source', 'target', 'when', 'unless', 'after_ms', 'after', 'event')
+
+    def __init__(self, source: str, target: str, when: Union[str, Iterable[str]] = (),
+                 unless: Union[str, Iterable[str]] = (), after_ms: float = 0.0, event: Optional[str] = None):
+        self.source = source
+        self.target = target
+        self.when = (when,) if isinstance(when, str) else tuple(when)
+        self.unless = (unless,) if isinstance(unless, str) else tuple(unless)
+        self.after_ms = after_ms
+        self.after = after_ms / 1000.0  # Seconds, the unit of the capture timestamps
+        self.event = event
+
+    def __repr__(self):
+        return f"Transition({self.source} -> {self.target}, event={self.event})"
+
+
+def _unchanged(previous: Tuple, values: Tuple) -> bool:
+    for old, new in zip(previous, values):
+        if old is new:
+            continue
+        if type(new) in _SCALARS and type(old) is type(new) and old == new:
+            continue
+        return False
+    return True
+
+
+class GestureMachine:
+    """
+    Runs one gesture table.
+        machine.subscribe(lambda event, now: ...)
+        event = machine.update(now, {'hand': hand})
+    """
+
+    def __init__(self, name: str, initial: str, transitions: Iterable[Transition], guards: Mapping[str, Guard]):
+        self.name = name
+        self.initial = initial
+        self.guards = dict(guards)
+        self.table: Dict[str, List[Transition]] = {}
+        for transition in transitions:
+            for guard in transition.when + transition.unless:
+                if guard not in self.guards:
+                    raise ValueError(f"{name}: transition {transition} uses unknown guard '{guard}'")
+            self.table.setdefault(transition.source, []).append(transition)
+            self.table.setdefault(transition.target, [])
+        if initial not in self.table:
+            raise ValueError(f"{name}: initial state '{initial}' has no transitions")
+
+        self.state = initial
+        self.entered_at: Optional[float] = None
+        self._since: Dict[Transition, float] = {}  # Since when each timed transition's guards have held
+        self._cache: Dict[str, Tuple[Tuple, bool]] = {}
+        self._subscribers: List[Callable[[str, float], None]] = []
+        self.guard_evaluations = 0
+
+    def subscribe(self, callback: Callable[[str, float], None]):
+        """callback(event, now) for every event fired"""
+        self._subscribers.append(callback)
+
+    def guard(self, name: str, features: Mapping) -> bool:
+        """Guard value, recomputed only when one of its inputs changed"""
+        guard = self.guards[name]
+        values = tuple(map(features.__getitem__, guard.inputs))
+        cached = self._cache.get(name)
+        if cached is not None and _unchanged(cached[0], values):
+            return cached[1]
+        self.guard_evaluations += 1
+        value = bool(guard.fn(*values))
+        self._cache[name] = (values, value)
+        return value
+
+    def _holds(self, transition: Transition, features: Mapping) -> bool:
+        for name in transition.when:
+            if not self.guard(name, features):
+                return False
+        for name in transition.unless:
+            if self.guard(name, features):
+                return False
+        return True
+
+    def update(self, now: Optional[float], features: Mapping) -> Optional[str]:
+        """Evaluate the current state's transitions; returns the event fired this update (or None)"""
+        now = time.perf_counter() if now is None else now
+        if self.entered_at is None:
+            self._enter(self.state, now)
+        for transition in self.table[self.state]:
+            if not self._holds(transition, features):
+                if transition.after:
+                    self._since.pop(transition, None)
+                continue
+            if transition.after:
+                since = self._since.setdefault(transition, now)
+                if now - since < transition.after:
+                    continue
+            return self.set_state(transition.target, now, transition.event)
+        return None
+
+    def set_state(self, state: str, now: Optional[float] = None, event: Optional[str] = None) -> Optional[str]:
+        """Enter a state directly (resets, forced releases), firing `event` if given"""
+        if state not in self.table:
+            raise ValueError(f"{self.name}: unknown state '{state}'")
+        now = time.perf_counter() if now is None else now
+        self._enter(state, now)
+        if event is not None:
+            for callback in self._subscribers:
+                callback(event, now)
+        return event
+
+    def _enter(self, state: str, now: float):
+        # Timed transitions count from entry: the guards held when the state was entered
+        self.state = state
+        self.entered_at = now
+        self._since = {transition: now for transition in self.table[state] if transition.after}
+
+    def reset(self, now: Optional[float] = None):
+        """Back to the initial state without firing events"""
+        self.set_state(self.initial, now)
+        self._cache.clear()
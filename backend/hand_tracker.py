@@ -0,0 +1,174 @@
+"""
+Hand Tracker
+Stable left/right hand identities across frames.
+
+identify_hands used to pick roles from wrist x every frame: a lone hand was
+always the right hand, MediaPipe's handedness was ignored, and the roles
+swapped whenever the hands crossed - dropping the gun lock and re-acquiring it
+on the other hand. HandTracker instead:
+
+    - matches each detection to the track whose predicted palm position is
+      nearest (greedy nearest neighbour, gated by max_distance); unmatched
+      detections start new tracks with new ids
+    - gives each track a role from its smoothed handedness probability, with
+      hysteresis so one bad classification can't flip it; without handedness
+      new tracks fall back to screen side (the frame is mirrored, so the hand
+      on the left is the left hand) and keep that role while they are tracked
+    - keeps a track that drops out for up to hold_ms, coasting on its velocity,
+      so a missed detection doesn't reset its role; meanwhile the hands ROI
+      keeps its crop instead of falling back to a full-frame re-detection
+
+The frame is mirrored before inference, so MediaPipe's 'Right' label is the
+player's right hand.
+"""
+
+import math
+import time
+from typing import List, Optional, Tuple
+
+PALM_POINTS = (0, 5, 17)  # Wrist, index and pinky bases: stable under finger movement
+
+
+def palm_center(hand_landmarks) -> Tuple[float, float]:
+    landmarks = hand_landmarks.landmark
+    x = y = 0.0
+    for index in PALM_POINTS:
+        point = landmarks[index]
+        x += point.x
+        y += point.y
+    return x / len(PALM_POINTS), y / len(PALM_POINTS)
+
+
+def right_probability(handedness) -> Optional[float]:
+    """P(player's right hand) from a MediaPipe handedness ClassificationList (None if missing)"""
+    if handedness is None or not handedness.classification:
+        return None
+    best = handedness.classification[0]
+    return best.score if best.label == 'Right' else 1.0 - best.score
+
+
+class TrackedHand:
+    """One hand followed across frames"""
+    __slots__ = ('id', 'role', 'p_right', 'x', 'y', 'vx', 'vy', 'last_seen', 'landmarks')
+
+    def __init__(self, track_id: int, x: float, y: float, now: float, p_right: Optional[float]):
+        self.id = track_id
+        self.role: Optional[str] = None
+        self.p_right = 0.5 if p_right is None else p_right
+        self.x, self.y = x, y
+        self.vx = self.vy = 0.0
+        self.last_seen = now
+        self.landmarks = None  # This frame's landmarks (None while coasting)
+
+    def predict(self, now: float, horizon: float) -> Tuple[float, float]:
+        dt = min(max(now - self.last_seen, 0.0), horizon)
+        return self.x + self.vx * dt, self.y + self.vy * dt
+
+    def __repr__(self):
+        return f"TrackedHand(id={self.id}, role={self.role}, p_right={self.p_right:.2f})"
+
+
+class HandTracker:
+    """
+    Per-frame left/right assignment with persistent track ids.
+        left, right = tracker.update(results.multi_hand_landmarks, results.multi_handedness, capture_time)
+    """
+
+    def __init__(self, max_distance: float = 0.2, hold_ms: float = 300.0, handedness_alpha: float = 0.3,
+                 role_margin: float = 0.2):
+        self.max_distance = max_distance  # Max palm travel between matches (normalized frame units)
+        self.hold_ms = hold_ms  # How long an undetected track is kept
+        self.handedness_alpha = handedness_alpha  # Smoothing of the per-track handedness probability
+        self.role_margin = role_margin  # p_right must pass 0.5 +/- this to set or flip a role
+        self.tracks: List[TrackedHand] = []
+        self.left: Optional[TrackedHand] = None  # Tracks detected this frame, by role
+        self.right: Optional[TrackedHand] = None
+        self._next_id = 1
+
+    def update(self, hand_landmarks_list, handedness_list=None, now: Optional[float] = None):
+        """(left_hand, right_hand) landmarks for this frame (None where that hand isn't detected)"""
+        now = time.perf_counter() if now is None else now
+        hold = self.hold_ms / 1000.0
+        detections = list(hand_landmarks_list or ())
+        handedness_list = handedness_list or ()
+        centres = [palm_center(hand) for hand in detections]
+
+        # Greedy nearest-neighbour matching on predicted palm positions (at most 2x2 pairs)
+        tracks = [track for track in self.tracks if now - track.last_seen <= hold]
+        pairs = []
+        for t, track in enumerate(tracks):
+            px, py = track.predict(now, hold)
+            for d, (cx, cy) in enumerate(centres):
+                distance = math.hypot(cx - px, cy - py)
+                if distance <= self.max_distance:
+                    pairs.append((distance, t, d))
+        pairs.sort()
+        matched_tracks, matched = set(), {}
+        for _, t, d in pairs:
+            if t not in matched_tracks and d not in matched:
+                matched_tracks.add(t)
+                matched[d] = tracks[t]
+
+        for track in tracks:
+            track.landmarks = None
+        for d, hand in enumerate(detections):
+            cx, cy = centres[d]
+            observed = right_probability(handedness_list[d]) if d < len(handedness_list) else None
+            track = matched.get(d)
+            if track is None:
+                track = TrackedHand(self._next_id, cx, cy, now, observed)
+                self._next_id += 1
+                tracks.append(track)
+            else:
+                dt = now - track.last_seen
+                if dt > 0:
+                    track.vx, track.vy = (cx - track.x) / dt, (cy - track.y) / dt
+                track.x, track.y, track.last_seen = cx, cy, now
+                if observed is not None:
+                    track.p_right += self.handedness_alpha * (observed - track.p_right)
+            track.landmarks = hand
+        self.tracks = tracks
+
+        self._assign_roles([track for track in tracks if track.landmarks is not None])
+        return (self.left.landmarks if self.left else None,
+                self.right.landmarks if self.right else None)
+
+    def _assign_roles(self, visible: List[TrackedHand]):
+        margin = self.role_margin
+        for track in visible:
+            if track.p_right >= 0.5 + margin:
+                track.role = 'right'
+            elif track.p_right <= 0.5 - margin:
+                track.role = 'left'
+
+        if len(visible) >= 2:
+            first, second = visible[0], visible[1]
+            if first.role is None or first.role == second.role:
+                if second.role is not None and first.role is None:
+                    first.role = 'left' if second.role == 'right' else 'right'
+                else:
+                    # Both undecided or clashing: more right-handed wins, then screen side
+                    first_right = (first.p_right, first.x) > (second.p_right, second.x)
+                    first.role, second.role = ('right', 'left') if first_right else ('left', 'right')
+            elif second.role is None:
+                second.role = 'left' if first.role == 'right' else 'right'
+        elif visible and visible[0].role is None:
+            # Lone undecided hand: the role no other live track holds, else right (gun hand)
+            held = {track.role for track in self.tracks if track is not visible[0]}
+            visible[0].role = 'left' if 'right' in held and 'left' not in held else 'right'
+
+        self.left = self.right = None
+        for track in visible[:2]:
+            if track.role == 'right':
+                self.right = track
+            else:
+                self.left = track
+
+    def expects_hands(self, now: Optional[float] = None) -> bool:
+        """A track was seen within hold_ms (a missing detection is probably a momentary drop-out)"""
+        now = time.perf_counter() if now is None else now
+        return any((now - track.last_seen) * 1000.0 <= self.hold_ms for track in self.tracks)
+
+    def reset(self):
+        self.tracks = []
+        self.left = self.right = None
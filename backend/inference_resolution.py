@@ -0,0 +1,321 @@
+"""
+Inference Resolution
+Per-model input resolution for the MediaPipe graphs, independent of the capture
+resolution used for the preview.
+
+Each model can run on a downscaled copy of the shared RGB frame (made once per
+distinct size per frame, into reused buffers, with fast linear interpolation)
+or at full resolution. Hands can instead run on a full-resolution crop around
+the hands (HandROI), with landmarks remapped to full-frame coordinates. Because
+MediaPipe landmarks are normalized to the input image, downscaled results need
+no remapping at all.
+
+In auto mode, AutoResolution watches the profiled frame time and steps the most
+expensive model down the resolution ladder when the frame budget is exceeded,
+and back up when there is headroom.
+"""
+
+import argparse
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# Candidate inference widths for auto mode (heights follow the capture aspect ratio)
+RESOLUTION_LADDER = (1280, 960, 640, 480, 320)
+
+# None = full capture resolution
+DEFAULT_SIZES = {
+    'hands': None,
+    'pose': (640, 360),   # Pose runs on a 256x256 crop internally; 640 wide loses nothing
+    'face_mesh': None,    # Lip gap for tongue detection needs the detail
+}
+
+
+def parse_resolution(text: str) -> Optional[Tuple[int, int]]:
+    """'640x360' -> (640, 360); 'full'/'none' -> None"""
+    if text is None or text.lower() in ('full', 'none', ''):
+        return None
+    width, _, height = text.lower().partition('x')
+    return int(width), int(height) if height else 0
+
+
+def fit_size(size: Optional[Tuple[int, int]], frame_shape) -> Optional[Tuple[int, int]]:
+    """Clamp a requested size to the frame, keeping the frame's aspect ratio (None = full frame)"""
+    if size is None:
+        return None
+    h, w = frame_shape[:2]
+    width = int(size[0])
+    if width >= w:
+        return None
+    height = max(2, int(round(width * h / w)))
+    return width, height
+
+
+def describe_size(size: Optional[Tuple[int, int]]) -> str:
+    return 'full' if size is None else f"{size[0]}w"
+
+
+class FrameScaler:
+    """Downscales the shared read-only RGB frame once per size per frame, into reused buffers"""
+
+    def __init__(self, interpolation: int = cv2.INTER_LINEAR):
+        self.interpolation = interpolation
+        self._buffers: Dict[Tuple[int, int], np.ndarray] = {}
+        self._ready = set()
+        self._source = None
+
+    def begin_frame(self, rgb: np.ndarray):
+        self._source = rgb
+        self._ready.clear()
+
+    def get(self, size: Optional[Tuple[int, int]]) -> np.ndarray:
+        size = fit_size(size, self._source.shape)
+        if size is None:
+            return self._source
+        buffer = self._buffers.get(size)
+        if buffer is None:
+            buffer = self._buffers[size] = np.empty((size[1], size[0], 3), dtype=np.uint8)
+        if size not in self._ready:
+            buffer.flags.writeable = True
+            cv2.resize(self._source, size, dst=buffer, interpolation=self.interpolation)
+            buffer.flags.writeable = False
+            self._ready.add(size)
+        return buffer
+
+
+class HandROI:
+    """
+    Full-resolution crop around the tracked hands.
+    The region only moves when the hands approach its edge, and the full frame is
+    re-scanned when tracking is lost (or periodically, to pick up a second hand).
+    With a HandTracker attached, a hand missing for less than its hold keeps the crop.
+    """
+
+    def __init__(self, margin: float = 0.5, min_size: float = 0.35, edge: float = 0.1,
+                 rescan_interval: int = 30, max_hands: int = 2):
+        self.margin = margin  # Padding around the hands' bounding box (fraction of its size)
+        self.min_size = min_size  # Minimum region size (fraction of the frame)
+        self.edge = edge  # Recentre when a hand comes within this fraction of the region edge
+        self.rescan_interval = rescan_interval  # Full-frame pass every N frames while < max_hands
+        self.max_hands = max_hands
+        self.region: Optional[Tuple[float, float, float, float]] = None  # Normalized x0, y0, x1, y1
+        self.frames_since_scan = 0
+        self.tracker = None  # Optional hand_tracker.HandTracker: holds the crop through brief drop-outs
+        self._buffer = None
+
+    def crop(self, rgb: np.ndarray):
+        """Image to run Hands on plus the region it covers (None = full frame)"""
+        region = self.region
+        if region is None:
+            self.frames_since_scan = 0
+            return rgb, None
+        self.frames_since_scan += 1
+        h, w = rgb.shape[:2]
+        x0, y0 = int(region[0] * w), int(region[1] * h)
+        x1, y1 = int(region[2] * w), int(region[3] * h)
+        view = rgb[y0:y1, x0:x1]
+        if self._buffer is None or self._buffer.shape != view.shape:
+            self._buffer = np.empty(view.shape, dtype=np.uint8)
+        self._buffer.flags.writeable = True
+        np.copyto(self._buffer, view)  # MediaPipe needs a contiguous image
+        self._buffer.flags.writeable = False
+        return self._buffer, (x0 / w, y0 / h, x1 / w, y1 / h)
+
+    @staticmethod
+    def remap(hand_results, region):
+        """Convert ROI-normalized hand landmarks to full-frame normalized coordinates (in place)"""
+        if region is None or not hand_results or not hand_results.multi_hand_landmarks:
+            return hand_results
+        x0, y0, x1, y1 = region
+        sx, sy = x1 - x0, y1 - y0
+        for hand in hand_results.multi_hand_landmarks:
+            for lm in hand.landmark:
+                lm.x = x0 + lm.x * sx
+                lm.y = y0 + lm.y * sy
+                lm.z = lm.z * sx  # z shares the x scale
+        return hand_results
+
+    def update(self, hand_results):
+        """Move/grow the region to follow the (full-frame normalized) hands"""
+        hands = hand_results.multi_hand_landmarks if hand_results else None
+        if not hands:
+            if self.tracker is not None and self.region is not None and self.tracker.expects_hands():
+                return  # Momentary miss of a tracked hand - keep the crop it was in
+            self.region = None  # Lost - scan the whole frame next time
+            return
+        if len(hands) < self.max_hands and self.frames_since_scan >= self.rescan_interval:
+            self.region = None  # Look for the missing hand outside the crop
+            return
+
+        xs = [lm.x for hand in hands for lm in hand.landmark]
+        ys = [lm.y for hand in hands for lm in hand.landmark]
+        bx0, bx1, by0, by1 = min(xs), max(xs), min(ys), max(ys)
+
+        if self.region is not None:
+            rx0, ry0, rx1, ry1 = self.region
+            ex, ey = (rx1 - rx0) * self.edge, (ry1 - ry0) * self.edge
+            if bx0 > rx0 + ex and bx1 < rx1 - ex and by0 > ry0 + ey and by1 < ry1 - ey:
+                return  # Still comfortably inside - keep the crop stable for MediaPipe's tracker
+
+        pad_x = max((bx1 - bx0) * self.margin, (self.min_size - (bx1 - bx0)) / 2, 0.0)
+        pad_y = max((by1 - by0) * self.margin, (self.min_size - (by1 - by0)) / 2, 0.0)
+        region = (max(0.0, bx0 - pad_x), max(0.0, by0 - pad_y), min(1.0, bx1 + pad_x), min(1.0, by1 + pad_y))
+        if (region[2] - region[0]) * (region[3] - region[1]) > 0.8:
+            region = None  # Nearly the whole frame anyway
+        self.region = region
+
+
+class AutoResolution:
+    """
+    Keeps frame time under budget by moving models along RESOLUTION_LADDER.
+    Steps the most expensive model down when the windowed mean frame time is over
+    budget, and steps the most recently lowered model back up when below
+    headroom * budget. A step that doesn't make that model's stage faster (the
+    graph's cost is dominated by its fixed internal input size) is undone and the
+    model is left at that resolution.
+    """
+
+    def __init__(self, sizes: Dict[str, Optional[Tuple[int, int]]], budget_ms: float = 33.3,
+                 window: int = 30, headroom: float = 0.75, ladder=RESOLUTION_LADDER,
+                 models=('hands', 'pose', 'face_mesh')):
+        self.sizes = sizes
+        self.budget_ms = budget_ms
+        self.window = window
+        self.headroom = headroom
+        self.ladder = tuple(sorted(ladder, reverse=True))
+        self.models = models
+        self.lowered = []  # Models stepped down, most recent last
+        self.fixed = set()  # Models where lowering the resolution didn't help
+        self.min_gain = 0.05  # A step down must cut the model's stage time by this fraction
+        self._pending = None  # (model, stage ms before the step) awaiting verification
+        self._frames = 0
+        self._total = 0.0
+        self._stages = {name: 0.0 for name in models}
+
+    def _level(self, model, frame_width):
+        size = self.sizes.get(model)
+        width = frame_width if size is None else min(size[0], frame_width)
+        for i, step in enumerate(self.ladder):
+            if width >= step:
+                return i
+        return len(self.ladder) - 1
+
+    def _set_level(self, model, level, frame_width):
+        width = self.ladder[level]
+        self.sizes[model] = None if width >= frame_width else (width, 0)
+
+    def update(self, row: Dict[str, float], frame_width: int) -> Optional[str]:
+        """Feed one profiled frame ({stage: ms, 'total': ms}); returns a description when a size changes"""
+        self._frames += 1
+        self._total += row.get('total', 0.0)
+        for name in self.models:
+            self._stages[name] += row.get(name, 0.0)
+        if self._frames < self.window:
+            return None
+
+        mean_total = self._total / self._frames
+        stage_means = {name: value / self._frames for name, value in self._stages.items()}
+        self._frames = 0
+        self._total = 0.0
+        self._stages = {name: 0.0 for name in self.models}
+
+        if self._pending is not None:
+            model, before = self._pending
+            self._pending = None
+            if stage_means[model] > before * (1.0 - self.min_gain):
+                self._set_level(model, max(0, self._level(model, frame_width) - 1), frame_width)
+                self.lowered.remove(model)
+                self.fixed.add(model)
+                return f"{model} back to {describe_size(self.sizes[model])} (lower resolution didn't help)"
+
+        if mean_total > self.budget_ms:
+            candidates = [m for m in self.models
+                          if m not in self.fixed and self._level(m, frame_width) < len(self.ladder) - 1]
+            if not candidates:
+                return None
+            model = max(candidates, key=lambda m: stage_means[m])
+            self._set_level(model, self._level(model, frame_width) + 1, frame_width)
+            self.lowered.append(model)
+            self._pending = (model, stage_means[model])
+            return f"{model} -> {describe_size(self.sizes[model])} ({mean_total:.1f} ms > {self.budget_ms:.1f} ms)"
+
+        if mean_total < self.budget_ms * self.headroom and self.lowered:
+            model = self.lowered.pop()
+            self._set_level(model, max(0, self._level(model, frame_width) - 1), frame_width)
+            return f"{model} -> {describe_size(self.sizes[model])} ({mean_total:.1f} ms headroom)"
+        return None
+
+
+class InferenceResolution:
+    """
+    Per-frame image selection for each model.
+        inference.begin_frame(rgb)
+        hand_results = inference.process_hands(hands_model)
+        pose_results = pose_model.process(inference.image_for('pose'))
+        inference.end_frame(profiler_row)
+    """
+
+    def __init__(self, sizes: Optional[Dict[str, Optional[Tuple[int, int]]]] = None, hands_roi: bool = False,
+                 auto: bool = False, budget_ms: float = 33.3, max_hands: int = 2,
+                 interpolation: int = cv2.INTER_LINEAR):
+        self.sizes = dict(DEFAULT_SIZES)
+        self.sizes.update(sizes or {})
+        self.scaler = FrameScaler(interpolation)
+        self.hand_roi = HandROI(max_hands=max_hands) if hands_roi else None
+        models = ('pose', 'face_mesh') if hands_roi else ('hands', 'pose', 'face_mesh')
+        self.auto = AutoResolution(self.sizes, budget_ms, models=models) if auto else None
+        self.frame_width = 0
+
+    def begin_frame(self, rgb: np.ndarray):
+        self.scaler.begin_frame(rgb)
+        self.frame_width = rgb.shape[1]
+
+    def image_for(self, model: str) -> np.ndarray:
+        """Input image for a model at its configured resolution"""
+        return self.scaler.get(self.sizes.get(model))
+
+    def process_hands(self, hands_model):
+        """Run Hands on the ROI crop (if enabled) or the scaled frame; landmarks come back full-frame normalized"""
+        if self.hand_roi is None:
+            return hands_model.process(self.image_for('hands'))
+        image, region = self.hand_roi.crop(self.scaler.get(None))
+        results = HandROI.remap(hands_model.process(image), region)
+        self.hand_roi.update(results)
+        return results
+
+    def end_frame(self, row: Optional[Dict[str, float]]):
+        """Feed the frame's profiled stage times to auto mode"""
+        if self.auto is None or not row:
+            return
+        change = self.auto.update(row, self.frame_width)
+        if change:
+            print(f"🔧 Inference resolution: {change}")
+
+    def describe(self) -> str:
+        parts = [f"{name}={describe_size(size)}" for name, size in self.sizes.items()]
+        if self.hand_roi is not None:
+            parts.append('hands ROI')
+        if self.auto is not None:
+            parts.append(f"auto<{self.auto.budget_ms:.0f}ms")
+        return ', '.join(parts)
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Command-line options shared by the control scripts"""
+    group = parser.add_argument_group('inference resolution')
+    group.add_argument('--hands-res', help="Hands input resolution, e.g. 640x360 or 'full' (default full)")
+    group.add_argument('--pose-res', help="Pose input resolution (default 640x360)")
+    group.add_argument('--face-res', help="Face mesh input resolution (default full)")
+    group.add_argument('--hands-roi', action='store_true', help='Run Hands on a full-resolution crop around the hands')
+    group.add_argument('--auto-res', action='store_true', help='Lower/raise model resolutions to stay within --frame-budget')
+    group.add_argument('--frame-budget', type=float, default=33.3, help='Frame time budget for --auto-res (ms)')
+
+
+def from_args(args, max_hands: int = 2) -> InferenceResolution:
+    sizes = {}
+    for model, value in (('hands', args.hands_res), ('pose', args.pose_res), ('face_mesh', args.face_res)):
+        if value is not None:
+            sizes[model] = parse_resolution(value)
+    return InferenceResolution(sizes, hands_roi=args.hands_roi, auto=args.auto_res,
+                               budget_ms=args.frame_budget, max_hands=max_hands)
@@ -0,0 +1,324 @@
+"""
+Inference Workers
+Optional multi-process backend: one worker process per MediaPipe graph.
+
+In-process, Hands/Pose/FaceMesh run one after the other on the main
+interpreter, so a frame costs the sum of the three models. With workers the
+main process converts each frame straight into a slot of a shared-memory ring
+(SharedFrameRing), sends the slot index to every worker over a pipe, and each
+worker runs its model on a zero-copy read-only view of that slot. Workers send
+back compact float32 landmark arrays (a few KB per frame) which are rebuilt into
+landmark_log views, so the controllers, overlay and landmark log consume them
+exactly like MediaPipe results. A frame then costs roughly the slowest model.
+
+    workers = InferenceWorkerPool(MODEL_PARAMS, inference)
+    rgb = workers.input_buffer(frame.shape)       # next ring slot (writeable)
+    ... convert the camera frame into rgb ...
+    workers.submit()
+    hand_results, pose_results, face_results = workers.collect()
+    workers.close()
+
+depth > 1 keeps several frames in flight: throughput goes up, but the results
+returned by collect() then lag the submitted frame by depth - 1 frames.
+Per-model resolution and the hands ROI (inference_resolution.py) run inside
+the workers; auto mode is not available because stage times are not profiled
+per model in the main process. Each worker warms its graph up to steady-state
+timing (model_warmup.py) before reporting ready, all of them at once.
+"""
+
+import time
+from collections import deque
+from multiprocessing import get_context, shared_memory
+from types import SimpleNamespace
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from inference_resolution import InferenceResolution, describe_size
+from landmark_log import HAND_POINTS, POSE_POINTS, HandednessView, LandmarkListView
+from model_warmup import WarmupReport, print_reports, warm_up, warmup_image
+
+MODELS = ('hands', 'pose', 'face_mesh')
+
+
+class SharedFrameRing:
+    """
+    Fixed ring of uint8 frames in one shared memory block.
+    The creator owns (and unlinks) the block; workers attach by name.
+    """
+
+    def __init__(self, shape: Tuple[int, int, int], slots: int, name: Optional[str] = None):
+        self.shape = tuple(shape)
+        self.slots = slots
+        size = int(np.prod(self.shape)) * slots
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.shm = _attach(name)
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=self.shm.buf)
+        self.index = 0
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def next_slot(self) -> Tuple[int, np.ndarray]:
+        """(index, writeable view) of the slot the next frame goes into"""
+        slot = self.index
+        self.index = (self.index + 1) % self.slots
+        return slot, self.frames[slot]
+
+    def view(self, slot: int) -> np.ndarray:
+        """Read-only zero-copy view of a slot"""
+        frame = self.frames[slot]
+        frame.flags.writeable = False
+        return frame
+
+    def close(self):
+        self.frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _attach(name):
+    """Attach to an existing block; only the creator unlinks it"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13: spawned workers share the creator's resource tracker, so this is harmless
+        return shared_memory.SharedMemory(name=name)
+
+
+# ---------------------------------------------------------------------------
+# Compact landmark payloads
+# ---------------------------------------------------------------------------
+
+def pack_results(model: str, results):
+    """MediaPipe results -> small picklable arrays"""
+    if model == 'hands':
+        hands = results.multi_hand_landmarks or []
+        points = np.array([[(p.x, p.y, p.z) for p in hand.landmark] for hand in hands],
+                          dtype=np.float32).reshape(-1, HAND_POINTS, 3)
+        handedness = [(c.classification[0].label, c.classification[0].score)
+                      for c in results.multi_handedness or []]
+        return points, handedness
+    if model == 'pose':
+        if not results.pose_landmarks:
+            return None
+        return np.array([(p.x, p.y, p.z, p.visibility) for p in results.pose_landmarks.landmark],
+                        dtype=np.float32).reshape(POSE_POINTS, 4)
+    if not results.multi_face_landmarks:
+        return None
+    return np.array([(p.x, p.y, p.z) for p in results.multi_face_landmarks[0].landmark],
+                    dtype=np.float32).reshape(-1, 3)
+
+
+def unpack_results(model: str, payload):
+    """Compact arrays -> objects shaped like the MediaPipe results (landmark_log views)"""
+    if model == 'hands':
+        points, handedness = payload
+        return SimpleNamespace(
+            multi_hand_landmarks=[LandmarkListView(hand) for hand in points] or None,
+            multi_handedness=[HandednessView(label, score) for label, score in handedness] or None,
+        )
+    if model == 'pose':
+        return SimpleNamespace(pose_landmarks=LandmarkListView(payload) if payload is not None else None)
+    return SimpleNamespace(multi_face_landmarks=[LandmarkListView(payload)] if payload is not None else None)
+
+
+# ---------------------------------------------------------------------------
+# Worker process
+# ---------------------------------------------------------------------------
+
+def _create_model(model: str, params: Dict):
+    import mediapipe as mp
+    factory = {
+        'hands': mp.solutions.hands.Hands,
+        'pose': mp.solutions.pose.Pose,
+        'face_mesh': mp.solutions.face_mesh.FaceMesh,
+    }[model]
+    return factory(**params)
+
+
+def _worker_main(model: str, params: Dict, size, hands_roi: bool, max_hands: int, warmup, conn):
+    """
+    Worker loop. Messages from the main process:
+        ('attach', shm_name, shape, slots)   (re)attach to the frame ring
+        ('frame', frame_id, slot)           run the model on a ring slot
+        None                                shut down
+    Replies: ('ready', model, WarmupReport), ('result', frame_id, payload) or ('error', frame_id, message)
+    """
+    start = time.perf_counter()
+    try:
+        graph = _create_model(model, params)
+        init_ms = (time.perf_counter() - start) * 1000.0
+        if warmup:
+            warmed = warm_up(graph, warmup_image(size), **(warmup if isinstance(warmup, dict) else {}))
+        else:
+            warmed = (0.0, 0.0, 0, False)
+    except Exception as e:
+        conn.send(('error', None, f"{model}: {e!r}"))
+        return
+    inference = InferenceResolution({model: size}, hands_roi=hands_roi and model == 'hands', max_hands=max_hands)
+    conn.send(('ready', model, WarmupReport(model, init_ms, *warmed)))
+
+    ring = None
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                break
+            if message is None:
+                break
+            if message[0] == 'attach':
+                if ring is not None:
+                    ring.close()
+                ring = SharedFrameRing(message[2], message[3], name=message[1])
+                continue
+            _, frame_id, slot = message
+            try:
+                inference.begin_frame(ring.view(slot))
+                if model == 'hands':
+                    results = inference.process_hands(graph)
+                else:
+                    results = graph.process(inference.image_for(model))
+                conn.send(('result', frame_id, pack_results(model, results)))
+            except Exception as e:
+                conn.send(('error', frame_id, f"{model}: {e!r}"))
+    except KeyboardInterrupt:
+        pass  # The main process handles Ctrl+C and shuts the workers down
+    finally:
+        graph.close()
+        inference = None  # Drop the scaler's views into the ring before closing it
+        if ring is not None:
+            ring.close()
+
+
+# ---------------------------------------------------------------------------
+# Main-process side
+# ---------------------------------------------------------------------------
+
+class InferenceWorkerPool:
+    """
+    One spawned worker per model, fed through a SharedFrameRing.
+    params: {'hands': {...}, 'pose': {...}, 'face_mesh': {...}} MediaPipe constructor arguments;
+            models missing from params are not run (their results are None)
+    inference: InferenceResolution whose sizes/hands ROI the workers apply
+    warmup: True, warm_up() options, or False to skip warming the graphs up
+    """
+
+    def __init__(self, params: Dict[str, Dict], inference: Optional[InferenceResolution] = None,
+                 depth: int = 1, timeout: float = 10.0, warmup=True):
+        inference = inference or InferenceResolution()
+        self.models = [model for model in MODELS if model in params]
+        self.depth = max(1, depth)
+        self.timeout = timeout
+        self.ring = None
+        self.frame_id = 0
+        self.in_flight = deque()
+        self.init_ms = {}
+        self.warmup_reports = {}
+        if inference.auto is not None:
+            print("⚠️ Auto resolution is not available with inference workers - using fixed sizes")
+
+        context = get_context('spawn')  # Never fork a process that already holds MediaPipe graphs/threads
+        self.workers = {}
+        for model in self.models:
+            parent, child = context.Pipe()
+            process = context.Process(
+                target=_worker_main, name=f"inference-{model}", daemon=True,
+                args=(model, params[model], inference.sizes.get(model), inference.hand_roi is not None,
+                      inference.hand_roi.max_hands if inference.hand_roi is not None else 2, warmup, child)
+            )
+            process.start()
+            child.close()
+            self.workers[model] = (process, parent)
+        self.describe_text = ', '.join(f"{model}={describe_size(inference.sizes.get(model))}"
+                                       for model in self.models)
+        if inference.hand_roi is not None:
+            self.describe_text += ', hands ROI'
+
+        start = time.perf_counter()
+        for model, (process, conn) in self.workers.items():
+            kind, _, value = self._receive(model, self.timeout + 30.0)  # Start-up includes the warm-up
+            if kind == 'error':
+                self.close()
+                raise RuntimeError(f"Inference worker failed to start: {value}")
+            self.init_ms[model] = value.init_ms
+            if warmup:
+                self.warmup_reports[model] = value
+        if self.warmup_reports:
+            print_reports(self.warmup_reports, (time.perf_counter() - start) * 1000.0)
+
+    def describe(self) -> str:
+        return f"{len(self.workers)} worker processes ({self.describe_text}), depth {self.depth}"
+
+    def input_buffer(self, shape) -> np.ndarray:
+        """Writeable ring slot for the next frame (the ring is (re)created when the frame shape changes)"""
+        if self.ring is None or self.ring.shape != tuple(shape):
+            self._drain()
+            if self.ring is not None:
+                self.ring.close()
+            self.ring = SharedFrameRing(shape, self.depth + 1)  # +1: the slot being written is never in flight
+            for _, conn in self.workers.values():
+                conn.send(('attach', self.ring.name, self.ring.shape, self.ring.slots))
+        self._slot, frame = self.ring.next_slot()
+        return frame
+
+    def submit(self, models=None):
+        """Hand the frame written into input_buffer() to every worker (or only to `models`)"""
+        self.frame_id += 1
+        models = [model for model in self.models if models is None or model in models]
+        for model in models:
+            self.workers[model][1].send(('frame', self.frame_id, self._slot))
+        self.in_flight.append((self.frame_id, models))
+
+    def collect(self, block: bool = False):
+        """
+        (hand_results, pose_results, face_results) for the oldest frame in flight
+        (None for models the frame was not submitted to).
+        Only waits once depth frames are queued (or block=True); returns None while the pipeline fills.
+        """
+        if not self.in_flight or (len(self.in_flight) < self.depth and not block):
+            return None
+        frame_id, models = self.in_flight.popleft()
+        results = {}
+        for model in models:
+            kind, reply_id, payload = self._receive(model)
+            if kind == 'error':
+                raise RuntimeError(f"Inference worker error: {payload}")
+            if reply_id != frame_id:
+                raise RuntimeError(f"Inference worker {model} out of sync (frame {reply_id}, expected {frame_id})")
+            results[model] = unpack_results(model, payload)
+        return results.get('hands'), results.get('pose'), results.get('face_mesh')
+
+    def _receive(self, model, timeout: Optional[float] = None):
+        process, conn = self.workers[model]
+        if not conn.poll(self.timeout if timeout is None else timeout):
+            state = 'exited' if not process.is_alive() else 'timed out'
+            raise RuntimeError(f"Inference worker {model} {state}")
+        return conn.recv()
+
+    def _drain(self):
+        while self.in_flight:
+            self.collect(block=True)
+
+    def close(self):
+        """Stop the workers and release the shared ring"""
+        for model, (process, conn) in self.workers.items():
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for model, (process, conn) in self.workers.items():
+            process.join(timeout=2.0)
+            if process.is_alive():
+                process.terminate()
+            conn.close()
+        self.workers = {}
+        self.in_flight.clear()
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
@@ -0,0 +1,534 @@
+"""
+Input Backends
+Keyboard/mouse injection used by the gesture controllers.
+
+Controllers talk to an InputBackend instead of calling pyautogui/pynput
+directly, so the same pipeline can drive the real desktop or a recording
+null backend for offline replay and regression comparison.
+
+    pyautogui  pyautogui keys/clicks + pynput relative moves (the original behaviour)
+    pynput     pynput for everything
+    xtest      X11 XTest extension (python-xlib); relative motion without a cursor query
+    uinput     Linux virtual input device (python-evdev, needs write access to
+               /dev/uinput); raw relative REL_X/REL_Y motion, as from a real mouse
+    quartz     macOS CGEvents with the delta fields set (pointer-locked browser games)
+    null       records events instead of injecting them (replay, benchmarks, tests)
+
+Every backend times each injection call; latency_summary()/describe_latency()
+report the measured cost per event type:
+
+    backend = create_backend('uinput')
+    backend.move_relative(12, -3)
+    print(backend.describe_latency())
+"""
+
+import argparse
+import inspect
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from streaming_stats import RunningStats
+
+BUTTONS = ('left', 'right', 'middle')
+
+
+class InputBackend:
+    """
+    Base class for keyboard/mouse injection.
+    Subclasses implement the underscored methods; the public ones time each call.
+    Keys use pyautogui names: single characters plus 'ctrl', 'shift', 'alt', 'space', 'enter', 'esc', 'tab'.
+    """
+
+    name = 'base'
+
+    def __init__(self):
+        self.latency: Dict[str, RunningStats] = {}  # Event type -> injection call duration (s)
+
+    def key_down(self, key: str):
+        start = time.perf_counter()
+        self._key_down(key)
+        self._measure('key_down', start)
+
+    def key_up(self, key: str):
+        start = time.perf_counter()
+        self._key_up(key)
+        self._measure('key_up', start)
+
+    def press(self, key: str):
+        """Tap a key (down + up)"""
+        start = time.perf_counter()
+        self._press(key)
+        self._measure('press', start)
+
+    def mouse_down(self, button: str = 'left'):
+        start = time.perf_counter()
+        self._mouse_down(button)
+        self._measure('mouse_down', start)
+
+    def mouse_up(self, button: str = 'left'):
+        start = time.perf_counter()
+        self._mouse_up(button)
+        self._measure('mouse_up', start)
+
+    def move_relative(self, dx: int, dy: int):
+        start = time.perf_counter()
+        self._move_relative(dx, dy)
+        self._measure('move', start)
+
+    def close(self):
+        """Release any OS resources held by the backend"""
+        pass
+
+    def _measure(self, action: str, start: float):
+        stats = self.latency.get(action)
+        if stats is None:
+            stats = self.latency[action] = RunningStats()
+        stats.add(time.perf_counter() - start)
+
+    def latency_summary(self) -> Dict[str, Dict[str, float]]:
+        """{event type: {'count', 'mean_us', 'max_us'}} of the measured injection calls"""
+        return {action: {'count': stats.count, 'mean_us': stats.mean * 1e6, 'max_us': stats.max * 1e6}
+                for action, stats in self.latency.items()}
+
+    def describe_latency(self) -> str:
+        summary = self.latency_summary()
+        if not summary:
+            return f"{self.name} injection: no events"
+        return f"{self.name} injection: " + " | ".join(
+            f"{action} {s['mean_us']:.1f} µs avg (max {s['max_us']:.0f}) x{s['count']}"
+            for action, s in sorted(summary.items()))
+
+    def _key_down(self, key: str):
+        raise NotImplementedError
+
+    def _key_up(self, key: str):
+        raise NotImplementedError
+
+    def _press(self, key: str):
+        self._key_down(key)
+        self._key_up(key)
+
+    def _mouse_down(self, button: str):
+        raise NotImplementedError
+
+    def _mouse_up(self, button: str):
+        raise NotImplementedError
+
+    def _move_relative(self, dx: int, dy: int):
+        raise NotImplementedError
+
+
+class PyAutoGUIBackend(InputBackend):
+    """pyautogui for keys/clicks, pynput for relative mouse moves (the original behaviour)"""
+
+    name = 'pyautogui'
+
+    def __init__(self, pause: Optional[float] = 0, failsafe: Optional[bool] = False):
+        super().__init__()
+        import pyautogui
+        from pynput.mouse import Controller as MouseController
+
+        self.pyautogui = pyautogui
+        if pause is not None:
+            pyautogui.PAUSE = pause  # 0 removes pyautogui's sleep after every call
+        if failsafe is not None:
+            pyautogui.FAILSAFE = failsafe
+        # pynput gives better game compatibility for relative moves
+        self.mouse = MouseController()
+
+    def _key_down(self, key: str):
+        self.pyautogui.keyDown(key)
+
+    def _key_up(self, key: str):
+        self.pyautogui.keyUp(key)
+
+    def _press(self, key: str):
+        self.pyautogui.press(key)
+
+    def _mouse_down(self, button: str):
+        self.pyautogui.mouseDown(button=button)
+
+    def _mouse_up(self, button: str):
+        self.pyautogui.mouseUp(button=button)
+
+    def _move_relative(self, dx: int, dy: int):
+        self.mouse.move(dx, dy)
+
+
+class PynputBackend(InputBackend):
+    """pynput keyboard and mouse controllers (no pyautogui per-call overhead)"""
+
+    name = 'pynput'
+
+    def __init__(self):
+        super().__init__()
+        from pynput.keyboard import Controller as KeyboardController, Key
+        from pynput.mouse import Button, Controller as MouseController
+
+        self.keyboard = KeyboardController()
+        self.mouse = MouseController()
+        self._special = Key
+        self._buttons = {name: getattr(Button, name) for name in BUTTONS}
+
+    def _key(self, key: str):
+        return key if len(key) == 1 else getattr(self._special, key)
+
+    def _key_down(self, key: str):
+        self.keyboard.press(self._key(key))
+
+    def _key_up(self, key: str):
+        self.keyboard.release(self._key(key))
+
+    def _mouse_down(self, button: str):
+        self.mouse.press(self._buttons[button])
+
+    def _mouse_up(self, button: str):
+        self.mouse.release(self._buttons[button])
+
+    def _move_relative(self, dx: int, dy: int):
+        self.mouse.move(dx, dy)
+
+
+# X keysym names of the non-character keys
+XTEST_KEYSYMS = {'ctrl': 'Control_L', 'shift': 'Shift_L', 'alt': 'Alt_L', 'space': 'space',
+                 'enter': 'Return', 'esc': 'Escape', 'tab': 'Tab', 'backspace': 'BackSpace'}
+
+
+class XTestBackend(InputBackend):
+    """X11 XTest fake input (python-xlib): one request per event, flushed without a round trip"""
+
+    name = 'xtest'
+
+    def __init__(self, display: Optional[str] = None):
+        super().__init__()
+        from Xlib import X, XK, display as xdisplay
+        from Xlib.ext import xtest
+
+        self.display = xdisplay.Display(display)
+        if not self.display.has_extension('XTEST'):
+            raise RuntimeError("X server has no XTEST extension")
+        self._X = X
+        self._XK = XK
+        self._fake_input = xtest.fake_input
+        self._keycodes: Dict[str, int] = {}
+        self.pressed_keys = set()
+
+    def _keycode(self, key: str) -> int:
+        code = self._keycodes.get(key)
+        if code is None:
+            keysym = self._XK.string_to_keysym(XTEST_KEYSYMS.get(key, key))
+            code = self.display.keysym_to_keycode(keysym)
+            if not code:
+                raise ValueError(f"no keycode for key '{key}'")
+            self._keycodes[key] = code
+        return code
+
+    def _send(self, event_type: int, detail: int = 0, x: int = 0, y: int = 0):
+        self._fake_input(self.display, event_type, detail, x=x, y=y)
+        self.display.flush()
+
+    def _key_down(self, key: str):
+        if key not in self.pressed_keys:  # Held keys are re-sent; a repeat would look like autorepeat
+            self.pressed_keys.add(key)
+            self._send(self._X.KeyPress, self._keycode(key))
+
+    def _key_up(self, key: str):
+        self.pressed_keys.discard(key)
+        self._send(self._X.KeyRelease, self._keycode(key))
+
+    def _mouse_down(self, button: str):
+        self._send(self._X.ButtonPress, BUTTONS.index(button) + 1)
+
+    def _mouse_up(self, button: str):
+        self._send(self._X.ButtonRelease, BUTTONS.index(button) + 1)
+
+    def _move_relative(self, dx: int, dy: int):
+        self._send(self._X.MotionNotify, True, dx, dy)  # detail=True: relative motion
+
+    def close(self):
+        self.display.close()
+
+
+# evdev key codes of the non-character keys (characters map to KEY_<char>)
+UINPUT_KEYS = {'ctrl': 'KEY_LEFTCTRL', 'shift': 'KEY_LEFTSHIFT', 'alt': 'KEY_LEFTALT', 'space': 'KEY_SPACE',
+               'enter': 'KEY_ENTER', 'esc': 'KEY_ESC', 'tab': 'KEY_TAB', 'backspace': 'KEY_BACKSPACE'}
+UINPUT_BUTTONS = {'left': 'BTN_LEFT', 'right': 'BTN_RIGHT', 'middle': 'BTN_MIDDLE'}
+
+
+class UinputBackend(InputBackend):
+    """
+    Linux virtual keyboard+mouse (python-evdev uinput). Moves are raw REL_X/REL_Y reports, which
+    pointer-locked games read like a physical mouse; no display server round trip.
+    settle: seconds to wait after creating the device so the desktop picks it up before the first event
+    """
+
+    name = 'uinput'
+
+    def __init__(self, device_name: str = 'gesture-control virtual input', settle: float = 0.3):
+        super().__init__()
+        from evdev import UInput, ecodes
+
+        self.ecodes = ecodes
+        characters = 'abcdefghijklmnopqrstuvwxyz0123456789'
+        self.keys = {key: ecodes.ecodes[code] for key, code in UINPUT_KEYS.items()}
+        self.keys.update({c: ecodes.ecodes[f"KEY_{c.upper()}"] for c in characters})
+        self.buttons = {button: ecodes.ecodes[code] for button, code in UINPUT_BUTTONS.items()}
+        capabilities = {
+            ecodes.EV_KEY: sorted(set(self.keys.values()) | set(self.buttons.values())),
+            ecodes.EV_REL: [ecodes.REL_X, ecodes.REL_Y],
+        }
+        self.device = UInput(capabilities, name=device_name)
+        self.pressed_keys = set()
+        time.sleep(settle)
+
+    def _emit(self, event_type: int, code: int, value: int):
+        self.device.write(event_type, code, value)
+        self.device.syn()
+
+    def _key_down(self, key: str):
+        if key not in self.pressed_keys:  # The kernel drops repeats anyway; skip the syscalls
+            self.pressed_keys.add(key)
+            self._emit(self.ecodes.EV_KEY, self.keys[key], 1)
+
+    def _key_up(self, key: str):
+        self.pressed_keys.discard(key)
+        self._emit(self.ecodes.EV_KEY, self.keys[key], 0)
+
+    def _mouse_down(self, button: str):
+        self._emit(self.ecodes.EV_KEY, self.buttons[button], 1)
+
+    def _mouse_up(self, button: str):
+        self._emit(self.ecodes.EV_KEY, self.buttons[button], 0)
+
+    def _move_relative(self, dx: int, dy: int):
+        # Both axes in one report
+        if dx:
+            self.device.write(self.ecodes.EV_REL, self.ecodes.REL_X, int(dx))
+        if dy:
+            self.device.write(self.ecodes.EV_REL, self.ecodes.REL_Y, int(dy))
+        self.device.syn()
+
+    def close(self):
+        for key in list(self.pressed_keys):
+            self._key_up(key)
+        self.device.close()
+
+
+# macOS virtual key codes (ANSI layout)
+QUARTZ_KEYCODES = {
+    'a': 0, 's': 1, 'd': 2, 'f': 3, 'h': 4, 'g': 5, 'z': 6, 'x': 7, 'c': 8, 'v': 9, 'b': 11, 'q': 12,
+    'w': 13, 'e': 14, 'r': 15, 'y': 16, 't': 17, '1': 18, '2': 19, '3': 20, '4': 21, '6': 22, '5': 23,
+    '9': 25, '7': 26, '8': 28, '0': 29, 'o': 31, 'u': 32, 'i': 34, 'p': 35, 'l': 37, 'j': 38, 'k': 40,
+    'n': 45, 'm': 46, 'enter': 36, 'tab': 48, 'space': 49, 'backspace': 51, 'esc': 53,
+    'shift': 56, 'alt': 58, 'ctrl': 59,
+}
+
+
+class QuartzBackend(InputBackend):
+    """macOS CGEvents; moves carry explicit delta fields so browsers see relative movement"""
+
+    name = 'quartz'
+
+    def __init__(self):
+        super().__init__()
+        import Quartz.CoreGraphics as cg
+
+        self.cg = cg
+        self._buttons = {
+            'left': (cg.kCGEventLeftMouseDown, cg.kCGEventLeftMouseUp, cg.kCGMouseButtonLeft),
+            'right': (cg.kCGEventRightMouseDown, cg.kCGEventRightMouseUp, cg.kCGMouseButtonRight),
+            'middle': (cg.kCGEventOtherMouseDown, cg.kCGEventOtherMouseUp, cg.kCGMouseButtonCenter),
+        }
+        self.pressed_buttons = set()
+
+    def _location(self):
+        return self.cg.CGEventGetLocation(self.cg.CGEventCreate(None))
+
+    def _key(self, key: str, down: bool):
+        event = self.cg.CGEventCreateKeyboardEvent(None, QUARTZ_KEYCODES[key], down)
+        self.cg.CGEventPost(self.cg.kCGHIDEventTap, event)
+
+    def _key_down(self, key: str):
+        self._key(key, True)
+
+    def _key_up(self, key: str):
+        self._key(key, False)
+
+    def _mouse_down(self, button: str):
+        down, _, number = self._buttons[button]
+        self.pressed_buttons.add(button)
+        event = self.cg.CGEventCreateMouseEvent(None, down, self._location(), number)
+        self.cg.CGEventPost(self.cg.kCGHIDEventTap, event)
+
+    def _mouse_up(self, button: str):
+        _, up, number = self._buttons[button]
+        self.pressed_buttons.discard(button)
+        event = self.cg.CGEventCreateMouseEvent(None, up, self._location(), number)
+        self.cg.CGEventPost(self.cg.kCGHIDEventTap, event)
+
+    def _move_relative(self, dx: int, dy: int):
+        cg = self.cg
+        current = self._location()
+        # Dragging while a button is held, so games keep tracking the aim while firing
+        event_type = cg.kCGEventLeftMouseDragged if 'left' in self.pressed_buttons else cg.kCGEventMouseMoved
+        event = cg.CGEventCreateMouseEvent(None, event_type, (current.x + dx, current.y + dy), 0)
+        # Browsers with pointer lock read the delta fields, not the position
+        cg.CGEventSetIntegerValueField(event, cg.kCGMouseEventDeltaX, int(dx))
+        cg.CGEventSetIntegerValueField(event, cg.kCGMouseEventDeltaY, int(dy))
+        cg.CGEventPost(cg.kCGHIDEventTap, event)
+
+
+class NullInputBackend(InputBackend):
+    """Records emitted events instead of injecting them (replay, benchmarks, tests)"""
+
+    name = 'null'
+
+    def __init__(self, record: bool = True):
+        super().__init__()
+        self.record = record
+        self.events: List[Tuple[float, str, tuple]] = []
+        self.pressed_keys = set()
+        self.mouse_pressed = False
+        self.cursor = [0, 0]
+
+    def _log(self, action: str, *args):
+        if self.record:
+            self.events.append((time.perf_counter(), action, args))
+
+    def _key_down(self, key: str):
+        # Controllers re-send keyDown every frame to hold keys; only log edges
+        if key not in self.pressed_keys:
+            self.pressed_keys.add(key)
+            self._log('key_down', key)
+
+    def _key_up(self, key: str):
+        self.pressed_keys.discard(key)
+        self._log('key_up', key)
+
+    def _press(self, key: str):
+        self._log('press', key)
+
+    def _mouse_down(self, button: str):
+        self.mouse_pressed = True
+        self._log('mouse_down', button)
+
+    def _mouse_up(self, button: str):
+        self.mouse_pressed = False
+        self._log('mouse_up', button)
+
+    def _move_relative(self, dx: int, dy: int):
+        self.cursor[0] += dx
+        self.cursor[1] += dy
+        self._log('move', dx, dy)
+
+    def clear(self):
+        """Forget recorded events, state and latency"""
+        self.events = []
+        self.pressed_keys = set()
+        self.mouse_pressed = False
+        self.cursor = [0, 0]
+        self.latency = {}
+
+    def event_signature(self) -> List[tuple]:
+        """Events without timestamps, for comparing two replays of the same input"""
+        return [(action, args) for _, action, args in self.events]
+
+    def export_json(self, path: str):
+        """Write the recorded event stream to JSON"""
+        start = self.events[0][0] if self.events else 0.0
+        data = [{'t': round(t - start, 6), 'action': action, 'args': list(args)}
+                for t, action, args in self.events]
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=1)
+
+
+BACKENDS = {
+    'pyautogui': PyAutoGUIBackend,
+    'pynput': PynputBackend,
+    'xtest': XTestBackend,
+    'uinput': UinputBackend,
+    'quartz': QuartzBackend,
+    'null': NullInputBackend,
+}
+
+
+def auto_backend_names() -> List[str]:
+    """Backends 'auto' tries, best first, for this platform"""
+    if sys.platform == 'darwin':
+        return ['quartz', 'pyautogui']
+    if sys.platform.startswith('linux'):
+        names = ['uinput'] if os.access('/dev/uinput', os.W_OK) else []
+        if os.environ.get('DISPLAY'):
+            names.append('xtest')
+        return names + ['pyautogui']
+    return ['pyautogui']
+
+
+def _construct(backend_class, options) -> InputBackend:
+    """Instantiate with just the options its constructor takes (e.g. pause/failsafe only reach pyautogui)"""
+    accepted = inspect.signature(backend_class.__init__).parameters
+    return backend_class(**{key: value for key, value in options.items() if key in accepted})
+
+
+def create_backend(name: str = 'auto', **options) -> InputBackend:
+    """
+    Backend by name; 'auto' takes the first auto_backend_names() entry that can be created.
+    Options are forwarded to whichever backend accepts them, so pause/failsafe still apply
+    when 'auto' falls back to pyautogui.
+    """
+    if name != 'auto':
+        if name not in BACKENDS:
+            raise ValueError(f"unknown input backend '{name}' (choose from {', '.join(BACKENDS)})")
+        return _construct(BACKENDS[name], options)
+    errors = []
+    for candidate in auto_backend_names():
+        try:
+            return _construct(BACKENDS[candidate], options)
+        except Exception as e:  # Missing module, no device/display access, ...
+            errors.append(f"{candidate}: {e}")
+    raise RuntimeError("no usable input backend (" + "; ".join(errors) + ")")
+
+
+_default_backend: Optional[InputBackend] = None
+
+
+def get_default_backend() -> InputBackend:
+    """Shared desktop backend, created on first use so importing controllers stays headless-safe"""
+    global _default_backend
+    if _default_backend is None:
+        _default_backend = PyAutoGUIBackend()
+    return _default_backend
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Command-line options shared by the control scripts"""
+    group = parser.add_argument_group('input injection')
+    group.add_argument('--input-backend', choices=('auto',) + tuple(name for name in BACKENDS if name != 'null'),
+                       help="Keyboard/mouse injection (default pyautogui; auto prefers uinput, then XTest, on "
+                            "Linux and Quartz on macOS)")
+
+
+def from_args(args, **options) -> Optional[InputBackend]:
+    """The --input-backend backend (built with the caller's options), or None for the script's default"""
+    if not args.input_backend:
+        return None
+    backend = create_backend(args.input_backend, **options)
+    print(f"⌨️ Input backend: {backend.name}")
+    return backend
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure a backend's injection latency with small mouse moves")
+    parser.add_argument('backend', nargs='?', default='auto', choices=('auto',) + tuple(BACKENDS))
+    parser.add_argument('--events', type=int, default=200)
+    args = parser.parse_args()
+
+    backend = create_backend(args.backend)
+    for i in range(args.events):
+        step = 1 if i % 2 == 0 else -1  # Jiggle in place
+        backend.move_relative(step, 0)
+    backend.close()
+    print(backend.describe_latency())
@@ -2,32 +2,20 @@
 KRUNKER OPTIMIZED MODE
 Special configuration for browser-based FPS games like Krunker.io
 Higher sensitivity and more aggressive tracking for browser games
+
+Mouse output goes through an input backend (input_backends.py): native
+CGEvents with delta fields on macOS, a uinput device or XTest on Linux.
+
+    python krunker_mode.py [--input-backend uinput] [--sensitivity 3.5]
 """
 
+import argparse
 import cv2
 import mediapipe as mp
 import numpy as np
-import pyautogui
 import time
-from pynput.mouse import Controller as MouseController
-from Quartz.CoreGraphics import (
-    CGEventCreateMouseEvent, 
-    CGEventPost, 
-    kCGEventMouseMoved,
-    kCGEventLeftMouseDown,
-    kCGEventLeftMouseUp, 
-    kCGHIDEventTap, 
-    kCGEventTapOptionDefault,
-    CGEventCreate, 
-    CGEventGetLocation,
-    CGEventSetIntegerValueField,
-    kCGMouseEventDeltaX,
-    kCGMouseEventDeltaY
-)
-
-# CRITICAL: Disable fail-safe for gaming
-pyautogui.PAUSE = 0
-pyautogui.FAILSAFE = False
+import camera_capture
+import input_backends
 
 # MediaPipe initialization
 mp_hands = mp.solutions.hands
@@ -133,7 +121,8 @@ class StickyGunDetector:
                 return True
 
 class ThumbShootingController:
-    def __init__(self):
+    def __init__(self, input_backend):
+        self.input = input_backend
         self.is_pressed = False
         self.last_thumb_down = False
         
@@ -146,12 +135,12 @@ class ThumbShootingController:
         
         if thumb_down and not self.last_thumb_down:
             if not self.is_pressed:
-                pyautogui.mouseDown()
+                self.input.mouse_down()
                 self.is_pressed = True
                 return True, "FIRING!"
         elif not thumb_down and self.last_thumb_down:
             if self.is_pressed:
-                pyautogui.mouseUp()
+                self.input.mouse_up()
                 self.is_pressed = False
                 return False, "Ready"
         
@@ -164,12 +153,13 @@ class ThumbShootingController:
     
     def force_release(self):
         if self.is_pressed:
-            pyautogui.mouseUp()
+            self.input.mouse_up()
             self.is_pressed = False
 
 class KrunkerMouseController:
-    """Optimized for Krunker - smooth interpolation + native macOS mouse events"""
-    def __init__(self, sensitivity=3.5, smoothing_frames=3):
+    """Optimized for Krunker - smooth interpolation + relative mouse events the browser accepts"""
+    def __init__(self, input_backend, sensitivity=3.5, smoothing_frames=3):
+        self.input = input_backend
         self.sensitivity = sensitivity
         self.smoothing_frames = smoothing_frames  # Frames to smooth over when re-establishing
         self.last_x = None
@@ -178,34 +168,17 @@ class KrunkerMouseController:
         self.move_counter = 0  # Separate counter for movement verification
         self.gun_was_active = False
         self.interpolation_queue = []  # Queue for smooth movement
-        print(f"🎮 Krunker Mouse Controller - Native macOS events | Sensitivity: {self.sensitivity}")
+        print(f"🎮 Krunker Mouse Controller - {self.input.name} events | Sensitivity: {self.sensitivity}")
         
     def _move_mouse_native(self, delta_x, delta_y):
-        """Use native macOS CGEvent with delta fields for browser compatibility"""
+        """Relative move through the input backend (Quartz/uinput/XTest deliver true deltas to the browser)"""
         try:
-            # Get current mouse position
-            event = CGEventCreate(None)
-            current_pos = CGEventGetLocation(event)
-            
-            # Calculate new position
-            new_x = current_pos.x + delta_x
-            new_y = current_pos.y + delta_y
-            
-            # Create mouse move event
-            move_event = CGEventCreateMouseEvent(None, kCGEventMouseMoved, (new_x, new_y), 0)
-            
-            # CRITICAL FOR BROWSERS: Set the delta fields explicitly
-            # This makes browsers see it as relative movement (like a real mouse)
-            CGEventSetIntegerValueField(move_event, kCGMouseEventDeltaX, int(delta_x))
-            CGEventSetIntegerValueField(move_event, kCGMouseEventDeltaY, int(delta_y))
-            
-            # Post the event
-            CGEventPost(kCGHIDEventTap, move_event)
+            self.input.move_relative(int(delta_x), int(delta_y))
             
             # Verify the movement (debug)
             self.move_counter += 1
             if self.move_counter % 60 == 0:
-                print(f"🖱️  CGEvent posted with delta: ({int(delta_x)}, {int(delta_y)})")
+                print(f"🖱️  {self.input.name} move posted with delta: ({int(delta_x)}, {int(delta_y)})")
             
         except Exception as e:
             print(f"❌ Native mouse error: {e}")
@@ -258,7 +231,7 @@ class KrunkerMouseController:
                 delta_x = (current_x - self.last_x) * self.sensitivity
                 delta_y = (current_y - self.last_y) * self.sensitivity
                 
-                # Apply movement using native macOS events
+                # Apply movement as a relative event
                 if abs(delta_x) > 0.5 or abs(delta_y) > 0.5:
                     self._move_mouse_native(int(delta_x), int(delta_y))
                 
@@ -275,134 +248,149 @@ class KrunkerMouseController:
         except Exception as e:
             print(f"❌ Mouse error: {e}")
 
-# Initialize
-hands = mp_hands.Hands(
-    static_image_mode=False,
-    max_num_hands=1,
-    min_detection_confidence=0.7,
-    min_tracking_confidence=0.5
-)
-
-cap = cv2.VideoCapture(0)
-cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
-cap.set(cv2.CAP_PROP_FPS, 60)  # Higher FPS for better tracking
-
-gun_detector = StickyGunDetector(grace_period=30)
-shooting_controller = ThumbShootingController()
-mouse_controller = KrunkerMouseController(sensitivity=3.5)  # Higher for Krunker
-
-control_enabled = False
-
-print("=" * 70)
-print("🎯 KRUNKER OPTIMIZED MODE")
-print("=" * 70)
-print("Controls:")
-print("  'g' - Toggle control ON/OFF")
-print("  'q' - Quit")
-print("  '+' - Increase sensitivity")
-print("  '-' - Decrease sensitivity")
-print("\nSetup for Krunker:")
-print("  1. Open Krunker.io in your browser")
-print("  2. Start a game (go into pointer lock mode)")
-print("  3. Alt+Tab back here and press 'g' to enable")
-print("  4. Alt+Tab back to Krunker")
-print("  5. Make gun gesture and start playing!")
-print("\nGestures:")
-print("  - Gun: Index finger out, other 3 fingers curled")
-print("  - Shoot: Thumb DOWN")
-print("  - Stop: Thumb UP")
-print("=" * 70)
-
-frame_count = 0
-last_frame_time = time.time()
-
-try:
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            time.sleep(0.01)
-            continue
-        
-        frame_count += 1
-        if frame_count % 60 == 0:
-            fps = 60 / (time.time() - last_frame_time) if time.time() > last_frame_time else 0
-            print(f"🎮 FPS: {fps:.1f} | Control: {'ON' if control_enabled else 'OFF'}")
-            last_frame_time = time.time()
-        
-        frame = cv2.flip(frame, 1)
-        h, w, _ = frame.shape
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        
-        results = hands.process(rgb_frame)
-        
-        gun_active = False
-        is_shooting = False
-        shoot_status = "No hand"
-        
-        if results.multi_hand_landmarks:
-            hand_landmarks = results.multi_hand_landmarks[0]
-            
-            # Draw landmarks
-            mp_drawing.draw_landmarks(
-                frame, hand_landmarks, mp_hands.HAND_CONNECTIONS,
-                mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2),
-                mp_drawing.DrawingSpec(color=(255, 255, 255), thickness=2)
-            )
-            
-            if control_enabled:
-                gun_active = gun_detector.update(hand_landmarks)
-                
-                if gun_active:
-                    is_shooting, shoot_status = shooting_controller.update(hand_landmarks, gun_active)
-                    mouse_controller.update(hand_landmarks, gun_active)
-                else:
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Krunker optimized finger-gun mode")
+    parser.add_argument('--sensitivity', type=float, default=3.5, help='Mouse sensitivity (+/- adjust it live)')
+    input_backends.add_arguments(parser)
+    camera_capture.add_arguments(parser, fps=60)  # Higher FPS for better tracking
+    args = parser.parse_args(argv)
+    
+    # Relative moves need a backend the browser reads as mouse motion: Quartz on macOS, uinput/XTest on Linux
+    backend = input_backends.from_args(args)
+    if backend is None:
+        backend = input_backends.create_backend('auto')
+        print(f"⌨️ Input backend: {backend.name}")
+    
+    # Initialize
+    hands = mp_hands.Hands(
+        static_image_mode=False,
+        max_num_hands=1,
+        min_detection_confidence=0.7,
+        min_tracking_confidence=0.5
+    )
+
+    cap = camera_capture.open_from_args(args)
+
+    gun_detector = StickyGunDetector(grace_period=30)
+    shooting_controller = ThumbShootingController(backend)
+    mouse_controller = KrunkerMouseController(backend, sensitivity=args.sensitivity)  # Higher for Krunker
+
+    control_enabled = False
+
+    print("=" * 70)
+    print("🎯 KRUNKER OPTIMIZED MODE")
+    print("=" * 70)
+    print("Controls:")
+    print("  'g' - Toggle control ON/OFF")
+    print("  'q' - Quit")
+    print("  '+' - Increase sensitivity")
+    print("  '-' - Decrease sensitivity")
+    print("\nSetup for Krunker:")
+    print("  1. Open Krunker.io in your browser")
+    print("  2. Start a game (go into pointer lock mode)")
+    print("  3. Alt+Tab back here and press 'g' to enable")
+    print("  4. Alt+Tab back to Krunker")
+    print("  5. Make gun gesture and start playing!")
+    print("\nGestures:")
+    print("  - Gun: Index finger out, other 3 fingers curled")
+    print("  - Shoot: Thumb DOWN")
+    print("  - Stop: Thumb UP")
+    print("=" * 70)
+
+    frame_count = 0
+    last_frame_time = time.time()
+
+    try:
+        while cap.isOpened():
+            ret, frame = cap.read()
+            if not ret:
+                time.sleep(0.01)
+                continue
+
+            frame_count += 1
+            if frame_count % 60 == 0:
+                fps = 60 / (time.time() - last_frame_time) if time.time() > last_frame_time else 0
+                print(f"🎮 FPS: {fps:.1f} | Control: {'ON' if control_enabled else 'OFF'}")
+                last_frame_time = time.time()
+
+            frame = cv2.flip(frame, 1)
+            h, w, _ = frame.shape
+            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+            results = hands.process(rgb_frame)
+
+            gun_active = False
+            is_shooting = False
+            shoot_status = "No hand"
+
+            if results.multi_hand_landmarks:
+                hand_landmarks = results.multi_hand_landmarks[0]
+
+                # Draw landmarks
+                mp_drawing.draw_landmarks(
+                    frame, hand_landmarks, mp_hands.HAND_CONNECTIONS,
+                    mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2),
+                    mp_drawing.DrawingSpec(color=(255, 255, 255), thickness=2)
+                )
+
+                if control_enabled:
+                    gun_active = gun_detector.update(hand_landmarks)
+
+                    if gun_active:
+                        is_shooting, shoot_status = shooting_controller.update(hand_landmarks, gun_active)
+                        mouse_controller.update(hand_landmarks, gun_active)
+                    else:
+                        shooting_controller.force_release()
+
+            # Display status
+            status = "CONTROL: ON ✓" if control_enabled else "CONTROL: OFF (press 'g')"
+            color = (0, 255, 0) if control_enabled else (0, 0, 255)
+            cv2.putText(frame, status, (10, 40), cv2.FONT_HERSHEY_SIMPLEX, 1.0, color, 2)
+
+            gun_color = (0, 255, 0) if gun_active else (128, 128, 128)
+            cv2.putText(frame, f"Gun: {'ACTIVE' if gun_active else 'Make gesture'}", (10, 80), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, gun_color, 2)
+
+            if is_shooting:
+                cv2.putText(frame, "🔥 FIRING! 🔥", (10, 120), 
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
+
+            cv2.putText(frame, f"Sensitivity: {mouse_controller.sensitivity:.1f}", (10, h - 60), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+            cv2.putText(frame, "Press '+'/'-' to adjust | 'g' toggle | 'q' quit", (10, h - 20), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+
+            cv2.imshow('Krunker Mode', frame)
+
+            key = cv2.waitKey(1) & 0xFF
+            if key == ord('q') or key == 27:
+                break
+            elif key == ord('g'):
+                control_enabled = not control_enabled
+                if not control_enabled:
                     shooting_controller.force_release()
-        
-        # Display status
-        status = "CONTROL: ON ✓" if control_enabled else "CONTROL: OFF (press 'g')"
-        color = (0, 255, 0) if control_enabled else (0, 0, 255)
-        cv2.putText(frame, status, (10, 40), cv2.FONT_HERSHEY_SIMPLEX, 1.0, color, 2)
-        
-        gun_color = (0, 255, 0) if gun_active else (128, 128, 128)
-        cv2.putText(frame, f"Gun: {'ACTIVE' if gun_active else 'Make gesture'}", (10, 80), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, gun_color, 2)
-        
-        if is_shooting:
-            cv2.putText(frame, "🔥 FIRING! 🔥", (10, 120), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
-        
-        cv2.putText(frame, f"Sensitivity: {mouse_controller.sensitivity:.1f}", (10, h - 60), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-        cv2.putText(frame, "Press '+'/'-' to adjust | 'g' toggle | 'q' quit", (10, h - 20), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-        
-        cv2.imshow('Krunker Mode', frame)
-        
-        key = cv2.waitKey(1) & 0xFF
-        if key == ord('q') or key == 27:
-            break
-        elif key == ord('g'):
-            control_enabled = not control_enabled
-            if not control_enabled:
-                shooting_controller.force_release()
-            print(f"\n{'='*50}")
-            print(f"🎮 Control {'ENABLED ✓' if control_enabled else 'DISABLED ✗'}")
-            print(f"{'='*50}\n")
-        elif key == ord('+') or key == ord('='):
-            mouse_controller.sensitivity += 0.5
-            print(f"📈 Sensitivity increased to {mouse_controller.sensitivity:.1f}")
-        elif key == ord('-') or key == ord('_'):
-            mouse_controller.sensitivity = max(0.5, mouse_controller.sensitivity - 0.5)
-            print(f"📉 Sensitivity decreased to {mouse_controller.sensitivity:.1f}")
-
-except KeyboardInterrupt:
-    print("\n⏹️  Interrupted")
-finally:
-    print("🧹 Cleaning up...")
-    shooting_controller.force_release()
-    cap.release()
-    cv2.destroyAllWindows()
-    hands.close()
-    print("✅ Done!")
+                print(f"\n{'='*50}")
+                print(f"🎮 Control {'ENABLED ✓' if control_enabled else 'DISABLED ✗'}")
+                print(f"{'='*50}\n")
+            elif key == ord('+') or key == ord('='):
+                mouse_controller.sensitivity += 0.5
+                print(f"📈 Sensitivity increased to {mouse_controller.sensitivity:.1f}")
+            elif key == ord('-') or key == ord('_'):
+                mouse_controller.sensitivity = max(0.5, mouse_controller.sensitivity - 0.5)
+                print(f"📉 Sensitivity decreased to {mouse_controller.sensitivity:.1f}")
+
+    except KeyboardInterrupt:
+        print("\n⏹️  Interrupted")
+    finally:
+        print("🧹 Cleaning up...")
+        shooting_controller.force_release()
+        cap.release()
+        cv2.destroyAllWindows()
+        hands.close()
+        print(backend.describe_latency())
+        backend.close()
+        print("✅ Done!")
+
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+Landmark Drawing
+Vectorized replacement for mp_drawing.draw_landmarks on the preview.
+
+mp_drawing walks the landmarks and connections in Python and issues one
+cv2.line/cv2.circle per element - 124 contour lines for the face mesh every
+frame. A LandmarkSkeleton precomputes the connection index arrays once; each
+frame it:
+
+    - reads the landmark list into arrays in one pass (protobuf lists are
+      decoded from their serialized form with NumPy, no per-landmark Python)
+    - converts to pixels with one multiply
+    - draws every connection with a single cv2.polylines call (the connections
+      are merged into paths when every landmark is drawable: 11 polylines for
+      the 124 face contour connections)
+    - stamps all the points at once with a precomputed copy of mp_drawing's
+      circle pair (border circle + colored circle); markers clipped by the
+      image edge are drawn with cv2.circle like mp_drawing does
+
+Output matches mp_drawing pixel for pixel: landmarks below the visibility or
+presence threshold or outside the image are skipped, along with their
+connections.
+
+    POSE_SKELETON.draw(frame, pose_results.pose_landmarks)
+"""
+
+from typing import Iterable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+import mediapipe as mp
+
+mp_drawing = mp.solutions.drawing_utils
+
+# Same thresholds and marker border color as mp_drawing
+VISIBILITY_THRESHOLD = 0.5
+PRESENCE_THRESHOLD = 0.5
+BORDER_COLOR = mp_drawing.WHITE_COLOR
+
+# NormalizedLandmark wire format: each landmark is a length-delimited submessage
+# (tag 0x0a) of fixed32 float fields x=1, y=2, z=3, visibility=4, presence=5
+_LANDMARK_TAG = 0x0A
+_FIELD_TAGS = {0x0D: 'x', 0x15: 'y', 0x1D: 'z', 0x25: 'visibility', 0x2D: 'presence'}
+
+
+def _wire_table(data: bytes, count: int) -> Optional[Tuple[List[str], np.ndarray]]:
+    """(field names, float32 (count, fields) view) when every landmark serializes with the same fields, else None"""
+    if not count or len(data) % count:
+        return None
+    size = len(data) // count
+    fields = (size - 2) // 5
+    if size - 2 >= 128 or 2 + 5 * fields != size or fields < 2 or data[0] != _LANDMARK_TAG or data[1] != size - 2:
+        return None  # Multi-byte length prefix or not all fixed32 fields
+    # Every record must repeat the first one's header (bytes 0-1) and field tags (bytes 2, 7, 12, ...);
+    # strided bytes slices compare faster than NumPy views for these short runs
+    for offset in (0, 1) + tuple(range(2, size, 5)):
+        if data[offset::size] != data[offset:offset + 1] * count:
+            return None
+    names = [_FIELD_TAGS.get(tag) for tag in data[2:size:5]]
+    if None in names:
+        return None
+    return names, np.ndarray((count, fields), '<f4', data, 3, (size, 5))
+
+
+def _from_wire(data: bytes, count: int) -> Optional[dict]:
+    """{field: float32 column view} when every landmark serializes with the same fields, else None"""
+    table = _wire_table(data, count)
+    if table is None:
+        return None
+    names, values = table
+    return {name: values[:, i] for i, name in enumerate(names)}
+
+
+def landmark_points(landmark_lists: List) -> np.ndarray:
+    """
+    float32 (lists, n, 3) xyz for landmark lists of the same length (e.g. both
+    hands), decoded in one pass
+    """
+    count = len(landmark_lists[0].landmark)
+    if all(hasattr(landmark_list, 'SerializeToString') for landmark_list in landmark_lists):
+        table = _wire_table(b''.join([landmark_list.SerializeToString() for landmark_list in landmark_lists]),
+                            count * len(landmark_lists))
+        if table is not None and table[0][:3] == ['x', 'y', 'z']:
+            return np.array(table[1][:, :3]).reshape(len(landmark_lists), count, 3)
+    else:
+        arrays = [getattr(landmark_list, 'array', None) for landmark_list in landmark_lists]
+        if all(array is not None for array in arrays):  # landmark_log views
+            return np.stack([array[:, :3] for array in arrays]).astype(np.float32)
+    return np.array([[(p.x, p.y, p.z) for p in landmark_list.landmark] for landmark_list in landmark_lists],
+                    dtype=np.float32).reshape(len(landmark_lists), count, 3)
+
+
+def landmark_arrays(landmark_list) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (xy, drawable) for a landmark list: float32 (n, 2) normalized coordinates and
+    a bool (n,) mask of landmarks mp_drawing would draw
+    """
+    visibility = presence = None
+    array = getattr(landmark_list, 'array', None)  # landmark_log views are array-backed
+    if array is not None:
+        x, y = array[:, 0], array[:, 1]
+        if array.shape[1] > 3:
+            visibility = array[:, 3]
+    else:
+        landmarks = landmark_list.landmark
+        fields = None
+        if hasattr(landmark_list, 'SerializeToString'):
+            fields = _from_wire(landmark_list.SerializeToString(), len(landmarks))
+        if fields is not None and 'x' in fields and 'y' in fields:
+            x, y = fields['x'], fields['y']
+            visibility, presence = fields.get('visibility'), fields.get('presence')
+        else:
+            xy = np.array([(p.x, p.y) for p in landmarks], dtype=np.float32).reshape(-1, 2)
+            x, y = xy[:, 0], xy[:, 1]
+            visibility = np.array([p.visibility if p.HasField('visibility') else 1.0 for p in landmarks])
+            presence = np.array([p.presence if p.HasField('presence') else 1.0 for p in landmarks])
+
+    drawable = (x >= 0.0) & (x <= 1.0) & (y >= 0.0) & (y <= 1.0)
+    if visibility is not None:
+        drawable &= visibility >= VISIBILITY_THRESHOLD
+    if presence is not None:
+        drawable &= presence >= PRESENCE_THRESHOLD
+    xy = np.empty((len(x), 2), dtype=np.float32)
+    xy[:, 0] = x
+    xy[:, 1] = y
+    return xy, drawable
+
+
+def _chains(pairs: np.ndarray) -> List[List[int]]:
+    """Split connections into paths (each connection used once), so one polyline covers many"""
+    remaining = set(map(tuple, pairs.tolist()))
+    neighbours = {}
+    for a, b in remaining:
+        neighbours.setdefault(a, []).append((a, b))
+        neighbours.setdefault(b, []).append((a, b))
+    chains = []
+    for edge in map(tuple, pairs.tolist()):
+        if edge not in remaining:
+            continue
+        remaining.discard(edge)
+        chain = list(edge)
+        while True:
+            step = next((e for e in neighbours[chain[-1]] if e in remaining), None)
+            if step is None:
+                break
+            remaining.discard(step)
+            chain.append(step[1] if step[0] == chain[-1] else step[0])
+        chains.append(chain)
+    return chains
+
+
+def _point_stamp(spec):
+    """Pixel offsets and colors of mp_drawing's landmark marker (border circle, then colored circle)"""
+    border = max(spec.circle_radius + 1, int(spec.circle_radius * 1.2))
+    half = border + spec.thickness + 1
+    labels = np.zeros((2 * half + 1, 2 * half + 1), dtype=np.uint8)
+    cv2.circle(labels, (half, half), border, 1, spec.thickness)
+    cv2.circle(labels, (half, half), spec.circle_radius, 2, spec.thickness)
+    dy, dx = np.nonzero(labels)
+    palette = np.array([(0, 0, 0), BORDER_COLOR, spec.color], dtype=np.uint8)
+    return (dy - half).astype(np.intp), (dx - half).astype(np.intp), palette[labels[dy, dx]], half
+
+
+class LandmarkSkeleton:
+    """
+    One model's landmark overlay with precomputed connection arrays.
+    landmark_spec/connection_spec: mp_drawing.DrawingSpec (None skips points/connections)
+    """
+
+    def __init__(self, connections: Iterable[Tuple[int, int]], landmark_spec=None, connection_spec=None):
+        pairs = np.array(sorted(connections), dtype=np.intp).reshape(-1, 2)
+        self.starts = pairs[:, 0]
+        self.ends = pairs[:, 1]
+        self.min_points = int(pairs.max()) + 1 if len(pairs) else 0
+        chains = _chains(pairs)
+        self.chain_index = np.array([i for chain in chains for i in chain], dtype=np.intp)
+        bounds = np.cumsum([0] + [len(chain) for chain in chains])
+        self.chain_bounds = list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+        self.connection_spec = connection_spec
+        self.landmark_spec = landmark_spec
+        self._stamp = _point_stamp(landmark_spec) if landmark_spec is not None else None
+        self._offsets = {}  # Image width -> flat pixel offsets of the stamp
+        self._colors = {}  # Point count -> stamp colors tiled for that many points
+
+    def draw(self, image: np.ndarray, landmark_list):
+        """Draw onto a BGR image in place (mp_drawing.draw_landmarks equivalent)"""
+        if not landmark_list:
+            return
+        xy, drawable = landmark_arrays(landmark_list)
+        if len(xy) < self.min_points:
+            return  # Partial view (e.g. a replayed face subset) - nothing to connect
+        h, w = image.shape[:2]
+        # Double precision like mp_drawing's floor(x * width), or pixels can land one off;
+        # truncation is floor for the drawable (non-negative) coordinates
+        pixels = (xy * np.array((w, h), dtype=np.float64)).astype(np.int32)
+        np.minimum(pixels, (w - 1, h - 1), out=pixels)
+
+        spec = self.connection_spec
+        if spec is not None and len(self.starts):
+            if drawable.all():
+                path = pixels[self.chain_index]
+                cv2.polylines(image, [path[a:b] for a, b in self.chain_bounds], False, spec.color, spec.thickness)
+            else:
+                both = drawable[self.starts] & drawable[self.ends]
+                segments = np.stack((pixels[self.starts[both]], pixels[self.ends[both]]), axis=1)
+                if len(segments):
+                    cv2.polylines(image, segments, False, spec.color, spec.thickness)
+
+        if self._stamp is not None:
+            self._stamp_points(image, pixels[drawable])
+
+    def _stamp_points(self, image: np.ndarray, points: np.ndarray):
+        if not len(points):
+            return
+        dy, dx, colors, half = self._stamp
+        h, w = image.shape[:2]
+        tiled = self._colors.get(len(points))
+        if tiled is None:
+            tiled = self._colors[len(points)] = np.tile(colors, (len(points), 1))
+        if image.flags.c_contiguous and points.min() >= half and (points < (w - half, h - half)).all():
+            # Every marker is inside the image: one flat scatter
+            offsets = self._offsets.get(w)
+            if offsets is None:
+                offsets = self._offsets[w] = dy * w + dx
+            index = (points[:, 1:2] * w + points[:, 0:1] + offsets).ravel()
+            image.reshape(-1, 3)[index] = tiled
+            return
+        # cv2 rasterizes a clipped circle differently from the cropped stamp, so markers near
+        # the edge get mp_drawing's own cv2.circle pair; runs in between are still stamped
+        # and landmark order (later markers on top) is kept
+        inside = ((points >= half) & (points < (w - half, h - half))).all(axis=1)
+        breaks = np.flatnonzero(np.diff(inside.view(np.int8))) + 1
+        for start, end in zip([0] + breaks.tolist(), breaks.tolist() + [len(points)]):
+            if inside[start]:
+                ys = (points[start:end, 1:2] + dy).ravel()
+                xs = (points[start:end, 0:1] + dx).ravel()
+                image[ys, xs] = tiled[:len(ys)]
+            else:
+                for x, y in points[start:end].tolist():
+                    self._circle_pair(image, (x, y))
+
+    def _circle_pair(self, image: np.ndarray, center: Tuple[int, int]):
+        spec = self.landmark_spec
+        border = max(spec.circle_radius + 1, int(spec.circle_radius * 1.2))
+        cv2.circle(image, center, border, BORDER_COLOR, spec.thickness)
+        cv2.circle(image, center, spec.circle_radius, spec.color, spec.thickness)
+
+
+# The preview overlays of the control scripts
+POSE_SKELETON = LandmarkSkeleton(
+    mp.solutions.pose.POSE_CONNECTIONS,
+    mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2),
+    mp_drawing.DrawingSpec(color=(255, 0, 0), thickness=2, circle_radius=2)
+)
+FACE_CONTOUR_SKELETON = LandmarkSkeleton(
+    mp.solutions.face_mesh.FACEMESH_CONTOURS,
+    None, mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=1, circle_radius=1)
+)
+HAND_SKELETON = LandmarkSkeleton(
+    mp.solutions.hands.HAND_CONNECTIONS,
+    mp_drawing.DrawingSpec(color=(0, 0, 255), thickness=2, circle_radius=2),
+    mp_drawing.DrawingSpec(color=(0, 255, 255), thickness=2, circle_radius=2)
+)
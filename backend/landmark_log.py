@@ -0,0 +1,321 @@
+"""
+Landmark Log
+Compact binary recording of MediaPipe outputs for replaying the controllers
+without running inference.
+
+File layout:
+    b'FGLM' | uint32 header length | JSON header | fixed-size records...
+
+Each record holds a capture timestamp plus float16/float32 arrays for up to two
+hands (with handedness label/score), the 33 pose landmarks and the face mesh
+subset the controllers actually read. Records are fixed-size, so a log opens as
+a NumPy memmap and a 10-minute session replays through every controller in
+seconds.
+
+Usage:
+    python leaning_control_system.py --record-landmarks session.lmk
+    python landmark_log.py replay session.lmk
+"""
+
+import argparse
+import json
+import struct
+import time
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+
+MAGIC = b'FGLM'
+VERSION = 1
+
+MAX_HANDS = 2
+HAND_POINTS = 21
+POSE_POINTS = 33
+FACE_MESH_POINTS = 478
+# Face mesh indices read by calculate_head_pose and detect_mouth_open
+FACE_SUBSET = (1, 10, 13, 14, 33, 152, 263)
+
+HANDEDNESS_LABELS = {'Left': 1, 'Right': 2}
+HANDEDNESS_NAMES = {value: key for key, value in HANDEDNESS_LABELS.items()}
+
+
+def record_dtype(precision: str = 'float16') -> np.dtype:
+    """Structured dtype of one frame record"""
+    f = np.dtype(precision)
+    return np.dtype([
+        ('t', '<f8'),
+        ('hand_count', 'u1'),
+        ('pose_valid', 'u1'),
+        ('face_valid', 'u1'),
+        ('hand_label', 'u1', (MAX_HANDS,)),
+        ('hand_score', '<f4', (MAX_HANDS,)),
+        ('hands', f, (MAX_HANDS, HAND_POINTS, 3)),
+        ('pose', f, (POSE_POINTS, 4)),
+        ('face', f, (len(FACE_SUBSET), 3)),
+    ])
+
+
+class LandmarkPoint:
+    """Lightweight stand-in for a MediaPipe NormalizedLandmark"""
+    __slots__ = ('x', 'y', 'z', 'visibility')
+
+    def __init__(self, x, y, z=0.0, visibility=1.0):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.visibility = visibility
+
+    def HasField(self, name):  # noqa: N802 - protobuf API used by mp_drawing.draw_landmarks
+        return name == 'visibility'
+
+
+class _LazyLandmarks:
+    """Sequence of LandmarkPoints built on first access (controllers read only a few)"""
+    __slots__ = ('values', 'points')
+
+    def __init__(self, values):
+        self.values = values
+        self.points = {}
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self.values)))]
+        point = self.points.get(index)
+        if point is None:
+            point = self.points[index] = LandmarkPoint(*self.values[index])
+        return point
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self.values)))
+
+
+class LandmarkListView:
+    """Array-backed stand-in for a MediaPipe NormalizedLandmarkList (`.landmark[i].x`)"""
+    __slots__ = ('array', 'landmark')
+
+    def __init__(self, array: np.ndarray):
+        self.array = array
+        self.landmark = _LazyLandmarks(array.tolist())
+
+
+class _SparseLandmarks(_LazyLandmarks):
+    """Face mesh landmark list where only FACE_SUBSET indices are populated"""
+    __slots__ = ()
+
+    def __getitem__(self, index):
+        point = self.points.get(index)
+        if point is None:
+            point = self.points[index] = LandmarkPoint(*self.values[_FACE_SLOT[index]])
+        return point
+
+    def __len__(self):
+        return FACE_MESH_POINTS
+
+    def __iter__(self):
+        return (self[i] for i in FACE_SUBSET)
+
+
+_FACE_SLOT = {index: slot for slot, index in enumerate(FACE_SUBSET)}
+
+
+class FaceSubsetView:
+    """Face landmarks restricted to FACE_SUBSET, indexed by original face mesh index"""
+    __slots__ = ('array', 'landmark')
+
+    def __init__(self, array: np.ndarray):
+        self.array = array
+        self.landmark = _SparseLandmarks(array.tolist())
+
+
+class HandednessView:
+    """Stand-in for a MediaPipe handedness ClassificationList"""
+    __slots__ = ('classification',)
+
+    def __init__(self, label: str, score: float):
+        self.classification = [_Classification(label, score)]
+
+
+class _Classification:
+    __slots__ = ('label', 'score', 'index')
+
+    def __init__(self, label, score):
+        self.label = label
+        self.score = score
+        self.index = 0 if label == 'Left' else 1
+
+
+class LandmarkFrame:
+    """One replayed frame, shaped like the MediaPipe results the controllers consume"""
+    __slots__ = ('timestamp', 'multi_hand_landmarks', 'multi_handedness', 'pose_landmarks', 'face_landmarks')
+
+    def __init__(self, record):
+        self.timestamp = float(record['t'])
+        count = int(record['hand_count'])
+        self.multi_hand_landmarks = [LandmarkListView(record['hands'][i]) for i in range(count)] or None
+        self.multi_handedness = [
+            HandednessView(HANDEDNESS_NAMES.get(int(record['hand_label'][i]), 'Right'),
+                           float(record['hand_score'][i]))
+            for i in range(count)
+        ] or None
+        self.pose_landmarks = LandmarkListView(record['pose']) if record['pose_valid'] else None
+        self.face_landmarks = FaceSubsetView(record['face']) if record['face_valid'] else None
+
+
+def _landmark_array(landmark_list, count, with_visibility=False):
+    points = landmark_list.landmark
+    if with_visibility:
+        return np.array([(p.x, p.y, p.z, p.visibility) for p in points[:count]], dtype=np.float32)
+    return np.array([(p.x, p.y, p.z) for p in points[:count]], dtype=np.float32)
+
+
+class LandmarkLogWriter:
+    """Appends one fixed-size record per frame"""
+
+    def __init__(self, path: str, precision: str = 'float16'):
+        self.path = path
+        self.dtype = record_dtype(precision)
+        self.frames = 0
+        self._record = np.zeros(1, dtype=self.dtype)
+        self._start = None
+
+        header = json.dumps({
+            'version': VERSION,
+            'precision': precision,
+            'max_hands': MAX_HANDS,
+            'hand_points': HAND_POINTS,
+            'pose_points': POSE_POINTS,
+            'face_subset': list(FACE_SUBSET),
+        }).encode('utf-8')
+        self._file = open(path, 'wb')
+        self._file.write(MAGIC + struct.pack('<I', len(header)) + header)
+
+    def write(self, timestamp: float, hand_results=None, pose_results=None, face_results=None):
+        """Record MediaPipe results for one frame (timestamp in seconds, any monotonic clock)"""
+        if self._start is None:
+            self._start = timestamp
+        rec = self._record
+        rec[:] = 0
+        rec['t'][0] = timestamp - self._start
+
+        hands = getattr(hand_results, 'multi_hand_landmarks', None) or []
+        handedness = getattr(hand_results, 'multi_handedness', None) or []
+        count = min(len(hands), MAX_HANDS)
+        rec['hand_count'][0] = count
+        for i in range(count):
+            rec['hands'][0, i] = _landmark_array(hands[i], HAND_POINTS)
+            if i < len(handedness):
+                cls = handedness[i].classification[0]
+                rec['hand_label'][0, i] = HANDEDNESS_LABELS.get(cls.label, 0)
+                rec['hand_score'][0, i] = cls.score
+
+        pose = getattr(pose_results, 'pose_landmarks', None)
+        if pose is not None:
+            rec['pose_valid'][0] = 1
+            rec['pose'][0] = _landmark_array(pose, POSE_POINTS, with_visibility=True)
+
+        faces = getattr(face_results, 'multi_face_landmarks', None)
+        if faces:
+            points = faces[0].landmark
+            rec['face_valid'][0] = 1
+            rec['face'][0] = np.array([(points[i].x, points[i].y, points[i].z) for i in FACE_SUBSET],
+                                      dtype=np.float32)
+
+        self._file.write(self._record.tobytes())
+        self.frames += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            print(f"💾 Recorded {self.frames} landmark frames to {self.path}")
+
+
+class LandmarkLog:
+    """Memory-mapped reader for a landmark log"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            magic = f.read(4)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a landmark log")
+            (header_len,) = struct.unpack('<I', f.read(4))
+            self.header = json.loads(f.read(header_len).decode('utf-8'))
+        if tuple(self.header.get('face_subset', ())) != FACE_SUBSET:
+            raise ValueError(f"{path} was recorded with a different face subset")
+        self.dtype = record_dtype(self.header.get('precision', 'float16'))
+        self.records = np.memmap(path, dtype=self.dtype, mode='r', offset=8 + header_len)
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def duration(self) -> float:
+        """Recorded session length in seconds"""
+        return float(self.records['t'][-1]) if len(self.records) else 0.0
+
+    def frame(self, index: int) -> LandmarkFrame:
+        return LandmarkFrame(self.records[index])
+
+    def __iter__(self) -> Iterator[LandmarkFrame]:
+        for record in self.records:
+            yield LandmarkFrame(record)
+
+
+def replay_controllers(log: LandmarkLog, system=None, params: Optional[Dict[str, Dict]] = None,
+                       control_enabled: bool = True):
+    """
+    Run every LeaningControlSystem controller against a landmark log with no inference.
+    params overrides controller attributes, e.g. {'wasd_controller': {'lean_threshold': 6}}.
+    Returns: (system, input_backend) - the backend holds the emitted key/mouse events
+    """
+    from input_backends import NullInputBackend
+    from leaning_control_system import LeaningControlSystem
+
+    if system is None:
+        system = LeaningControlSystem(input_backend=NullInputBackend(), load_models=False)
+    if params:
+        system.apply_profile(params)
+    system.control_enabled = control_enabled
+
+    for frame in log:
+        system.update_controls(frame.multi_hand_landmarks, frame.pose_landmarks, frame.face_landmarks,
+                               capture_time=frame.timestamp, handedness_list=frame.multi_handedness)
+    system.wasd_controller.release_all_keys()
+    system.shooting_controller.force_release()
+    return system, system.input
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or replay a landmark log")
+    sub = parser.add_subparsers(dest='command', required=True)
+    info = sub.add_parser('info', help='Print log statistics')
+    info.add_argument('path')
+    rep = sub.add_parser('replay', help='Run all controllers against the log')
+    rep.add_argument('path')
+    rep.add_argument('--events', help='Write emitted input events to this JSON file')
+    rep.add_argument('--profile', help='Controller thresholds to replay with (threshold_tuner.py output)')
+    args = parser.parse_args()
+
+    log = LandmarkLog(args.path)
+    if args.command == 'info':
+        records = log.records
+        print(f"Frames: {len(log)} | Duration: {log.duration:.1f}s | Precision: {log.header['precision']}")
+        print(f"Hands: {int((records['hand_count'] > 0).sum())} frames | "
+              f"Pose: {int(records['pose_valid'].sum())} | Face: {int(records['face_valid'].sum())}")
+    else:
+        start = time.perf_counter()
+        params = None
+        if args.profile:
+            with open(args.profile) as f:
+                params = json.load(f)['params']
+        system, backend = replay_controllers(log, params=params)
+        elapsed = time.perf_counter() - start
+        speedup = log.duration / elapsed if elapsed > 0 else float('inf')
+        print(f"Replayed {len(log)} frames in {elapsed:.2f}s ({speedup:.0f}x real time), "
+              f"{len(backend.events)} input events")
+        if args.events:
+            backend.export_json(args.events)
@@ -0,0 +1,186 @@
+"""
+Latency Governor
+Keeps the per-frame processing time under a deadline by shedding work in a
+fixed order when the loop falls behind, and restoring it when headroom returns:
+
+    1. preview   - skip landmark/status drawing (the window still shows the frame)
+    2. face_mesh - run face mesh on every Nth frame (the last result is held)
+    3. pose      - run pose at a lower input resolution
+    4. frames    - drop the frame after one that overran the deadline
+
+Without it a spike (the game itself competing for the CPU) makes the loop run
+late and every downstream stage - WASD, aim, shooting - inherits the delay;
+shedding keeps aim latency bounded instead.
+
+Processing time is the profiled frame total minus the capture wait (waiting
+for the camera is idle time, not work). The governor sheds one step when the
+mean over a window of processed frames exceeds the deadline and restores one
+after `recover_windows` windows below headroom * deadline; a step that
+overruns again right after being restored doubles that wait. Steps that don't
+apply (no preview, face mesh off, pose sizes owned by auto mode or worker
+processes) are skipped.
+
+    governor = LatencyGovernor(deadline_ms=33.3)
+    governor.configure(preview=True, face_mesh=True, sizes=inference.sizes)
+    if governor.drop_frame(): continue
+    change = governor.update(profiler_row)
+"""
+
+import argparse
+from typing import Dict, Optional, Tuple
+
+# Degradation order (each level keeps the steps before it shed)
+STEPS = ('preview', 'face_mesh', 'pose', 'frames')
+
+
+class LatencyGovernor:
+    """Sheds and restores pipeline work to hold the frame processing time under deadline_ms"""
+
+    def __init__(self, deadline_ms: float = 33.3, window: int = 10, headroom: float = 0.7,
+                 recover_windows: int = 3, face_mesh_interval: int = 3, pose_size: Tuple[int, int] = (320, 180),
+                 max_dropped: int = 1):
+        self.deadline_ms = deadline_ms
+        self.window = window  # Processed frames per decision
+        self.headroom = headroom  # Restore a step only below headroom * deadline
+        self.recover_windows = recover_windows  # Consecutive calm windows before restoring a step
+        self.face_mesh_interval_shed = max(2, face_mesh_interval)
+        self.pose_size = pose_size
+        self.max_dropped = max_dropped  # Consecutive frames dropped at most
+        self.steps = STEPS
+        self.level = 0  # Number of steps currently shed
+        self.sizes: Optional[Dict] = None  # InferenceResolution.sizes for the pose step
+        self.changes = 0
+        self.dropped = 0
+        self._saved_pose = None
+        self._recover_needed = recover_windows
+        self._calm = 0
+        self._just_restored = False
+        self._overran = False
+        self._dropped_run = 0
+        self._frames = 0
+        self._work = 0.0
+
+    def configure(self, preview: bool = True, face_mesh: bool = True, sizes: Optional[Dict] = None):
+        """Steps available to this loop; sizes is the InferenceResolution.sizes dict (None: pose step unavailable)"""
+        self.restore_all()
+        self.sizes = sizes
+        available = {'preview': preview, 'face_mesh': face_mesh, 'pose': sizes is not None, 'frames': True}
+        self.steps = tuple(step for step in STEPS if available[step])
+
+    @property
+    def shed(self) -> Tuple[str, ...]:
+        return self.steps[:self.level]
+
+    @property
+    def preview(self) -> bool:
+        """Whether preview drawing runs"""
+        return 'preview' not in self.shed
+
+    @property
+    def face_mesh_interval(self) -> int:
+        """Face mesh runs on every Nth frame (1 = every frame)"""
+        return self.face_mesh_interval_shed if 'face_mesh' in self.shed else 1
+
+    def drop_frame(self) -> bool:
+        """Whether to skip the frame just captured (only while shedding frames and behind)"""
+        if not self._overran or 'frames' not in self.shed or self._dropped_run >= self.max_dropped:
+            self._dropped_run = 0
+            return False
+        self._dropped_run += 1
+        self.dropped += 1
+        return True
+
+    def update(self, row: Optional[Dict[str, float]]) -> Optional[str]:
+        """Feed one processed frame's profiler row; returns a description when a step is shed or restored"""
+        if not row:
+            return None
+        work = row.get('total', 0.0) - row.get('capture', 0.0)
+        self._overran = work > self.deadline_ms
+        self._frames += 1
+        self._work += work
+        if self._frames < self.window:
+            return None
+        mean = self._work / self._frames
+        self._frames = 0
+        self._work = 0.0
+        just_restored, self._just_restored = self._just_restored, False
+
+        if mean > self.deadline_ms:
+            self._calm = 0
+            if just_restored:
+                # The step we just restored doesn't fit yet - wait longer before trying again
+                self._recover_needed = min(self._recover_needed * 2, self.recover_windows * 8)
+            if self.level < len(self.steps):
+                return self._shed_step(mean)
+            return None
+
+        if self.level == 0:
+            self._recover_needed = self.recover_windows
+        elif mean < self.deadline_ms * self.headroom:
+            self._calm += 1
+            if self._calm >= self._recover_needed:
+                self._calm = 0
+                return self._restore_step(mean)
+        else:
+            self._calm = 0
+        return None
+
+    def _shed_step(self, mean: float) -> str:
+        step = self.steps[self.level]
+        if step == 'pose':
+            self._saved_pose = self.sizes.get('pose')
+            self.sizes['pose'] = self.pose_size
+        self.level += 1
+        self.changes += 1
+        return f"shed {self._label(step)} ({mean:.1f} ms > {self.deadline_ms:.1f} ms)"
+
+    def _restore_step(self, mean: float) -> str:
+        self.level -= 1
+        step = self.steps[self.level]
+        if step == 'pose':
+            self.sizes['pose'] = self._saved_pose
+        self.changes += 1
+        self._just_restored = True
+        return f"restored {self._label(step)} ({mean:.1f} ms < {self.deadline_ms * self.headroom:.1f} ms)"
+
+    def restore_all(self):
+        """Back to full quality (nothing shed)"""
+        while self.level:
+            self.level -= 1
+            if self.steps[self.level] == 'pose':
+                self.sizes['pose'] = self._saved_pose
+        self._calm = 0
+        self._overran = False
+        self._dropped_run = 0
+        self._recover_needed = self.recover_windows
+
+    def _label(self, step: str) -> str:
+        if step == 'face_mesh':
+            return f"face mesh (1 in {self.face_mesh_interval_shed} frames)"
+        if step == 'pose':
+            return f"pose resolution ({self.pose_size[0]}w)"
+        if step == 'frames':
+            return "frames (dropping while behind)"
+        return "preview drawing"
+
+    def describe(self) -> str:
+        if not self.level:
+            return f"full (<{self.deadline_ms:.0f}ms)"
+        return f"shedding {', '.join(self.shed)} (<{self.deadline_ms:.0f}ms)"
+
+    def summary(self) -> Dict:
+        return {'deadline_ms': self.deadline_ms, 'level': self.level, 'shed': list(self.shed),
+                'changes': self.changes, 'dropped': self.dropped}
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Command-line options shared by the control scripts"""
+    group = parser.add_argument_group('latency governor')
+    group.add_argument('--governor', action='store_true',
+                       help='Shed preview drawing, face mesh rate, pose resolution, then frames when behind')
+    group.add_argument('--deadline', type=float, default=33.3,
+                       help='Per-frame processing deadline for --governor (ms, default 33.3)')
+
+
+def from_args(args) -> Optional[LatencyGovernor]:
+    return LatencyGovernor(deadline_ms=args.deadline) if args.governor else None
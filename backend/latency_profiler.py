@@ -0,0 +1,218 @@
+"""
+Latency Profiler
+Per-stage timing for the gesture pipeline with rolling p50/p95/p99 statistics.
+
+Stages are timed with nested context managers; a stage's time excludes any
+stages nested inside it (e.g. 'injection' inside 'controllers'), so the
+per-stage numbers add up to the frame total. Results can be drawn as a HUD
+panel on the preview and exported as CSV/JSON.
+"""
+
+import csv
+import json
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+# Canonical stage order for display/export (unknown stages are appended)
+STAGE_ORDER = [
+    'capture', 'color', 'hands', 'pose', 'face_mesh',
+    'features', 'controllers', 'injection', 'overlay', 'display'
+]
+
+_NULL_STAGE = nullcontext()
+
+
+class LatencyProfiler:
+    """Rolling per-stage latency histograms for the main loop"""
+
+    def __init__(self, window: int = 300, enabled: bool = True):
+        self.enabled = enabled
+        self.window = window
+        self.frames = deque(maxlen=window)  # Per-frame {stage: ms} rows
+        self.frame_index = 0
+        self.show_hud = False
+
+        self._current: Optional[Dict[str, float]] = None
+        self._frame_start = 0.0
+        self._stack: List[list] = []
+        self._stages: List[str] = list(STAGE_ORDER)
+
+        # Cached summary so the HUD doesn't recompute percentiles every frame
+        self._summary_cache: Dict[str, Dict[str, float]] = {}
+        self._summary_time = 0.0
+        self.summary_interval = 0.5  # seconds
+
+    def reset(self, window: Optional[int] = None):
+        """Drop all recorded frames (optionally resizing the rolling window)"""
+        if window is not None:
+            self.window = window
+        self.frames = deque(maxlen=self.window)
+        self.frame_index = 0
+        self._current = None
+        self._stack = []
+        self._summary_cache = {}
+
+    def begin_frame(self):
+        """Start timing a new frame (call before reading the camera)"""
+        if not self.enabled:
+            return
+        self._current = {}
+        self._stack = []
+        self._frame_start = time.perf_counter()
+
+    def end_frame(self) -> float:
+        """Finish the current frame and return its total time in ms"""
+        if not self.enabled or self._current is None:
+            return 0.0
+        row = self._current
+        row['total'] = (time.perf_counter() - self._frame_start) * 1000.0
+        self.frames.append(row)
+        self.frame_index += 1
+        self._current = None
+        return row['total']
+
+    def cancel_frame(self):
+        """Abandon the current frame without recording it (e.g. a frame the governor dropped)"""
+        self._current = None
+        self._stack = []
+
+    def stage(self, name: str):
+        """Time a pipeline stage; nested stages are subtracted from their parent"""
+        if not self.enabled or self._current is None:
+            return _NULL_STAGE  # No frame in progress (e.g. landmark replay) - skip the generator
+        return self._timed_stage(name)
+
+    @contextmanager
+    def _timed_stage(self, name: str):
+        entry = [name, time.perf_counter(), 0.0]
+        self._stack.append(entry)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - entry[1]
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1][2] += elapsed
+            self.record(name, elapsed - entry[2])
+
+    def record(self, name: str, seconds: float):
+        """Add time to a stage of the current frame (accumulates repeated calls)"""
+        if not self.enabled or self._current is None:
+            return
+        if name not in self._stages:
+            self._stages.append(name)
+        self._current[name] = self._current.get(name, 0.0) + seconds * 1000.0
+
+    def stage_names(self) -> List[str]:
+        """Stages that have been recorded in the current window, in display order"""
+        seen = set()
+        for row in self.frames:
+            seen.update(row.keys())
+        return [name for name in self._stages if name in seen]
+
+    def percentiles(self, name: str) -> Dict[str, float]:
+        """p50/p95/p99/mean (ms) for a stage over the rolling window"""
+        values = np.fromiter((row.get(name, 0.0) for row in self.frames), dtype=np.float64,
+                             count=len(self.frames))
+        if values.size == 0:
+            return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'mean': 0.0}
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        return {'p50': float(p50), 'p95': float(p95), 'p99': float(p99), 'mean': float(values.mean())}
+
+    def summary(self, cached: bool = False) -> Dict[str, Dict[str, float]]:
+        """Percentiles for every stage plus the frame total"""
+        now = time.perf_counter()
+        if cached and self._summary_cache and now - self._summary_time < self.summary_interval:
+            return self._summary_cache
+        result = {name: self.percentiles(name) for name in self.stage_names()}
+        result['total'] = self.percentiles('total')
+        self._summary_cache = result
+        self._summary_time = now
+        return result
+
+    def toggle_hud(self) -> bool:
+        """Toggle the on-screen latency panel"""
+        self.show_hud = not self.show_hud
+        return self.show_hud
+
+    def draw_hud(self, frame: np.ndarray, x: int = None, y: int = 140):
+        """Draw per-stage p50/p95/p99 and a frame-time histogram on the frame"""
+        if not self.show_hud or not self.frames:
+            return
+        h, w = frame.shape[:2]
+        stats = self.summary(cached=True)
+        rows = [name for name in stats if name != 'total'] + ['total']
+
+        panel_w = 330
+        panel_h = 40 + 18 * len(rows) + 60
+        if x is None:
+            x = w - panel_w - 10
+        x = max(0, x)
+        y = max(0, min(y, h - panel_h))
+
+        # Darken only the panel region instead of blending a full-frame copy
+        roi = frame[y:y + panel_h, x:x + panel_w]
+        roi[:] = (roi * 0.25).astype(np.uint8)
+        cv2.rectangle(frame, (x, y), (x + panel_w, y + panel_h), (255, 255, 255), 1)
+        cv2.putText(frame, "LATENCY (ms)   p50    p95    p99", (x + 8, y + 20),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.45, (255, 255, 255), 1)
+
+        ty = y + 40
+        for name in rows:
+            s = stats[name]
+            color = (0, 255, 255) if name == 'total' else (200, 200, 200)
+            cv2.putText(frame, f"{name[:12]:<12} {s['p50']:6.1f} {s['p95']:6.1f} {s['p99']:6.1f}",
+                        (x + 8, ty), cv2.FONT_HERSHEY_PLAIN, 1.0, color, 1)
+            ty += 18
+
+        # Frame-time histogram (0-100 ms in 5 ms bins)
+        totals = np.fromiter((row['total'] for row in self.frames), dtype=np.float64, count=len(self.frames))
+        counts, _ = np.histogram(np.clip(totals, 0, 99.9), bins=20, range=(0, 100))
+        peak = max(1, int(counts.max()))
+        base_y = y + panel_h - 8
+        bar_w = (panel_w - 16) // 20
+        for i, count in enumerate(counts):
+            bar_h = int(45 * count / peak)
+            if bar_h:
+                bx = x + 8 + i * bar_w
+                cv2.rectangle(frame, (bx, base_y - bar_h), (bx + bar_w - 2, base_y), (0, 200, 255), -1)
+
+    def export_csv(self, path: str):
+        """Write the per-frame stage timings in the rolling window to CSV"""
+        stages = self.stage_names()
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['frame'] + stages + ['total'])
+            first = self.frame_index - len(self.frames)
+            for i, row in enumerate(self.frames):
+                writer.writerow([first + i] + [f"{row.get(name, 0.0):.3f}" for name in stages]
+                                + [f"{row['total']:.3f}"])
+
+    def export_json(self, path: str):
+        """Write the percentile summary to JSON"""
+        data = {
+            'frames': len(self.frames),
+            'window': self.window,
+            'stages': self.summary(),
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+    def export(self, prefix: str = 'latency_profile') -> List[str]:
+        """Export both CSV and JSON with a timestamped file name"""
+        stamp = time.strftime('%Y%m%d_%H%M%S')
+        csv_path = f"{prefix}_{stamp}.csv"
+        json_path = f"{prefix}_{stamp}.json"
+        self.export_csv(csv_path)
+        self.export_json(json_path)
+        print(f"📈 Latency profile exported: {csv_path}, {json_path}")
+        return [csv_path, json_path]
+
+
+# Global instance
+latency_profiler = LatencyProfiler()
@@ -6,50 +6,91 @@ Combines:
 - Tongue tracking for spray emote (from tongue_tracking.py)
 
 Controls:
-- 't' to toggle control ON/OFF
+- 'g' to toggle control ON/OFF
+- 'c' to calibrate (neutral pose and range of motion, see calibration.py)
 - 'q' or ESC to quit
 """
 
+import argparse
+import math
 import cv2
 import mediapipe as mp
-import numpy as np
-import pyautogui
 import time
-from pynput.mouse import Controller as MouseController
-
-# PyAutoGUI Configuration for continuous key holding
-pyautogui.PAUSE = 0  # Remove pause for continuous operation
-pyautogui.FAILSAFE = False  # Disable failsafe for gesture control
+from aim_prediction import AimPredictor
+from calibration import Calibrator, CalibrationStore
+from camera_capture import open_camera
+from landmark_drawing import FACE_CONTOUR_SKELETON, HAND_SKELETON, POSE_SKELETON
+from latency_profiler import latency_profiler
+from input_backends import get_default_backend
+from frame_buffers import FrameBufferPool, blend_rect
+from inference_resolution import InferenceResolution
+from model_activation import ModelActivation
+from model_warmup import print_reports, warm_up_models, warmup_image
+from gesture_frame import NO_KEYS, GestureFrame
+from gesture_state_machine import GestureMachine, Guard, Transition, legacy_frames
+from hand_tracker import HandTracker
 
 # MediaPipe initialization
 mp_hands = mp.solutions.hands
 mp_pose = mp.solutions.pose
 mp_face_mesh = mp.solutions.face_mesh
-mp_drawing = mp.solutions.drawing_utils
+
+# MediaPipe graph settings (shared with the inference worker processes)
+MODEL_PARAMS = {
+    'hands': dict(
+        static_image_mode=False,
+        max_num_hands=2,
+        min_detection_confidence=0.7,
+        min_tracking_confidence=0.5
+    ),
+    'pose': dict(
+        static_image_mode=False,
+        model_complexity=1,
+        enable_segmentation=False,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5
+    ),
+    'face_mesh': dict(
+        max_num_faces=1,
+        refine_landmarks=True,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5
+    ),
+}
+
+# When face mesh runs: every frame, only while the tongue action is enabled,
+# every face_mesh_interval frames (landmarks are held in between), or never.
+# Outside 'always', head pitch comes from the pose landmarks.
+FACE_MESH_MODES = ('always', 'tongue', 'low_rate', 'off')
+
+# Joint angle (degrees) above which a finger counts as extended; the default of
+# RuleGestures.finger_extended_angle, which threshold_tuner.py profiles tune per system
+FINGER_EXTENDED_ANGLE = 140.0
 
 def calculate_angle(point1, point2, point3):
-    vector1 = np.array([point1[0] - point2[0], point1[1] - point2[1]])
-    vector2 = np.array([point3[0] - point2[0], point3[1] - point2[1]])
-    cosine = np.dot(vector1, vector2) / (np.linalg.norm(vector1) * np.linalg.norm(vector2) + 1e-6)
-    angle = np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
+    # Scalar math instead of NumPy: 2-element arrays cost more to build than to compute
+    v1x, v1y = point1[0] - point2[0], point1[1] - point2[1]
+    v2x, v2y = point3[0] - point2[0], point3[1] - point2[1]
+    cosine = (v1x * v2x + v1y * v2y) / (math.hypot(v1x, v1y) * math.hypot(v2x, v2y) + 1e-6)
+    angle = math.degrees(math.acos(max(-1.0, min(1.0, cosine))))
     return angle
 
-def is_finger_extended(landmarks, finger_tip_id, finger_pip_id, finger_mcp_id):
+def is_finger_extended(landmarks, finger_tip_id, finger_pip_id, finger_mcp_id, extended_angle=FINGER_EXTENDED_ANGLE):
     tip = [landmarks[finger_tip_id].x, landmarks[finger_tip_id].y]
     pip = [landmarks[finger_pip_id].x, landmarks[finger_pip_id].y]
     mcp = [landmarks[finger_mcp_id].x, landmarks[finger_mcp_id].y]
     angle = calculate_angle(tip, pip, mcp)
-    return angle > 140  # Increased threshold to be more strict
+    return angle > extended_angle
 
-def is_gun_gesture(hand_landmarks):
+def is_gun_gesture(hand_landmarks, extended_angle=FINGER_EXTENDED_ANGLE):
     """Detect gun gesture (index out, bottom 3 curled)"""
     if hand_landmarks is None:
         return False
     landmarks = hand_landmarks.landmark
-    index_extended = is_finger_extended(landmarks, 8, 6, 5)
-    middle_curled = not is_finger_extended(landmarks, 12, 10, 9)
-    ring_curled = not is_finger_extended(landmarks, 16, 14, 13)
-    pinky_curled = not is_finger_extended(landmarks, 20, 18, 17)
+    index_extended = is_finger_extended(landmarks, 8, 6, 5, extended_angle)
+    middle_curled = not is_finger_extended(landmarks, 12, 10, 9, extended_angle)
+    ring_curled = not is_finger_extended(landmarks, 16, 14, 13, extended_angle)
+    pinky_curled = not is_finger_extended(landmarks, 20, 18, 17, extended_angle)
     is_gun = index_extended and middle_curled and ring_curled and pinky_curled
     return is_gun
 
@@ -90,7 +131,7 @@ def are_bottom_fingers_curled(hand_landmarks):
     return curled_count >= 2
 
 
-def detect_left_hand_gestures(hand_landmarks):
+def detect_left_hand_gestures(hand_landmarks, extended_angle=FINGER_EXTENDED_ANGLE):
     """Detect left hand gestures for crouch/jump"""
     try:
         if not hasattr(hand_landmarks, 'landmark') or len(hand_landmarks.landmark) < 21:
@@ -99,11 +140,11 @@ def detect_left_hand_gestures(hand_landmarks):
         landmarks = hand_landmarks.landmark
         
         # Check individual finger states - for palm-facing camera, we check if fingers are DOWN
-        thumb_down = not is_finger_extended(landmarks, 4, 3, 2)
-        index_down = not is_finger_extended(landmarks, 8, 6, 5)
-        middle_down = not is_finger_extended(landmarks, 12, 10, 9)
-        ring_down = not is_finger_extended(landmarks, 16, 14, 13)
-        pinky_down = not is_finger_extended(landmarks, 20, 18, 17)
+        thumb_down = not is_finger_extended(landmarks, 4, 3, 2, extended_angle)
+        index_down = not is_finger_extended(landmarks, 8, 6, 5, extended_angle)
+        middle_down = not is_finger_extended(landmarks, 12, 10, 9, extended_angle)
+        ring_down = not is_finger_extended(landmarks, 16, 14, 13, extended_angle)
+        pinky_down = not is_finger_extended(landmarks, 20, 18, 17, extended_angle)
         
         # Gesture detection based on fingers DOWN
         fingers_down = [thumb_down, index_down, middle_down, ring_down, pinky_down]
@@ -120,6 +161,31 @@ def detect_left_hand_gestures(hand_landmarks):
         print(f"Error in detect_left_hand_gestures: {e}")
         return "error", None
 
+class RuleGestures:
+    """
+    The hand-tuned predicates above as a gesture source for the controllers;
+    gesture_classifier.GestureClassifier is the learned alternative
+    """
+    def __init__(self, finger_extended_angle=FINGER_EXTENDED_ANGLE):
+        self.finger_extended_angle = finger_extended_angle
+    
+    def classify(self, left_hand=None, right_hand=None):
+        pass  # Predicates are evaluated per hand on demand
+    
+    def gun(self, hand):
+        return is_gun_gesture(hand, self.finger_extended_angle)
+    
+    def curled(self, hand):
+        return hand is not None and are_bottom_fingers_curled(hand)
+    
+    def thumb_down(self, hand):
+        return hand is not None and is_thumb_down(hand)
+    
+    def left_gesture(self, hand):
+        return detect_left_hand_gestures(hand, self.finger_extended_angle)[0]
+
+RULE_GESTURES = RuleGestures()
+
 def calculate_head_pose(face_landmarks, frame_width, frame_height):
     """Calculate head pose (yaw and pitch for W/S movement)"""
     try:
@@ -148,6 +214,40 @@ def calculate_head_pose(face_landmarks, frame_width, frame_height):
         print(f"Error calculating head pose: {e}")
         return 0, 0
 
+# Pose has no forehead/chin points; the nose is located between the eye line and the
+# mouth line instead and mapped onto the face mesh forehead->chin scale (canonical
+# proportions, forehead=0, chin=1) so calculate_head_pose's thresholds still apply.
+FACE_EYE_LINE = 0.33
+FACE_MOUTH_LINE = 0.73
+
+def calculate_head_pose_from_pose(pose_landmarks, frame_width, frame_height):
+    """Calculate head pose (yaw and pitch for W/S movement) from the Pose head landmarks - no face mesh needed"""
+    try:
+        landmarks = pose_landmarks.landmark
+        nose = landmarks[mp_pose.PoseLandmark.NOSE]
+        left_eye = landmarks[mp_pose.PoseLandmark.LEFT_EYE]
+        right_eye = landmarks[mp_pose.PoseLandmark.RIGHT_EYE]
+        mouth_left = landmarks[mp_pose.PoseLandmark.MOUTH_LEFT]
+        mouth_right = landmarks[mp_pose.PoseLandmark.MOUTH_RIGHT]
+        
+        # Yaw (left/right) - same definition as calculate_head_pose
+        eye_center_x = (left_eye.x + right_eye.x) / 2
+        yaw = (nose.x - eye_center_x) * 100
+        
+        # Pitch (forward/backward) - nose position between eye line (0) and mouth line (1)
+        eye_y = (left_eye.y + right_eye.y) / 2
+        mouth_y = (mouth_left.y + mouth_right.y) / 2
+        span = mouth_y - eye_y
+        nose_between = (nose.y - eye_y) / span if span > 0 else 0.5
+        nose_position = FACE_EYE_LINE + nose_between * (FACE_MOUTH_LINE - FACE_EYE_LINE)
+        pitch = (nose_position - 0.5) * 100
+        
+        return yaw, pitch
+        
+    except Exception as e:
+        print(f"Error calculating head pose from pose: {e}")
+        return 0, 0
+
 def calculate_lean_pose(pose_landmarks, frame_width, frame_height):
     """Calculate body lean for A/D movement based on shoulder and hip positions"""
     try:
@@ -173,8 +273,8 @@ def calculate_lean_pose(pose_landmarks, frame_width, frame_height):
         print(f"Error calculating lean pose: {e}")
         return 0
 
-def detect_mouth_open(face_landmarks):
-    """Detect if tongue is out (mouth open)"""
+def detect_mouth_open(face_landmarks, threshold=0.015):
+    """Detect if tongue is out (mouth open); threshold is the lip gap in normalized image height"""
     try:
         landmarks = face_landmarks.landmark
         
@@ -185,121 +285,212 @@ def detect_mouth_open(face_landmarks):
         # Calculate vertical separation between lips
         lip_separation = abs(upper_lip_bottom.y - lower_lip_top.y)
         
-        # Threshold for mouth opening (adjustable)
-        threshold = 0.015
-        
         return lip_separation > threshold
     except:
         return False
 
+def add_face_mesh_arguments(parser):
+    """Face mesh scheduling options shared by the control scripts"""
+    group = parser.add_argument_group('face mesh')
+    group.add_argument('--face-mesh', choices=FACE_MESH_MODES, default='always',
+                       help="When face mesh runs: every frame, only with the tongue action, every "
+                            "--face-mesh-interval frames, or never (head pitch then comes from pose)")
+    group.add_argument('--face-mesh-interval', type=int, default=6, help="Frames between face mesh runs in low_rate mode")
+    group.add_argument('--head-pose', choices=('face', 'pose'),
+                       help="Head pitch source for W/S (default face with --face-mesh always, else pose)")
+    group.add_argument('--no-tongue', action='store_true', help='Disable the tongue/spray action')
+
+def face_mesh_options(args):
+    """
+    LeaningControlSystem keyword arguments from add_face_mesh_arguments options.
+    Without the tongue action and with head pitch not explicitly from the face, nothing reads
+    the face mesh, so it is turned off (pitch then comes from pose).
+    """
+    face_mesh_mode = args.face_mesh
+    if args.no_tongue and args.head_pose != 'face' and face_mesh_mode != 'off':
+        print(f"--no-tongue: face mesh off (was '{face_mesh_mode}'), head pitch from pose")
+        face_mesh_mode = 'off'
+    return dict(face_mesh_mode=face_mesh_mode, face_mesh_interval=args.face_mesh_interval,
+                head_pose_source=args.head_pose, tongue_enabled=not args.no_tongue)
+
+class ResumeGestureDetector:
+    """Both palms open (all four fingers extended on each hand) held for hold_ms re-enables control"""
+    def __init__(self, hold_ms=1000.0):
+        self.hold_ms = hold_ms
+        self.open_since = None
+    
+    def update(self, hand_landmarks_list, now=None):
+        now = time.perf_counter() if now is None else now
+        open_palms = bool(hand_landmarks_list) and len(hand_landmarks_list) >= 2 and all(
+            all(is_finger_extended(hand.landmark, tip, tip - 2, tip - 3) for tip in (8, 12, 16, 20))
+            for hand in hand_landmarks_list[:2]
+        )
+        if not open_palms:
+            self.open_since = None
+            return False
+        if self.open_since is None:
+            self.open_since = now
+        if (now - self.open_since) * 1000.0 >= self.hold_ms:
+            self.open_since = None
+            return True
+        return False
+
+# Gun lock: a gun gesture locks it, uncurling the bottom fingers unlocks it, and a
+# lock survives the right hand going missing for grace_ms
+def gun_guards(gestures):
+    return {
+        'hand': Guard(lambda hand: hand is not None, 'hand'),
+        'gun': Guard(gestures.gun, 'hand'),
+        'curled': Guard(gestures.curled, 'hand'),
+    }
+
+GUN_GUARDS = gun_guards(RULE_GESTURES)
+
+def gun_lock_table(grace_ms):
+    return [
+        Transition('unlocked', 'locked', when='gun', event='locked'),
+        Transition('locked', 'lost', unless='hand'),
+        Transition('locked', 'unlocked', unless='curled', event='unlocked'),
+        Transition('lost', 'unlocked', unless='hand', after_ms=grace_ms, event='expired'),
+        Transition('lost', 'locked', when=('hand', 'curled')),
+        Transition('lost', 'unlocked', when='hand', unless='curled', event='unlocked'),
+    ]
+
 class StickyGunDetector:
     """Gun gesture detector with sticky behavior (from dual_hand_tracking.py)"""
-    def __init__(self, grace_period=30):
-        self.is_locked = False
-        self.lock_frames = 0
-        self.grace_period = grace_period
-        self.frames_without_hand = 0
-        
-    def update(self, hand_landmarks):
-        if hand_landmarks is None:
-            if self.is_locked:
-                self.frames_without_hand += 1
-                if self.frames_without_hand > self.grace_period:
-                    self.is_locked = False
-                    self.lock_frames = 0
-                    self.frames_without_hand = 0
-                    print("🔫 Gun UNLOCKED! (no hand)")
-                    return False
-                else:
-                    return True
-            else:
-                self.frames_without_hand = 0
-                return False
-        
-        self.frames_without_hand = 0
-        gun_detected = is_gun_gesture(hand_landmarks)
-        bottom_fingers_curled = are_bottom_fingers_curled(hand_landmarks)
-        
-        if not self.is_locked:
-            if gun_detected:
-                self.is_locked = True
-                self.lock_frames = 0
-                print("🔫 Gun LOCKED!")
-                return True
-            else:
-                return False
-        else:
-            self.lock_frames += 1
-            if not bottom_fingers_curled:
-                self.is_locked = False
-                self.lock_frames = 0
-                print("🔫 Gun UNLOCKED!")
-                return False
-            else:
-                return True
+    def __init__(self, grace_ms=1000.0, grace_period=None, gestures=None):
+        if grace_period is not None:  # Old frame-count setting
+            grace_ms = legacy_frames('grace_period', grace_period)
+        self.grace_ms = grace_ms
+        guards = GUN_GUARDS if gestures is None else gun_guards(gestures)
+        self.machine = GestureMachine('gun', 'unlocked', gun_lock_table(grace_ms), guards)
+        self.machine.subscribe(self._announce)
+    
+    @property
+    def is_locked(self):
+        return self.machine.state != 'unlocked'
+    
+    def update(self, hand_landmarks, now=None):
+        self.machine.update(now, {'hand': hand_landmarks})
+        return self.is_locked
+    
+    def reset(self, now=None):
+        self.machine.reset(now)
+    
+    def _announce(self, event, now):
+        print({'locked': "🔫 Gun LOCKED!", 'unlocked': "🔫 Gun UNLOCKED!",
+               'expired': "🔫 Gun UNLOCKED! (no hand)"}[event])
+
+# Thumb shooting: thumb down presses the mouse button, thumb up releases it. Losing the
+# gun releases too, and the thumb must come up before the next shot. Edge-triggered: the
+# controller starts (and returns after losing the gun) in 'held', so a thumb already down
+# when the gun locks doesn't fire until it has come up and gone down again.
+def shooting_guards(gestures):
+    return {
+        'armed': Guard(lambda hand, gun_active: gun_active and hand is not None, 'hand', 'gun_active'),
+        'thumb_down': Guard(gestures.thumb_down, 'hand'),
+    }
+
+SHOOTING_GUARDS = shooting_guards(RULE_GESTURES)
+
+SHOOTING_TABLE = [
+    Transition('ready', 'firing', when=('armed', 'thumb_down'), event='pressed'),
+    Transition('firing', 'held', unless='armed', event='released'),
+    Transition('firing', 'ready', unless='thumb_down', event='released'),
+    Transition('ready', 'held', unless='armed'),
+    Transition('held', 'ready', when='armed', unless='thumb_down'),
+]
 
 class ThumbShootingController:
     """Mouse click controller based on thumb position (from dual_hand_tracking.py)"""
-    def __init__(self):
-        self.is_pressed = False
-        self.last_thumb_down = False
-        
-    def update(self, hand_landmarks, gun_active):
+    def __init__(self, input_backend=None, gestures=None):
+        self.input = input_backend or get_default_backend()
+        guards = SHOOTING_GUARDS if gestures is None else shooting_guards(gestures)
+        self.machine = GestureMachine('shooting', 'held', SHOOTING_TABLE, guards)
+        self.machine.subscribe(self._inject)
+        self.inject = True  # False: the thumb is still tracked, but no click is sent
+        self.button_down = False  # Mouse button held through the input backend
+    
+    @property
+    def is_pressed(self):
+        return self.machine.state == 'firing'
+    
+    def update(self, hand_landmarks, gun_active, now=None, inject=True):
+        self.inject = inject
+        self.machine.update(now, {'hand': hand_landmarks, 'gun_active': gun_active})
         if not gun_active or hand_landmarks is None:
-            self.force_release()
             return False, "Gun not active"
-        
-        thumb_down = is_thumb_down(hand_landmarks)
-        
-        # Detect thumb press (transition from up to down)
-        if thumb_down and not self.last_thumb_down:
-            if not self.is_pressed:
-                pyautogui.mouseDown()
-                self.is_pressed = True
-                return True, "FIRING!"
-        
-        # Detect thumb release (transition from down to up)
-        elif not thumb_down and self.last_thumb_down:
-            if self.is_pressed:
-                pyautogui.mouseUp()
-                self.is_pressed = False
-                return False, "Ready"
-        
-        self.last_thumb_down = thumb_down
-        
         if self.is_pressed:
             return True, "FIRING!"
+        elif self.machine.state == 'held':
+            return False, "Thumb up to arm"
         else:
             return False, "Ready"
     
     def force_release(self):
+        """Gun lost: release the button; the thumb has to come up again before the next shot"""
         if self.is_pressed:
-            pyautogui.mouseUp()
-            self.is_pressed = False
+            self.machine.set_state('held', event='released')
+        elif self.machine.state != 'held':
+            self.machine.set_state('held')
+    
+    def release_button(self):
+        """Let go of the mouse button if this controller holds it (the recognized state is kept)"""
+        if self.button_down:
+            with latency_profiler.stage('injection'):
+                self.input.mouse_up()
+            self.button_down = False
+    
+    def _inject(self, event, now):
+        if event != 'pressed':
+            self.release_button()
+        elif self.inject:
+            with latency_profiler.stage('injection'):
+                self.input.mouse_down()
+            self.button_down = True
 
 class SmoothMouseController:
     """Relative mouse controller optimized for FPS games - TRUE relative positioning, no snapping"""
-    def __init__(self, sensitivity=2.5):
+    def __init__(self, sensitivity=2.5, prediction=True, input_backend=None):
         self.sensitivity = sensitivity
+        self.range_scale = 1.0  # Per-user hand range of motion (calibration.py)
         self.debug_counter = 0
-        self.mouse = MouseController()
+        self.input = input_backend or get_default_backend()
         self.last_x = None
         self.last_y = None
         self.gun_was_active = False  # Track gun state to prevent snapping
+        self.hand_id = None  # HandTracker id of the hand being followed
+        # Extrapolate the aim point to injection time to hide pipeline latency
+        self.predictor = AimPredictor() if prediction else None
         
-    def update(self, hand_landmarks, gun_active):
+    def update(self, hand_landmarks, gun_active, capture_time=None, hand_id=None, read_time=None):
+        """
+        capture_time: frame timestamp (drives the prediction); read_time: perf_counter when the frame
+        was read, for the latency feedback (None skips it, e.g. replayed timestamps on another clock)
+        """
         if not gun_active or hand_landmarks is None:
             # DON'T reset position - keep last known position to prevent snapping
             self.gun_was_active = False
             return
+        
+        if hand_id != self.hand_id:
+            # A different hand: re-baseline (and restart prediction) instead of jumping to it
+            self.hand_id = hand_id
+            self.gun_was_active = False
             
         try:
             # Get index finger tip position (normalized 0-1)
             index_tip = hand_landmarks.landmark[8]
+            tip_x, tip_y = index_tip.x, index_tip.y
+            
+            if self.predictor is not None:
+                if not self.gun_was_active:
+                    self.predictor.reset()
+                tip_x, tip_y = self.predictor.update(tip_x, tip_y, capture_time)
             
             # Convert to screen pixels for tracking
-            current_x = index_tip.x * 1920
-            current_y = index_tip.y * 1080
+            current_x = tip_x * 1920
+            current_y = tip_y * 1080
             
             # Check if this is first frame after gun activation
             if not self.gun_was_active:
@@ -307,11 +498,17 @@ class SmoothMouseController:
                 print("🔄 Position tracking reestablished (no snap)")
             elif self.last_x is not None and self.last_y is not None:
                 # Subsequent frames - calculate and apply delta movement
-                delta_x = (current_x - self.last_x) * self.sensitivity
-                delta_y = (current_y - self.last_y) * self.sensitivity
+                gain = self.sensitivity * self.range_scale
+                delta_x = (current_x - self.last_x) * gain
+                delta_y = (current_y - self.last_y) * gain
                 
-                # Use pynput for better game compatibility
-                self.mouse.move(int(delta_x), int(delta_y))
+                # Relative move (pynput by default for better game compatibility)
+                with latency_profiler.stage('injection'):
+                    self.input.move_relative(int(delta_x), int(delta_y))
+                
+                # Feed measured capture-to-injection latency back into the prediction horizon
+                if self.predictor is not None and read_time is not None:
+                    self.predictor.observe_latency(time.perf_counter() - read_time)
                 
                 # Debug output every 30 frames
                 self.debug_counter += 1
@@ -326,60 +523,79 @@ class SmoothMouseController:
         except Exception as e:
             print(f"Mouse control error: {e}")
 
+# Left hand: each action gesture taps its key once when it appears; it has to be gone for
+# debounce_ms before it (or another gesture) can tap again
+LEFT_HAND_KEYS = {'one_down': 'ctrl', 'four_down': 'space'}  # Crouch, jump
+
+LEFT_HAND_GUARDS = {
+    gesture: Guard(lambda name, gesture=gesture: name == gesture, 'gesture') for gesture in LEFT_HAND_KEYS
+}
+
+def left_hand_table(debounce_ms):
+    table = [Transition('idle', gesture, when=gesture, event=gesture) for gesture in LEFT_HAND_KEYS]
+    table += [Transition(gesture, 'idle', unless=gesture, after_ms=debounce_ms) for gesture in LEFT_HAND_KEYS]
+    return table
+
 class LeftHandGestureController:
     """Left hand gesture controller for crouch/jump (from dual_hand_tracking.py)"""
-    def __init__(self):
-        self.last_gesture = None
-        self.last_gesture_time = 0
-        self.gesture_debounce = 0.1
+    def __init__(self, input_backend=None, debounce_ms=100.0, gestures=None):
+        self.input = input_backend or get_default_backend()
+        self.gestures = gestures or RULE_GESTURES
+        self.debounce_ms = debounce_ms
+        self.machine = GestureMachine('left_hand', 'idle', left_hand_table(debounce_ms), LEFT_HAND_GUARDS)
+        self.machine.subscribe(self._inject)
+        self.inject = True
         
-    def update(self, hand_landmarks, control_enabled):
+    def update(self, hand_landmarks, control_enabled, now=None):
+        """Recognize the gesture every frame; keys are only pressed while control_enabled"""
         try:
-            if not control_enabled or hand_landmarks is None:
-                return None, "Control Disabled"
+            if hand_landmarks is None:
+                return None, "No left hand"
+            self.inject = control_enabled
             
-            current_time = time.time()
-            gesture_name, action_key = detect_left_hand_gestures(hand_landmarks)
+            gesture_name = self.gestures.left_gesture(hand_landmarks)
+            action_key = LEFT_HAND_KEYS.get(gesture_name)
             
             if gesture_name == "error" or gesture_name == "invalid":
                 return None, "Gesture detection error"
             
-            if action_key and gesture_name != self.last_gesture:
-                if current_time - self.last_gesture_time > self.gesture_debounce:
-                    pyautogui.press(action_key)
-                    self.last_gesture = gesture_name
-                    self.last_gesture_time = current_time
-                    return action_key, f"Pressed '{action_key}' - {gesture_name}"
-                else:
-                    return None, f"Gesture detected (debounced): {gesture_name}"
-            elif gesture_name == self.last_gesture:
+            if self.machine.update(now, {'gesture': gesture_name}):
+                verb = "Pressed" if control_enabled else "Recognized"
+                return action_key, f"{verb} '{action_key}' - {gesture_name}"
+            elif gesture_name == self.machine.state:
                 return None, f"Holding: {gesture_name}"
+            elif action_key:
+                return None, f"Gesture detected (debounced): {gesture_name}"
             else:
                 return None, "Left hand ready"
                 
         except Exception as e:
             print(f"Error in LeftHandGestureController: {e}")
             return None, "Error"
+    
+    def _inject(self, gesture, now):
+        if self.inject:
+            with latency_profiler.stage('injection'):
+                self.input.press(LEFT_HAND_KEYS[gesture])
 
 class WASDController:
     """Hybrid controller: Head pose for W/S, body lean for A/D"""
-    def __init__(self, lean_threshold=5, pitch_threshold=8, pitch_threshold_back=12, hysteresis=0.7):
+    def __init__(self, lean_threshold=5, pitch_threshold=8, pitch_threshold_back=12, hysteresis=0.7,
+                 input_backend=None):
+        self.input = input_backend or get_default_backend()
         self.lean_threshold = lean_threshold  # For A/D (left/right lean)
         self.pitch_threshold = pitch_threshold  # For W (head forward)
         self.pitch_threshold_back = pitch_threshold_back  # For S (head backward)
         self.hysteresis = hysteresis  # Multiplier for release threshold
-        self.current_keys = set()  # Currently pressed keys
+        self.current_keys = set()  # Currently recognized keys (hysteresis state)
+        self.pressed_keys = set()  # Keys held down through the input backend
         
     def update(self, left_right_lean, head_pitch, control_enabled):
         """
-        Update WASD keys based on body lean (A/D) and head pose (W/S)
+        Update WASD keys based on body lean (A/D) and head pose (W/S); the keys are recognized
+        every frame but only injected while control_enabled
         Returns: (active_keys, key_states)
         """
-        if not control_enabled:
-            # Release all keys if control disabled
-            self.release_all_keys()
-            return set(), {'w': False, 'a': False, 's': False, 'd': False}
-        
         desired_keys = set()
         
         # Calculate release thresholds (closer to center)
@@ -426,23 +642,12 @@ class WASDController:
         elif head_pitch < -self.pitch_threshold:
             desired_keys.add('s')  # Start pressing S (head forward)
         
-        # Release keys that should no longer be pressed
-        keys_to_release = self.current_keys - desired_keys
-        for key in keys_to_release:
-            pyautogui.keyUp(key)
-            print(f"Released: {key.upper()}")
-        
-        # Press keys that should be pressed
-        keys_to_press = desired_keys - self.current_keys
-        for key in keys_to_press:
-            pyautogui.keyDown(key)
-            print(f"Pressed: {key.upper()}")
-            
-        # Continuously hold down keys that should remain pressed
-        for key in desired_keys:
-            pyautogui.keyDown(key)  # Keep pressing the key to ensure it stays down
-        
         self.current_keys = desired_keys
+        if not control_enabled:
+            # Recognition only: release anything still held from before
+            self.release_all_keys()
+        else:
+            self._inject(desired_keys)
         
         # Create key state dict for display
         key_states = {
@@ -454,78 +659,158 @@ class WASDController:
         
         return desired_keys, key_states
     
+    def _inject(self, desired_keys):
+        # Release keys that should no longer be pressed
+        keys_to_release = self.pressed_keys - desired_keys
+        keys_to_press = desired_keys - self.pressed_keys
+        with latency_profiler.stage('injection'):
+            for key in keys_to_release:
+                self.input.key_up(key)
+                print(f"Released: {key.upper()}")
+            
+            # Press keys that should be pressed
+            for key in keys_to_press:
+                self.input.key_down(key)
+                print(f"Pressed: {key.upper()}")
+                
+            # Continuously hold down keys that should remain pressed
+            for key in desired_keys:
+                self.input.key_down(key)  # Keep pressing the key to ensure it stays down
+        
+        self.pressed_keys = desired_keys
+    
     def release_all_keys(self):
         """Release all currently pressed keys"""
-        for key in self.current_keys:
-            pyautogui.keyUp(key)
-        if self.current_keys:
-            print(f"Released all keys: {', '.join([k.upper() for k in self.current_keys])}")
-        self.current_keys = set()
+        with latency_profiler.stage('injection'):
+            for key in self.pressed_keys:
+                self.input.key_up(key)
+        if self.pressed_keys:
+            print(f"Released all keys: {', '.join([k.upper() for k in self.pressed_keys])}")
+        self.pressed_keys = set()
+
+# Tongue: mouth held open for hold_ms taps T once; it fires again only after closing
+def tongue_guards(controller):
+    # Reads the controller's current sensitivity (lip gap threshold) at evaluation time
+    return {'mouth_open': Guard(lambda face: detect_mouth_open(face, controller.sensitivity), 'face')}
+
+def tongue_table(hold_ms):
+    return [
+        Transition('closed', 'opening', when='mouth_open'),
+        Transition('opening', 'closed', unless='mouth_open'),
+        Transition('opening', 'out', when='mouth_open', after_ms=hold_ms, event='pressed'),
+        Transition('out', 'closed', unless='mouth_open'),
+    ]
 
 class TongueController:
     """Tongue detection controller for spray emote (from tongue_tracking.py)"""
-    def __init__(self, sensitivity=0.015, debounce_frames=10):
+    def __init__(self, sensitivity=0.015, hold_ms=300.0, input_backend=None, debounce_frames=None):
+        if debounce_frames is not None:  # Old frame-count setting
+            hold_ms = legacy_frames('debounce_frames', debounce_frames)
+        self.input = input_backend or get_default_backend()
         self.sensitivity = sensitivity
-        self.debounce_frames = debounce_frames
-        self.frames_held = 0
-        self.last_tongue_out = False
-        
-    def update(self, face_landmarks, control_enabled):
-        if not control_enabled or face_landmarks is None:
-            self.frames_held = 0
-            self.last_tongue_out = False
-            return False, "Control Disabled"
-        
-        tongue_out = detect_mouth_open(face_landmarks)
-        
-        if tongue_out:
-            self.frames_held += 1
-            if self.frames_held >= self.debounce_frames and not self.last_tongue_out:
-                pyautogui.press('t')
-                self.last_tongue_out = True
-                return True, "Tongue out - T pressed!"
-        else:
-            self.frames_held = 0
-            self.last_tongue_out = False
+        self.hold_ms = hold_ms
+        self.machine = GestureMachine('tongue', 'closed', tongue_table(hold_ms), tongue_guards(self))
+        self.machine.subscribe(self._inject)
+        self.inject = True
+        
+    def update(self, face_landmarks, control_enabled, now=None):
+        """Recognize the tongue every frame; T is only pressed while control_enabled"""
+        if face_landmarks is None:
+            self.machine.reset(now)
+            return False, "No face"
+        self.inject = control_enabled
         
-        return tongue_out, "Tongue ready"
+        features = {'face': face_landmarks}
+        if self.machine.update(now, features):
+            return True, "Tongue out - T pressed!"
+        
+        return self.machine.guard('mouth_open', features), "Tongue ready"
+    
+    def _inject(self, event, now):
+        if self.inject:
+            with latency_profiler.stage('injection'):
+                self.input.press('t')
 
 class LeaningControlSystem:
     """Complete leaning-based CS:GO control system"""
-    def __init__(self):
-        # Initialize MediaPipe
-        self.hands = mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=2,
-            min_detection_confidence=0.7,
-            min_tracking_confidence=0.5
-        )
+    def __init__(self, input_backend=None, load_models=True, inference=None, workers=None,
+                 face_mesh_mode='always', face_mesh_interval=6, head_pose_source=None, tongue_enabled=True,
+                 activation=None, gesture_resume=False, warmup=True, governor=None, gestures=None,
+                 profile=None, calibration=None):
+        # Keyboard/mouse output (desktop by default, NullInputBackend for offline replay)
+        self.input = input_backend or get_default_backend()
         
-        self.pose = mp_pose.Pose(
-            static_image_mode=False,
-            model_complexity=1,
-            enable_segmentation=False,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
-        )
+        # Per-model input resolution (pose runs downscaled by default, see inference_resolution.py)
+        self.inference = inference or InferenceResolution()
         
-        self.face_mesh = mp_face_mesh.FaceMesh(
-            max_num_faces=1,
-            refine_landmarks=True,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
-        )
+        # Optional inference_workers.InferenceWorkerPool (models run in worker processes instead)
+        self.workers = workers
+        
+        # Face mesh scheduling and the W/S head pitch source ('face' or 'pose')
+        if face_mesh_mode not in FACE_MESH_MODES:
+            raise ValueError(f"face_mesh_mode must be one of {FACE_MESH_MODES}")
+        self.face_mesh_mode = face_mesh_mode
+        self.face_mesh_interval = max(1, face_mesh_interval)
+        self.head_pose_source = head_pose_source or ('face' if face_mesh_mode == 'always' else 'pose')
+        self.tongue_enabled = tongue_enabled  # Spray emote bound; 'tongue' mode only runs face mesh while it is
+        self._frame_index = 0
+        self._last_face_results = None
+        
+        # Which graphs run each frame (idle while control is off or in tutorial/backseat mode)
+        self.activation = activation or ModelActivation()
+        
+        # Optional latency_governor.LatencyGovernor: sheds drawing/face mesh/pose/frames when behind
+        self.governor = governor
+        
+        # Landmark replay (landmark_log.py) only needs the controllers
+        self.hands = self.pose = self.face_mesh = None
+        self.warmup = warmup  # True, warm_up() options, or False (see model_warmup.py)
+        self.warmup_reports = {}
+        self.models_loaded = load_models and workers is None
+        if self.models_loaded:
+            self._create_models()
+        
+        # Hand gesture source: the rule predicates (an own instance, so apply_profile's thresholds
+        # stay with this system), or a gesture_classifier.GestureClassifier
+        self.gestures = gestures or RuleGestures()
         
         # Initialize controllers
-        self.wasd_controller = WASDController()
-        self.gun_detector = StickyGunDetector()
-        self.shooting_controller = ThumbShootingController()
-        self.mouse_controller = SmoothMouseController()
-        self.left_hand_controller = LeftHandGestureController()
-        self.tongue_controller = TongueController()
+        self.wasd_controller = WASDController(input_backend=self.input)
+        self.gun_detector = StickyGunDetector(gestures=self.gestures)
+        self.shooting_controller = ThumbShootingController(input_backend=self.input, gestures=self.gestures)
+        self.mouse_controller = SmoothMouseController(input_backend=self.input)
+        self.left_hand_controller = LeftHandGestureController(input_backend=self.input, gestures=self.gestures)
+        self.tongue_controller = TongueController(input_backend=self.input)
+        self.resume_gesture = ResumeGestureDetector() if gesture_resume else None
+        
+        # Tuned thresholds (threshold_tuner.py) over the controller defaults
+        if profile:
+            self.apply_profile(profile)
+        
+        # Per-user neutral pose and ranges (calibration.py); a Calibrator is captured on the first frames
+        self.calibration = None
+        self.calibrator = None
+        self.calibration_store = CalibrationStore()
+        if isinstance(calibration, Calibrator):
+            self.start_calibration(calibrator=calibration)
+        elif calibration is not None:
+            self.apply_calibration(calibration)
+        
+        # Persistent left/right hand identities; with the hands ROI, a briefly lost
+        # hand keeps the crop instead of forcing a full-frame re-detection
+        self.hand_tracker = HandTracker()
+        if self.inference.hand_roi is not None:
+            self.inference.hand_roi.tracker = self.hand_tracker
         
         # Control state
         self.control_enabled = False
+        self.frame_time = None  # Capture timestamp of the last update_controls frame
+        
+        # Per-stage latency instrumentation ('p' toggles the HUD, 'e' exports CSV/JSON)
+        self.profiler = latency_profiler
+        
+        # Reused capture/BGR/RGB frame buffers (no per-frame image allocations)
+        self.frame_pool = FrameBufferPool()
         
         print("Hybrid Control System initialized!")
         print("Movement: Head pose for W/S + Body lean for A/D")
@@ -533,34 +818,449 @@ class LeaningControlSystem:
         print("Left hand: Crouch/jump")
         print("Tongue: Spray emote")
     
-    def identify_hands(self, hand_landmarks_list):
-        """Identify which hand is left vs right based on position (from dual_hand_tracking.py)"""
-        if len(hand_landmarks_list) == 0:
-            return None, None
-        elif len(hand_landmarks_list) == 1:
-            # Only one hand detected, assume it's the right hand
-            return None, hand_landmarks_list[0]
+    def _create_models(self):
+        """
+        Create the MediaPipe graphs, warmed up to steady-state timing unless warmup is off.
+        Face mesh is skipped with face_mesh_mode 'off', as for the worker pool.
+        """
+        models = [model for model in MODEL_PARAMS if model != 'face_mesh' or self.face_mesh_mode != 'off']
+        if not self.warmup:
+            for model in models:
+                self._create_model(model)
+            return
+        start = time.perf_counter()
+        graphs, self.warmup_reports = warm_up_models(
+            {model: (lambda model=model: self._new_graph(model)) for model in models},
+            {model: warmup_image(self.inference.sizes.get(model)) for model in models},
+            **(self.warmup if isinstance(self.warmup, dict) else {})
+        )
+        for model, graph in graphs.items():
+            setattr(self, model, graph)
+        print_reports(self.warmup_reports, (time.perf_counter() - start) * 1000.0)
+    
+    def _new_graph(self, model):
+        factory = {'hands': mp_hands.Hands, 'pose': mp_pose.Pose, 'face_mesh': mp_face_mesh.FaceMesh}[model]
+        return factory(**MODEL_PARAMS[model])
+    
+    def _create_model(self, model):
+        graph = self._new_graph(model)
+        setattr(self, model, graph)
+        return graph
+    
+    def _model(self, model):
+        """In-process graph, recreated if ModelActivation released it while idle"""
+        return getattr(self, model) or self._create_model(model)
+    
+    def _release_idle_models(self):
+        loaded = [model for model in MODEL_PARAMS if getattr(self, model) is not None]
+        for model in self.activation.release_due(loaded):
+            getattr(self, model).close()
+            setattr(self, model, None)
+            print(f"💤 Released idle {model} graph")
+    
+    def face_mesh_due(self):
+        """Whether face mesh runs on the current frame (see FACE_MESH_MODES; the governor can thin it out)"""
+        mode = self.face_mesh_mode
+        throttle = self.governor.face_mesh_interval if self.governor is not None else 1
+        if mode == 'always':
+            return self._frame_index % throttle == 0
+        if mode == 'tongue':
+            return self.tongue_enabled and self._frame_index % throttle == 0
+        if mode == 'low_rate':
+            return self._frame_index % (self.face_mesh_interval * throttle) == 0
+        return False
+    
+    @property
+    def preview_drawing(self):
+        """Whether landmark/status overlays are drawn (the governor sheds them first)"""
+        return self.governor is None or self.governor.preview
+    
+    @property
+    def injecting(self):
+        """Whether recognized gestures drive the keyboard/mouse: control on, outside tutorial practice"""
+        return self.control_enabled and self.activation.mode != 'tutorial'
+    
+    def configure_governor(self, show_preview=True):
+        """Tell the governor which steps this loop can shed (pose resolution only in-process, without auto mode)"""
+        if self.governor is None:
+            return
+        own_sizes = self.workers is None and self.inference.auto is None
+        self.governor.configure(preview=show_preview, face_mesh=self.face_mesh_mode != 'off',
+                                sizes=self.inference.sizes if own_sizes else None)
+        print(f"Latency governor: {self.governor.describe()}")
+    
+    def drop_frame(self):
+        """Whether the governor drops the frame just captured (its profile row is discarded)"""
+        if self.governor is None or not self.governor.drop_frame():
+            return False
+        self.profiler.cancel_frame()
+        return True
+    
+    def end_frame(self):
+        """Close the profiled frame and feed its stage times to auto resolution and the governor"""
+        if not self.profiler.end_frame():
+            return
+        row = self.profiler.frames[-1]
+        if self.workers is None:
+            self.inference.end_frame(row)
+        if self.governor is not None:
+            change = self.governor.update(row)
+            if change:
+                print(f"⏱️ Latency governor: {change}")
+    
+    def prepare_frame(self, frame):
+        """
+        Mirror + RGB conversion into reused buffers (or straight into the worker frame ring).
+        Returns (bgr, rgb); rgb is shared by all models and must not be drawn on.
+        """
+        calibrating = self.calibrator is not None  # Calibration samples every model that can run
+        face_needed = self.tongue_enabled or self.head_pose_source == 'face' or calibrating
+        active = self.activation.select(self.control_enabled or calibrating, face_needed, self.face_mesh_due())
+        self._frame_index += 1
+        if not active:
+            # Nothing runs this frame: mirror for the preview only, no RGB conversion
+            frame, rgb_frame = self.frame_pool.prepare(frame, convert=False)
+            if self.workers is not None:
+                self.workers.submit(active)
+        elif self.workers is not None:
+            frame, rgb_frame = self.frame_pool.prepare(frame, rgb_out=self.workers.input_buffer(frame.shape))
+            self.workers.submit(active)
         else:
-            # Two hands detected, identify by x position
-            hand1 = hand_landmarks_list[0]
-            hand2 = hand_landmarks_list[1]
-            
-            # Get wrist positions
-            wrist1_x = hand1.landmark[0].x
-            wrist2_x = hand2.landmark[0].x
-            
-            # Left hand is on the left side of screen (lower x value)
-            if wrist1_x < wrist2_x:
-                return hand1, hand2  # hand1 is left, hand2 is right
-            else:
-                return hand2, hand1  # hand2 is left, hand1 is right
+            frame, rgb_frame = self.frame_pool.prepare(frame)
+            self.inference.begin_frame(rgb_frame)
+        if self.models_loaded:
+            self._release_idle_models()
+        return frame, rgb_frame
+    
+    def process_models(self):
+        """Run Hands/Pose/FaceMesh on the prepared frame -> (hand_results, pose_results, face_results)"""
+        profiler = self.profiler
+        if self.workers is not None:
+            with profiler.stage('workers'):
+                hand_results, pose_results, face_results = self.workers.collect() or (None, None, None)
+            return hand_results, pose_results, self._held_face_results(face_results)
+        
+        inference = self.inference
+        active = self.activation.active
+        hand_results = pose_results = face_results = None
+        
+        # Process hands (landmarks are full-frame normalized whatever the input size/ROI)
+        if 'hands' in active:
+            with profiler.stage('hands'):
+                hand_results = inference.process_hands(self._model('hands'))
+        
+        # Process pose
+        if 'pose' in active:
+            with profiler.stage('pose'):
+                pose_results = self._model('pose').process(inference.image_for('pose'))
+        
+        # Process face (skipped on frames the face mesh schedule leaves out)
+        if 'face_mesh' in active:
+            with profiler.stage('face_mesh'):
+                face_results = self._model('face_mesh').process(inference.image_for('face_mesh'))
+        return hand_results, pose_results, self._held_face_results(face_results)
+    
+    def _held_face_results(self, face_results):
+        """In low-rate mode (or throttled by the governor) the last face mesh result stands in for skipped frames"""
+        throttled = self.face_mesh_mode == 'low_rate' or (
+            self.governor is not None and self.governor.face_mesh_interval > 1)
+        paused = not self.control_enabled and self.activation.mode == 'normal'  # Face mesh idle meanwhile
+        if not throttled or paused:
+            return face_results
+        if face_results is not None:
+            self._last_face_results = face_results
+        return self._last_face_results
+    
+    def head_pose(self, pose_landmarks, face_landmarks, w=1280, h=720):
+        """
+        (yaw, pitch) for W/S from the configured head_pose_source, pitch relative to the calibrated
+        neutral pose; (0, 0) when the source has no landmarks
+        """
+        if self.head_pose_source == 'pose':
+            if not pose_landmarks:
+                return 0, 0
+            yaw, pitch = calculate_head_pose_from_pose(pose_landmarks, w, h)
+        elif face_landmarks:
+            yaw, pitch = calculate_head_pose(face_landmarks, w, h)
+        else:
+            return 0, 0
+        if self.calibration is not None:
+            pitch = self.calibration.adjust_pitch(pitch, self.head_pose_source)
+        return yaw, pitch
+    
+    def lean_pose(self, pose_landmarks, w=1280, h=720):
+        """A/D body lean relative to the calibrated neutral pose (frame center without a calibration)"""
+        lean = calculate_lean_pose(pose_landmarks, w, h)
+        if self.calibration is not None:
+            lean = self.calibration.adjust_lean(lean)
+        return lean
+    
+    def close_models(self):
+        if self.workers is not None:
+            self.workers.close()
+        for model in (self.hands, self.pose, self.face_mesh):
+            if model is not None:
+                model.close()
+    
+    def apply_profile(self, params):
+        """
+        Override controller settings, e.g. {'wasd_controller': {'lean_threshold': 6}} (a threshold_tuner.py
+        profile). The 'predicates' section sets thresholds of this system's RuleGestures such as
+        finger_extended_angle; a learned gesture source has none and ignores them.
+        """
+        for section, values in params.items():
+            for name, value in values.items():
+                if section == 'predicates':
+                    if not isinstance(getattr(RuleGestures(), name, None), float):
+                        raise ValueError(f"unknown predicate setting '{name}'")
+                    if isinstance(self.gestures, RuleGestures):
+                        setattr(self.gestures, name, float(value))
+                else:
+                    controller = getattr(self, section)
+                    if not hasattr(controller, name):
+                        raise ValueError(f"{section} has no setting '{name}'")
+                    setattr(controller, name, value)
+    
+    def apply_calibration(self, calibration):
+        """Measure lean/pitch from this calibration.Calibration's neutral pose and scale aim to its hand range"""
+        self.calibration = calibration
+        self.mouse_controller.range_scale = calibration.mouse_scale if calibration is not None else 1.0
+    
+    def start_calibration(self, name=None, calibrator=None):
+        """
+        Capture a calibration over the next frames (controllers stay idle meanwhile), then save and apply it.
+        name defaults to the current calibration's, else 'default'.
+        """
+        if calibrator is None:
+            name = name or (self.calibration.name if self.calibration is not None else 'default')
+            calibrator = Calibrator(name, store=self.calibration_store)
+        self.calibration_store = calibrator.store
+        self.calibrator = calibrator
+        self.wasd_controller.release_all_keys()
+        self.shooting_controller.force_release()
+        print(f"\n📐 Calibrating '{calibrator.name}' ({calibrator.duration:.0f}s) - follow the instructions on screen")
+    
+    def _update_calibration(self, pose_landmarks, face_landmarks, right_hand, w, h, now):
+        """Feed one frame's raw features to the active Calibrator; save and apply the result when it finishes"""
+        pitch = {}
+        if face_landmarks:
+            pitch['face'] = calculate_head_pose(face_landmarks, w, h)[1]
+        if pose_landmarks:
+            pitch['pose'] = calculate_head_pose_from_pose(pose_landmarks, w, h)[1]
+        lean = calculate_lean_pose(pose_landmarks, w, h) if pose_landmarks else None
+        tip = (right_hand.landmark[8].x, right_hand.landmark[8].y) if right_hand else None
+        if not self.calibrator.update(now, lean, pitch, tip):
+            return
+        calibrator, self.calibrator = self.calibrator, None
+        try:
+            calibration = calibrator.result()
+        except ValueError as e:
+            print(f"⚠️ Calibration failed: {e}")
+            return
+        path = calibrator.store.save(calibration)
+        self.apply_calibration(calibration)
+        print(f"📐 Calibration {calibration.describe()} -> {path}\n")
+    
+    def calibration_prompt(self, now=None):
+        """Instruction for the preview while calibrating ('Nod slowly ... 3s'), else None"""
+        if self.calibrator is None:
+            return None
+        if now is None:  # The clock the calibrator is fed on (replays run on recorded time)
+            now = self.frame_time if self.frame_time is not None else time.perf_counter()
+        phase = self.calibrator.phase(now)
+        if phase is None:
+            return None
+        _, left, instruction = phase
+        return f"CALIBRATING: {instruction} ({left:.0f}s)"
     
-    def run(self):
-        """Main control loop"""
-        cap = cv2.VideoCapture(0)
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
-        cap.set(cv2.CAP_PROP_FPS, 30)
+    def draw_calibration_prompt(self, frame):
+        prompt = self.calibration_prompt()
+        if prompt is not None:
+            h, w = frame.shape[:2]
+            blend_rect(frame, 0, h // 2 - 40, w, 60, border=None, alpha=0.6)
+            cv2.putText(frame, prompt, (20, h // 2), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 255, 255), 2)
+    
+    def identify_hands(self, hand_landmarks_list, handedness_list=None, now=None):
+        """(left_hand, right_hand) landmarks, kept stable across frames by the hand tracker (hand_tracker.py)"""
+        return self.hand_tracker.update(hand_landmarks_list, handedness_list, now)
+    
+    def draw_landmarks(self, frame, hand_results, pose_results, face_results):
+        """Draw MediaPipe landmarks for all models onto the preview frame (vectorized, see landmark_drawing.py)"""
+        if pose_results and pose_results.pose_landmarks:
+            POSE_SKELETON.draw(frame, pose_results.pose_landmarks)
+        
+        if face_results and face_results.multi_face_landmarks:
+            FACE_CONTOUR_SKELETON.draw(frame, face_results.multi_face_landmarks[0])
+        
+        if hand_results and hand_results.multi_hand_landmarks:
+            for hand_landmarks in hand_results.multi_hand_landmarks:
+                HAND_SKELETON.draw(frame, hand_landmarks)
+    
+    def update_controls(self, hand_landmarks_list, pose_landmarks, face_landmarks,
+                        w=1280, h=720, capture_time=None, handedness_list=None, read_time=None):
+        """
+        Run feature extraction and all controllers for one frame of landmarks.
+        Gestures are recognized on every frame (the tutorial and backseat modes read them with
+        control off); only the keyboard/mouse injection follows self.injecting.
+        capture_time: frame timestamp for every controller timer (a replay's recorded time, see
+                      FrameBufferPool.read); read_time: perf_counter when it was read (latency feedback)
+        handedness_list: MediaPipe multi_handedness for hand_landmarks_list (steadies left/right roles)
+        Works with MediaPipe results or landmark_log views, so it can be replayed without inference.
+        Returns: GestureFrame shared by the overlay and the tutorial/backseat modes
+        """
+        profiler = self.profiler
+        self.frame_time = capture_time
+        
+        # While paused, hands run at a low rate only to spot the resume gesture
+        if (not self.control_enabled and self.resume_gesture is not None
+                and 'hands' in self.activation.active):
+            with profiler.stage('features'):
+                resumed = self.resume_gesture.update(hand_landmarks_list, capture_time)
+            if resumed:
+                self.control_enabled = True
+                print("\n✋✋ Resume gesture - control ENABLED ✓\n")
+        
+        # Initialize status variables
+        left_right_lean = 0
+        head_yaw, head_pitch = 0, 0
+        wasd_states = NO_KEYS
+        
+        gun_active = False
+        is_shooting = False
+        shoot_status = "No right hand"
+        left_action = None
+        left_status = "No left hand"
+        tongue_out = False
+        tongue_status = "No face"
+        
+        # Calibrating: the raw features go to the Calibrator and every controller stays idle
+        if self.calibrator is not None:
+            with profiler.stage('features'):
+                right_hand = None
+                if 'hands' in self.activation.active:
+                    right_hand = self.identify_hands(hand_landmarks_list, handedness_list, capture_time)[1]
+                now = time.perf_counter() if capture_time is None else capture_time
+                self._update_calibration(pose_landmarks, face_landmarks, right_hand, w, h, now)
+            return GestureFrame(
+                capture_time, False, wasd_states, left_right_lean, head_pitch,
+                gun_active, is_shooting, "Calibrating", left_action, "Calibrating",
+                tongue_out, "Calibrating",
+                len(hand_landmarks_list) if hand_landmarks_list else 0,
+                pose_landmarks is not None, face_landmarks is not None,
+            )
+        
+        inject = self.injecting
+        
+        # Process pose for body leaning (A/D only)
+        if pose_landmarks:
+            try:
+                with profiler.stage('features'):
+                    left_right_lean = self.lean_pose(pose_landmarks, w, h)
+            except Exception as e:
+                print(f"Error processing pose: {e}")
+        
+        # Head pose for W/S movement (face mesh, or pose landmarks when face mesh is scheduled down)
+        try:
+            with profiler.stage('features'):
+                head_yaw, head_pitch = self.head_pose(pose_landmarks, face_landmarks, w, h)
+        except Exception as e:
+            print(f"Error processing head pose: {e}")
+        
+        # Process face for tongue detection
+        if not self.tongue_enabled:
+            tongue_status = "Tongue off"
+        elif face_landmarks:
+            try:
+                # Tongue detection for spray emote
+                with profiler.stage('controllers'):
+                    tongue_out, tongue_status = self.tongue_controller.update(
+                        face_landmarks, inject, capture_time
+                    )
+                
+            except Exception as e:
+                print(f"Error processing face: {e}")
+        
+        # Update WASD controller with both body lean (A/D) and head pose (W/S)
+        with profiler.stage('controllers'):
+            active_wasd_keys, wasd_states = self.wasd_controller.update(
+                left_right_lean, head_pitch, inject
+            )
+        
+        # Left/right hand tracks (only advanced on frames where Hands ran)
+        left_hand = right_hand = None
+        if 'hands' in self.activation.active:
+            try:
+                with profiler.stage('features'):
+                    left_hand, right_hand = self.identify_hands(hand_landmarks_list, handedness_list, capture_time)
+                    self.gestures.classify(left_hand, right_hand)  # Both hands in one batch (learned model)
+            except Exception as e:
+                print(f"Error identifying hands: {e}")
+        
+        # Process hands
+        if hand_landmarks_list:
+            try:
+                # Process right hand (gun control)
+                if right_hand:
+                    try:
+                        with profiler.stage('controllers'):
+                            gun_active = self.gun_detector.update(right_hand, capture_time)
+                            
+                            if gun_active:
+                                # Thumb shooting
+                                is_shooting, shoot_status = self.shooting_controller.update(
+                                    right_hand, gun_active, capture_time, inject
+                                )
+                                
+                                # Mouse movement (injection only; without it the aim re-baselines on resume)
+                                self.mouse_controller.update(right_hand, gun_active and inject, capture_time,
+                                                             self.hand_tracker.right.id, read_time)
+                            else:
+                                # Gun not active - release mouse if held
+                                self.shooting_controller.force_release()
+                            
+                    except Exception as e:
+                        print(f"Error processing right hand: {e}")
+                
+                # Process left hand (gesture controls)
+                if left_hand:
+                    try:
+                        with profiler.stage('controllers'):
+                            left_action, left_status = self.left_hand_controller.update(
+                                left_hand, inject, capture_time
+                            )
+                        
+                    except Exception as e:
+                        print(f"Error processing left hand: {e}")
+                
+            except Exception as e:
+                print(f"Error processing hands: {e}")
+        
+        if not inject:
+            # Recognition only: let go of a button held from before control went off
+            self.shooting_controller.release_button()
+        
+        return GestureFrame(
+            capture_time, self.control_enabled,
+            wasd_states, left_right_lean, head_pitch,
+            gun_active, is_shooting, shoot_status,
+            left_action, left_status,
+            tongue_out, tongue_status,
+            len(hand_landmarks_list) if hand_landmarks_list else 0,
+            pose_landmarks is not None, face_landmarks is not None,
+        )
+    
+    def run(self, capture=None, show_preview=True, landmark_log=None):
+        """
+        Main control loop
+        capture: any object with the cv2.VideoCapture read/isOpened/release interface (defaults to
+                 webcam 0 negotiated by camera_capture.py; use frame_recording.ReplayCapture for offline replay)
+        show_preview: False runs headless (no window, no keyboard controls)
+        landmark_log: optional landmark_log.LandmarkLogWriter that records every frame's landmarks
+        """
+        if capture is None:
+            cap, _ = open_camera()
+        else:
+            cap = capture
         
         if not cap.isOpened():
             print("Error: Could not open camera")
@@ -571,6 +1271,9 @@ class LeaningControlSystem:
         print("=" * 50)
         print("Controls:")
         print("  'g' - Toggle control ON/OFF")
+        print("  'c' - Calibrate neutral pose and range of motion (saved per user)")
+        print("  'p' - Toggle latency HUD")
+        print("  'e' - Export latency profile (CSV/JSON)")
         print("  'q' - Quit")
         print("\nMovement (WASD - Hybrid):")
         print("  - Head FORWARD → Press 'S' (move forward)")
@@ -593,160 +1296,83 @@ class LeaningControlSystem:
         
         frame_count = 0
         last_frame_time = time.time()
+        profiler = self.profiler
+        frame_pool = self.frame_pool
+        inference = self.inference
+        if self.workers is not None:
+            print(f"Inference: {self.workers.describe()}")
+        else:
+            print(f"Inference resolution: {inference.describe()}")
+        self.configure_governor(show_preview)
         
         try:
             while True:
-                ret, frame = cap.read()
+                profiler.begin_frame()
+                with profiler.stage('capture'):
+                    ret, frame = frame_pool.read(cap)
                 if not ret:
+                    if not cap.isOpened():
+                        print("End of input stream")
+                        break
                     time.sleep(0.1)
                     continue
+                capture_time = frame_pool.capture_time
+                if self.drop_frame():
+                    continue
                 
                 frame_count += 1
                 current_time = time.time()
                 if current_time - last_frame_time >= 1.0:
                     fps = frame_count / (current_time - last_frame_time)
-                    print(f"Frame {frame_count}: Running... FPS: {fps:.1f}")
+                    p95 = profiler.percentiles('total')['p95']
+                    governor = f" | Governor: {self.governor.describe()}" if self.governor is not None else ""
+                    print(f"Frame {frame_count}: Running... FPS: {fps:.1f} | Frame p95: {p95:.1f} ms{governor}")
                     frame_count = 0
                     last_frame_time = current_time
                 
-                frame = cv2.flip(frame, 1)
-                h, w, _ = frame.shape
-                
-                # Process hands
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                hand_results = self.hands.process(rgb_frame)
-                
-                # Process pose
-                pose_results = self.pose.process(rgb_frame)
+                # Mirror + RGB conversion into reused buffers; rgb_frame is read-only and shared by all models
+                with profiler.stage('color'):
+                    frame, rgb_frame = self.prepare_frame(frame)
+                    h, w, _ = frame.shape
                 
-                # Process face
-                face_results = self.face_mesh.process(rgb_frame)
+                hand_results, pose_results, face_results = self.process_models()
                 
-                # Initialize status variables
-                left_right_lean = 0
-                head_yaw, head_pitch = 0, 0
-                active_wasd_keys = set()
-                wasd_states = {'w': False, 'a': False, 's': False, 'd': False}
+                if landmark_log is not None:
+                    landmark_log.write(capture_time, hand_results, pose_results, face_results)
                 
-                gun_active = False
-                is_shooting = False
-                shoot_status = "No right hand"
-                left_action = None
-                left_status = "No left hand"
-                tongue_out = False
-                tongue_status = "No face"
+                # Draw landmarks
+                if show_preview and self.preview_drawing:
+                    with profiler.stage('overlay'):
+                        self.draw_landmarks(frame, hand_results, pose_results, face_results)
                 
-                # Process pose for body leaning (A/D only)
-                if pose_results and pose_results.pose_landmarks:
-                    try:
-                        # Draw pose landmarks
-                        mp_drawing.draw_landmarks(
-                            frame, pose_results.pose_landmarks, mp_pose.POSE_CONNECTIONS,
-                            mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2),
-                            mp_drawing.DrawingSpec(color=(255, 0, 0), thickness=2, circle_radius=2)
-                        )
-                        
-                        # Body leaning for A/D only
-                        left_right_lean = calculate_lean_pose(pose_results.pose_landmarks, w, h)
-                        
-                    except Exception as e:
-                        print(f"Error processing pose: {e}")
-                
-                # Process face for head pose (W/S) and tongue detection
-                if face_results and face_results.multi_face_landmarks:
-                    try:
-                        face_landmarks = face_results.multi_face_landmarks[0]
-                        
-                        # Draw face mesh
-                        mp_drawing.draw_landmarks(
-                            frame, face_landmarks, mp_face_mesh.FACEMESH_CONTOURS,
-                            None, mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=1, circle_radius=1)
-                        )
-                        
-                        # Head pose for W/S movement
-                        head_yaw, head_pitch = calculate_head_pose(face_landmarks, w, h)
-                        
-                        # Tongue detection for spray emote
-                        tongue_out, tongue_status = self.tongue_controller.update(
-                            face_landmarks, self.control_enabled
-                        )
-                        
-                    except Exception as e:
-                        print(f"Error processing face: {e}")
-                
-                # Update WASD controller with both body lean (A/D) and head pose (W/S)
-                active_wasd_keys, wasd_states = self.wasd_controller.update(
-                    left_right_lean, head_pitch, self.control_enabled
+                # Features + controllers (shared with offline landmark replay)
+                gesture = self.update_controls(
+                    hand_results.multi_hand_landmarks if hand_results else None,
+                    pose_results.pose_landmarks if pose_results else None,
+                    face_results.multi_face_landmarks[0] if face_results and face_results.multi_face_landmarks else None,
+                    w, h, capture_time,
+                    hand_results.multi_handedness if hand_results else None,
+                    frame_pool.read_time
                 )
                 
-                # Debug output for hybrid detection
-                # print(f"DEBUG: Left/Right Lean={left_right_lean:.1f}, Head Pitch={head_pitch:.1f}")
-                
-                # Process hands
-                if hand_results and hand_results.multi_hand_landmarks:
-                    try:
-                        # Draw hand landmarks
-                        for hand_landmarks in hand_results.multi_hand_landmarks:
-                            mp_drawing.draw_landmarks(
-                                frame, hand_landmarks, mp_hands.HAND_CONNECTIONS,
-                                mp_drawing.DrawingSpec(color=(0, 0, 255), thickness=2, circle_radius=2),
-                                mp_drawing.DrawingSpec(color=(0, 255, 255), thickness=2, circle_radius=2)
-                            )
-                        
-                        # Identify left and right hands
-                        left_hand, right_hand = self.identify_hands(hand_results.multi_hand_landmarks)
-                        
-                        # Process right hand (gun control)
-                        if right_hand:
-                            try:
-                                # Only detect gun gesture if controls are enabled
-                                if self.control_enabled:
-                                    gun_active = self.gun_detector.update(right_hand)
-                                    
-                                    if gun_active:
-                                        # Thumb shooting
-                                        is_shooting, shoot_status = self.shooting_controller.update(
-                                            right_hand, gun_active
-                                        )
-                                        
-                                        # Mouse movement
-                                        self.mouse_controller.update(right_hand, gun_active)
-                                    else:
-                                        # Gun not active - release mouse if held
-                                        self.shooting_controller.force_release()
-                                else:
-                                    # Controls disabled - force release everything and reset gun detector
-                                    self.shooting_controller.force_release()
-                                    self.gun_detector.is_locked = False  # Reset gun detector
-                                    self.gun_detector.lock_frames = 0
-                                    gun_active = False
-                                    
-                            except Exception as e:
-                                print(f"Error processing right hand: {e}")
-                        
-                        # Process left hand (gesture controls)
-                        if left_hand:
-                            try:
-                                left_action, left_status = self.left_hand_controller.update(
-                                    left_hand, self.control_enabled
-                                )
-                                
-                            except Exception as e:
-                                print(f"Error processing left hand: {e}")
-                        
-                    except Exception as e:
-                        print(f"Error processing hands: {e}")
-                
                 # Display status overlay
-                self.display_status(frame, wasd_states, gun_active, shoot_status, 
-                                  left_status, tongue_status, left_right_lean, head_pitch, tongue_out)
+                if show_preview and self.preview_drawing:
+                    with profiler.stage('overlay'):
+                        self.display_gesture_frame(frame, gesture)
+                        self.draw_calibration_prompt(frame)
+                        profiler.draw_hud(frame)
                 
                 # Show frame
-                cv2.imshow('Hybrid Control System', frame)
+                key = 0xFF
+                if show_preview:
+                    with profiler.stage('display'):
+                        cv2.imshow('Hybrid Control System', frame)
+                        
+                        # Handle keyboard input
+                        key = cv2.waitKey(1) & 0xFF
+                self.end_frame()
                 
-                # Handle keyboard input
                 try:
-                    key = cv2.waitKey(1) & 0xFF
                     if key == ord('q') or key == 27:  # 'q' or ESC to quit
                         print("Quit key pressed - exiting...")
                         break
@@ -758,6 +1384,12 @@ class LeaningControlSystem:
                         print(f"\n{'='*50}")
                         print(f"Control {'ENABLED ✓' if self.control_enabled else 'DISABLED ✗'}")
                         print(f"{'='*50}\n")
+                    elif key == ord('c'):
+                        self.start_calibration()
+                    elif key == ord('p'):
+                        print(f"Latency HUD {'ON' if profiler.toggle_hud() else 'OFF'}")
+                    elif key == ord('e'):
+                        profiler.export()
                 except Exception as e:
                     print(f"Error handling keyboard input: {e}")
                     
@@ -771,11 +1403,14 @@ class LeaningControlSystem:
                 print("Cleaning up resources...")
                 self.shooting_controller.force_release()
                 self.wasd_controller.release_all_keys()
+                print(self.input.describe_latency())
                 cap.release()
-                cv2.destroyAllWindows()
-                self.hands.close()
-                self.pose.close()
-                self.face_mesh.close()
+                if landmark_log is not None:
+                    landmark_log.close()
+                if show_preview:
+                    cv2.destroyAllWindows()
+                self.close_models()
+                self.input.close()
                 print("Camera released")
                 print("Windows closed")
                 print("MediaPipe closed")
@@ -825,15 +1460,16 @@ class LeaningControlSystem:
         cv2.putText(frame, f"👅 Tongue: {tongue_status}", (20, y_start + 95), 
                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, tongue_color, 2)
     
+    def display_gesture_frame(self, frame, gesture):
+        """display_status for a GestureFrame"""
+        self.display_status(frame, gesture.wasd_states, gesture.gun_active, gesture.shoot_status,
+                            gesture.left_status, gesture.tongue_status, gesture.left_right_lean,
+                            gesture.head_pitch, gesture.tongue_out)
+    
     def _draw_panel(self, frame, x, y, width, height, title, alpha=0.7):
         """Draw a semi-transparent panel with title"""
-        # Create overlay
-        overlay = frame.copy()
-        cv2.rectangle(overlay, (x, y), (x + width, y + height), (0, 0, 0), -1)
-        cv2.rectangle(overlay, (x, y), (x + width, y + height), (255, 255, 255), 2)
-        
-        # Blend overlay
-        cv2.addWeighted(overlay, alpha, frame, 1 - alpha, 0, frame)
+        # Blend only the panel region instead of a full-frame copy
+        blend_rect(frame, x, y, width, height, alpha=alpha)
         
         # Add title
         cv2.putText(frame, title, (x + 5, y - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
@@ -862,5 +1498,72 @@ class LeaningControlSystem:
             cv2.putText(frame, key.upper(), (kx - 6, ky + 4), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 0), 2)
 
 if __name__ == "__main__":
-    system = LeaningControlSystem()
-    system.run()
+    import calibration
+    import camera_capture
+    import gesture_classifier
+    import inference_resolution
+    import input_backends
+    import latency_governor
+    import model_activation
+    import model_warmup
+    import threshold_tuner
+    
+    parser = argparse.ArgumentParser(description="Hybrid leaning control system")
+    parser.add_argument('--replay', help='Replay a recording (see frame_recording.py) instead of the webcam')
+    parser.add_argument('--fast', action='store_true', help='Replay as fast as possible instead of real time')
+    parser.add_argument('--record', help='Record the webcam session to this video file')
+    parser.add_argument('--record-landmarks', help='Record per-frame landmarks to this log (see landmark_log.py)')
+    parser.add_argument('--no-preview', action='store_true', help='Run without the preview window')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Capture key/mouse events instead of injecting them (saved to input_events.json)')
+    parser.add_argument('--enable', action='store_true', help='Start with control enabled')
+    parser.add_argument('--workers', action='store_true',
+                        help='Run each model in its own process (see inference_workers.py)')
+    parser.add_argument('--worker-depth', type=int, default=1,
+                        help='Frames in flight with --workers (>1 trades latency for throughput)')
+    inference_resolution.add_arguments(parser)
+    add_face_mesh_arguments(parser)
+    model_activation.add_arguments(parser)
+    model_warmup.add_arguments(parser)
+    latency_governor.add_arguments(parser)
+    gesture_classifier.add_arguments(parser)
+    threshold_tuner.add_arguments(parser)
+    calibration.add_arguments(parser)
+    input_backends.add_arguments(parser)
+    camera_capture.add_arguments(parser)
+    args = parser.parse_args()
+    
+    from input_backends import NullInputBackend
+    from frame_recording import FrameRecorder, RecordingCapture, ReplayCapture
+    from landmark_log import LandmarkLogWriter
+    
+    backend = NullInputBackend() if args.dry_run else input_backends.from_args(args)
+    capture = None
+    if args.replay:
+        capture = ReplayCapture(args.replay, realtime=not args.fast)
+    elif args.record:
+        capture = RecordingCapture(camera_capture.open_from_args(args), FrameRecorder(args.record, fps=args.camera_fps))
+    else:
+        capture = camera_capture.open_from_args(args)
+    
+    inference = inference_resolution.from_args(args)
+    face_options = face_mesh_options(args)
+    workers = None
+    if args.workers:
+        from inference_workers import InferenceWorkerPool
+        face_mesh_off = face_options['face_mesh_mode'] == 'off'
+        params = {model: p for model, p in MODEL_PARAMS.items() if model != 'face_mesh' or not face_mesh_off}
+        workers = InferenceWorkerPool(params, inference, depth=args.worker_depth,
+                                      warmup=model_warmup.from_args(args))
+    system = LeaningControlSystem(input_backend=backend, inference=inference, workers=workers,
+                                  activation=model_activation.from_args(args), gesture_resume=args.gesture_resume,
+                                  warmup=model_warmup.from_args(args), governor=latency_governor.from_args(args),
+                                  gestures=gesture_classifier.from_args(args), profile=threshold_tuner.from_args(args),
+                                  calibration=calibration.from_args(args), **face_options)
+    system.control_enabled = args.enable
+    landmark_log = LandmarkLogWriter(args.record_landmarks) if args.record_landmarks else None
+    system.run(capture=capture, show_preview=not args.no_preview, landmark_log=landmark_log)
+    
+    if args.dry_run:
+        backend.export_json('input_events.json')
+        print(f"Captured {len(backend.events)} input events -> input_events.json")
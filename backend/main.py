@@ -3,30 +3,35 @@ Main CS:GO Gesture Control Application
 Integrates all systems: Hybrid Control + Tutorial Mode + Backseat Gamer Mode
 """
 
+import argparse
 import cv2
-import mediapipe as mp
 import numpy as np
-import pyautogui
 import time
 import sys
 import os
 
 # Import our custom modules
-from leaning_control_system import LeaningControlSystem
+from leaning_control_system import LeaningControlSystem, add_face_mesh_arguments, face_mesh_options
+from gesture_frame import EMPTY_FRAME, GestureFrame
 from tutorial_mode import tutorial_mode
 from backseat_mode import backseat_mode
 from config import config
-
-# Safety
-pyautogui.PAUSE = 0.01
-pyautogui.FAILSAFE = True
+from camera_capture import open_camera
+from latency_profiler import latency_profiler
+from input_backends import PyAutoGUIBackend
 
 class MainApplication:
     """Main application with mode switching"""
     
-    def __init__(self):
+    def __init__(self, input_backend=None, inference=None, **control_options):
+        # Safety: keep pyautogui's failsafe and short pause for the desktop backend
+        if input_backend is None:
+            input_backend = PyAutoGUIBackend(pause=0.01, failsafe=True)
+        
         # Initialize the hybrid control system
-        self.control_system = LeaningControlSystem()
+        # (control_options: face mesh scheduling, see leaning_control_system.add_face_mesh_arguments)
+        self.control_system = LeaningControlSystem(input_backend=input_backend, inference=inference,
+                                                   **control_options)
         
         # Mode states
         self.current_mode = 'normal'  # 'normal', 'tutorial', 'backseat'
@@ -35,18 +40,43 @@ class MainApplication:
         # Performance tracking
         self.frame_count = 0
         self.last_frame_time = time.time()
+        self.capture_time = None  # Capture timestamp of the frame being processed (see FrameBufferPool.read)
+        self.rgb_frame = None  # Read-only RGB view of the current frame, shared by the models
+        self.gesture_frame = EMPTY_FRAME  # Gesture state of the current frame, shared by all modes
+        self.profiler = latency_profiler
         
         print("🎮 CS:GO Gesture Control - Main Application")
         print("=" * 60)
         self._print_mode_instructions()
     
+    # Mode and control state live on the control system, whose ModelActivation idles
+    # the graphs the current mode/state doesn't use
+    @property
+    def current_mode(self) -> str:
+        return self.control_system.activation.mode
+    
+    @current_mode.setter
+    def current_mode(self, mode: str):
+        self.control_system.activation.set_mode(mode)
+    
+    @property
+    def control_enabled(self) -> bool:
+        return self.control_system.control_enabled
+    
+    @control_enabled.setter
+    def control_enabled(self, enabled: bool):
+        self.control_system.control_enabled = enabled
+    
     def _print_mode_instructions(self):
         """Print mode switching instructions"""
         print("\n🎯 MODE CONTROLS:")
         print("  'g' - Toggle control ON/OFF")
+        print("  'c' - Calibrate neutral pose and range of motion")
         print("  't' - Switch to Tutorial Mode")
         print("  'b' - Switch to Backseat Gamer Mode")
         print("  'n' - Switch to Normal Mode")
+        print("  'p' - Toggle latency HUD")
+        print("  'e' - Export latency profile (CSV/JSON)")
         print("  'q' - Quit")
         
         print(f"\n🎮 CURRENT MODE: {self.current_mode.upper()}")
@@ -67,49 +97,73 @@ class MainApplication:
         
         print("\n" + "=" * 60)
     
-    def run(self):
-        """Main application loop"""
+    def run(self, capture=None, show_preview=True):
+        """Main application loop (capture defaults to webcam 0, see LeaningControlSystem.run)"""
+        self.show_preview = show_preview
+        
         # Initialize camera
-        cap = cv2.VideoCapture(0)
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
-        cap.set(cv2.CAP_PROP_FPS, 30)
+        if capture is None:
+            cap, _ = open_camera()
+        else:
+            cap = capture
         
         if not cap.isOpened():
             print("❌ Error: Could not open camera")
             return
         
         print("✅ Camera initialized successfully")
+        self.control_system.configure_governor(show_preview)
+        frame_pool = self.control_system.frame_pool
         
         try:
             while True:
-                ret, frame = cap.read()
+                self.profiler.begin_frame()
+                with self.profiler.stage('capture'):
+                    ret, frame = frame_pool.read(cap)
                 if not ret:
+                    if not cap.isOpened():
+                        print("⏹️  End of input stream")
+                        break
                     time.sleep(0.1)
                     continue
+                self.capture_time = frame_pool.capture_time
+                if self.control_system.drop_frame():
+                    continue
                 
                 self.frame_count += 1
                 current_time = time.time()
                 if current_time - self.last_frame_time >= 1.0:
                     fps = self.frame_count / (current_time - self.last_frame_time)
-                    print(f"📊 Frame {self.frame_count}: Running... FPS: {fps:.1f}")
+                    p95 = self.profiler.percentiles('total')['p95']
+                    governor = self.control_system.governor
+                    governor = f" | Governor: {governor.describe()}" if governor is not None else ""
+                    print(f"📊 Frame {self.frame_count}: Running... FPS: {fps:.1f} | Frame p95: {p95:.1f} ms{governor}")
                     self.frame_count = 0
                     self.last_frame_time = current_time
                 
-                frame = cv2.flip(frame, 1)
+                # Mirror + RGB conversion once per frame into the shared buffers
+                with self.profiler.stage('color'):
+                    frame, self.rgb_frame = self.control_system.prepare_frame(frame)
                 h, w, _ = frame.shape
                 
                 # Process frame based on current mode
                 status_message = self._process_frame(frame, w, h)
                 
-                # Display mode and status information
-                self._draw_status_overlay(frame, status_message)
+                # Display mode and status information (shed first when the governor is behind)
+                if self.control_system.preview_drawing:
+                    with self.profiler.stage('overlay'):
+                        self._draw_status_overlay(frame, status_message)
+                        self.control_system.draw_calibration_prompt(frame)
+                        self.profiler.draw_hud(frame)
                 
                 # Show frame
-                cv2.imshow('CS:GO Gesture Control - Main Application', frame)
-                
-                # Handle keyboard input
-                self._handle_keyboard_input()
+                if show_preview:
+                    with self.profiler.stage('display'):
+                        cv2.imshow('CS:GO Gesture Control - Main Application', frame)
+                        
+                        # Handle keyboard input
+                        self._handle_keyboard_input()
+                self.control_system.end_frame()
                 
         except KeyboardInterrupt:
             print("⏹️  Interrupted by user")
@@ -119,7 +173,9 @@ class MainApplication:
             self._cleanup(cap)
     
     def _process_frame(self, frame: np.ndarray, w: int, h: int) -> str:
-        """Process frame based on current mode"""
+        """Track once, then hand the shared GestureFrame to the current mode"""
+        self.gesture_frame = self._track(frame, w, h)
+        
         if self.current_mode == 'tutorial':
             return self._process_tutorial_mode(frame, w, h)
         elif self.current_mode == 'backseat':
@@ -127,128 +183,32 @@ class MainApplication:
         else:  # normal mode
             return self._process_normal_mode(frame, w, h)
     
+    def _track(self, frame: np.ndarray, w: int, h: int) -> GestureFrame:
+        """Inference + features + controllers for the current frame (the only tracking pass)"""
+        control_system = self.control_system
+        
+        # RGB conversion already done in run(); each model gets its configured inference resolution
+        hand_results, pose_results, face_results = control_system.process_models()
+        
+        # Landmarks are drawn in normal mode (the AI modes draw their own overlays)
+        if self.current_mode == 'normal' and control_system.preview_drawing:
+            with self.profiler.stage('overlay'):
+                control_system.draw_landmarks(frame, hand_results, pose_results, face_results)
+        
+        return control_system.update_controls(
+            hand_results.multi_hand_landmarks if hand_results else None,
+            pose_results.pose_landmarks if pose_results else None,
+            face_results.multi_face_landmarks[0] if face_results and face_results.multi_face_landmarks else None,
+            w, h, self.capture_time,
+            hand_results.multi_handedness if hand_results else None,
+            control_system.frame_pool.read_time
+        )
+    
     def _process_normal_mode(self, frame: np.ndarray, w: int, h: int) -> str:
         """Process frame in normal mode (basic hybrid control)"""
-        # Use the existing leaning control system
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        
-        # Process hands
-        hand_results = self.control_system.hands.process(rgb_frame)
-        
-        # Process pose
-        pose_results = self.control_system.pose.process(rgb_frame)
-        
-        # Process face
-        face_results = self.control_system.face_mesh.process(rgb_frame)
-        
-        # Initialize variables
-        left_right_lean = 0
-        head_yaw, head_pitch = 0, 0
-        active_wasd_keys = set()
-        wasd_states = {'w': False, 'a': False, 's': False, 'd': False}
-        
-        gun_active = False
-        is_shooting = False
-        shoot_status = "No right hand"
-        left_action = None
-        left_status = "No left hand"
-        tongue_out = False
-        tongue_status = "No face"
-        
-        # Process pose for body leaning (A/D only)
-        if pose_results and pose_results.pose_landmarks:
-            try:
-                # Draw pose landmarks
-                mp_drawing = mp.solutions.drawing_utils
-                mp_pose = mp.solutions.pose
-                mp_drawing.draw_landmarks(
-                    frame, pose_results.pose_landmarks, mp_pose.POSE_CONNECTIONS,
-                    mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2),
-                    mp_drawing.DrawingSpec(color=(255, 0, 0), thickness=2, circle_radius=2)
-                )
-                
-                # Body leaning for A/D only
-                from leaning_control_system import calculate_lean_pose
-                left_right_lean = calculate_lean_pose(pose_results.pose_landmarks, w, h)
-                
-            except Exception as e:
-                print(f"Error processing pose: {e}")
-        
-        # Process face for head pose (W/S) and tongue detection
-        if face_results and face_results.multi_face_landmarks:
-            try:
-                face_landmarks = face_results.multi_face_landmarks[0]
-                
-                # Draw face mesh
-                mp_face_mesh = mp.solutions.face_mesh
-                mp_drawing.draw_landmarks(
-                    frame, face_landmarks, mp_face_mesh.FACEMESH_CONTOURS,
-                    None, mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=1, circle_radius=1)
-                )
-                
-                # Head pose for W/S movement
-                from leaning_control_system import calculate_head_pose
-                head_yaw, head_pitch = calculate_head_pose(face_landmarks, w, h)
-                
-                # Tongue detection for spray emote
-                tongue_out, tongue_status = self.control_system.tongue_controller.update(
-                    face_landmarks, self.control_enabled
-                )
-                
-            except Exception as e:
-                print(f"Error processing face: {e}")
-        
-        # Update WASD controller
-        active_wasd_keys, wasd_states = self.control_system.wasd_controller.update(
-            left_right_lean, head_pitch, self.control_enabled
-        )
-        
-        # Process hands
-        if hand_results and hand_results.multi_hand_landmarks:
-            try:
-                # Draw hand landmarks
-                mp_hands = mp.solutions.hands
-                for hand_landmarks in hand_results.multi_hand_landmarks:
-                    mp_drawing.draw_landmarks(
-                        frame, hand_landmarks, mp_hands.HAND_CONNECTIONS,
-                        mp_drawing.DrawingSpec(color=(0, 0, 255), thickness=2, circle_radius=2),
-                        mp_drawing.DrawingSpec(color=(0, 255, 255), thickness=2, circle_radius=2)
-                    )
-                
-                # Identify hands
-                left_hand, right_hand = self.control_system.identify_hands(hand_results.multi_hand_landmarks)
-                
-                # Process right hand
-                if right_hand:
-                    try:
-                        gun_active = self.control_system.gun_detector.update(right_hand)
-                        
-                        if gun_active:
-                            is_shooting, shoot_status = self.control_system.shooting_controller.update(
-                                right_hand, gun_active
-                            )
-                            self.control_system.mouse_controller.update(right_hand, gun_active)
-                        else:
-                            self.control_system.shooting_controller.force_release()
-                            
-                    except Exception as e:
-                        print(f"Error processing right hand: {e}")
-                
-                # Process left hand
-                if left_hand:
-                    try:
-                        left_action, left_status = self.control_system.left_hand_controller.update(
-                            left_hand, self.control_enabled
-                        )
-                    except Exception as e:
-                        print(f"Error processing left hand: {e}")
-                        
-            except Exception as e:
-                print(f"Error processing hands: {e}")
-        
-        # Display status
-        self.control_system.display_status(frame, wasd_states, gun_active, shoot_status, 
-                                         left_status, tongue_status, left_right_lean, head_pitch, tongue_out)
+        if self.control_system.preview_drawing:
+            with self.profiler.stage('overlay'):
+                self.control_system.display_gesture_frame(frame, self.gesture_frame)
         
         return f"Normal Mode | Control: {'ON' if self.control_enabled else 'OFF'}"
     
@@ -259,23 +219,8 @@ class MainApplication:
             tutorial_mode.start_tutorial()
             tutorial_mode._tutorial_started = True
         
-        # Create gesture data for tutorial evaluation
-        gesture_data = {
-            'gun_active': False,
-            'is_shooting': False,
-            'wasd_states': {'w': False, 'a': False, 's': False, 'd': False},
-            'left_action': None,
-            'tongue_out': False,
-            'head_pitch': 0,
-            'left_right_lean': 0
-        }
-        
-        # Get basic gesture data (simplified for tutorial)
-        # This would normally come from the full gesture processing
-        # For now, we'll use placeholder data
-        
-        # Update tutorial
-        tutorial_complete, status_message = tutorial_mode.update_tutorial(gesture_data, frame)
+        # Update tutorial from the frame's shared gesture state
+        tutorial_complete, status_message = tutorial_mode.update_tutorial(self.gesture_frame, frame)
         
         if tutorial_complete:
             print("🎉 Tutorial completed! Switching to Normal Mode.")
@@ -290,19 +235,8 @@ class MainApplication:
         if not backseat_mode.is_active_mode():
             backseat_mode.start_backseat_mode()
         
-        # Create gesture data for backseat evaluation
-        gesture_data = {
-            'gun_active': False,
-            'is_shooting': False,
-            'wasd_states': {'w': False, 'a': False, 's': False, 'd': False},
-            'left_action': None,
-            'tongue_out': False,
-            'head_pitch': 0,
-            'left_right_lean': 0
-        }
-        
-        # Update backseat mode
-        status_message = backseat_mode.update_backseat_mode(gesture_data, frame)
+        # Update backseat mode from the frame's shared gesture state
+        status_message = backseat_mode.update_backseat_mode(self.gesture_frame, frame)
         
         return status_message
     
@@ -343,12 +277,18 @@ class MainApplication:
                 print(f"\n{'='*50}")
                 print(f"🎯 Control {'ENABLED ✓' if self.control_enabled else 'DISABLED ✗'}")
                 print(f"{'='*50}\n")
+            elif key == ord('c'):
+                self.control_system.start_calibration()
             elif key == ord('t'):
                 self._switch_to_mode('tutorial')
             elif key == ord('b'):
                 self._switch_to_mode('backseat')
             elif key == ord('n'):
                 self._switch_to_mode('normal')
+            elif key == ord('p'):
+                print(f"📈 Latency HUD {'ON' if self.profiler.toggle_hud() else 'OFF'}")
+            elif key == ord('e'):
+                self.profiler.export()
         except Exception as e:
             print(f"Error handling keyboard input: {e}")
     
@@ -387,15 +327,16 @@ class MainApplication:
             # Release control system resources
             self.control_system.shooting_controller.force_release()
             self.control_system.wasd_controller.release_all_keys()
+            print(f"⌨️ {self.control_system.input.describe_latency()}")
             
             # Release camera
             cap.release()
-            cv2.destroyAllWindows()
+            if getattr(self, 'show_preview', True):
+                cv2.destroyAllWindows()
             
             # Close MediaPipe
-            self.control_system.hands.close()
-            self.control_system.pose.close()
-            self.control_system.face_mesh.close()
+            self.control_system.close_models()
+            self.control_system.input.close()
             
             print("✅ Cleanup completed")
             print("\n🎉 CS:GO Gesture Control Application finished!")
@@ -404,5 +345,48 @@ class MainApplication:
             print(f"❌ Error during cleanup: {e}")
 
 if __name__ == "__main__":
-    app = MainApplication()
-    app.run()
+    import calibration
+    import camera_capture
+    import gesture_classifier
+    import inference_resolution
+    import input_backends
+    import latency_governor
+    import model_activation
+    import model_warmup
+    import threshold_tuner
+    
+    parser = argparse.ArgumentParser(description="CS:GO Gesture Control - Main Application")
+    parser.add_argument('--replay', help='Replay a recording (see frame_recording.py) instead of the webcam')
+    parser.add_argument('--fast', action='store_true', help='Replay as fast as possible instead of real time')
+    parser.add_argument('--no-preview', action='store_true', help='Run without the preview window')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Capture key/mouse events instead of injecting them (saved to input_events.json)')
+    inference_resolution.add_arguments(parser)
+    add_face_mesh_arguments(parser)
+    model_activation.add_arguments(parser)
+    model_warmup.add_arguments(parser)
+    latency_governor.add_arguments(parser)
+    gesture_classifier.add_arguments(parser)
+    threshold_tuner.add_arguments(parser)
+    calibration.add_arguments(parser)
+    input_backends.add_arguments(parser)
+    camera_capture.add_arguments(parser)
+    args = parser.parse_args()
+    
+    from input_backends import NullInputBackend
+    from frame_recording import ReplayCapture
+    
+    # Same pyautogui safety as the default backend if --input-backend picks (or auto falls back to) it
+    backend = NullInputBackend() if args.dry_run else input_backends.from_args(args, pause=0.01, failsafe=True)
+    capture = ReplayCapture(args.replay, realtime=not args.fast) if args.replay else camera_capture.open_from_args(args)
+    
+    app = MainApplication(input_backend=backend, inference=inference_resolution.from_args(args),
+                          activation=model_activation.from_args(args), gesture_resume=args.gesture_resume,
+                          warmup=model_warmup.from_args(args), governor=latency_governor.from_args(args),
+                          gestures=gesture_classifier.from_args(args), profile=threshold_tuner.from_args(args),
+                          calibration=calibration.from_args(args), **face_mesh_options(args))
+    app.run(capture=capture, show_preview=not args.no_preview)
+    
+    if args.dry_run:
+        backend.export_json('input_events.json')
+        print(f"Captured {len(backend.events)} input events -> input_events.json")
@@ -0,0 +1,101 @@
+"""
+Model Activation
+Decides each frame which MediaPipe graphs actually run, from the application
+mode and which controllers can use their output.
+
+    control ON, or tutorial / hands + pose every frame; face mesh when the tongue
+    backseat mode             action or face-based head pitch needs it (and its
+                              schedule, see FACE_MESH_MODES, says so). The AI
+                              modes read the same GestureFrame as normal mode.
+    normal mode, control OFF  hands only, every paused_interval frames (enough
+                              for the preview and a resume gesture); pose and
+                              face mesh idle
+
+Idle graphs cost no CPU. With release_after set, graphs left idle that long
+are closed to free their memory and recreated on next use (in-process models
+only; the first frame after reactivation pays the graph start-up).
+"""
+
+import argparse
+import time
+from typing import Dict, Optional, Tuple
+
+MODELS = ('hands', 'pose', 'face_mesh')
+MODES = ('normal', 'tutorial', 'backseat')
+
+
+class ModelActivation:
+    """Per-frame model selection plus idle tracking"""
+
+    def __init__(self, paused_interval: int = 5, release_after: Optional[float] = None):
+        self.mode = 'normal'
+        self.paused_interval = max(1, paused_interval)
+        self.release_after = release_after
+        self.active: Tuple[str, ...] = MODELS
+        self.runs: Dict[str, int] = {model: 0 for model in MODELS}
+        self.last_used: Dict[str, float] = {}
+        self._paused_frames = 0
+        self._state = None
+
+    def set_mode(self, mode: str):
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}")
+        self.mode = mode
+
+    def select(self, control_enabled: bool, face_needed: bool, face_mesh_due: bool,
+               now: Optional[float] = None) -> Tuple[str, ...]:
+        """
+        Models to run on this frame.
+        face_needed: some consumer reads face mesh output (tongue action or face-based head pitch)
+        face_mesh_due: the face mesh schedule allows it this frame
+        """
+        if self.mode == 'normal' and not control_enabled:
+            state = 'paused'
+            active = ('hands',) if self._paused_frames % self.paused_interval == 0 else ()
+            self._paused_frames += 1
+        else:
+            state = 'active' if self.mode == 'normal' else self.mode
+            active = ('hands', 'pose', 'face_mesh') if face_needed and face_mesh_due else ('hands', 'pose')
+        if state != 'paused':
+            self._paused_frames = 0
+        if state != self._state:
+            self._state = state
+            print(f"🔌 Models: {self.describe(state)}")
+
+        now = time.perf_counter() if now is None else now
+        for model in active:
+            self.runs[model] += 1
+            self.last_used[model] = now
+        self.active = active
+        return active
+
+    def release_due(self, loaded, now: Optional[float] = None):
+        """Loaded models idle for longer than release_after (empty when releasing is disabled)"""
+        if self.release_after is None:
+            return []
+        now = time.perf_counter() if now is None else now
+        return [model for model in loaded
+                if model not in self.active and now - self.last_used.get(model, now) > self.release_after]
+
+    def describe(self, state: Optional[str] = None) -> str:
+        state = state or self._state or 'active'
+        if state == 'paused':
+            return f"control off - hands every {self.paused_interval} frames, pose/face mesh idle"
+        if state in ('tutorial', 'backseat'):
+            return f"{state} mode - hands, pose and face mesh as needed"
+        return "control on - hands, pose and face mesh as needed"
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Command-line options shared by the control scripts"""
+    group = parser.add_argument_group('model activation')
+    group.add_argument('--paused-interval', type=int, default=5,
+                       help='Run hands every N frames while control is off (default 5)')
+    group.add_argument('--release-idle', type=float, metavar='SECONDS',
+                       help='Close graphs idle for this long and recreate them on demand')
+    group.add_argument('--gesture-resume', action='store_true',
+                       help='Re-enable control by holding both palms open for a second')
+
+
+def from_args(args) -> ModelActivation:
+    return ModelActivation(paused_interval=args.paused_interval, release_after=args.release_idle)
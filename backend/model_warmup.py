@@ -0,0 +1,121 @@
+"""
+Model Warm-up
+Runs each MediaPipe graph on synthetic frames at startup until its per-call
+time settles, so graph initialization, model loading and delegate setup don't
+land on the first real frames (the first process() call costs several times
+the steady state).
+
+    graphs, reports = warm_up_models({'hands': make_hands, ...}, images)
+
+Each graph is created and warmed in its own thread (the graphs run in native
+code, so on a multi-core machine they warm up side by side); the call returns
+once every graph has reached steady-state timing or max_runs. Per-model
+reports give construction time, first-call time and steady-state time.
+Inference worker processes (inference_workers.py) warm their graph the same way
+before reporting ready.
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from inference_resolution import fit_size
+
+# Capture size the control scripts request from the camera
+WARMUP_SHAPE = (720, 1280, 3)
+
+
+class WarmupReport:
+    """Start-up timings of one graph"""
+    __slots__ = ('model', 'init_ms', 'first_ms', 'steady_ms', 'runs', 'steady')
+
+    def __init__(self, model: str, init_ms: float, first_ms: float, steady_ms: float, runs: int, steady: bool):
+        self.model = model
+        self.init_ms = init_ms
+        self.first_ms = first_ms
+        self.steady_ms = steady_ms
+        self.runs = runs
+        self.steady = steady
+
+    def describe(self) -> str:
+        state = f"steady {self.steady_ms:.1f} ms" if self.steady else f"not settled ({self.steady_ms:.1f} ms)"
+        return (f"{self.model}: init {self.init_ms:.0f} ms, first call {self.first_ms:.0f} ms, "
+                f"{state} after {self.runs} runs")
+
+    def as_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def warmup_image(size: Optional[Tuple[int, int]] = None, shape=WARMUP_SHAPE) -> np.ndarray:
+    """Read-only mid-grey RGB frame at a model's inference size (None = full shape)"""
+    size = fit_size(size, shape)
+    height, width = (shape[0], shape[1]) if size is None else (size[1], size[0])
+    image = np.full((height, width, 3), 128, dtype=np.uint8)
+    image.flags.writeable = False
+    return image
+
+
+def warm_up(graph, image: np.ndarray, min_runs: int = 3, max_runs: int = 20, window: int = 3,
+            tolerance: float = 1.5) -> Tuple[float, float, int, bool]:
+    """
+    Call graph.process(image) until the last `window` calls (first call excluded)
+    are within `tolerance` of each other.
+    Returns (first_ms, steady_ms, runs, steady) - steady_ms is the median of that window.
+    """
+    times = []
+    while len(times) < max_runs:
+        start = time.perf_counter()
+        graph.process(image)
+        times.append((time.perf_counter() - start) * 1000.0)
+        recent = times[1:][-window:]
+        if len(times) >= min_runs and len(recent) == window and max(recent) <= tolerance * min(recent):
+            return times[0], float(np.median(recent)), len(times), True
+    return times[0], float(np.median(times[1:][-window:] or times)), len(times), False
+
+
+def create_and_warm(model: str, factory: Callable[[], object], image: np.ndarray, **options):
+    """Construct one graph and warm it up; returns (graph, WarmupReport)"""
+    start = time.perf_counter()
+    graph = factory()
+    init_ms = (time.perf_counter() - start) * 1000.0
+    first_ms, steady_ms, runs, steady = warm_up(graph, image, **options)
+    return graph, WarmupReport(model, init_ms, first_ms, steady_ms, runs, steady)
+
+
+def warm_up_models(factories: Dict[str, Callable[[], object]], images: Dict[str, np.ndarray],
+                   parallel: bool = True, **options):
+    """Create and warm every graph (in parallel threads); returns ({model: graph}, {model: WarmupReport})"""
+    if parallel and len(factories) > 1:
+        with ThreadPoolExecutor(max_workers=len(factories), thread_name_prefix='warmup') as pool:
+            futures = {model: pool.submit(create_and_warm, model, factory, images[model], **options)
+                       for model, factory in factories.items()}
+            done = {model: future.result() for model, future in futures.items()}
+    else:
+        done = {model: create_and_warm(model, factory, images[model], **options)
+                for model, factory in factories.items()}
+    return ({model: graph for model, (graph, _) in done.items()},
+            {model: report for model, (_, report) in done.items()})
+
+
+def print_reports(reports: Dict[str, WarmupReport], total_ms: Optional[float] = None):
+    for report in reports.values():
+        print(f"🔥 Warm-up {report.describe()}")
+    if total_ms is not None:
+        print(f"🔥 Models ready in {total_ms:.0f} ms")
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Command-line options shared by the control scripts"""
+    group = parser.add_argument_group('model warm-up')
+    group.add_argument('--no-warmup', action='store_true',
+                       help='Skip warming the models up on synthetic frames before the loop starts')
+    group.add_argument('--warmup-runs', type=int, default=20,
+                       help='Give up waiting for steady-state timing after this many calls per model (default 20)')
+
+
+def from_args(args):
+    """LeaningControlSystem/InferenceWorkerPool warmup argument: warm_up() options, or False to skip"""
+    return False if args.no_warmup else {'max_runs': args.warmup_runs}
@@ -0,0 +1,169 @@
+"""
+Ring Buffers
+Fixed-capacity NumPy-backed histories for per-frame statistics.
+
+Appending to Python lists and trimming them by slicing or re-filtering every
+frame is O(n) per frame; over an hour at 60 FPS that is steady wasted work
+and allocation. These rings never grow, append and expire in O(1) (amortized)
+and keep their statistics up to date incrementally:
+
+    RingBuffer   last `capacity` values, running sum/mean
+    RollingMean  mean of the last `window` values
+    EventWindow  timestamped integer event codes expiring after `horizon`
+                 seconds, with distinct-code and distinct-transition counts
+"""
+
+from typing import List, Optional
+
+import numpy as np
+
+
+class RingBuffer:
+    """Last `capacity` numeric values (oldest overwritten) with a running sum"""
+
+    def __init__(self, capacity: int, dtype=np.float64):
+        self.capacity = max(1, capacity)
+        self.data = np.zeros(self.capacity, dtype=dtype)
+        self.head = 0  # Index of the oldest value
+        self.size = 0
+        self.sum = 0.0
+        self._evictions = 0
+
+    def __len__(self):
+        return self.size
+
+    def append(self, value) -> Optional[float]:
+        """Add a value; returns the evicted oldest value once full"""
+        if self.size < self.capacity:
+            self.data[(self.head + self.size) % self.capacity] = value
+            self.size += 1
+            self.sum += value
+            return None
+        evicted = float(self.data[self.head])
+        self.data[self.head] = value
+        self.head = (self.head + 1) % self.capacity
+        self._evictions += 1
+        if self._evictions >= self.capacity:
+            # Re-sum once per full turn so float error can't accumulate (amortized O(1))
+            self._evictions = 0
+            self.sum = float(self.data.sum())
+        else:
+            self.sum += value - evicted
+        return evicted
+
+    def mean(self, default: float = 0.0) -> float:
+        return self.sum / self.size if self.size else default
+
+    def last(self, n: int) -> np.ndarray:
+        """The newest n values, oldest first"""
+        n = min(n, self.size)
+        start = (self.head + self.size - n) % self.capacity
+        return np.take(self.data, np.arange(start, start + n) % self.capacity)
+
+    def values(self) -> np.ndarray:
+        return self.last(self.size)
+
+    def clear(self):
+        self.head = self.size = self._evictions = 0
+        self.sum = 0.0
+
+
+class RollingMean(RingBuffer):
+    """Mean of the last `window` values, maintained in O(1) per update"""
+
+    def __init__(self, window: int):
+        super().__init__(window)
+
+    @property
+    def value(self) -> float:
+        return self.mean()
+
+
+class EventWindow:
+    """
+    Timestamped event codes (0 <= code < codes) kept for `horizon` seconds.
+    Maintains incrementally:
+        distinct          codes present in the whole window
+        distinct_recent   codes among the newest `recent` events
+        transitions       distinct (previous, next) code pairs between consecutive events
+    """
+
+    def __init__(self, capacity: int, horizon: float, codes: int, recent: int = 10):
+        self.capacity = max(2, capacity)
+        self.horizon = horizon
+        self.recent = recent
+        self.times = np.zeros(self.capacity, dtype=np.float64)
+        self.codes = np.zeros(self.capacity, dtype=np.int16)
+        self._counts = np.zeros(codes, dtype=np.int64)
+        self._recent_counts = np.zeros(codes, dtype=np.int64)
+        self._pairs = np.zeros((codes, codes), dtype=np.int64)
+        self.clear()
+
+    def clear(self):
+        self.head = self.size = 0
+        self.distinct = self.distinct_recent = self.transitions = 0
+        self._counts[:] = 0
+        self._recent_counts[:] = 0
+        self._pairs[:] = 0
+
+    def __len__(self):
+        return self.size
+
+    def _code_at(self, offset: int) -> int:
+        """Code of the event `offset` places after the oldest"""
+        return int(self.codes[(self.head + offset) % self.capacity])
+
+    def append(self, timestamp: float, code: int):
+        if self.size == self.capacity:
+            self._pop_oldest()
+        if self.size:
+            self._add_pair(self._code_at(self.size - 1), code)
+        self.times[(self.head + self.size) % self.capacity] = timestamp
+        self.codes[(self.head + self.size) % self.capacity] = code
+        self.size += 1
+
+        self._counts[code] += 1
+        if self._counts[code] == 1:
+            self.distinct += 1
+        self._add_recent(code, 1)
+        if self.size > self.recent:
+            self._add_recent(self._code_at(self.size - 1 - self.recent), -1)
+
+    def expire(self, now: float):
+        """Drop events older than the horizon (amortized O(1): each event is dropped once)"""
+        cutoff = now - self.horizon
+        while self.size and self.times[self.head] <= cutoff:
+            self._pop_oldest()
+
+    def _pop_oldest(self):
+        code = self._code_at(0)
+        if self.size <= self.recent:
+            self._add_recent(code, -1)  # Still inside the recent span
+        if self.size >= 2:
+            self._add_pair(code, self._code_at(1), -1)
+        self._counts[code] -= 1
+        if self._counts[code] == 0:
+            self.distinct -= 1
+        self.head = (self.head + 1) % self.capacity
+        self.size -= 1
+
+    def _add_recent(self, code: int, delta: int):
+        before = self._recent_counts[code]
+        self._recent_counts[code] = before + delta
+        if before == 0 and delta > 0:
+            self.distinct_recent += 1
+        elif before + delta == 0 and delta < 0:
+            self.distinct_recent -= 1
+
+    def _add_pair(self, previous: int, code: int, delta: int = 1):
+        before = self._pairs[previous, code]
+        self._pairs[previous, code] = before + delta
+        if before == 0 and delta > 0:
+            self.transitions += 1
+        elif before + delta == 0 and delta < 0:
+            self.transitions -= 1
+
+    def last(self, n: int) -> List[int]:
+        """Codes of the newest n events, oldest first"""
+        n = min(n, self.size)
+        return [self._code_at(self.size - n + i) for i in range(n)]
@@ -0,0 +1,377 @@
+"""
+Soak Test
+Replays recorded landmarks for hours of session time and fails when memory keeps growing.
+
+Streamers leave the control system running for hours, so a history that gains
+one entry per frame or per commentary line never shows up in a ten minute
+test. The soak test loops landmark logs (landmark_log.py) through
+LeaningControlSystem.update_controls and the latency profiler, optionally
+feeding the tutorial and backseat modes too. Timestamps stay monotonic across
+loops. Every --interval of replayed time it samples:
+
+    - the traced Python heap (tracemalloc) and the allocation sites that grew most
+    - resident set size
+    - the number of live objects (gc)
+
+Caches, rolling windows and the profiler window fill up during the warm-up.
+The first sample after it is the baseline. The run fails (exit status 1) when
+growth from the baseline passes a limit, and the report names the allocation
+sites responsible.
+
+    python soak_test.py session.lmk --duration 4h                  # As fast as the controllers run
+    python soak_test.py a.lmk b.lmk --duration 2h --speed 60       # 60x real time
+    python soak_test.py --duration 30m --modes tutorial,backseat --output soak.json
+
+Without a log it replays the scripted synthetic stream from the benchmarks.
+The modes still pace commentary on wall-clock time and need config.py, so
+they are only soaked when their imports succeed.
+"""
+
+import argparse
+import contextlib
+import gc
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+FPS = 30.0
+MB = 1024 * 1024
+
+# Growth from the post-warm-up baseline that fails a run
+DEFAULT_LIMITS = {
+    'traced_mb': 8.0,  # Python heap: the leak signal
+    'rss_mb': 64.0,  # Allocator and native buffers: noisy, so looser
+    'objects': 20000,
+}
+
+_DURATION_UNITS = {'h': 3600.0, 'm': 60.0, 's': 1.0, '': 1.0}
+
+
+def parse_duration(text: str) -> float:
+    """Seconds from '90', '90s', '30m', '4h' or '1h30m'"""
+    parts = re.findall(r'(\d+(?:\.\d+)?)\s*([hms]?)', text.strip().lower())
+    if not parts or re.sub(r'[\d.\shms]', '', text.lower()):
+        raise argparse.ArgumentTypeError(f"invalid duration '{text}' (e.g. 90s, 30m, 4h, 1h30m)")
+    return sum(float(value) * _DURATION_UNITS[unit] for value, unit in parts)
+
+
+def rss_bytes() -> int:
+    """Current resident set size (Linux /proc; 0 where unavailable)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+@contextlib.contextmanager
+def silenced():
+    """Send the controllers' console prints to /dev/null (a StringIO would grow and look like a leak)"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+class MemorySample:
+    """Memory use after `frames` frames and `replayed` seconds of session time"""
+
+    __slots__ = ('frames', 'replayed', 'wall', 'traced', 'rss', 'objects')
+
+    def __init__(self, frames: int, replayed: float, wall: float, traced: int, rss: int, objects: int):
+        self.frames = frames
+        self.replayed = replayed
+        self.wall = wall
+        self.traced = traced
+        self.rss = rss
+        self.objects = objects
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class MemoryTracker:
+    """
+    Samples the traced heap, RSS and the live object count against a baseline.
+    start() once the process has warmed up, sample() periodically, stop() for the final snapshot.
+    """
+
+    def __init__(self):
+        self.samples: List[MemorySample] = []
+        self.baseline = None
+        self.final = None
+        self.started = None
+
+    def start(self):
+        gc.collect()
+        tracemalloc.start()
+        self.baseline = tracemalloc.take_snapshot()
+        self.final = None
+        self.samples = []
+        self.started = time.perf_counter()
+
+    def sample(self, frames: int, replayed: float) -> MemorySample:
+        gc.collect()
+        sample = MemorySample(frames, replayed, time.perf_counter() - self.started,
+                              tracemalloc.get_traced_memory()[0], rss_bytes(), len(gc.get_objects()))
+        self.samples.append(sample)
+        return sample
+
+    def stop(self):
+        if tracemalloc.is_tracing():
+            self.final = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+
+    def growth(self) -> Dict[str, int]:
+        """Last sample minus the first: traced/rss bytes and objects"""
+        if len(self.samples) < 2:
+            return {'traced': 0, 'rss': 0, 'objects': 0}
+        first, last = self.samples[0], self.samples[-1]
+        return {column: getattr(last, column) - getattr(first, column) for column in ('traced', 'rss', 'objects')}
+
+    def slope(self, column: str, per: str = 'replayed', scale: float = 1.0) -> float:
+        """Least-squares growth of `column` per `scale` units of `per` (e.g. per hour of replayed time)"""
+        if len(self.samples) < 2:
+            return 0.0
+        x = np.array([getattr(s, per) for s in self.samples], dtype=np.float64)
+        y = np.array([getattr(s, column) for s in self.samples], dtype=np.float64)
+        if np.ptp(x) == 0:
+            return 0.0
+        return float(np.polyfit(x, y, 1)[0] * scale)
+
+    def top_growth(self, top: int = 10) -> List[Dict]:
+        """Allocation sites that grew most between the baseline and the final snapshot"""
+        if self.baseline is None or self.final is None:
+            return []
+        return [
+            {'site': str(stat.traceback[0]), 'bytes': stat.size_diff, 'blocks': stat.count_diff}
+            for stat in self.final.compare_to(self.baseline, 'lineno')[:top] if stat.size_diff > 0
+        ]
+
+    def check(self, limits: Dict[str, float]) -> List[str]:
+        """Failure messages for growth past `limits` (DEFAULT_LIMITS keys; None disables one)"""
+        growth = self.growth()
+        failures = []
+        for column, key, scale, unit in (('traced', 'traced_mb', MB, ' MB'), ('rss', 'rss_mb', MB, ' MB'),
+                                         ('objects', 'objects', 1, '')):
+            limit = limits.get(key)
+            if limit is not None and growth[column] > limit * scale:
+                failures.append(f"{column} grew {growth[column] / scale:,.1f}{unit} (limit {limit:,}{unit})")
+        return failures
+
+
+def load_records(paths: Sequence[str]) -> List[np.ndarray]:
+    """Landmark log records, copied out of the memmaps so replay doesn't grow the page cache into RSS"""
+    from landmark_log import LandmarkLog
+
+    if paths:
+        sessions = [np.array(LandmarkLog(path).records) for path in paths]
+    else:
+        from benchmarks.synthetic import landmark_frames, write_landmark_log
+        with tempfile.TemporaryDirectory() as tmp, silenced():
+            log = write_landmark_log(os.path.join(tmp, 'soak.lmk'), landmark_frames(int(FPS * 60)))
+            sessions = [np.array(log.records)]
+    sessions = [records for records in sessions if len(records)]
+    if not sessions:
+        raise ValueError("no frames in the landmark logs")
+    return sessions
+
+
+def replay_frames(sessions: List[np.ndarray]):
+    """LandmarkFrames from the sessions back to back, forever, with monotonic timestamps"""
+    from landmark_log import LandmarkFrame
+
+    offset = 0.0
+    while True:
+        for records in sessions:
+            start = float(records['t'][0])
+            for record in records:
+                frame = LandmarkFrame(record)
+                frame.timestamp = offset + float(record['t']) - start
+                yield frame
+            offset += float(records['t'][-1]) - start + 1.0 / FPS
+
+
+def mode_consumers(modes: Sequence[str], frame_shape=(720, 1280, 3)) -> Dict[str, Callable]:
+    """
+    Per-frame callbacks feeding the gesture frame to the tutorial/backseat modes, as main.py does.
+    Modes that can't be imported here (config.py, API clients) are skipped with a warning.
+    """
+    canvas = np.zeros(frame_shape, dtype=np.uint8)  # One reused frame, like a camera buffer
+    consumers = {}
+    for mode in modes:
+        try:
+            if mode == 'tutorial':
+                from tutorial_mode import tutorial_mode
+
+                def tutorial(gesture, tutorial_mode=tutorial_mode):
+                    complete, _ = tutorial_mode.update_tutorial(gesture, canvas)
+                    if complete:
+                        tutorial_mode.start_tutorial()  # Loop the lessons for the whole soak
+
+                with silenced():
+                    tutorial_mode.start_tutorial()
+                consumers[mode] = tutorial
+            elif mode == 'backseat':
+                from backseat_mode import backseat_mode
+                with silenced():
+                    backseat_mode.start_backseat_mode()
+                consumers[mode] = lambda gesture: backseat_mode.update_backseat_mode(gesture, canvas)
+            else:
+                print(f"⚠️  Unknown mode '{mode}' (tutorial, backseat)")
+        except Exception as e:
+            print(f"⚠️  Skipping {mode} mode: {e}")
+    return consumers
+
+
+def soak(sessions: List[np.ndarray], duration: float, speed: float = 0.0, interval: float = 60.0,
+         warmup: float = 60.0, modes: Sequence[str] = (), limits: Optional[Dict[str, float]] = None,
+         top: int = 10, progress: bool = True) -> Dict:
+    """
+    Replay `duration` seconds of session time after `warmup` seconds, sampling memory every `interval`.
+    speed: replayed seconds per wall second (0 = as fast as possible)
+    Returns: the report (see main); report['failures'] is empty when memory stayed within `limits`
+    """
+    from input_backends import NullInputBackend
+    from latency_profiler import latency_profiler
+    from leaning_control_system import LeaningControlSystem
+
+    limits = dict(DEFAULT_LIMITS if limits is None else limits)
+    with silenced():
+        system = LeaningControlSystem(input_backend=NullInputBackend(record=False), load_models=False)
+    system.control_enabled = True
+    consumers = mode_consumers(modes)
+    profiler = latency_profiler
+    tracker = MemoryTracker()
+    out = sys.stdout
+
+    frames = 0
+    replayed = 0.0
+    next_sample = warmup
+    end = warmup + duration
+    wall_start = time.perf_counter()
+    with silenced():
+        for frame in replay_frames(sessions):
+            replayed = frame.timestamp
+            if replayed >= end:
+                break
+            if speed > 0:
+                ahead = replayed / speed - (time.perf_counter() - wall_start)
+                if ahead > 0:
+                    time.sleep(ahead)
+
+            profiler.begin_frame()
+            gesture = system.update_controls(frame.multi_hand_landmarks, frame.pose_landmarks,
+                                             frame.face_landmarks, capture_time=frame.timestamp,
+                                             handedness_list=frame.multi_handedness)
+            for consume in consumers.values():
+                consume(gesture)
+            profiler.end_frame()
+            frames += 1
+
+            if replayed >= next_sample:
+                if tracker.baseline is None:
+                    tracker.start()
+                sample = tracker.sample(frames, replayed - warmup)
+                next_sample += interval
+                if progress:
+                    growth = tracker.growth()
+                    print(f"⏱️  {_clock(sample.replayed)} replayed ({frames:,} frames) | "
+                          f"heap {sample.traced / MB:.1f} MB ({growth['traced'] / MB:+.2f}) | "
+                          f"RSS {sample.rss / MB:.0f} MB ({growth['rss'] / MB:+.1f}) | "
+                          f"objects {sample.objects:,} ({growth['objects']:+,})", file=out, flush=True)
+        if tracker.baseline is not None and tracker.samples[-1].frames != frames:
+            tracker.sample(frames, replayed - warmup)
+        tracker.stop()
+        system.wasd_controller.release_all_keys()
+        system.shooting_controller.force_release()
+    wall = time.perf_counter() - wall_start
+
+    failures = tracker.check(limits)
+    if len(tracker.samples) < 2:
+        failures.append("fewer than two samples - lengthen --duration or shorten --interval")
+    growth = tracker.growth()
+    return {
+        'frames': frames,
+        'replayed_seconds': round(max(replayed - warmup, 0.0), 1),
+        'warmup_seconds': warmup,
+        'wall_seconds': round(wall, 1),
+        'speed': round(replayed / wall, 1) if wall > 0 else 0.0,
+        'modes': sorted(consumers),
+        'limits': limits,
+        'growth': growth,
+        'per_hour': {column: round(tracker.slope(column, scale=3600.0), 1) for column in growth},
+        'top_growth': tracker.top_growth(top),
+        'samples': [sample.to_dict() for sample in tracker.samples],
+        'failures': failures,
+        'passed': not failures,
+    }
+
+
+def _clock(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes // 60}:{minutes % 60:02d}:{seconds:02d}"
+
+
+def print_report(report: Dict):
+    growth, per_hour = report['growth'], report['per_hour']
+    print(f"\n🧪 Soak: {_clock(report['replayed_seconds'])} replayed in {_clock(report['wall_seconds'])} "
+          f"({report['speed']}x, {report['frames']:,} frames, modes: {', '.join(report['modes']) or 'controllers only'})")
+    print(f"   heap    {growth['traced'] / MB:+8.2f} MB  ({per_hour['traced'] / MB:+.2f} MB/h)")
+    print(f"   RSS     {growth['rss'] / MB:+8.2f} MB  ({per_hour['rss'] / MB:+.2f} MB/h)")
+    print(f"   objects {growth['objects']:+8,}     ({per_hour['objects']:+,.0f}/h)")
+    if report['top_growth']:
+        print("   Top growing allocation sites:")
+        for site in report['top_growth']:
+            print(f"     {site['bytes'] / 1024:+9.1f} KiB {site['blocks']:+7,} blocks  {site['site']}")
+    for failure in report['failures']:
+        print(f"❌ {failure}")
+    if report['passed']:
+        print("✅ Memory stayed within limits")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Replay landmark logs for hours and fail on memory growth")
+    parser.add_argument('logs', nargs='*', help='Landmark logs (.lmk) replayed in a loop (default: synthetic stream)')
+    parser.add_argument('--duration', type=parse_duration, default=parse_duration('4h'),
+                        help='Session time to replay after the warm-up, e.g. 90s, 30m, 4h (default: 4h)')
+    parser.add_argument('--speed', type=float, default=0.0,
+                        help='Replayed seconds per wall second; 0 = as fast as possible (default)')
+    parser.add_argument('--interval', type=parse_duration, default=parse_duration('5m'),
+                        help='Replayed time between memory samples (default: 5m)')
+    parser.add_argument('--warmup', type=parse_duration, default=parse_duration('2m'),
+                        help='Replayed time before the baseline sample (default: 2m)')
+    parser.add_argument('--modes', default='', help='Also feed these modes: tutorial,backseat')
+    parser.add_argument('--max-traced-mb', type=float, default=DEFAULT_LIMITS['traced_mb'],
+                        help='Fail if the traced Python heap grows more than this (MB)')
+    parser.add_argument('--max-rss-mb', type=float, default=DEFAULT_LIMITS['rss_mb'],
+                        help='Fail if the resident set grows more than this (MB)')
+    parser.add_argument('--max-objects', type=int, default=DEFAULT_LIMITS['objects'],
+                        help='Fail if the live object count grows more than this')
+    parser.add_argument('--top', type=int, default=10, help='Growing allocation sites to report')
+    parser.add_argument('--output', help='Write the JSON report here')
+    args = parser.parse_args(argv)
+
+    sessions = load_records(args.logs)
+    print(f"🧪 Soaking {sum(len(r) for r in sessions):,} frames from {', '.join(args.logs) or 'the synthetic stream'} "
+          f"for {_clock(args.duration)} after a {_clock(args.warmup)} warm-up")
+    report = soak(sessions, args.duration, speed=args.speed, interval=args.interval, warmup=args.warmup,
+                  modes=[mode.strip() for mode in args.modes.split(',') if mode.strip()],
+                  limits={'traced_mb': args.max_traced_mb, 'rss_mb': args.max_rss_mb, 'objects': args.max_objects},
+                  top=args.top)
+    report['logs'] = args.logs or ['synthetic']
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report -> {args.output}")
+    return 0 if report['passed'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
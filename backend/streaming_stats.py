@@ -0,0 +1,143 @@
+"""
+Streaming Statistics
+O(1)-memory per-frame statistics for the tutorial's lesson scoring.
+
+    RunningStats   count, mean, variance (Welford), min/max
+    ProgressCurve  downsampled (time, value) curve with a fixed number of points:
+                   when full, neighbouring points are merged and each point
+                   then covers twice as many samples
+    LessonScorer   one lesson's score from real frame timestamps - time spent
+                   performing the gesture over time practised - so the score
+                   doesn't depend on the loop's frame rate
+"""
+
+import math
+from typing import Dict, List, Optional, Tuple
+
+
+class RunningStats:
+    """Running count/mean/variance (Welford's algorithm)"""
+    __slots__ = ('count', 'mean', '_m2', 'min', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def summary(self) -> Dict[str, float]:
+        if not self.count:
+            return {'count': 0}
+        return {'count': self.count, 'mean': self.mean, 'std': self.std, 'min': self.min, 'max': self.max}
+
+
+class ProgressCurve:
+    """Downsampled curve of at most `points` (time, mean value) points"""
+
+    def __init__(self, points: int = 64):
+        self.points = max(2, points - points % 2)
+        self.span = 1  # Samples per stored point
+        self._times: List[float] = []
+        self._values: List[float] = []
+        self._pending = (0, 0.0, 0.0)  # (samples, time sum, value sum) of the point being filled
+
+    def add(self, timestamp: float, value: float):
+        samples, time_sum, value_sum = self._pending
+        samples, time_sum, value_sum = samples + 1, time_sum + timestamp, value_sum + value
+        if samples < self.span:
+            self._pending = (samples, time_sum, value_sum)
+            return
+        self._pending = (0, 0.0, 0.0)
+        self._times.append(time_sum / samples)
+        self._values.append(value_sum / samples)
+        if len(self._times) >= self.points:
+            # Merge neighbours: half the points, each covering twice the samples
+            self._times = [(a + b) / 2 for a, b in zip(self._times[::2], self._times[1::2])]
+            self._values = [(a + b) / 2 for a, b in zip(self._values[::2], self._values[1::2])]
+            self.span *= 2
+
+    def curve(self) -> List[Tuple[float, float]]:
+        """Stored points plus the partially filled one, oldest first"""
+        points = list(zip(self._times, self._values))
+        samples, time_sum, value_sum = self._pending
+        if samples:
+            points.append((time_sum / samples, value_sum / samples))
+        return points
+
+
+class LessonScorer:
+    """
+    Streaming score for one tutorial lesson.
+    Each frame contributes its real duration (time since the previous frame,
+    capped at max_dt so a stall doesn't count as practice); the score is the
+    fraction of practice time spent above the success threshold.
+    """
+
+    def __init__(self, success_threshold: float, max_dt: float = 0.25, curve_points: int = 64):
+        self.success_threshold = success_threshold
+        self.max_dt = max_dt
+        self.attempts = 0
+        self.successes = 0
+        self.practice_time = 0.0
+        self.time_in_gesture = 0.0
+        self.performance = RunningStats()
+        self.curve = ProgressCurve(curve_points)
+        self.start_time: Optional[float] = None
+        self.last_time: Optional[float] = None
+
+    def update(self, performance: float, timestamp: float) -> float:
+        """Add one frame's gesture performance (0..1); returns the current score"""
+        if self.last_time is None:
+            self.start_time = timestamp
+            dt = 0.0
+        else:
+            dt = min(max(timestamp - self.last_time, 0.0), self.max_dt)
+        self.last_time = timestamp
+
+        success = performance > self.success_threshold
+        self.attempts += 1
+        self.successes += success
+        self.practice_time += dt
+        if success:
+            self.time_in_gesture += dt
+        self.performance.add(performance)
+
+        score = self.score
+        self.curve.add(timestamp - self.start_time, score)
+        return score
+
+    @property
+    def score(self) -> float:
+        if self.practice_time > 0:
+            return self.time_in_gesture / self.practice_time
+        return self.successes / max(1, self.attempts)
+
+    def summary(self) -> Dict:
+        return {
+            'score': self.score,
+            'attempts': self.attempts,
+            'successes': self.successes,
+            'practice_time': self.practice_time,
+            'time_in_gesture': self.time_in_gesture,
+            'performance': self.performance.summary(),
+            'progress_curve': self.curve.curve(),
+        }
@@ -0,0 +1,373 @@
+"""
+Threshold Tuner
+Offline search for the controller thresholds over recorded landmark sessions.
+
+The WASD lean/pitch thresholds and hysteresis, the tongue lip-gap threshold
+and the finger-extension angle were guessed and then adjusted by trial and
+error in front of the webcam. The tuner replays landmark_log recordings
+against intended-action labels instead, and scores every candidate setting on:
+
+    - missed presses:  labeled actions without a press inside them
+    - false presses:   presses outside every labeled action, or extra presses inside one
+    - reaction delay:  press time minus labeled start (median, ms)
+
+Intended actions go in the labels file next to each log (<log>.labels.json,
+shared with gesture_classifier.py), in session seconds:
+
+    {"actions": [
+        {"action": "w", "start": 3.2, "end": 5.0},
+        {"action": "fire", "start": 7.1, "end": 7.3},
+        {"action": "crouch", "start": 9.0, "end": 9.6}
+    ]}
+
+Actions are w/a/s/d (held keys), fire (mouse button), crouch, jump and spray
+(taps). Every press of an action that appears in a file must be labeled;
+actions a file never mentions are not scored for that session.
+
+Settings are searched per group, and each group only feeds its own
+controller: a candidate replays just that controller over inputs extracted
+once per session (lean and head pitch, face landmarks, tracked hands) instead
+of the whole pipeline. Each group is tried with the current defaults, random
+samples of its ranges and a second round around the best so far, and the
+candidates are scored in parallel across cores. The result is a profile that
+the runtime loads:
+
+    python threshold_tuner.py session1.lmk session2.lmk --output profile.json
+    python leaning_control_system.py --profile profile.json
+"""
+
+import argparse
+import json
+import os
+import time
+from contextlib import contextmanager, redirect_stdout
+from multiprocessing import Pool
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+ACTIONS = ('w', 'a', 's', 'd', 'fire', 'crouch', 'jump', 'spray')
+LEFT_HAND_ACTIONS = {'ctrl': 'crouch', 'space': 'jump'}  # LeftHandGestureController keys -> actions
+
+# group -> (scored actions, {'<section>.<setting>': (low, high)}); sections as in LeaningControlSystem.apply_profile
+GROUPS = {
+    'wasd': (('w', 'a', 's', 'd'), {
+        'wasd_controller.lean_threshold': (2.0, 12.0),
+        'wasd_controller.pitch_threshold': (3.0, 16.0),
+        'wasd_controller.pitch_threshold_back': (4.0, 20.0),
+        'wasd_controller.hysteresis': (0.4, 0.95),
+    }),
+    'tongue': (('spray',), {
+        'tongue_controller.sensitivity': (0.005, 0.04),
+    }),
+    'hands': (('fire', 'crouch', 'jump'), {
+        'predicates.finger_extended_angle': (120.0, 170.0),
+    }),
+}
+
+
+@contextmanager
+def _silenced():
+    """Controllers print every press; keep thousands of replays off the console"""
+    with open(os.devnull, 'w') as sink, redirect_stdout(sink):
+        yield
+
+
+def load_actions(path: str) -> Dict[str, List[Tuple[float, float]]]:
+    """{action: sorted [(start, end)]} from a labels file's "actions" list"""
+    with open(path) as f:
+        entries = json.load(f).get('actions', [])
+    actions: Dict[str, List[Tuple[float, float]]] = {}
+    for entry in entries:
+        if entry['action'] not in ACTIONS:
+            raise ValueError(f"{path}: unknown action '{entry['action']}' (expected one of {', '.join(ACTIONS)})")
+        actions.setdefault(entry['action'], []).append((float(entry['start']), float(entry['end'])))
+    return {action: sorted(intervals) for action, intervals in actions.items()}
+
+
+def _new_system():
+    from input_backends import NullInputBackend
+    from leaning_control_system import LeaningControlSystem
+
+    with _silenced():
+        return LeaningControlSystem(input_backend=NullInputBackend(record=False), load_models=False)
+
+
+def nested(settings: Dict[str, float]) -> Dict[str, Dict[str, float]]:
+    """{'wasd_controller.hysteresis': 0.7} -> {'wasd_controller': {'hysteresis': 0.7}}"""
+    params: Dict[str, Dict[str, float]] = {}
+    for key, value in settings.items():
+        section, name = key.split('.', 1)
+        params.setdefault(section, {})[name] = value
+    return params
+
+
+def current_settings(group: str) -> Dict[str, float]:
+    """The runtime defaults of a group's settings"""
+    system = _new_system()
+    settings = {}
+    for key in GROUPS[group][1]:
+        section, name = key.split('.', 1)
+        if section == 'predicates':
+            settings[key] = getattr(system.gestures, name)
+        else:
+            settings[key] = float(getattr(getattr(system, section), name))
+    return settings
+
+
+class Session:
+    """Per-frame controller inputs of one landmark log, plus its intended actions"""
+
+    def __init__(self, path: str, labels_path: Optional[str] = None):
+        import leaning_control_system as lcs
+        from hand_tracker import HandTracker
+        from landmark_log import LandmarkLog
+
+        self.path = path
+        self.actions = load_actions(labels_path or f"{path}.labels.json")
+        log = LandmarkLog(path)
+        system = _new_system()
+        tracker = HandTracker()
+        count = len(log)
+        self.t = np.empty(count)
+        self.lean = np.zeros(count)
+        self.pitch = np.zeros(count)
+        self.faces = [None] * count
+        self.hands = [(None, None)] * count
+        with _silenced():
+            for i, frame in enumerate(log):
+                self.t[i] = frame.timestamp
+                if frame.pose_landmarks:
+                    self.lean[i] = lcs.calculate_lean_pose(frame.pose_landmarks, 1280, 720)
+                self.pitch[i] = system.head_pose(frame.pose_landmarks, frame.face_landmarks, 1280, 720)[1]
+                self.faces[i] = frame.face_landmarks
+                hands = tracker.update(frame.multi_hand_landmarks, frame.multi_handedness, frame.timestamp)
+                if frame.multi_hand_landmarks:  # update_controls only runs the hand controllers then
+                    self.hands[i] = hands
+        self.duration = float(self.t[-1] - self.t[0]) if count else 0.0
+
+
+def simulate(group: str, settings: Dict[str, float], session: Session) -> Dict[str, np.ndarray]:
+    """Per-frame activity (bool arrays) of the group's actions, driving its controller as update_controls does"""
+    system = _new_system()
+    system.apply_profile(nested(settings))
+    count = len(session.t)
+    active = {action: np.zeros(count, bool) for action in GROUPS[group][0]}
+    with _silenced():
+        if group == 'wasd':
+            update = system.wasd_controller.update
+            for i, (lean, pitch) in enumerate(zip(session.lean.tolist(), session.pitch.tolist())):
+                for key in update(lean, pitch, True)[0]:
+                    active[key][i] = True
+        elif group == 'tongue':
+            tongue = system.tongue_controller
+            for i, (t, face) in enumerate(zip(session.t.tolist(), session.faces)):
+                if face is not None:
+                    active['spray'][i] = tongue.update(face, True, t)[0]
+        else:
+            gun, shooting, left = system.gun_detector, system.shooting_controller, system.left_hand_controller
+            for i, (t, (left_hand, right_hand)) in enumerate(zip(session.t.tolist(), session.hands)):
+                if right_hand is not None:
+                    if gun.update(right_hand, t):
+                        active['fire'][i] = shooting.update(right_hand, True, t)[0]
+                    else:
+                        shooting.force_release()
+                if left_hand is not None:
+                    key = left.update(left_hand, True, t)[0]
+                    if key in LEFT_HAND_ACTIONS:
+                        active[LEFT_HAND_ACTIONS[key]][i] = True
+    return active
+
+
+def score_action(active: np.ndarray, t: np.ndarray, intervals: Sequence[Tuple[float, float]],
+                 slack: float) -> Tuple[int, int, List[float]]:
+    """
+    (missed, false presses, delays in s) for one action. A press (rising edge) in
+    [start - slack, end] hits the interval - the first one counts, any more are false;
+    presses within slack after an interval are ignored, all others are false.
+    """
+    onsets = t[np.flatnonzero(active & ~np.concatenate(([False], active[:-1])))]
+    claimed = np.zeros(len(onsets), bool)
+    missed, false, delays = 0, 0, []
+    for start, end in intervals:
+        lo = np.searchsorted(onsets, start - slack, side='left')
+        hi = np.searchsorted(onsets, end, side='right')
+        if hi > lo:
+            delays.append(max(0.0, float(onsets[lo]) - start))
+            false += int(hi - lo) - 1
+        else:
+            missed += 1
+        claimed[lo:np.searchsorted(onsets, end + slack, side='right')] = True
+    false += int((~claimed).sum())
+    return missed, false, delays
+
+
+def evaluate(group: str, settings: Dict[str, float], sessions: Sequence[Session], slack: float = 0.25,
+             delay_weight: float = 1.0) -> Dict[str, float]:
+    """
+    Group metrics over all sessions. cost = missed rate + false presses per intended
+    press + delay_weight * median delay (s); lower is better
+    """
+    actions = GROUPS[group][0]
+    intended = missed = false = 0
+    delays: List[float] = []
+    minutes = 0.0
+    for session in sessions:
+        scored = [action for action in actions if action in session.actions]
+        if not scored:
+            continue
+        active = simulate(group, settings, session)
+        minutes += session.duration / 60.0
+        for action in scored:
+            m, f, d = score_action(active[action], session.t, session.actions[action], slack)
+            intended += len(session.actions[action])
+            missed += m
+            false += f
+            delays += d
+    delay = float(np.median(delays)) if delays else 0.0
+    missed_rate = missed / max(intended, 1)
+    false_rate = false / max(intended, 1)
+    return {
+        'intended': intended, 'missed': missed, 'false': false,
+        'missed_rate': missed_rate, 'false_rate': false_rate,
+        'false_per_min': false / minutes if minutes else 0.0,
+        'delay_ms': delay * 1000.0,
+        'cost': missed_rate + false_rate + delay_weight * delay,
+    }
+
+
+def sample_settings(space: Dict[str, Tuple[float, float]], count: int, rng: np.random.Generator,
+                    around: Optional[Dict[str, float]] = None, spread: float = 0.1) -> List[Dict[str, float]]:
+    """Uniform samples of the ranges, or Gaussian ones (sd spread * range) around a setting, clipped to the ranges"""
+    candidates = []
+    for _ in range(count):
+        candidate = {}
+        for key, (low, high) in space.items():
+            if around is None:
+                value = rng.uniform(low, high)
+            else:
+                value = float(np.clip(rng.normal(around[key], spread * (high - low)), low, high))
+            candidate[key] = round(float(value), 4)
+        candidates.append(candidate)
+    return candidates
+
+
+# Worker processes load the sessions once (_init_worker) and then score candidates
+_SESSIONS: List[Session] = []
+_SCORING: Dict[str, float] = {}
+
+
+def _init_worker(paths: Sequence[str], scoring: Dict[str, float]):
+    global _SESSIONS, _SCORING
+    _SESSIONS = [Session(path) for path in paths]
+    _SCORING = scoring
+
+
+def _score_candidate(job):
+    group, settings = job
+    return evaluate(group, settings, _SESSIONS, **_SCORING)
+
+
+def tune(paths: Sequence[str], groups: Sequence[str] = tuple(GROUPS), candidates: int = 48,
+         workers: Optional[int] = None, seed: int = 0, slack: float = 0.25, delay_weight: float = 1.0) -> Dict:
+    """
+    Search every group's settings over the labeled sessions.
+    Returns the profile: {'params': LeaningControlSystem.apply_profile params, 'report': per-group
+    default vs tuned metrics, 'sessions': paths}
+    """
+    workers = workers or os.cpu_count() or 1
+    scoring = {'slack': slack, 'delay_weight': delay_weight}
+    rng = np.random.default_rng(seed)
+    defaults = {group: current_settings(group) for group in groups}
+    labeled = set()
+    for path in paths:
+        labeled.update(load_actions(f"{path}.labels.json"))
+
+    pool = Pool(workers, _init_worker, (list(paths), scoring)) if workers > 1 else None
+    if pool is None:
+        _init_worker(paths, scoring)
+    score = pool.map if pool is not None else lambda fn, jobs: list(map(fn, jobs))
+
+    params, report = {}, {}
+    try:
+        for group in groups:
+            actions, space = GROUPS[group]
+            if not labeled.intersection(actions):
+                report[group] = {'skipped': f"no labeled {'/'.join(actions)} actions"}
+                continue
+            start = time.perf_counter()
+            # Round 1: defaults + uniform samples; round 2: samples around the best of round 1
+            tried = [defaults[group]] + sample_settings(space, candidates, rng)
+            results = score(_score_candidate, [(group, settings) for settings in tried])
+            best = min(range(len(tried)), key=lambda i: results[i]['cost'])
+            refined = sample_settings(space, max(1, candidates // 2), rng, around=tried[best])
+            tried += refined
+            results += score(_score_candidate, [(group, settings) for settings in refined])
+            best = min(range(len(tried)), key=lambda i: results[i]['cost'])
+            chosen = tried[best] if results[best]['cost'] < results[0]['cost'] else tried[0]
+            params.update(nested(chosen))
+            report[group] = {'default': results[0], 'tuned': results[tried.index(chosen)],
+                             'settings': chosen, 'candidates': len(tried),
+                             'seconds': round(time.perf_counter() - start, 2)}
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return {'params': params, 'report': report, 'sessions': list(paths)}
+
+
+def print_report(report: Dict):
+    for group, entry in report.items():
+        if 'skipped' in entry:
+            print(f"  {group}: skipped ({entry['skipped']})")
+            continue
+        print(f"  {group}: {entry['candidates']} candidates in {entry['seconds']:.1f}s")
+        for name in ('default', 'tuned'):
+            m = entry[name]
+            print(f"    {name:<8} missed {m['missed']}/{m['intended']} | false {m['false']} "
+                  f"({m['false_per_min']:.1f}/min) | delay {m['delay_ms']:.0f} ms | cost {m['cost']:.3f}")
+        print(f"    settings {', '.join(f'{key}={value:g}' for key, value in entry['settings'].items())}")
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Command-line options shared by the control scripts"""
+    group = parser.add_argument_group('threshold profile')
+    group.add_argument('--profile', metavar='PROFILE.json',
+                       help='Tuned controller thresholds (threshold_tuner.py) instead of the defaults')
+
+
+def from_args(args) -> Optional[Dict[str, Dict[str, float]]]:
+    """LeaningControlSystem(profile=...) params from --profile"""
+    if not args.profile:
+        return None
+    with open(args.profile) as f:
+        params = json.load(f)['params']
+    settings = ', '.join(f"{name}={value:g}" for values in params.values() for name, value in values.items())
+    print(f"🎛️ Threshold profile: {args.profile} ({settings or 'defaults'})")
+    return params
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tune controller thresholds on labeled landmark logs")
+    parser.add_argument('logs', nargs='+', help='Landmark logs, each with a <log>.labels.json holding "actions"')
+    parser.add_argument('--output', default='threshold_profile.json')
+    parser.add_argument('--groups', default=','.join(GROUPS), help=f"Comma-separated groups ({', '.join(GROUPS)})")
+    parser.add_argument('--candidates', type=int, default=48, help='Random candidates per group (plus a refinement round)')
+    parser.add_argument('--workers', type=int, help='Processes (default: all cores)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--slack', type=float, default=0.25,
+                        help='Seconds a press may lead a labeled action (and trail it without counting as false)')
+    parser.add_argument('--delay-weight', type=float, default=1.0,
+                        help='Cost of one second of median reaction delay, in missed-press units')
+    args = parser.parse_args()
+
+    groups = [group.strip() for group in args.groups.split(',')]
+    if set(groups) - set(GROUPS):
+        parser.error(f"unknown group(s): {', '.join(sorted(set(groups) - set(GROUPS)))}")
+    start = time.perf_counter()
+    profile = tune(args.logs, groups, args.candidates, args.workers, args.seed, args.slack, args.delay_weight)
+    print(f"Tuned {len(args.logs)} session(s) in {time.perf_counter() - start:.1f}s")
+    print_report(profile['report'])
+    with open(args.output, 'w') as f:
+        json.dump(profile, f, indent=2)
+    print(f"💾 Profile written to {args.output}")
@@ -23,16 +23,18 @@ pyautogui.PAUSE = 0.01
 pyautogui.FAILSAFE = True
 
 class TongueDetector:
-    def __init__(self, sensitivity=0.015, debounce_frames=10):
+    def __init__(self, sensitivity=0.015, repeat_ms=1000.0, ready_ms=100.0):
         """
         Initialize mouth opening detector with blue line separation method
         
         Args:
             sensitivity: Threshold for mouth line separation (0.01-0.05)
-            debounce_frames: Frames to wait before registering new detection
+            repeat_ms: Milliseconds before an open mouth can press T again
+            ready_ms: Milliseconds after a press before showing ready again
         """
         self.sensitivity = sensitivity  # Threshold for blue line separation
-        self.debounce_frames = debounce_frames
+        self.repeat_ms = repeat_ms
+        self.ready_ms = ready_ms
         self.last_tongue_detection = 0
         self.frames_since_last_detection = 0
         self.tongue_out = False
@@ -79,18 +81,20 @@ class TongueDetector:
         
         return mouth_open
     
-    def update(self, face_landmarks, control_enabled):
+    def update(self, face_landmarks, control_enabled, now=None):
         """
         Update tongue detection and handle key press
         
         Args:
             face_landmarks: MediaPipe face landmarks
             control_enabled: Whether controls are active
+            now: Capture timestamp of the frame (time.perf_counter() clock)
             
         Returns:
             dict: Detection status and action taken
         """
-        current_time = time.time()
+        current_time = time.perf_counter() if now is None else now
+        elapsed_ms = (current_time - self.last_tongue_detection) * 1000.0
         
         # Detect mouth opening
         mouth_open = self.detect_mouth_open(face_landmarks)
@@ -105,17 +109,16 @@ class TongueDetector:
         # Handle T key press on mouth opening with better debouncing
         if mouth_open:
             # Only trigger if enough time has passed since last detection
-            if current_time - self.last_tongue_detection > 1.0:  # 1 second debounce
+            if elapsed_ms > self.repeat_ms:
                 self.last_tongue_detection = current_time
                 pyautogui.press('t')  # Press T key once
                 action = "Pressed 'T' key!"
                 print(f"Mouth open detected! T key pressed at {current_time:.2f}")
             else:
-                time_since_last = current_time - self.last_tongue_detection
-                action = f"Mouth open (debounced - {1.0-time_since_last:.1f}s)"
+                action = f"Mouth open (debounced - {(self.repeat_ms - elapsed_ms) / 1000.0:.1f}s)"
         else:
             # Reset debounce timer when mouth is closed
-            if current_time - self.last_tongue_detection > 0.1:  # Small delay to prevent immediate re-trigger
+            if elapsed_ms > self.ready_ms:  # Small delay to prevent immediate re-trigger
                 action = "👄 Ready to open mouth"
             else:
                 action = "Mouth closed - waiting..."
@@ -133,7 +136,7 @@ class TongueDetector:
 
 class TongueTrackingController:
     def __init__(self):
-        self.tongue_detector = TongueDetector(sensitivity=0.02, debounce_frames=10)
+        self.tongue_detector = TongueDetector(sensitivity=0.02)
         self.control_enabled = False
         
         # Initialize MediaPipe Face Mesh
@@ -174,6 +177,7 @@ class TongueTrackingController:
             success, frame = self.cap.read()
             if not success:
                 break
+            capture_time = time.perf_counter()
             
             frame = cv2.flip(frame, 1)
             h, w, _ = frame.shape
@@ -187,7 +191,7 @@ class TongueTrackingController:
                 face_landmarks = results.multi_face_landmarks[0]
             
             # Update tongue detection
-            detection_result = self.tongue_detector.update(face_landmarks, self.control_enabled)
+            detection_result = self.tongue_detector.update(face_landmarks, self.control_enabled, capture_time)
             
             # Draw face landmarks if detected
             if face_landmarks:
@@ -10,6 +10,8 @@ from typing import Dict, List, Optional, Tuple
 from config import config
 from ai_commentary import gemini_commentary
 from voice_synthesis import voice_synthesis
+from gesture_frame import GestureFrame
+from streaming_stats import LessonScorer
 
 class TutorialMode:
     """Tutorial mode for learning gesture controls"""
@@ -19,10 +21,8 @@ class TutorialMode:
         self.lessons = self._create_lessons()
         self.current_gesture = None
         self.lesson_start_time = 0
-        self.gesture_practice_time = 0
-        self.success_count = 0
-        self.attempt_count = 0
-        self.performance_scores = []
+        self.scorer: Optional[LessonScorer] = None  # Streaming score of the current lesson
+        self.lesson_results: List[Dict] = []  # Summary of each finished lesson
         self.last_tip_time = 0
         self.tip_cooldown = 5  # seconds between tips
         
@@ -30,6 +30,7 @@ class TutorialMode:
         self.overlay_alpha = 0.7
         self.progress_bar_width = 300
         self.progress_bar_height = 20
+        self.overlay_band_height = 160  # Rows covered by the tutorial overlay (last text line at y=140)
         
         print("✓ Tutorial Mode initialized")
     
@@ -132,9 +133,10 @@ class TutorialMode:
     def start_tutorial(self):
         """Start the tutorial mode"""
         self.current_lesson = 0
-        self.performance_scores = []
+        self.lesson_results = []
         self.lesson_start_time = time.time()
         self.current_gesture = self.lessons[0]
+        self.scorer = LessonScorer(self.current_gesture['success_threshold'])
         
         # Welcome message
         welcome_text = f"Welcome to CS:GO Gesture Control Tutorial! Let's start with {self.current_gesture['name']}."
@@ -146,7 +148,7 @@ class TutorialMode:
         print(f"Lesson 1/{len(self.lessons)}: {self.current_gesture['name']}")
         print(f"Instruction: {self.current_gesture['instruction']}")
     
-    def update_tutorial(self, gesture_data: Dict, frame: np.ndarray) -> Tuple[bool, str]:
+    def update_tutorial(self, gesture_data: GestureFrame, frame: np.ndarray) -> Tuple[bool, str]:
         """
         Update tutorial progress based on current gesture performance
         Returns: (tutorial_complete, status_message)
@@ -156,19 +158,14 @@ class TutorialMode:
         
         current_time = time.time()
         lesson_elapsed = current_time - self.lesson_start_time
-        self.gesture_practice_time += 0.033  # Assume 30 FPS
         
         # Check if current gesture is being performed correctly
         gesture_performance = self._evaluate_gesture_performance(gesture_data)
         
-        # Update success/attempt counts
-        self.attempt_count += 1
-        if gesture_performance > self.current_gesture['success_threshold']:
-            self.success_count += 1
-        
-        # Calculate current performance score
-        current_score = self.success_count / max(1, self.attempt_count)
-        self.performance_scores.append(current_score)
+        # Score = share of practice time spent doing the gesture, timed by the frame's
+        # capture timestamp so it doesn't depend on the loop's frame rate
+        frame_time = gesture_data.timestamp if gesture_data.timestamp is not None else time.perf_counter()
+        current_score = self.scorer.update(gesture_performance, frame_time)
         
         # Provide tips periodically
         if (current_time - self.last_tip_time > self.tip_cooldown and 
@@ -203,7 +200,7 @@ class TutorialMode:
         
         return False, status
     
-    def _evaluate_gesture_performance(self, gesture_data: Dict) -> float:
+    def _evaluate_gesture_performance(self, gesture_data: GestureFrame) -> float:
         """Evaluate how well the current gesture is being performed"""
         gesture_id = self.current_gesture['id']
         
@@ -224,7 +221,7 @@ class TutorialMode:
         
         return 0.0
     
-    def _evaluate_gun_gesture(self, gesture_data: Dict) -> float:
+    def _evaluate_gun_gesture(self, gesture_data: GestureFrame) -> float:
         """Evaluate gun gesture performance"""
         if not gesture_data.get('gun_active', False):
             return 0.0
@@ -232,7 +229,7 @@ class TutorialMode:
         # Simple evaluation - gun is active
         return 1.0
     
-    def _evaluate_thumb_shooting(self, gesture_data: Dict) -> float:
+    def _evaluate_thumb_shooting(self, gesture_data: GestureFrame) -> float:
         """Evaluate thumb shooting performance"""
         if not gesture_data.get('gun_active', False):
             return 0.0
@@ -242,7 +239,7 @@ class TutorialMode:
         
         return 0.5  # Gun active but not shooting
     
-    def _evaluate_head_movement(self, gesture_data: Dict) -> float:
+    def _evaluate_head_movement(self, gesture_data: GestureFrame) -> float:
         """Evaluate head movement performance"""
         wasd_states = gesture_data.get('wasd_states', {})
         if wasd_states.get('w', False) or wasd_states.get('s', False):
@@ -254,7 +251,7 @@ class TutorialMode:
         
         return 0.0
     
-    def _evaluate_body_leaning(self, gesture_data: Dict) -> float:
+    def _evaluate_body_leaning(self, gesture_data: GestureFrame) -> float:
         """Evaluate body leaning performance"""
         wasd_states = gesture_data.get('wasd_states', {})
         if wasd_states.get('a', False) or wasd_states.get('d', False):
@@ -266,14 +263,14 @@ class TutorialMode:
         
         return 0.0
     
-    def _evaluate_tongue_spray(self, gesture_data: Dict) -> float:
+    def _evaluate_tongue_spray(self, gesture_data: GestureFrame) -> float:
         """Evaluate tongue spray performance"""
         if gesture_data.get('tongue_out', False):
             return 1.0
         
         return 0.0
     
-    def _evaluate_left_hand_crouch(self, gesture_data: Dict) -> float:
+    def _evaluate_left_hand_crouch(self, gesture_data: GestureFrame) -> float:
         """Evaluate left hand crouch performance"""
         left_action = gesture_data.get('left_action')
         if left_action == 'ctrl':
@@ -281,7 +278,7 @@ class TutorialMode:
         
         return 0.0
     
-    def _evaluate_left_hand_jump(self, gesture_data: Dict) -> float:
+    def _evaluate_left_hand_jump(self, gesture_data: GestureFrame) -> float:
         """Evaluate left hand jump performance"""
         left_action = gesture_data.get('left_action')
         if left_action == 'space':
@@ -292,7 +289,8 @@ class TutorialMode:
     def _complete_current_lesson(self) -> Tuple[bool, str]:
         """Complete the current lesson and move to next"""
         # Save performance score
-        final_score = self.success_count / max(1, self.attempt_count)
+        final_score = self.scorer.score
+        self.lesson_results.append({'lesson': self.current_gesture['id'], **self.scorer.summary()})
         
         completion_text = f"Great job! You completed {self.current_gesture['name']} with {final_score:.1%} accuracy!"
         print(f"TUTORIAL: {completion_text}")
@@ -309,9 +307,7 @@ class TutorialMode:
         # Start next lesson
         self.current_gesture = self.lessons[self.current_lesson]
         self.lesson_start_time = time.time()
-        self.gesture_practice_time = 0
-        self.success_count = 0
-        self.attempt_count = 0
+        self.scorer = LessonScorer(self.current_gesture['success_threshold'])
         
         next_lesson_text = f"Next lesson: {self.current_gesture['name']}. {self.current_gesture['instruction']}"
         print(f"TUTORIAL: {next_lesson_text}")
@@ -325,8 +321,10 @@ class TutorialMode:
         """Draw tutorial overlay on the frame"""
         h, w = frame.shape[:2]
         
-        # Semi-transparent overlay
-        overlay = frame.copy()
+        # Semi-transparent overlay - everything below is drawn in the top band of the
+        # frame, so only that band is copied and blended (coordinates are unchanged)
+        band = frame[:min(h, self.overlay_band_height)]
+        overlay = band.copy()
         
         # Draw progress bar
         progress_x = w - self.progress_bar_width - 20
@@ -374,7 +372,7 @@ class TutorialMode:
                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
         
         # Apply overlay
-        cv2.addWeighted(overlay, self.overlay_alpha, frame, 1 - self.overlay_alpha, 0, frame)
+        cv2.addWeighted(overlay, self.overlay_alpha, band, 1 - self.overlay_alpha, 0, band)
     
     def get_current_lesson(self) -> Optional[Dict]:
         """Get current lesson information"""
@@ -388,7 +386,8 @@ class TutorialMode:
             'current_lesson': self.current_lesson,
             'total_lessons': len(self.lessons),
             'progress_percent': (self.current_lesson / len(self.lessons)) * 100,
-            'performance_scores': self.performance_scores,
+            'lesson_results': self.lesson_results,
+            'current_lesson_stats': self.scorer.summary() if self.scorer is not None else None,
             'current_gesture': self.current_gesture
         }
     
@@ -398,9 +397,7 @@ class TutorialMode:
             self.current_lesson += 1
             self.current_gesture = self.lessons[self.current_lesson]
             self.lesson_start_time = time.time()
-            self.gesture_practice_time = 0
-            self.success_count = 0
-            self.attempt_count = 0
+            self.scorer = LessonScorer(self.current_gesture['success_threshold'])
             
             skip_text = f"Skipped to lesson {self.current_lesson + 1}: {self.current_gesture['name']}"
             print(f"TUTORIAL: {skip_text}")
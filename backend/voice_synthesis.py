@@ -8,9 +8,13 @@ import pygame
 import io
 import threading
 import time
+from collections import deque
 from typing import Optional, Callable
 from config import config
 
+# Clips waiting for synthesis/playback; when the API is slow the oldest (stale) commentary is dropped
+MAX_QUEUED_CLIPS = 3
+
 class VoiceSynthesis:
     """ElevenLabs voice synthesis system"""
     
@@ -29,7 +33,7 @@ class VoiceSynthesis:
             self.audio_available = False
         
         # Audio queue for managing multiple voice clips
-        self.audio_queue = []
+        self.audio_queue = deque(maxlen=MAX_QUEUED_CLIPS)
         self.is_playing = False
         self.current_audio = None
         
@@ -57,6 +61,8 @@ class VoiceSynthesis:
             'callback': callback
         }
         
+        if len(self.audio_queue) == self.audio_queue.maxlen:
+            print(f"⚠️ Voice queue full - dropping: {self.audio_queue[0]['text']}")
         self.audio_queue.append(audio_request)
         
         # Start processing if not already playing
@@ -72,7 +78,10 @@ class VoiceSynthesis:
         
         def process_queue():
             while self.audio_queue:
-                audio_request = self.audio_queue.pop(0)
+                try:
+                    audio_request = self.audio_queue.popleft()
+                except IndexError:  # Cleared by stop_all_audio meanwhile
+                    break
                 
                 try:
                     # Generate audio from ElevenLabs